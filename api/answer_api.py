@@ -1,7 +1,7 @@
 """
 Модуль FastAPI для обработки проверки ответов пользователей и сохранения состояния.
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 import logging
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import HTMLResponse
@@ -12,53 +12,69 @@ import json
 # NEW: Import DatabaseManager and FIPIAnswerChecker
 from utils.database_manager import DatabaseManager
 from utils.answer_checker import FIPIAnswerChecker
+from api.user_context import get_user_id
+from api.blocking_executor import BlockingCallExecutor, ExecutorOverloadedError, InlineExecutor
 
 logger = logging.getLogger(__name__)
 
-def create_app(db_manager: DatabaseManager, checker: FIPIAnswerChecker) -> FastAPI:
+def create_app(
+    db_manager: DatabaseManager,
+    checker: FIPIAnswerChecker,
+    executor: Optional[Union[BlockingCallExecutor, InlineExecutor]] = None,
+    proj_id: Optional[str] = None,
+) -> FastAPI:
     """
     Factory function to create the FastAPI application instance.
     This allows dependency injection of db_manager and checker.
+
+    `proj_id` is the project (subject) the served pages belong to: page names repeat
+    across projects, so page lookups are limited to it unless a request names another
+    project in its `proj_id` query parameter.
+
+    Database calls run through `executor`. By default they run inline on the event
+    loop, which measured faster for these short SQLite calls; pass a
+    BlockingCallExecutor to run them in a thread pool instead (requests are then
+    answered with 503 when its queue is full; the caller shuts it down).
+    The checker's pooled HTTP client is closed when the app shuts down.
     """
     app = FastAPI(title="FIPI Answer API")
 
     # NEW: Store injected dependencies
     app.state.db_manager = db_manager
     app.state.checker = checker
-
-    @app.get("/get_initial_state_for_page/{page_name}", response_class=HTMLResponse)
-    async def get_initial_state_for_page(page_name: str) -> Dict[str, Any]:
+    app.state.proj_id = proj_id
+    app.state.executor = executor or InlineExecutor()
+    # The checker keeps a pooled HTTP client open; close it with the app
+    if hasattr(checker, "aclose"):
+        app.add_event_handler("shutdown", checker.aclose)
+
+    @app.get("/get_initial_state_for_page/{page_name}")
+    async def get_initial_state_for_page(page_name: str, request: Request, proj_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Endpoint to get the initial state for all tasks on a given page.
         Returns a dictionary mapping task_id to its answer and status.
-        NEW: Uses db_manager to fetch answers for the default user.
+        NEW: Uses db_manager to fetch answers for the requesting user (`X-User-Id` header, default user otherwise).
+        Only the tasks stored for the page are looked up, so the response time depends
+        on the page size, not on the user's answer history.
+        The page is looked up in the `proj_id` query parameter's project, or in the app's project.
         """
-        logger.info(f"API: Request for initial state for page: {page_name}")
+        user_id = get_user_id(request)
+        proj_id = proj_id or app.state.proj_id
+        logger.info(f"API: Request for initial state for page: {page_name}, project: {proj_id}, user: {user_id}")
         db_manager = app.state.db_manager # NEW: Retrieve from app state
-        # NEW: Fetch all answers for the default user
+        # NEW: Fetch the user's answers to the tasks of this page
         # This method returns {problem_id: {"answer": ..., "status": ...}}
         try:
             # ИСПРАВЛЕНО: Вызов метода с правильными аргументами
-            all_user_answers = db_manager.get_answers_for_user_on_page(user_id="default_user", page_name=page_name)
-            logger.debug(f"Fetched {len(all_user_answers)} answers from DB for user 'default_user' for page '{page_name}'.")
-            # The get_answers_for_user_on_page method currently returns *all* answers for the user.
-            # Filtering by page_name must happen in the DatabaseManager method itself
-            # or the caller (e.g., in main.py when rendering) must provide context.
-            # For now, we return the fetched answers.
-            # In a more complex scenario, DBProblem would have a 'page_name' field,
-            # and get_answers_for_user_on_page would join with it or use a prefix.
-            # For this example, we assume the caller (like HTMLRenderer.render)
-            # knows the task_ids for the page and will use this dictionary accordingly.
-            # The current implementation of get_answers_for_user_on_page
-            # returns all answers for the user. This is a simplification.
-            # To truly filter by page, the DBManager needs a method like:
-            # get_problem_ids_for_page(page_name, proj_id) -> List[problem_id]
-            # and then get_answers_for_user_for_task_ids(user_id, task_ids)
-            # For now, we return all user answers.
-            # The frontend (INITIAL_PAGE_STATE) will only use the keys it needs.
-            # This is not ideal for performance if there are many tasks.
-            logger.info(f"API: Returning state for {len(all_user_answers)} tasks found for user 'default_user' for page '{page_name}'.")
+            all_user_answers = await app.state.executor.run(
+                db_manager.get_answers_for_user_on_page, user_id=user_id, page_name=page_name, proj_id=proj_id
+            )
+            logger.debug(f"Fetched {len(all_user_answers)} answers from DB for user '{user_id}' for page '{page_name}'.")
+            # Only answers to problems stored for this page are returned (single indexed JOIN).
+            logger.info(f"API: Returning state for {len(all_user_answers)} tasks found for user '{user_id}' for page '{page_name}'.")
             return all_user_answers
+        except ExecutorOverloadedError:
+            raise HTTPException(status_code=503, detail="Server is busy, please retry")
         except Exception as e:
             logger.error(f"Error loading initial state for page {page_name}: {e}", exc_info=True)
             # Return an empty dict as a fallback, or raise an HTTP error
@@ -71,10 +87,12 @@ def create_app(db_manager: DatabaseManager, checker: FIPIAnswerChecker) -> FastA
     async def submit_answer(request: Request) -> Dict[str, Any]:
         """
         Endpoint to submit an answer and check it using FIPIAnswerChecker.
-        Saves the result to the database.
+        Saves the result to the database, for the requesting user (`X-User-Id` header).
         Returns the status, a descriptive message, and the raw response from the checker if applicable.
         """
+        task_id = None
         try:
+            user_id = get_user_id(request)
             payload = await request.json()
             task_id = payload.get("task_id")
             answer = payload.get("answer")
@@ -88,7 +106,9 @@ def create_app(db_manager: DatabaseManager, checker: FIPIAnswerChecker) -> FastA
             checker = app.state.checker       # NEW: Retrieve from app state
 
             # Check if the answer already exists in the database
-            existing_answer, existing_status = db_manager.get_answer_and_status(task_id)
+            existing_answer, existing_status = await app.state.executor.run(
+                db_manager.get_answer_and_status, task_id, user_id=user_id
+            )
             if existing_answer is not None:
                 # If an answer exists, return the stored status without re-checking
                 logger.info(f"Retrieved cached result for task {task_id}, status: {existing_status}")
@@ -104,12 +124,17 @@ def create_app(db_manager: DatabaseManager, checker: FIPIAnswerChecker) -> FastA
                 message = check_result["message"]
 
                 # Save the answer and its status to the database
-                db_manager.save_answer(task_id, answer, status)
-                logger.info(f"Checked and saved new answer for task {task_id}, status: {status}")
+                await app.state.executor.run(db_manager.save_answer, task_id, answer, status, user_id=user_id)
+                logger.info(f"Checked and saved new answer for task {task_id}, user {user_id}, status: {status}")
 
                 # Return the check result
                 return check_result
 
+        except HTTPException:
+            # Re-raise HTTP exceptions (like 422 for an invalid X-User-Id header)
+            raise
+        except ExecutorOverloadedError:
+            raise HTTPException(status_code=503, detail="Server is busy, please retry")
         except Exception as e:
             logger.error(f"Error processing answer submission for task {task_id}: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -119,8 +144,11 @@ def create_app(db_manager: DatabaseManager, checker: FIPIAnswerChecker) -> FastA
         """
         Endpoint to save an answer without checking it.
         Useful for saving drafts or answers that will be checked later.
+        The answer belongs to the requesting user (`X-User-Id` header).
         """
+        task_id = None
         try:
+            user_id = get_user_id(request)
             payload = await request.json()
             task_id = payload.get("task_id")
             answer = payload.get("answer")
@@ -132,11 +160,16 @@ def create_app(db_manager: DatabaseManager, checker: FIPIAnswerChecker) -> FastA
             db_manager = app.state.db_manager # NEW: Retrieve from app state
 
             # Save the answer with the status "not_checked"
-            db_manager.save_answer(task_id, answer, "not_checked")
+            await app.state.executor.run(db_manager.save_answer, task_id, answer, "not_checked", user_id=user_id)
             logger.info(f"Saved answer for task {task_id} with status 'not_checked'")
 
             return {"message": f"Answer for task {task_id} saved successfully with status 'not_checked'."}
 
+        except HTTPException:
+            # Re-raise HTTP exceptions (like 422 for an invalid X-User-Id header)
+            raise
+        except ExecutorOverloadedError:
+            raise HTTPException(status_code=503, detail="Server is busy, please retry")
         except Exception as e:
             logger.error(f"Error saving answer for task {task_id}: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
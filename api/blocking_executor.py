@@ -0,0 +1,110 @@
+"""
+Модуль для выполнения блокирующих вызовов (SQLite, файловый ввод-вывод) вне цикла событий FastAPI.
+
+Эндпоинты объявлены как `async def` и выполняются в цикле событий uvicorn;
+синхронные методы `DatabaseManager` и `LocalStorage`, вызванные напрямую,
+останавливают обработку всех остальных запросов на время своей работы.
+`BlockingCallExecutor` выполняет их в отдельном пуле потоков с ограниченной
+очередью: при перегрузке запрос сразу отклоняется (`ExecutorOverloadedError`,
+HTTP 503), а не копится в памяти.
+
+По умолчанию API использует `InlineExecutor`, выполняющий вызовы прямо в цикле
+событий: запросы к SQLite занимают около миллисекунды, и в нагрузочном тесте
+(`scripts/load_test_submit_answer.py`) пул потоков проигрывал вызовам в цикле
+событий как без конкурирующей записи, так и при удержании блокировки записи
+другим процессом. Пул потоков подключается явно, передачей в фабрику приложения.
+"""
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ExecutorOverloadedError(RuntimeError):
+    """Очередь блокирующих вызовов заполнена; запрос следует повторить позже."""
+
+
+class InlineExecutor:
+    """Выполняет блокирующие вызовы прямо в цикле событий (поведение API по умолчанию)."""
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Выполняет функцию и возвращает её результат.
+
+        Args:
+            func (Callable[..., T]): Блокирующая функция.
+            *args: Позиционные аргументы функции.
+            **kwargs: Именованные аргументы функции.
+
+        Returns:
+            T: Результат функции.
+        """
+        return func(*args, **kwargs)
+
+
+class BlockingCallExecutor:
+    """
+    Пул потоков для блокирующих вызовов из асинхронных эндпоинтов.
+
+    Одновременно выполняется не более `max_workers` вызовов и ещё не более
+    `max_queue` ждут своей очереди; остальные отклоняются.
+    """
+
+    def __init__(self, max_workers: int = 8, max_queue: int = 256, thread_name_prefix: str = "api-io"):
+        """
+        Инициализирует BlockingCallExecutor.
+
+        Args:
+            max_workers (int): Количество потоков пула. SQLite в режиме WAL допускает
+                               параллельное чтение, запись всё равно выполняется по одной.
+            max_queue (int): Сколько вызовов может ждать свободного потока.
+            thread_name_prefix (str): Префикс имён потоков пула.
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=thread_name_prefix)
+        # Не зависит от цикла событий: один исполнитель может обслуживать несколько циклов (тесты, перезапуски)
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Выполняет блокирующую функцию в пуле потоков и ожидает результат.
+
+        Args:
+            func (Callable[..., T]): Блокирующая функция.
+            *args: Позиционные аргументы функции.
+            **kwargs: Именованные аргументы функции.
+
+        Returns:
+            T: Результат функции. Исключения функции пробрасываются вызывающему.
+
+        Raises:
+            ExecutorOverloadedError: Если все потоки заняты и очередь заполнена.
+        """
+        if not self._slots.acquire(blocking=False):
+            logger.warning(f"Blocking call {getattr(func, '__name__', func)} rejected: executor queue is full.")
+            raise ExecutorOverloadedError("Too many pending blocking calls")
+        try:
+            future = self._executor.submit(functools.partial(func, *args, **kwargs))
+        except BaseException:
+            self._slots.release()
+            raise
+        # Слот занят, пока вызов действительно выполняется, даже если запрос уже отменён
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Останавливает пул потоков.
+
+        Args:
+            wait (bool): Дождаться завершения уже запущенных вызовов.
+        """
+        logger.debug("Shutting down blocking call executor.")
+        self._executor.shutdown(wait=wait)
@@ -2,7 +2,7 @@
 Модуль FastAPI для основных эндпоинтов MVP приложения подготовки к ЕГЭ.
 Содержит заглушки для квизов, проверки ответов и генерации плана.
 """
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 import logging
 import uuid
 from fastapi import FastAPI, Request, HTTPException
@@ -12,21 +12,47 @@ from utils.database_manager import DatabaseManager
 from models.problem_schema import Problem
 from utils.local_storage import LocalStorage
 from utils.answer_checker import FIPIAnswerChecker
+from api.user_context import get_user_id
+from api.blocking_executor import BlockingCallExecutor, ExecutorOverloadedError, InlineExecutor
+from utils.quiz_selector import QuizSelector
 
 logger = logging.getLogger(__name__)
 
+QUIZ_ITEM_FIELDS = ["problem_id", "subject", "topics", "text"]
+"""Problem fields loaded to build quiz items."""
 
-def create_core_app(db_manager: DatabaseManager, storage: LocalStorage, checker: FIPIAnswerChecker) -> FastAPI:
+DEFAULT_QUIZ_SIZE = 10
+"""Number of problems in a daily quiz when the request does not set `count`."""
+
+MAX_QUIZ_SIZE = 50
+"""Largest `count` a daily quiz request may ask for."""
+
+
+def create_core_app(
+    db_manager: DatabaseManager,
+    storage: LocalStorage,
+    checker: FIPIAnswerChecker,
+    executor: Optional[Union[BlockingCallExecutor, InlineExecutor]] = None,
+    quiz_selector: Optional[QuizSelector] = None,
+) -> FastAPI:
     """
     Factory function to create the core FastAPI application instance.
 
     This app provides MVP endpoints for quizzes, answer checking, and plan generation.
     It uses dependency injection to access the DatabaseManager, LocalStorage, and FIPIAnswerChecker.
+    Their blocking calls run through the executor: inline on the event loop by default,
+    or in a thread pool when a BlockingCallExecutor is passed.
 
     Args:
         db_manager (DatabaseManager): An instance of DatabaseManager for data access.
         storage (LocalStorage): An instance of LocalStorage for caching answers.
-        checker (FIPIAnswerChecker): An instance of FIPIAnswerChecker for validating answers.
+        checker (FIPIAnswerChecker): An instance of FIPIAnswerChecker for validating answers;
+            its pooled HTTP client is closed when the app shuts down.
+        executor (Optional[Union[BlockingCallExecutor, InlineExecutor]]): Runs database and
+            storage calls. Defaults to an InlineExecutor; a BlockingCallExecutor passed here
+            is shut down by the caller.
+        quiz_selector (Optional[QuizSelector]): Picks daily quiz problems. Defaults to a new
+            selector over `db_manager`; its candidate pools are loaded at startup.
 
     Returns:
         FastAPI: Configured FastAPI application instance.
@@ -41,6 +67,21 @@ def create_core_app(db_manager: DatabaseManager, storage: LocalStorage, checker:
     app.state.db_manager = db_manager
     app.state.storage = storage
     app.state.checker = checker
+    app.state.executor = executor or InlineExecutor()
+    app.state.quiz_selector = quiz_selector or QuizSelector(db_manager)
+    # The checker keeps a pooled HTTP client open; close it with the app
+    if hasattr(checker, "aclose"):
+        app.add_event_handler("shutdown", checker.aclose)
+
+    async def warm_up_quiz_pools() -> None:
+        """Loads the quiz candidate pools before the first quiz is requested."""
+        try:
+            await app.state.executor.run(app.state.quiz_selector.warm_up)
+        except Exception as e:
+            # The pools are loaded on the first quiz instead
+            logger.warning(f"Could not preload quiz candidate pools: {e}")
+
+    app.add_event_handler("startup", warm_up_quiz_pools)
 
     @app.get("/")
     async def root() -> Dict[str, str]:
@@ -55,11 +96,15 @@ def create_core_app(db_manager: DatabaseManager, storage: LocalStorage, checker:
     @app.post("/quiz/daily/start")
     async def start_daily_quiz(request: Request) -> Dict[str, Any]:
         """
-        Starts a new daily quiz by fetching a set of problems from the database.
+        Starts a new daily quiz with problems sampled by the QuizSelector.
+
+        Problems the requesting user (`X-User-Id` header) has not answered yet are preferred.
 
         Args:
             request (Request): The incoming request object containing JSON payload.
-                Expected payload: {"page_name": "optional_page_name"}
+                Expected payload: {"page_name": "optional_page_name", "subject": "optional_subject",
+                                   "topic": "optional_topic", "difficulty": "optional_difficulty",
+                                   "count": optional_number_of_problems}
 
         Returns:
             Dict[str, Any]: A dictionary containing the quiz ID and a list of quiz items.
@@ -69,25 +114,39 @@ def create_core_app(db_manager: DatabaseManager, storage: LocalStorage, checker:
             payload = await request.json()
             # Optional page_name for future filtering, ignored in this stub
             page_name = payload.get("page_name", None)
-            logger.info(f"Starting daily quiz. Requested page: {page_name}")
+            user_id = get_user_id(request)
+            try:
+                count = int(payload.get("count", DEFAULT_QUIZ_SIZE))
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=422, detail="count must be an integer")
+            if not 1 <= count <= MAX_QUIZ_SIZE:
+                raise HTTPException(status_code=422, detail=f"count must be between 1 and {MAX_QUIZ_SIZE}")
+            logger.info(f"Starting daily quiz for user {user_id}. Requested page: {page_name}")
 
             db_manager: DatabaseManager = app.state.db_manager
-            # Fetch all problems (or a limited number for MVP)
-            # In a real implementation, this would be filtered by page, difficulty, etc.
-            all_problems = db_manager.get_all_problems()
-            # For MVP, let's take a smaller sample, e.g., first 10
-            problems = all_problems[:10]
+            quiz_selector: QuizSelector = app.state.quiz_selector
+            problem_ids = await app.state.executor.run(
+                quiz_selector.select, user_id, count,
+                subject=payload.get("subject"), topic=payload.get("topic"), difficulty=payload.get("difficulty"),
+            )
+            # Only the fields the quiz shows, for the selected problems; the generator is consumed in the executor thread
+            rows = await app.state.executor.run(
+                list, db_manager.iter_problem_fields(QUIZ_ITEM_FIELDS, problem_ids=problem_ids)
+            ) if problem_ids else []
+            by_id = {row["problem_id"]: row for row in rows}
+            problems = [by_id[problem_id] for problem_id in problem_ids if problem_id in by_id]
 
             quiz_id = f"daily_quiz_{uuid.uuid4().hex[:8]}"
             items = []
             for problem in problems:
                 # Extract fields
-                problem_id = problem.problem_id
-                subject = problem.subject
+                problem_id = problem["problem_id"]
+                subject = problem["subject"]
                 # Assuming topics is a list, take the first one or join them
-                topic = problem.topics[0] if problem.topics else "general"
+                topic = problem["topics"][0] if problem["topics"] else "general"
                 # Truncate prompt for brevity
-                prompt = problem.text[:200] + "..." if len(problem.text) > 200 else problem.text
+                text = problem["text"]
+                prompt = text[:200] + "..." if len(text) > 200 else text
                 # Default to text input for all problems in this stub
                 choices_or_input_type = "text_input"
 
@@ -106,6 +165,11 @@ def create_core_app(db_manager: DatabaseManager, storage: LocalStorage, checker:
                 "quiz_id": quiz_id,
                 "items": items
             }
+        except HTTPException:
+            # Re-raise HTTP exceptions (like 422)
+            raise
+        except ExecutorOverloadedError:
+            raise HTTPException(status_code=503, detail="Server is busy, please retry")
         except Exception as e:
             logger.error(f"Error starting daily quiz: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail="Internal server error while starting quiz")
@@ -160,7 +224,7 @@ def create_core_app(db_manager: DatabaseManager, storage: LocalStorage, checker:
     async def check_answer(request: Request) -> Dict[str, Any]:
         """
         Checks a single user answer against the correct one using FIPIAnswerChecker.
-        Caches the result using LocalStorage.
+        Caches the result using LocalStorage, per user (`X-User-Id` header, default user otherwise).
 
         Args:
             request (Request): The incoming request object containing JSON payload.
@@ -175,6 +239,7 @@ def create_core_app(db_manager: DatabaseManager, storage: LocalStorage, checker:
             problem_id = request_data.get("problem_id")
             user_answer = request_data.get("user_answer")
             form_id = request_data.get("form_id") # Required for FIPI checker
+            user_id = get_user_id(request)
 
             if not problem_id or user_answer is None or not form_id:
                 raise HTTPException(status_code=422, detail="problem_id, user_answer, and form_id are required")
@@ -186,9 +251,11 @@ def create_core_app(db_manager: DatabaseManager, storage: LocalStorage, checker:
             checker: FIPIAnswerChecker = request.app.state.checker
 
             # Check if the answer is already cached
-            stored_answer, stored_status = storage.get_answer_and_status(problem_id)
+            stored_answer, stored_status = await app.state.executor.run(
+                storage.get_answer_and_status, problem_id, user_id=user_id
+            )
             if stored_answer is not None and stored_status in ["correct", "incorrect"]:
-                logger.info(f"Answer for {problem_id} found in cache: {stored_status}")
+                logger.info(f"Answer for {problem_id}, user {user_id} found in cache: {stored_status}")
                 return {
                     "verdict": stored_status,
                     "score_float": 1.0 if stored_status == "correct" else 0.0,
@@ -203,7 +270,7 @@ def create_core_app(db_manager: DatabaseManager, storage: LocalStorage, checker:
             message = check_result["message"]
 
             # Save the result to storage
-            storage.save_answer_and_status(problem_id, user_answer, status)
+            await app.state.executor.run(storage.save_answer_and_status, problem_id, user_answer, status, user_id=user_id)
 
             # Prepare the response based on the check result
             score_float = 1.0 if status == "correct" else (0.0 if status == "incorrect" else -1.0)
@@ -222,6 +289,8 @@ def create_core_app(db_manager: DatabaseManager, storage: LocalStorage, checker:
         except HTTPException:
             # Re-raise HTTP exceptions (like 422)
             raise
+        except ExecutorOverloadedError:
+            raise HTTPException(status_code=503, detail="Server is busy, please retry")
         except Exception as e:
             logger.error(f"Error checking answer for problem '{problem_id}': {e}", exc_info=True)
             raise HTTPException(status_code=500, detail="Internal server error while checking answer")
@@ -0,0 +1,49 @@
+"""
+Модуль для определения пользователя, от имени которого выполняется запрос к API.
+
+Пользователь передаётся заголовком `X-User-Id`; запросы без заголовка относятся
+к пользователю по умолчанию, как и до появления поддержки нескольких пользователей.
+"""
+import logging
+
+from fastapi import HTTPException, Request
+
+logger = logging.getLogger(__name__)
+
+USER_ID_HEADER = "X-User-Id"
+"""Заголовок запроса с идентификатором пользователя."""
+
+DEFAULT_USER_ID = "default_user"
+"""Пользователь, к которому относятся запросы без заголовка `X-User-Id`."""
+
+MAX_USER_ID_LENGTH = 128
+"""Максимальная длина идентификатора пользователя."""
+
+USER_ID_FORBIDDEN_CHARS = "/"
+"""Символы, недопустимые в идентификаторе: "/" разделяет пользователя и задачу в ключах `LocalStorage`."""
+
+
+def get_user_id(request: Request) -> str:
+    """
+    Возвращает идентификатор пользователя из заголовка запроса.
+
+    Args:
+        request (Request): Входящий запрос.
+
+    Returns:
+        str: Идентификатор пользователя или `DEFAULT_USER_ID`, если заголовок не передан.
+
+    Raises:
+        HTTPException: 422, если идентификатор длиннее `MAX_USER_ID_LENGTH` символов
+            или содержит символы из `USER_ID_FORBIDDEN_CHARS`.
+    """
+    user_id = (request.headers.get(USER_ID_HEADER) or "").strip()
+    if not user_id:
+        return DEFAULT_USER_ID
+    if len(user_id) > MAX_USER_ID_LENGTH:
+        logger.warning(f"Rejected {USER_ID_HEADER} header of {len(user_id)} characters.")
+        raise HTTPException(status_code=422, detail=f"{USER_ID_HEADER} must be at most {MAX_USER_ID_LENGTH} characters")
+    if any(char in user_id for char in USER_ID_FORBIDDEN_CHARS):
+        logger.warning(f"Rejected {USER_ID_HEADER} header with a forbidden character: {user_id!r}")
+        raise HTTPException(status_code=422, detail=f"{USER_ID_HEADER} must not contain {USER_ID_FORBIDDEN_CHARS!r}")
+    return user_id
@@ -19,6 +19,11 @@ except ImportError:
     # Optionally print a warning
     # print("Warning: python-dotenv not found. Using system environment variables.")
 
+def _get_list(name: str, default: str) -> list:
+    """Reads a comma-separated environment variable into a list of non-empty, stripped items."""
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+
 # --- Configuration Variables ---
 # Load from environment variables, with sensible defaults if not present
 
@@ -60,3 +65,115 @@ BROWSER_USER_AGENT: str = os.getenv(
 
 BROWSER_HEADLESS: bool = os.getenv("BROWSER_HEADLESS", "True").lower() != "false"
 """Whether to run the browser in headless mode."""
+
+BROWSER_RECYCLE_EVERY: int = int(os.getenv("BROWSER_RECYCLE_EVERY", 25))
+"""Number of pages served by one browser context before it is recycled (0 disables recycling)."""
+
+SCRAPE_CONCURRENCY: int = int(os.getenv("SCRAPE_CONCURRENCY", 1))
+"""Number of pages scraped at the same time, each worker with its own browser (1 = sequential)."""
+
+SCRAPE_MIN_INTERVAL_PER_HOST: float = float(os.getenv("SCRAPE_MIN_INTERVAL_PER_HOST", 0.5))
+"""Minimum number of seconds between two page navigations to the same host, across all workers."""
+
+PAGE_WAIT_UNTIL: str = os.getenv("PAGE_WAIT_UNTIL", "domcontentloaded")
+"""Playwright load state awaited by page.goto for assignment pages ('domcontentloaded', 'load', 'networkidle')."""
+
+PAGE_READY_TIMEOUT_MS: int = int(os.getenv("PAGE_READY_TIMEOUT_MS", 15000))
+"""Maximum time to wait for the qblock and header elements of an assignment page, in milliseconds."""
+
+PAGE_READY_FALLBACK_MS: int = int(os.getenv("PAGE_READY_FALLBACK_MS", 1000))
+"""Fixed wait used when the readiness elements do not appear in time, in milliseconds."""
+
+ASSET_DOWNLOAD_WORKERS: int = int(os.getenv("ASSET_DOWNLOAD_WORKERS", 8))
+"""Maximum number of assets (images, files) of one page downloaded concurrently (1 = sequential)."""
+
+ASSET_CACHE_ENABLED: bool = os.getenv("ASSET_CACHE_ENABLED", "True").lower() != "false"
+"""Whether downloaded assets are kept in a content-addressed cache shared by all runs."""
+
+ASSET_CACHE_DIR: Path = Path(os.getenv("ASSET_CACHE_DIR", DATA_ROOT / "asset_cache")).resolve()
+"""Directory of the cross-run asset cache (blobs by content hash plus a per-URL index)."""
+
+ASSET_CACHE_MAX_AGE: float = float(os.getenv("ASSET_CACHE_MAX_AGE", 0))
+"""Seconds after a successful check during which a cached asset is reused without any request (0 = always revalidate)."""
+
+INCREMENTAL_SCRAPE: bool = os.getenv("INCREMENTAL_SCRAPE", "False").lower() == "true"
+"""Whether pages unchanged since the previous run are skipped; such a run folder holds only the changed pages (page_changes.json names the run with each unchanged page's outputs)."""
+
+PAGE_FINGERPRINT_MODE: str = os.getenv("PAGE_FINGERPRINT_MODE", "qblock_ids")
+"""How unchanged pages are detected: 'qblock_ids' (same set of tasks) or 'html' (identical raw HTML)."""
+
+PAGE_FINGERPRINTS_DIR: Path = Path(os.getenv("PAGE_FINGERPRINTS_DIR", DATA_ROOT / "page_fingerprints")).resolve()
+"""Directory with the per-subject page fingerprints used by the incremental mode."""
+
+PAGE_RETRY_ATTEMPTS: int = int(os.getenv("PAGE_RETRY_ATTEMPTS", 3))
+"""Total number of attempts for a failing page within one run (1 = no retries)."""
+
+PAGE_RETRY_BACKOFF: float = float(os.getenv("PAGE_RETRY_BACKOFF", 30))
+"""Seconds to wait before the first retry round; doubled before every following round."""
+
+HTML_PARSER: str = os.getenv("HTML_PARSER", "lxml")
+"""BeautifulSoup tree builder used to parse scraped pages ('lxml', 'html.parser' or 'html5lib')."""
+
+ARCHIVE_RAW_PAGES: bool = os.getenv("ARCHIVE_RAW_PAGES", "True").lower() != "false"
+"""Keep a gzip snapshot of every captured page in the run folder ('raw/'), for offline reprocessing (main.py --reprocess)."""
+
+_processing_workers = os.getenv("PROCESSING_WORKERS", "0")
+PROCESSING_WORKERS: int = (os.cpu_count() or 1) if _processing_workers.lower() == "auto" else int(_processing_workers)
+"""Worker processes that parse captured pages while the browser loads the next ones ('auto' = one per CPU core, 0 = parse in the scraping thread). Takes precedence over SCRAPE_CONCURRENCY."""
+
+# SQLite connection profile (see utils.database_manager.SQLiteProfile)
+SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+"""SQLite journal mode; WAL lets the API read answers while the scraper writes."""
+
+SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+"""SQLite synchronous level ('OFF', 'NORMAL', 'FULL'); NORMAL is safe with WAL."""
+
+SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+"""Milliseconds a connection waits for a lock held by another connection before failing."""
+
+SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+"""Bytes of the database file memory-mapped by each connection (0 disables mmap)."""
+
+SQLITE_CACHE_SIZE_KIB: int = int(os.getenv("SQLITE_CACHE_SIZE_KIB", 64 * 1024))
+"""Page cache size of each connection, in KiB."""
+
+SQLITE_POOL_SIZE: int = int(os.getenv("SQLITE_POOL_SIZE", 5))
+"""Number of pooled SQLite connections kept open for the scraper and API threads."""
+
+ANSWER_CACHE_SIZE: int = int(os.getenv("ANSWER_CACHE_SIZE", 4096))
+"""Number of recent (user, task) answer states kept in memory by the answer API (0 disables the cache)."""
+
+CHECKER_TIMEOUT: float = float(os.getenv("CHECKER_TIMEOUT", 10.0))
+"""Seconds to wait for FIPI to check an answer."""
+
+CHECKER_HTTP2: bool = os.getenv("CHECKER_HTTP2", "True").lower() != "false"
+"""Whether the answer checker negotiates HTTP/2 with FIPI (multiplexes checks over one connection)."""
+
+CHECKER_MAX_CONNECTIONS: int = int(os.getenv("CHECKER_MAX_CONNECTIONS", 20))
+"""Maximum number of concurrent connections the answer checker opens to FIPI."""
+
+CHECKER_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("CHECKER_MAX_KEEPALIVE_CONNECTIONS", 10))
+"""Number of idle connections to FIPI the answer checker keeps open between checks."""
+
+CHECKER_KEEPALIVE_EXPIRY: float = float(os.getenv("CHECKER_KEEPALIVE_EXPIRY", 30.0))
+"""Seconds an idle connection to FIPI is kept open before it is closed."""
+
+CHECKER_VERDICT_CACHE_TTL: float = float(os.getenv("CHECKER_VERDICT_CACHE_TTL", 600.0))
+"""Seconds a FIPI verdict for a (task, answer) pair is reused for all users (0 disables the cache)."""
+
+CHECKER_VERDICT_CACHE_SIZE: int = int(os.getenv("CHECKER_VERDICT_CACHE_SIZE", 10000))
+"""Maximum number of FIPI verdicts kept in memory by the answer checker."""
+
+# Request routing during HTML capture (comma-separated lists)
+BLOCKED_RESOURCE_TYPES: list = _get_list("BLOCKED_RESOURCE_TYPES", "font,media")
+"""Playwright resource types aborted while capturing pages (e.g. 'font,media,image')."""
+
+BLOCKED_URL_PATTERNS: list = _get_list(
+    "BLOCKED_URL_PATTERNS",
+    "*google-analytics.com*,*googletagmanager.com*,*doubleclick.net*,*mc.yandex.ru*,"
+    "*top-fwz1.mail.ru*,*counter.yadro.ru*,*connect.facebook.net*"
+)
+"""URL glob patterns aborted while capturing pages (third-party trackers by default)."""
+
+ALLOWED_URL_PATTERNS: list = _get_list("ALLOWED_URL_PATTERNS", "")
+"""URL glob patterns that are never blocked; they override both block lists."""
@@ -9,11 +9,23 @@ This script orchestrates the scraping process:
 """
 import config
 from scraper import fipi_scraper
+from scraper.concurrent_scraper import ConcurrentPageScraper, PageScrapeResult
+from scraper.processing_pipeline import PageProcessingPipeline
+from scraper.raw_page_archive import RawPageArchive
+from scraper.snapshot_reprocessor import SnapshotReprocessor
+from scraper.page_readiness import PageReadinessWaiter
+from scraper.request_router import RequestRouter
 from processors import html_renderer, json_saver
-from utils.database_manager import DatabaseManager # NEW: Import DatabaseManager
+from utils.database_manager import DatabaseManager, SQLiteProfile # NEW: Import DatabaseManager
 from utils.answer_checker import FIPIAnswerChecker # NEW: Import AnswerChecker
 from api.answer_api import create_app # NEW: Import API app factory
 from utils.logging_config import setup_logging # NEW: Import logging setup
+from utils.rate_limiter import HostRateLimiter
+from utils.asset_cache import AssetCache
+from utils.page_fingerprints import PageFingerprintStore
+from utils.checkpoint_journal import CheckpointJournal
+import argparse
+import json
 import logging # NEW: Import logging
 from pathlib import Path
 from datetime import datetime
@@ -21,6 +33,8 @@ import threading # NEW: Import threading for API server
 import time # NEW: Import time for waiting
 import uvicorn # NEW: Import uvicorn to run the API server
 import os # NEW: Import os for graceful shutdown
+import shutil
+import sys
 
 def get_user_selection(subjects_dict):
     """
@@ -50,10 +64,40 @@ def get_user_selection(subjects_dict):
         except ValueError:
             print("Invalid input. Please enter a number.")
 
-def main():
+def parse_args(argv=None):
+    """
+    Parses the command line arguments.
+
+    Args:
+        argv (List[str], optional): Arguments without the program name. Defaults to none.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Scrape a FIPI subject into a run folder.")
+    parser.add_argument(
+        "--resume", nargs="?", const="latest", default=None, metavar="RUN_FOLDER",
+        help="Continue an interrupted run: the given run folder, or the latest run of the selected subject."
+    )
+    parser.add_argument(
+        "--reprocess", default=None, metavar="RUN_FOLDER",
+        help="Rebuild a run from its archived raw pages, without a browser or network access."
+    )
+    parser.add_argument(
+        "--output", default=None, metavar="RUN_FOLDER",
+        help="Run folder for --reprocess. Defaults to a new run folder next to the source run."
+    )
+    return parser.parse_args(argv if argv is not None else [])
+
+
+def main(argv=None):
     """
     Main function to run the FIPI parser.
+
+    Args:
+        argv (List[str], optional): Command line arguments (see `parse_args`).
     """
+    args = parse_args(argv)
     # NEW: Setup logging first
     setup_logging(level="INFO")
     logger = logging.getLogger(__name__)
@@ -61,48 +105,90 @@ def main():
 
     # 1. Initialize Scraper to get subjects
     logger.info("Initializing FIPIScraper")
-    scraper = fipi_scraper.FIPIScraper(
-        base_url=config.FIPI_QUESTIONS_URL, # URL for scrape_page
-        subjects_url=config.FIPI_SUBJECTS_URL # URL for get_projects
-    )
+    # NEW: All scrapers (including concurrent workers) share one per-host politeness limiter
+    rate_limiter = HostRateLimiter(min_interval=config.SCRAPE_MIN_INTERVAL_PER_HOST)
+    # NEW: Skip fonts, media and trackers while capturing page HTML (block lists come from config)
+    request_router = RequestRouter()
+    # NEW: Images and files are kept across runs and only re-downloaded when they change
+    asset_cache = AssetCache(config.ASSET_CACHE_DIR, max_age=config.ASSET_CACHE_MAX_AGE) if config.ASSET_CACHE_ENABLED else None
+    # NEW: In incremental mode pages unchanged since the previous run are not processed again
+    fingerprint_store = None
+    if config.INCREMENTAL_SCRAPE:
+        fingerprint_store = PageFingerprintStore(config.PAGE_FINGERPRINTS_DIR, mode=config.PAGE_FINGERPRINT_MODE)
+        logger.info(f"Incremental mode enabled (fingerprints: {config.PAGE_FINGERPRINT_MODE})")
 
-    print("Fetching available subjects...")
-    logger.info("Fetching available subjects...")
-    try:
-        subjects = scraper.get_projects()
-        if not subjects:
-            logger.warning("Warning: No subjects found on the page.")
-            print("Warning: No subjects found on the page.")
-            return
-    except Exception as e:
-        logger.error(f"Error fetching subjects: {e}", exc_info=True)
-        print(f"Error fetching subjects: {e}")
+    def scraper_factory():
+        return fipi_scraper.FIPIScraper(
+            base_url=config.FIPI_QUESTIONS_URL, # URL for scrape_page
+            subjects_url=config.FIPI_SUBJECTS_URL, # URL for get_projects
+            recycle_context_every=config.BROWSER_RECYCLE_EVERY,
+            rate_limiter=rate_limiter,
+            readiness=PageReadinessWaiter(
+                timeout_ms=config.PAGE_READY_TIMEOUT_MS,
+                fallback_ms=config.PAGE_READY_FALLBACK_MS
+            ),
+            wait_until=config.PAGE_WAIT_UNTIL,
+            request_router=request_router,
+            asset_download_workers=config.ASSET_DOWNLOAD_WORKERS,
+            asset_cache=asset_cache,
+            fingerprint_store=fingerprint_store,
+            html_parser=config.HTML_PARSER,
+            archive_raw_pages=config.ARCHIVE_RAW_PAGES
+        )
+
+    scraper = scraper_factory()
+
+    if args.reprocess:
+        # NEW: Offline rebuild from raw page snapshots; the browser is never started
+        _reprocess_run(scraper, Path(args.reprocess), args.output, logger)
         return
 
-    # 2. Get user selection
-    selected_proj_id, selected_subject_name = get_user_selection(subjects)
+    # NEW: One browser session is shared by get_projects and every scrape_page call
+    with scraper:
+        _run_session(scraper, scraper_factory, logger, fingerprint_store, resume=args.resume)
 
-    # 3. Create run-specific output folder
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    # Sanitize subject name for use in path
-    safe_subject_name = "".join(c for c in selected_subject_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-    run_folder = config.DATA_ROOT / config.OUTPUT_DIR / f"{safe_subject_name}_{selected_proj_id}" / f"run_{timestamp}"
+
+def _run_session(scraper, scraper_factory, logger, fingerprint_store=None, resume=None):
+    """
+    Runs the interactive scraping session using an already started scraper.
+
+    Args:
+        scraper (FIPIScraper): Scraper with an open browser session.
+        scraper_factory (Callable[[], FIPIScraper]): Creates extra scrapers for concurrent scraping.
+        logger (logging.Logger): Logger of the main module.
+        fingerprint_store (PageFingerprintStore, optional): Set in incremental mode; updated for
+                                                            every page saved in this run.
+        resume (str, optional): Run to continue: "latest" or a run folder path (see `_select_run`).
+    """
+    selection = _select_run(scraper, logger, resume)
+    if selection is None:
+        return
+    selected_proj_id, selected_subject_name, run_folder = selection
     run_folder.mkdir(parents=True, exist_ok=True)
     logger.info(f"Data will be saved to: {run_folder}") # NEW: Log run folder creation
     print(f"Data will be saved to: {run_folder}")
 
     # NEW: Initialize DatabaseManager
     logger.info("Initializing DatabaseManager") # NEW: Log initialization
-    db_manager = DatabaseManager(str(run_folder / "fipi_data.db"))
+    db_manager = DatabaseManager(str(run_folder / "fipi_data.db"), profile=_sqlite_profile(), answer_cache_size=config.ANSWER_CACHE_SIZE)
     db_manager.initialize_db() # NEW: Create tables if they don't exist
 
     # NEW: Initialize AnswerChecker
     logger.info("Initializing FIPIAnswerChecker") # NEW: Log initialization
-    checker = FIPIAnswerChecker(base_url=config.FIPI_QUESTIONS_URL)
+    checker = FIPIAnswerChecker(
+        base_url=config.FIPI_QUESTIONS_URL,
+        timeout=config.CHECKER_TIMEOUT,
+        http2=config.CHECKER_HTTP2,
+        max_connections=config.CHECKER_MAX_CONNECTIONS,
+        max_keepalive_connections=config.CHECKER_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.CHECKER_KEEPALIVE_EXPIRY,
+        verdict_cache_ttl=config.CHECKER_VERDICT_CACHE_TTL,
+        verdict_cache_size=config.CHECKER_VERDICT_CACHE_SIZE,
+    ) # Pooled HTTP client, closed on API shutdown; identical checks share one request
 
     # NEW: Create API application
     logger.info("Creating API application") # NEW: Log app creation
-    app = create_app(db_manager, checker) # NEW: Pass db_manager and checker to API
+    app = create_app(db_manager, checker, proj_id=selected_proj_id) # NEW: Pass db_manager and checker to API; pages are looked up in the run's project
 
     # NEW: Define a target function for the thread that handles server startup
     def run_server(app, host, port):
@@ -144,76 +230,388 @@ def main():
     json_proc = json_saver.JSONSaver()
 
     # 5. Scrape and process pages
+    # NEW: Pages may be scraped concurrently, but results always arrive in page_list order
     page_list = ["init"] + [str(i) for i in range(1, config.TOTAL_PAGES + 1)]
+    # NEW: The checkpoint journal lets an interrupted run continue where it stopped
+    journal = CheckpointJournal(run_folder)
+    journal.start(selected_proj_id, selected_subject_name, page_list)
+    pages_to_scrape = journal.pending_pages(page_list)
+    if len(pages_to_scrape) < len(page_list):
+        logger.info(f"Resuming run: {len(page_list) - len(pages_to_scrape)} pages already completed, {len(pages_to_scrape)} left.")
+        print(f"Resuming run: {len(page_list) - len(pages_to_scrape)} pages already completed, {len(pages_to_scrape)} left.")
+    page_changes = {"changed": [], "unchanged": [], "failed": []}
+
+    def process_pages(pages, attempt):
+        """Scrapes and saves `pages`, returning the ones that failed."""
+        failed_pages = []
+        for result in _iter_page_results(scraper, scraper_factory, selected_proj_id, pages, run_folder):
+            page_name = result.page_name
+            print(f"Processing page: {page_name} for subject '{selected_subject_name}'...")
+            logger.info(f"Processing page: {page_name} for subject '{selected_subject_name}'...") # NEW: Log page processing
+            try:
+                if result.error is not None:
+                    raise result.error
+                # CHANGED: scrape_page now returns (problems, scraped_data)
+                problems, scraped_data = result.problems, result.scraped_data
+                if not scraped_data:
+                    raise ValueError(f"No data scraped for page {page_name}")
+                if scraped_data.get("unchanged"):
+                    # NEW: This run folder has no outputs for the page; point to the run that has them
+                    unchanged = _unchanged_page_entry(fingerprint_store, selected_proj_id, page_name)
+                    print(f"  Page {page_name} unchanged since run {unchanged['run']}. Skipping.")
+                    page_changes["unchanged"].append(unchanged)
+                    journal.record_done(page_name, {"unchanged": True, "run": unchanged["run"]})
+                    continue
+
+                outputs = _save_page_outputs(page_name, problems, scraped_data, run_folder, db_manager, html_proc, json_proc)
+                page_changes["changed"].append(page_name)
+                journal.record_done(page_name, outputs)
+                # NEW: Remember the page only once its outputs are saved
+                if fingerprint_store is not None and scraped_data.get("fingerprint"):
+                    fingerprint_store.update(selected_proj_id, page_name, scraped_data["fingerprint"], run_folder.name)
+
+            except Exception as e:
+                logger.error(f"Error processing page {page_name}: {e}", exc_info=True) # NEW: Log error with traceback
+                print(f"  Error processing page {page_name}: {e}")
+                # Optionally log error to a file within run_folder
+                error_log_path = run_folder / "error_log.txt"
+                with open(error_log_path, 'a', encoding='utf-8') as log_file:
+                    log_file.write(f"Page {page_name}: {e}\n")
+                journal.record_failed(page_name, e, attempt)
+                failed_pages.append(page_name)
+                continue # Skip to the next page
+        return failed_pages
+
+    failed_pages = process_pages(pages_to_scrape, attempt=1)
+    # NEW: Retry only the failed pages, waiting longer before each round
+    for attempt in range(2, config.PAGE_RETRY_ATTEMPTS + 1):
+        if not failed_pages:
+            break
+        delay = config.PAGE_RETRY_BACKOFF * 2 ** (attempt - 2)
+        logger.info(f"Retrying {len(failed_pages)} failed pages in {delay:.0f}s (attempt {attempt}/{config.PAGE_RETRY_ATTEMPTS})")
+        print(f"Retrying {len(failed_pages)} failed pages in {delay:.0f}s (attempt {attempt}/{config.PAGE_RETRY_ATTEMPTS})...")
+        time.sleep(delay)
+        failed_pages = process_pages(failed_pages, attempt)
+    page_changes["failed"] = failed_pages
+    if failed_pages:
+        print(f"Pages still failing: {', '.join(failed_pages)}. Continue later with: python main.py --resume \"{run_folder}\"")
+        logger.warning(f"Pages still failing after {config.PAGE_RETRY_ATTEMPTS} attempts: {failed_pages}")
+
+    if fingerprint_store is not None:
+        _report_page_changes(page_changes, run_folder, logger)
+
+    print(f"\n--- Parsing completed for '{selected_subject_name}'. Data saved in: {run_folder} ---")
+    logger.info(f"Parsing completed for '{selected_subject_name}'. Data saved in: {run_folder}") # NEW: Log completion
+
+
+def _select_run(scraper, logger, resume=None):
+    """
+    Determines the subject and the run folder of this session.
+
+    A new run asks the user for a subject and creates a `run_<timestamp>` folder.
+    `resume` continues an existing run instead: either a run folder path (the
+    subject is read from its checkpoint journal) or "latest" (the user picks the
+    subject and its most recent run with a journal is used).
+
+    Args:
+        scraper (FIPIScraper): Scraper with an open browser session.
+        logger (logging.Logger): Logger of the main module.
+        resume (str, optional): None for a new run, "latest" or the path of a run folder.
+
+    Returns:
+        Optional[Tuple[str, str, Path]]: (proj_id, subject_name, run_folder), or None if the session cannot start.
+    """
+    if resume and resume != "latest":
+        run_folder = Path(resume).expanduser().resolve()
+        journal = CheckpointJournal(run_folder)
+        if not journal.run_info:
+            logger.error(f"Cannot resume: no checkpoint journal in {run_folder}")
+            print(f"Cannot resume: no checkpoint journal in {run_folder}")
+            return None
+        logger.info(f"Resuming run {run_folder}")
+        return journal.run_info["proj_id"], journal.run_info["subject"], run_folder
+
+    print("Fetching available subjects...")
+    logger.info("Fetching available subjects...")
+    try:
+        subjects = scraper.get_projects()
+        if not subjects:
+            logger.warning("Warning: No subjects found on the page.")
+            print("Warning: No subjects found on the page.")
+            return None
+    except Exception as e:
+        logger.error(f"Error fetching subjects: {e}", exc_info=True)
+        print(f"Error fetching subjects: {e}")
+        return None
+
+    # 2. Get user selection
+    selected_proj_id, selected_subject_name = get_user_selection(subjects)
+
+    # 3. Create run-specific output folder
+    # Sanitize subject name for use in path
+    safe_subject_name = "".join(c for c in selected_subject_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    subject_folder = config.DATA_ROOT / config.OUTPUT_DIR / f"{safe_subject_name}_{selected_proj_id}"
+    if resume == "latest":
+        run_folder = CheckpointJournal.find_latest(subject_folder)
+        if run_folder is not None:
+            logger.info(f"Resuming latest run {run_folder}")
+            return selected_proj_id, selected_subject_name, run_folder
+        logger.info("No previous run to resume, starting a new one.")
+        print("No previous run to resume, starting a new one.")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    run_folder = subject_folder / f"run_{timestamp}"
+    return selected_proj_id, selected_subject_name, run_folder
+
+
+def _reprocess_run(scraper, source_run, output, logger):
+    """
+    Rebuilds a run from the raw page snapshots archived in another run.
+
+    Pages are processed in parallel worker processes and assets are copied from the
+    source run (or the asset cache), so no browser or network access is needed.
+    The new run gets its own database, page outputs, checkpoint journal and a copy
+    of the snapshots; an interrupted reprocessing continues when started again
+    with the same `output`.
+
+    Args:
+        scraper (FIPIScraper): Provides the base URL and processing components. Not started.
+        source_run (Path): Run folder holding the `raw/` snapshots.
+        output (str, optional): Run folder to write to. Defaults to `run_<timestamp>_reprocessed`
+                                next to `source_run`.
+        logger (logging.Logger): Logger of the main module.
+
+    Returns:
+        Optional[Path]: The run folder written to, or None if there was nothing to reprocess.
+    """
+    source_run = source_run.expanduser().resolve()
+    archive = RawPageArchive(source_run)
+    page_list = archive.pages()
+    if not page_list:
+        logger.error(f"Cannot reprocess: no raw page snapshots in {archive.root}")
+        print(f"Cannot reprocess: no raw page snapshots in {archive.root}")
+        return None
+    run_info = CheckpointJournal(source_run).run_info
+    proj_id = run_info.get("proj_id") or archive.load(page_list[0]).proj_id
+    subject_name = run_info.get("subject") or proj_id
+
+    if output:
+        run_folder = Path(output).expanduser().resolve()
+    else:
+        run_folder = source_run.parent / f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}_reprocessed"
+    run_folder.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Reprocessing {len(page_list)} archived pages of {source_run} into {run_folder}")
+    print(f"Reprocessing {len(page_list)} archived pages into: {run_folder}")
+
+    db_manager = DatabaseManager(str(run_folder / "fipi_data.db"), profile=_sqlite_profile(), answer_cache_size=config.ANSWER_CACHE_SIZE)
+    db_manager.initialize_db()
+    html_proc = html_renderer.HTMLRenderer(db_manager=db_manager)
+    json_proc = json_saver.JSONSaver()
+
+    # The new run can itself be reprocessed later
+    if run_folder != source_run:
+        shutil.copytree(archive.root, RawPageArchive(run_folder).root, dirs_exist_ok=True)
+
+    journal = CheckpointJournal(run_folder)
+    journal.start(proj_id, subject_name, page_list)
+    workers = config.PROCESSING_WORKERS if config.PROCESSING_WORKERS > 0 else None
+    reprocessor = SnapshotReprocessor(scraper, archive, asset_sources=[source_run, run_folder], workers=workers)
+    failed_pages = []
+    for result in reprocessor.scrape(proj_id, journal.pending_pages(page_list), run_folder):
+        page_name = result.page_name
+        try:
+            if result.error is not None:
+                raise result.error
+            outputs = _save_page_outputs(page_name, result.problems, result.scraped_data, run_folder, db_manager, html_proc, json_proc)
+            journal.record_done(page_name, outputs)
+        except Exception as e:
+            logger.error(f"Error reprocessing page {page_name}: {e}", exc_info=True)
+            print(f"  Error reprocessing page {page_name}: {e}")
+            journal.record_failed(page_name, e)
+            failed_pages.append(page_name)
+
+    if failed_pages:
+        logger.warning(f"Pages that failed to reprocess: {failed_pages}")
+        print(f"Pages that failed to reprocess: {', '.join(failed_pages)}")
+    print(f"\n--- Reprocessing completed for '{subject_name}'. Data saved in: {run_folder} ---")
+    logger.info(f"Reprocessing completed for '{subject_name}'. Data saved in: {run_folder}")
+    return run_folder
+
+
+def _unchanged_page_entry(fingerprint_store, proj_id, page_name):
+    """
+    Describes a page skipped as unchanged in an incremental run.
+
+    An incremental run folder only holds the pages that changed; the outputs of an
+    unchanged page (database rows, HTML and JSON) stay in the run that last processed it.
+
+    Args:
+        fingerprint_store (PageFingerprintStore, optional): The store that found the page unchanged.
+        proj_id (str): The project ID of the subject.
+        page_name (str): The page name.
+
+    Returns:
+        Dict[str, Optional[str]]: {"page": page_name, "run": name of the run folder with the page's outputs,
+                                  or None if it is not known}.
+    """
+    record = fingerprint_store.get(proj_id, page_name) if fingerprint_store is not None else None
+    return {"page": page_name, "run": (record or {}).get("run") or None}
+
+
+def _report_page_changes(page_changes, run_folder, logger):
+    """
+    Reports which pages changed in an incremental run and saves the report to the run folder.
+
+    Args:
+        page_changes (Dict[str, List]): Page names under "changed" and "failed"; under "unchanged",
+                                        {"page", "run"} entries naming the run folder with each page's outputs.
+        run_folder (Path): The run output folder; the report is saved as page_changes.json.
+        logger (logging.Logger): Logger of the main module.
+    """
+    summary = (
+        f"Incremental run: {len(page_changes['changed'])} changed, "
+        f"{len(page_changes['unchanged'])} unchanged, {len(page_changes['failed'])} failed pages."
+    )
+    print(summary)
+    logger.info(summary)
+    if page_changes["changed"]:
+        print(f"  Changed pages: {', '.join(page_changes['changed'])}")
+        logger.info(f"Changed pages: {page_changes['changed']}")
+    with open(run_folder / "page_changes.json", 'w', encoding='utf-8') as report_file:
+        json.dump(page_changes, report_file, ensure_ascii=False, indent=2)
+
+
+def _sqlite_profile():
+    """
+    Builds the SQLite connection profile of the run database from the configuration.
+
+    Returns:
+        SQLiteProfile: Pragmas and pool settings for `DatabaseManager`.
+    """
+    return SQLiteProfile(
+        journal_mode=config.SQLITE_JOURNAL_MODE,
+        synchronous=config.SQLITE_SYNCHRONOUS,
+        busy_timeout_ms=config.SQLITE_BUSY_TIMEOUT_MS,
+        mmap_size=config.SQLITE_MMAP_SIZE,
+        cache_size_kib=config.SQLITE_CACHE_SIZE_KIB,
+        pool_size=config.SQLITE_POOL_SIZE,
+    )
+
+
+def _iter_page_results(scraper, scraper_factory, proj_id, page_list, run_folder):
+    """
+    Yields the scrape result of every page in `page_list`, in order.
+
+    With `config.PROCESSING_WORKERS` above 0, `scraper` only captures the pages and
+    a pool of processes parses them in parallel. Otherwise, with
+    `config.SCRAPE_CONCURRENCY` above 1 the pages are scraped by a pool of
+    workers, each with its own browser session; otherwise `scraper` handles them
+    one by one.
+
+    Args:
+        scraper (FIPIScraper): Scraper with an open browser session (sequential mode).
+        scraper_factory (Callable[[], FIPIScraper]): Creates scrapers for concurrent workers.
+        proj_id (str): The project ID of the selected subject.
+        page_list (List[str]): Page names to scrape.
+        run_folder (Path): The run output folder.
+
+    Yields:
+        PageScrapeResult: The outcome for each page.
+    """
+    logger = logging.getLogger(__name__)
+    if config.PROCESSING_WORKERS > 0:
+        # NEW: The browser only captures HTML; parsing runs on all cores in worker processes
+        logger.info(f"Processing pages in {config.PROCESSING_WORKERS} worker processes")
+        pipeline = PageProcessingPipeline(scraper, workers=config.PROCESSING_WORKERS)
+        yield from pipeline.scrape(proj_id, page_list, run_folder)
+        return
+    if config.SCRAPE_CONCURRENCY > 1:
+        logger.info(f"Scraping with concurrency {config.SCRAPE_CONCURRENCY}")
+        pool = ConcurrentPageScraper(scraper_factory, concurrency=config.SCRAPE_CONCURRENCY)
+        yield from pool.scrape(proj_id, page_list, run_folder)
+        return
+
     for page_name in page_list:
-        print(f"Processing page: {page_name} for subject '{selected_subject_name}'...")
-        logger.info(f"Processing page: {page_name} for subject '{selected_subject_name}'...") # NEW: Log page processing
         try:
             # Scrape raw data for the page - ИСПРАВЛЕНО: передаем run_folder
-            # CHANGED: scrape_page now returns (problems, scraped_data)
-            problems, scraped_data = scraper.scrape_page(selected_proj_id, page_name, run_folder)
-            if not scraped_data:
-                logger.warning(f"Warning: No data scraped for page {page_name}. Skipping.") # NEW: Log warning
-                print(f"  Warning: No data scraped for page {page_name}. Skipping.")
-                continue
-
-            # NEW: Save the scraped problems using DatabaseManager
-            logger.info(f"Saving {len(problems)} problems for page {page_name} to database...") # NEW: Log saving
-            db_manager.save_problems(problems)
-
-            # --- Process and save HTML for the entire PAGE (as before) ---
-            # CHANGED: render now requires page_name
-            html_content = html_proc.render(scraped_data, page_name) # NEW: Pass page_name
-            html_file_path = run_folder / page_name / f"{page_name}.html" # HTML в подпапку
-            html_file_path.parent.mkdir(parents=True, exist_ok=True) # Убедиться, что подпапка существует
-            html_proc.save(html_content, html_file_path)
-            logger.info(f"Saved Page HTML: {html_file_path.relative_to(run_folder)}") # NEW: Log saving
-
-            # --- Process and save HTML for EACH BLOCK separately ---
-            # ИСПРАВЛЕНО: Добавляем цикл по blocks_html
-            blocks_html = scraped_data.get("blocks_html", [])
-            task_metadata = scraped_data.get("task_metadata", []) # NEW: Get task metadata
-            for block_idx, block_content in enumerate(blocks_html):
-                # NEW: Get task_id and form_id for the current block from metadata
-                metadata = task_metadata[block_idx] if block_idx < len(task_metadata) else {}
-                task_id = metadata.get('task_id', '')
-                form_id = metadata.get('form_id', '')
-
-                # Generate HTML for a single block using the new method
-                # ИСПРАВЛЕНО: Передаём asset_path_prefix="../../assets" для коррекции путей
-                # CHANGED: render_block now requires task_id, form_id, page_name for initial state
-                block_html_content = html_proc.render_block(
-                    block_content, block_idx,
-                    asset_path_prefix="../../assets", # ИСПРАВЛЕНО: Путь относительно init/blocks/
-                    task_id=task_id, # NEW: Pass task_id
-                    form_id=form_id, # NEW: Pass form_id
-                    page_name=page_name # NEW: Pass page_name for potential state loading
-                )
-                # Define path for the block's HTML file
-                block_html_file_path = run_folder / page_name / "blocks" / f"block_{block_idx}_{page_name}.html" # HTML блока в подпапку 'blocks'
-                block_html_file_path.parent.mkdir(parents=True, exist_ok=True) # Убедиться, что подпапка 'blocks' существует
-                # Save the block's HTML
-                html_proc.save(block_html_content, block_html_file_path)
-                logger.info(f"Saved block HTML: {block_html_file_path.relative_to(run_folder)}") # NEW: Log saving
-                print(f"  Saved block HTML: {block_html_file_path.relative_to(run_folder)}")
-
-            # Process and save JSON - ИСПРАВЛЕНО: сохраняем в подпапку page_name
-            json_file_path = run_folder / page_name / f"{page_name}.json" # JSON в подпапку
-            json_proc.save(scraped_data, json_file_path)
-            logger.info(f"Saved JSON: {json_file_path.relative_to(run_folder)}") # NEW: Log saving
-            print(f"  Saved Page HTML: {html_file_path.relative_to(run_folder)}, JSON: {json_file_path.relative_to(run_folder)}")
-
+            problems, scraped_data = scraper.scrape_page(proj_id, page_name, run_folder)
+            yield PageScrapeResult(page_name, problems, scraped_data)
         except Exception as e:
-            logger.error(f"Error processing page {page_name}: {e}", exc_info=True) # NEW: Log error with traceback
-            print(f"  Error processing page {page_name}: {e}")
-            # Optionally log error to a file within run_folder
-            error_log_path = run_folder / "error_log.txt"
-            with open(error_log_path, 'a', encoding='utf-8') as log_file:
-                log_file.write(f"Page {page_name}: {e}\n")
-            continue # Skip to the next page
+            yield PageScrapeResult(page_name, [], None, e)
+
+
+def _save_page_outputs(page_name, problems, scraped_data, run_folder, db_manager, html_proc, json_proc):
+    """
+    Saves one scraped page: problems to the database, page and block HTML, and JSON.
+
+    Args:
+        page_name (str): The page name (e.g., 'init', '1').
+        problems (List[Problem]): Problems built from the page.
+        scraped_data (Dict[str, Any]): The legacy scraped data dictionary.
+        run_folder (Path): The run output folder.
+        db_manager (DatabaseManager): Database to save problems to.
+        html_proc (HTMLRenderer): Renderer for page and block HTML.
+        json_proc (JSONSaver): Saver for the page JSON.
+
+    Returns:
+        Dict[str, Any]: Saved output paths relative to `run_folder` ("html", "json", "blocks") and the problem count.
+    """
+    logger = logging.getLogger(__name__)
+
+    # NEW: Save the scraped problems using DatabaseManager
+    logger.info(f"Saving {len(problems)} problems for page {page_name} to database...") # NEW: Log saving
+    db_manager.save_problems(problems)
+
+    # --- Process and save HTML for the entire PAGE (as before) ---
+    # CHANGED: render now requires page_name
+    html_content = html_proc.render(scraped_data, page_name) # NEW: Pass page_name
+    html_file_path = run_folder / page_name / f"{page_name}.html" # HTML в подпапку
+    html_file_path.parent.mkdir(parents=True, exist_ok=True) # Убедиться, что подпапка существует
+    html_proc.save(html_content, html_file_path)
+    logger.info(f"Saved Page HTML: {html_file_path.relative_to(run_folder)}") # NEW: Log saving
+
+    # --- Process and save HTML for EACH BLOCK separately ---
+    # ИСПРАВЛЕНО: Добавляем цикл по blocks_html
+    blocks_html = scraped_data.get("blocks_html", [])
+    task_metadata = scraped_data.get("task_metadata", []) # NEW: Get task metadata
+    block_files = []
+    for block_idx, block_content in enumerate(blocks_html):
+        # NEW: Get task_id and form_id for the current block from metadata
+        metadata = task_metadata[block_idx] if block_idx < len(task_metadata) else {}
+        task_id = metadata.get('task_id', '')
+        form_id = metadata.get('form_id', '')
+
+        # Generate HTML for a single block using the new method
+        # ИСПРАВЛЕНО: Передаём asset_path_prefix="../../assets" для коррекции путей
+        # CHANGED: render_block now requires task_id, form_id, page_name for initial state
+        block_html_content = html_proc.render_block(
+            block_content, block_idx,
+            asset_path_prefix="../../assets", # ИСПРАВЛЕНО: Путь относительно init/blocks/
+            task_id=task_id, # NEW: Pass task_id
+            form_id=form_id, # NEW: Pass form_id
+            page_name=page_name # NEW: Pass page_name for potential state loading
+        )
+        # Define path for the block's HTML file
+        block_html_file_path = run_folder / page_name / "blocks" / f"block_{block_idx}_{page_name}.html" # HTML блока в подпапку 'blocks'
+        block_html_file_path.parent.mkdir(parents=True, exist_ok=True) # Убедиться, что подпапка 'blocks' существует
+        # Save the block's HTML
+        html_proc.save(block_html_content, block_html_file_path)
+        block_files.append(str(block_html_file_path.relative_to(run_folder)))
+        logger.info(f"Saved block HTML: {block_html_file_path.relative_to(run_folder)}") # NEW: Log saving
+        print(f"  Saved block HTML: {block_html_file_path.relative_to(run_folder)}")
+
+    # Process and save JSON - ИСПРАВЛЕНО: сохраняем в подпапку page_name
+    json_file_path = run_folder / page_name / f"{page_name}.json" # JSON в подпапку
+    json_proc.save(scraped_data, json_file_path)
+    logger.info(f"Saved JSON: {json_file_path.relative_to(run_folder)}") # NEW: Log saving
+    print(f"  Saved Page HTML: {html_file_path.relative_to(run_folder)}, JSON: {json_file_path.relative_to(run_folder)}")
+
+    return {
+        "html": str(html_file_path.relative_to(run_folder)),
+        "json": str(json_file_path.relative_to(run_folder)),
+        "blocks": block_files,
+        "problems": len(problems),
+    }
 
-    print(f"\n--- Parsing completed for '{selected_subject_name}'. Data saved in: {run_folder} ---")
-    logger.info(f"Parsing completed for '{selected_subject_name}'. Data saved in: {run_folder}") # NEW: Log completion
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
@@ -38,6 +38,15 @@ class DBProblem(Base):
     created_at: datetime.datetime = sa.Column(sa.DateTime, nullable=False)
     updated_at: Optional[datetime.datetime] = sa.Column(sa.DateTime, nullable=True)
     metadata_ = sa.Column("metadata", sa.JSON, nullable=True)  # renamed to avoid conflict with SQLAlchemy's metadata
+    proj_id: Optional[str] = sa.Column(sa.String, nullable=True)
+    page_name: Optional[str] = sa.Column(sa.String, nullable=True)
+    task_id: Optional[str] = sa.Column(sa.String, nullable=True)  # ID задания на сайте ФИПИ, ключ ответов
+
+    # Выборка задач страницы (по page_name, с proj_id или без) идёт по одному индексу
+    __table_args__ = (
+        sa.Index("ix_problems_page_name_proj_id", "page_name", "proj_id"),
+        sa.Index("ix_problems_subject_difficulty", "subject", "difficulty"),
+    )
 
     # Связь один-ко-многим с ответами (если потребуется)
     answers = relationship("DBAnswer", back_populates="problem", cascade="all, delete-orphan")
@@ -48,7 +57,7 @@ class DBAnswer(Base):
     ORM-модель пользовательского ответа на задачу.
 
     Хранит ответ, статус проверки и временную метку.
-    Предполагается один пользователь (user_id опционален и может быть константой).
+    Ответы разных пользователей различаются по user_id (по умолчанию "default_user").
     """
     __tablename__ = "answers"
 
@@ -72,3 +81,8 @@ class DBAnswer(Base):
 
     # Связь с задачей
     problem = relationship("DBProblem", back_populates="answers")
+
+    # Ответы одного пользователя выбираются по индексу, начинающемуся с user_id
+    __table_args__ = (
+        sa.Index("ix_answers_user_id_problem_id", "user_id", "problem_id"),
+    )
@@ -40,6 +40,9 @@ class ProblemBuilder:
         skills: Optional[List[str]] = None,
         updated_at: Optional[datetime] = None,
         # ----------------------------------------------------------
+        proj_id: Optional[str] = None,
+        page_name: Optional[str] = None,
+        task_id: Optional[str] = None,
     ) -> Problem:
         """
         Builds a Problem instance from extracted data.
@@ -59,6 +62,9 @@ class ProblemBuilder:
             solutions (Optional[List[Dict[str, Any]]]): List of solutions for the problem. Defaults to None.
             skills (Optional[List[str]]): List of skill IDs associated with the problem. Defaults to None.
             updated_at (Optional[datetime]): The last update time for the problem record. Defaults to None.
+            proj_id (Optional[str]): Project ID of the subject the problem was scraped from. Defaults to None.
+            page_name (Optional[str]): Name of the page the problem is on (e.g., 'init', '1'). Defaults to None.
+            task_id (Optional[str]): FIPI task ID (e.g., '40B442'), the key of user answers. Defaults to None.
 
         Returns:
             Problem: A populated Problem instance.
@@ -83,5 +89,8 @@ class ProblemBuilder:
             raw_html_path=raw_html_path_str,
             created_at=datetime.now(),
             updated_at=updated_at, # Теперь передаётся из аргументов
-            metadata=metadata
+            metadata=metadata,
+            proj_id=proj_id,
+            page_name=page_name,
+            task_id=task_id,
         )
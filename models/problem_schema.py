@@ -34,6 +34,9 @@ class Problem(BaseModel):
         exam_part (str): Часть экзамена ("Part 1", "Part 2"), обязательное поле.
         max_score (int): Максимальный балл за задачу (1-4), обязательное поле.
         difficulty_level (str): Уровень сложности ("basic", "advanced", "high"), обязательное поле.
+        proj_id (Optional[str]): Идентификатор проекта (предмета) ФИПИ, с которого взята задача. Может быть null.
+        page_name (Optional[str]): Имя страницы банка заданий ('init', '1', ...), на которой находится задача. Может быть null.
+        task_id (Optional[str]): Идентификатор задания на сайте ФИПИ, например, '40B442'. Может быть null.
     """
     problem_id: str
     subject: str
@@ -56,3 +59,6 @@ class Problem(BaseModel):
     exam_part: str
     max_score: int
     difficulty_level: str
+    proj_id: Optional[str] = None
+    page_name: Optional[str] = None
+    task_id: Optional[str] = None
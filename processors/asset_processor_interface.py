@@ -7,8 +7,12 @@ such as downloading and replacing assets, removing elements, or transforming mar
 """
 import abc
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Optional, Tuple
 from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+if TYPE_CHECKING:
+    from processors.processing_engine import VisitContext
 
 
 class AssetProcessor(abc.ABC):
@@ -19,14 +23,29 @@ class AssetProcessor(abc.ABC):
 
     This interface enables polymorphic usage of processors and simplifies
     dependency injection and unit testing.
+
+    Processors that download assets may also override `collect_assets`, so that
+    all downloads of a page can be batched before any processor runs.
+
+    Processors can also take part in a fused, single-pass traversal (see
+    `processors.processing_engine.ProcessingEngine`) by declaring the tag names
+    they care about in `tag_names` and implementing `visit` (and optionally
+    `matches` and `begin`). Processors without `tag_names` are applied through
+    `process` only.
     """
 
+    tag_names: Optional[FrozenSet[str]] = None
+    """Tag names this processor visits ("*" for all), or None if it does not support visiting."""
+
     @abc.abstractmethod
     def process(self, soup: BeautifulSoup, assets_dir: Path, **kwargs) -> Tuple[BeautifulSoup, Dict[str, Any]]:
         """Process the BeautifulSoup object, potentially downloading or transforming assets.
 
         Args:
             soup (BeautifulSoup): The BeautifulSoup object representing the HTML fragment to process.
+                                  This may also be a `Tag` inside a larger document (e.g. a qblock
+                                  of a parsed page); processors must edit it in place and must not
+                                  rely on it being the document root.
             assets_dir (Path): The directory where downloaded assets should be saved.
                                Relative paths in the returned metadata should be relative to
                                the parent of this directory (i.e., the HTML page directory).
@@ -43,3 +62,43 @@ class AssetProcessor(abc.ABC):
                   Example: {"original_image_url.jpg": "assets/image.jpg"}.
         """
         pass
+
+    def collect_assets(self, soup: BeautifulSoup) -> List[Tuple[str, str]]:
+        """List the assets `process` would download from the given HTML, without downloading them.
+
+        Args:
+            soup (BeautifulSoup): The BeautifulSoup object representing the HTML fragment to inspect.
+
+        Returns:
+            List[Tuple[str, str]]: (asset_src, asset_type) pairs, in document order.
+                                   Processors that do not download anything return an empty list.
+        """
+        return []
+
+    def begin(self, context: "VisitContext") -> None:
+        """Prepare for a traversal, e.g. validate `context.kwargs` and initialize metadata.
+
+        Args:
+            context (VisitContext): The traversal context.
+        """
+
+    def matches(self, tag: Tag) -> bool:
+        """Tell whether a tag with one of `tag_names` should be visited.
+
+        Args:
+            tag (Tag): The candidate element.
+
+        Returns:
+            bool: True to call `visit` for this element. Defaults to True.
+        """
+        return True
+
+    def visit(self, tag: Tag, context: "VisitContext") -> None:
+        """Process one matching element in place (modify, replace or remove it).
+
+        Args:
+            tag (Tag): The element to process.
+            context (VisitContext): The traversal context; per-processor metadata goes
+                                    into `context.metadata(self)`.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support visiting")
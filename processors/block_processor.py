@@ -9,18 +9,21 @@ building Problem instances.
 import logging
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Tuple
-from bs4 import BeautifulSoup
 from bs4.element import Tag
 
-from utils.downloader import AssetDownloader
+from utils.downloader import AssetDownloader, AssetRequest
 from processors.html_data_processors import (
     ImageScriptProcessor,
     FileLinkProcessor,
+    LinkedImageProcessor,
+    InvalidImageRemover,
+    ScriptRemover,
     TaskInfoProcessor,
     InputFieldRemover,
     MathMLRemover,
     UnwantedElementRemover
 )
+from processors.processing_engine import ProcessingEngine
 from utils.metadata_extractor import MetadataExtractor
 from models.problem_builder import ProblemBuilder
 from models.problem_schema import Problem
@@ -100,8 +103,8 @@ class BlockProcessor:
                 - block_metadata (Dict[str, Any]): Metadata for this block, including task_id, form_id, and block_index.
         """
         logger.debug(f"Processing block {block_index}...")
-        combined_soup = BeautifulSoup('', 'html.parser')
-        combined_soup.append(qblock.extract())
+        # The qblock is processed in place as a subtree of the already parsed page
+        combined_soup = qblock
 
         # Get downloader instance
         downloader = self.asset_downloader_factory(page, base_url, files_location_prefix)
@@ -115,87 +118,39 @@ class BlockProcessor:
         }
         extracted_task_id = metadata["task_id"] or f"unknown_{block_index}"
 
-        # Initialize and apply processors
-        # Note: Processors list is expected to be passed during initialization
-        # If not, we could instantiate them here as per the original logic
-        # For now, we assume they are passed in self.processors
-        # Or, if the list is empty, instantiate them as before:
-        if not self.processors:
-            image_proc = ImageScriptProcessor()
-            file_proc = FileLinkProcessor()
-            info_proc = TaskInfoProcessor()
-            input_remover = InputFieldRemover()
-            math_remover = MathMLRemover()
-            unwanted_remover = UnwantedElementRemover()
-            processors_to_apply = [image_proc, file_proc, info_proc, input_remover, math_remover, unwanted_remover]
-        else:
-            processors_to_apply = self.processors
-
-        # Accumulate metadata from processors
-        all_new_images = {}
-        all_new_files = {}
-
-        # Process images inside <a> tags (previews for downloads)
-        for a_tag in combined_soup.find_all('a'):
-            img_tag = a_tag.find('img')
-            if img_tag:
-                img_src = img_tag.get('src')
-                if img_src:
-                    clean_img_src = img_src.lstrip('../../')
-                    local_img_path = downloader.download(clean_img_src, page_assets_dir / "assets", asset_type='image')
-                    if local_img_path:
-                        img_relative_path_from_html = local_img_path.relative_to(page_assets_dir)
-                        img_tag['src'] = str(img_relative_path_from_html)
-                        logger.debug(f"Updated img src inside <a> to local file: {img_tag['src']}")
-                    else:
-                        logger.warning(f"Failed to download image {clean_img_src} for assignment pair {block_index} on page {page_num}.")
-
-        # Apply processors that return (soup, metadata)
-        for processor in processors_to_apply:
-            if hasattr(processor, 'process') and callable(processor.process):
-                # Check if processor needs downloader
-                if hasattr(processor, '__class__') and processor.__class__.__name__ in ['ImageScriptProcessor', 'FileLinkProcessor']:
-                    processed_soup, proc_metadata = processor.process(combined_soup, page_assets_dir.parent, downloader=downloader)
-                else:
-                    processed_soup, proc_metadata = processor.process(combined_soup, page_assets_dir.parent)
+        processors_to_apply = self._processors_to_apply()
 
-                combined_soup = processed_soup
-                # Accumulate metadata from processors
-                if isinstance(proc_metadata, dict):
-                    if 'downloaded_images' in proc_metadata:
-                        all_new_images.update(proc_metadata['downloaded_images'])
-                    if 'downloaded_files' in proc_metadata:
-                        all_new_files.update(proc_metadata['downloaded_files'])
-
-        # Remove duplicate or undefined <img> tags
-        for img_tag in combined_soup.find_all('img'):
-            if img_tag.get('alt') == 'undefined' or img_tag.get('align') or img_tag.get('border'):
-                img_tag.decompose()
+        # Download linked image previews, apply the processors, then drop invalid images and scripts,
+        # all fused into as few tree walks as possible
+        combined_soup, all_new_images, all_new_files = self._run_pipeline(
+            [LinkedImageProcessor()] + processors_to_apply + [InvalidImageRemover(), ScriptRemover()],
+            combined_soup,
+            page_assets_dir.parent,
+            downloader
+        )
 
         # Append task-header-panel after qblock
         task_header_panel = header_container.find('div', class_='task-header-panel')
         if task_header_panel:
-            info_button = task_header_panel.find('div', class_='info-button')
-            if info_button:
-                header_soup_temp = BeautifulSoup('', 'html.parser')
-                header_soup_temp.append(task_header_panel)
+            panel_processors: List[Any] = []
+            if task_header_panel.find('div', class_='info-button'):
                 # Find the specific TaskInfoProcessor instance
                 info_proc = next((p for p in processors_to_apply if isinstance(p, TaskInfoProcessor)), TaskInfoProcessor())
-                processed_header_soup, _ = info_proc.process(header_soup_temp, page_assets_dir.parent)
-                header_soup_temp = processed_header_soup
-                task_header_panel = header_soup_temp.find('div', class_='task-header-panel')
-                logger.debug(f"Processed task-info for assignment pair {block_index}.")
-            combined_soup.append(task_header_panel.extract())
+                panel_processors.append(info_proc)
+                logger.debug(f"Processing task-info for assignment pair {block_index}.")
+            self._run_pipeline(panel_processors + [ScriptRemover()], task_header_panel, page_assets_dir.parent, downloader)
+            # Detach the panel so it is rendered after the qblock and no longer counted as header text
+            task_header_panel.extract()
             logger.debug(f"Appended task-header-panel for assignment pair {block_index}.")
         else:
             logger.warning(f"No task-header-panel found in header container for assignment pair {block_index}")
 
-        # Remove all remaining scripts
-        for script_tag in combined_soup.find_all('script'):
-            script_tag.decompose()
+        block_parts = [part for part in (combined_soup, task_header_panel) if part is not None]
 
-        processed_html_string = str(combined_soup)
-        assignment_text = combined_soup.get_text(separator='\n', strip=True)
+        processed_html_string = "".join(str(part) for part in block_parts)
+        assignment_text = "\n".join(
+            text for text in (part.get_text(separator='\n', strip=True) for part in block_parts) if text
+        )
 
         # Build Problem instance
         problem_id = f"{page_num}_{extracted_task_id}"
@@ -212,12 +167,125 @@ class BlockProcessor:
             topics=topics,
             difficulty=difficulty_str,
             source_url=source_url,
-            metadata={"original_block_index": block_index, "proj_id": proj_id}
+            metadata={"original_block_index": block_index, "proj_id": proj_id},
+            proj_id=proj_id,
+            page_name=page_num,
+            task_id=metadata["task_id"] or None,
         )
 
         logger.debug(f"Finished processing block {block_index}.")
         return processed_html_string, assignment_text, all_new_images, all_new_files, problem, block_metadata
 
+    def collect_assets(self, qblock: Tag, page_assets_dir: Path) -> List[AssetRequest]:
+        """
+        Lists every asset `process` would download for a qblock, without downloading anything.
+
+        Used to batch the downloads of a whole page (see `AssetDownloader.download_many`)
+        before the blocks are processed. The save directories match the ones used by `process`.
+
+        Args:
+            qblock (Tag): The BeautifulSoup Tag for the qblock.
+            page_assets_dir (Path): The directory to save downloaded assets for this page.
+
+        Returns:
+            List[AssetRequest]: (asset_src, save_dir, asset_type) tuples, possibly with duplicates.
+        """
+        assets: List[AssetRequest] = [
+            (img_tag.get('src').lstrip('../../'), page_assets_dir / "assets", 'image')
+            for img_tag in self._linked_images(qblock)
+        ]
+        for processor in self._processors_to_apply():
+            collect = getattr(processor, 'collect_assets', None)
+            if not callable(collect):
+                continue
+            for asset_src, asset_type in collect(qblock):
+                assets.append((asset_src, page_assets_dir.parent / "assets", asset_type))
+        return assets
+
+    @staticmethod
+    def _run_pipeline(
+        processors: List[Any],
+        root: Tag,
+        assets_dir: Path,
+        downloader: AssetDownloader
+    ) -> Tuple[Tag, Dict[str, str], Dict[str, str]]:
+        """
+        Applies processors to a subtree in order, in as few traversals as possible.
+
+        Consecutive processors that support visiting (see `ProcessingEngine.supports_visiting`)
+        share a single walk of the tree; any other processor is applied with its own
+        `process` method, between the walks; the tree it returns is the one processed next.
+
+        Args:
+            processors (List[Any]): The processors, in the order they must be applied.
+            root (Tag): The subtree to process in place.
+            assets_dir (Path): The `assets_dir` passed to the processors (the page's assets folder).
+            downloader (AssetDownloader): The downloader passed to the processors that need one.
+
+        Returns:
+            Tuple[Tag, Dict[str, str], Dict[str, str]]: The processed subtree, and the 'downloaded_images'
+                                                        and 'downloaded_files' metadata of all processors, merged.
+        """
+        all_new_images: Dict[str, str] = {}
+        all_new_files: Dict[str, str] = {}
+
+        def accumulate(proc_metadata: Any) -> None:
+            if isinstance(proc_metadata, dict):
+                if 'downloaded_images' in proc_metadata:
+                    all_new_images.update(proc_metadata['downloaded_images'])
+                if 'downloaded_files' in proc_metadata:
+                    all_new_files.update(proc_metadata['downloaded_files'])
+
+        def run_visitors(visitors: List[Any], tree: Tag) -> None:
+            if not visitors:
+                return
+            context = ProcessingEngine(visitors).run(tree, assets_dir, downloader=downloader)
+            for visitor in visitors:
+                accumulate(context.metadata(visitor))
+
+        pending_visitors: List[Any] = []
+        for processor in processors:
+            if ProcessingEngine.supports_visiting(processor):
+                pending_visitors.append(processor)
+                continue
+            if not (hasattr(processor, 'process') and callable(processor.process)):
+                continue
+            run_visitors(pending_visitors, root)
+            pending_visitors = []
+            # Check if processor needs downloader
+            if processor.__class__.__name__ in ['ImageScriptProcessor', 'FileLinkProcessor']:
+                processed_root, proc_metadata = processor.process(root, assets_dir, downloader=downloader)
+            else:
+                processed_root, proc_metadata = processor.process(root, assets_dir)
+            root = processed_root
+            accumulate(proc_metadata)
+        run_visitors(pending_visitors, root)
+
+        return root, all_new_images, all_new_files
+
+    def _processors_to_apply(self) -> List[Any]:
+        """Returns the configured processors, or the default set if none were given."""
+        if self.processors:
+            return self.processors
+        return [
+            ImageScriptProcessor(),
+            FileLinkProcessor(),
+            TaskInfoProcessor(),
+            InputFieldRemover(),
+            MathMLRemover(),
+            UnwantedElementRemover()
+        ]
+
+    @staticmethod
+    def _linked_images(soup: Tag) -> List[Tag]:
+        """Returns the first <img> with a src inside each <a> tag (previews for downloads)."""
+        images = []
+        for a_tag in soup.find_all('a'):
+            img_tag = a_tag.find('img')
+            if img_tag and img_tag.get('src'):
+                images.append(img_tag)
+        return images
+
     def _extract_kes_codes(self, header_container: Tag) -> List[str]:
         """Extracts KES codes from header container."""
         import re
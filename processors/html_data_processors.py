@@ -4,13 +4,24 @@ Module for processing HTML data and extracting content.
 This module provides various processors for handling different aspects of HTML content
 including images, file links, task information, input fields, and MathML elements.
 All processors implement the `AssetProcessor` interface.
+
+Every processor here is a visiting processor (it declares `tag_names`), so a
+`ProcessingEngine` can apply several of them in a single walk of the tree.
+Calling `process` on its own still works and walks the tree for that
+processor alone.
 """
 
+import logging
 import re
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 from bs4 import BeautifulSoup
+from bs4.element import Tag
 from processors.asset_processor_interface import AssetProcessor
+from processors.processing_engine import VisitContext, process_by_visiting
+from utils.html_parsing import new_tag
+
+logger = logging.getLogger(__name__)
 
 
 class ImageScriptProcessor(AssetProcessor):
@@ -22,6 +33,27 @@ class ImageScriptProcessor(AssetProcessor):
     Implements the `AssetProcessor` interface.
     """
 
+    PATTERN = re.compile(r'ShowPicture\w*\s*\(\s*[\'"]([^\'"]+)[\'"]', re.IGNORECASE)
+
+    tag_names = frozenset({'script'})
+
+    def collect_assets(self, soup: BeautifulSoup) -> List[Tuple[str, str]]:
+        """
+        Lists the images referenced by ShowPicture scripts.
+
+        Args:
+            soup (BeautifulSoup): The BeautifulSoup object containing HTML to inspect.
+
+        Returns:
+            List[Tuple[str, str]]: (image source, 'image') pairs.
+        """
+        assets = []
+        for script_tag in soup.find_all('script', string=self.PATTERN):
+            match = self.PATTERN.search(script_tag.get_text())
+            if match:
+                assets.append((match.group(1), 'image'))
+        return assets
+
     def process(self, soup: BeautifulSoup, assets_dir: Path, **kwargs) -> Tuple[BeautifulSoup, Dict[str, Any]]:
         """
         Processes script tags containing ShowPicture calls and replaces them with img tags.
@@ -39,33 +71,39 @@ class ImageScriptProcessor(AssetProcessor):
                 - Dictionary mapping original image sources to local relative paths,
                   under the key 'downloaded_images'.
         """
-        downloader = kwargs.get('downloader')
-        if not downloader:
-            raise ValueError("AssetDownloader must be provided via kwargs['downloader']")
+        return process_by_visiting(self, soup, assets_dir, **kwargs)
 
-        downloaded_images = {}
-        pattern = re.compile(r'ShowPicture\w*\s*\(\s*[\'"]([^\'"]+)[\'"]', re.IGNORECASE)
+    def begin(self, context: VisitContext) -> None:
+        """
+        Checks that a downloader was given and starts the 'downloaded_images' metadata.
 
-        for script_tag in soup.find_all('script', string=pattern):
-            script_text = script_tag.get_text()
-            match = pattern.search(script_text)
+        Raises:
+            ValueError: If no downloader was passed via kwargs['downloader'].
+        """
+        if not context.kwargs.get('downloader'):
+            raise ValueError("AssetDownloader must be provided via kwargs['downloader']")
+        context.metadata(self)["downloaded_images"] = {}
 
-            if match:
-                img_src = match.group(1)
-                # Pass assets_dir / "assets" to downloader
-                local_path = downloader.download(img_src, assets_dir / "assets", asset_type='image')
+    def matches(self, tag: Tag) -> bool:
+        """Matches scripts whose text calls ShowPicture."""
+        return tag.string is not None and self.PATTERN.search(tag.string) is not None
 
-                if local_path:
-                    # Calculate path relative to the HTML file's directory (assets_dir.parent)
-                    path_relative_to_html = str(local_path.relative_to(assets_dir))
+    def visit(self, tag: Tag, context: VisitContext) -> None:
+        """Downloads the referenced image and replaces the script with an img tag."""
+        img_src = self.PATTERN.search(tag.get_text()).group(1)
+        assets_dir = context.assets_dir
+        # Pass assets_dir / "assets" to downloader
+        local_path = context.kwargs['downloader'].download(img_src, assets_dir / "assets", asset_type='image')
 
-                    # Create new img tag
-                    new_img = soup.new_tag('img', src=path_relative_to_html)
-                    script_tag.replace_with(new_img)
+        if local_path:
+            # Calculate path relative to the HTML file's directory (assets_dir.parent)
+            path_relative_to_html = str(local_path.relative_to(assets_dir))
 
-                    downloaded_images[img_src] = path_relative_to_html
+            # Create new img tag
+            new_img = new_tag(tag, 'img', src=path_relative_to_html)
+            tag.replace_with(new_img)
 
-        return soup, {"downloaded_images": downloaded_images}
+            context.metadata(self)["downloaded_images"][img_src] = path_relative_to_html
 
 
 class FileLinkProcessor(AssetProcessor):
@@ -77,6 +115,54 @@ class FileLinkProcessor(AssetProcessor):
     Implements the `AssetProcessor` interface.
     """
 
+    FILE_EXTENSIONS = r'\.(zip|rar|pdf|doc|docx|xls|xlsx)$'
+
+    tag_names = frozenset({'a'})
+
+    @classmethod
+    def _file_path(cls, href: Optional[str]) -> Optional[str]:
+        """
+        Extracts the downloadable file path from a link's href, if it points to a file.
+
+        Args:
+            href (Optional[str]): The href attribute of an <a> tag.
+
+        Returns:
+            Optional[str]: The file path relative to the site root, or None for other links.
+        """
+        if not href:
+            return None
+
+        # Handle JavaScript links with window.open
+        if href.startswith('javascript:'):
+            match = re.search(r"window\.open\(\s*['\"]([^'\"]+)['\"]", href, re.IGNORECASE)
+            if match:
+                # Remove leading ../../
+                return match.group(1).lstrip('../../')
+            return None
+
+        # Handle direct file links
+        if re.search(cls.FILE_EXTENSIONS, href, re.IGNORECASE):
+            return href.lstrip('../../')
+        return None
+
+    def collect_assets(self, soup: BeautifulSoup) -> List[Tuple[str, str]]:
+        """
+        Lists the files referenced by download links.
+
+        Args:
+            soup (BeautifulSoup): The BeautifulSoup object containing HTML to inspect.
+
+        Returns:
+            List[Tuple[str, str]]: (file path, 'file') pairs.
+        """
+        assets = []
+        for a_tag in soup.find_all('a'):
+            file_path = self._file_path(a_tag.get('href'))
+            if file_path:
+                assets.append((file_path, 'file'))
+        return assets
+
     def process(self, soup: BeautifulSoup, assets_dir: Path, **kwargs) -> Tuple[BeautifulSoup, Dict[str, Any]]:
         """
         Processes file download links and downloads the referenced files.
@@ -94,45 +180,162 @@ class FileLinkProcessor(AssetProcessor):
                 - Dictionary mapping original file URLs to local relative paths,
                   under the key 'downloaded_files'.
         """
-        downloader = kwargs.get('downloader')
-        if not downloader:
+        return process_by_visiting(self, soup, assets_dir, **kwargs)
+
+    def begin(self, context: VisitContext) -> None:
+        """
+        Checks that a downloader was given and starts the 'downloaded_files' metadata.
+
+        Raises:
+            ValueError: If no downloader was passed via kwargs['downloader'].
+        """
+        if not context.kwargs.get('downloader'):
             raise ValueError("AssetDownloader must be provided via kwargs['downloader']")
+        context.metadata(self)["downloaded_files"] = {}
 
-        downloaded_files = {}
-        file_extensions = r'\.(zip|rar|pdf|doc|docx|xls|xlsx)$'
+    def matches(self, tag: Tag) -> bool:
+        """Matches links that point to a downloadable file."""
+        return self._file_path(tag.get('href')) is not None
 
-        for a_tag in soup.find_all('a'):
-            href = a_tag.get('href')
-            if not href:
-                continue
+    def visit(self, tag: Tag, context: VisitContext) -> None:
+        """Downloads the linked file and points the link to the local copy."""
+        file_path = self._file_path(tag.get('href'))
+        assets_dir = context.assets_dir
+        # Pass assets_dir / "assets" to downloader
+        local_path = context.kwargs['downloader'].download(file_path, assets_dir / "assets", asset_type='file')
 
-            file_path = None
+        if local_path:
+            # Calculate path relative to the HTML file's directory (assets_dir.parent)
+            path_relative_to_html = str(local_path.relative_to(assets_dir))
 
-            # Handle JavaScript links with window.open
-            if href.startswith('javascript:'):
-                match = re.search(r"window\.open\(\s*['\"]([^'\"]+)['\"]", href, re.IGNORECASE)
-                if match:
-                    file_path = match.group(1)
-                    # Remove leading ../../
-                    file_path = file_path.lstrip('../../')
+            # Update the href to point to local file
+            tag['href'] = path_relative_to_html
+            context.metadata(self)["downloaded_files"][file_path] = path_relative_to_html
 
-            # Handle direct file links
-            elif re.search(file_extensions, href, re.IGNORECASE):
-                file_path = href.lstrip('../../')
 
-            if file_path:
-                # Pass assets_dir / "assets" to downloader
-                local_path = downloader.download(file_path, assets_dir / "assets", asset_type='file')
+class LinkedImageProcessor(AssetProcessor):
+    """
+    A class to process images wrapped in links in HTML content.
 
-                if local_path:
-                    # Calculate path relative to the HTML file's directory (assets_dir.parent)
-                    path_relative_to_html = str(local_path.relative_to(assets_dir))
+    This processor finds <a> tags containing an <img>, downloads the image
+    and points the img src to the local copy. Images are saved one level
+    deeper than the other assets (`<assets_dir>/assets/assets`), with the
+    src relative to `<assets_dir>/assets`, as the block pages expect.
+    Implements the `AssetProcessor` interface.
+    """
 
-                    # Update the href to point to local file
-                    a_tag['href'] = path_relative_to_html
-                    downloaded_files[file_path] = path_relative_to_html
+    tag_names = frozenset({'a'})
 
-        return soup, {"downloaded_files": downloaded_files}
+    def process(self, soup: BeautifulSoup, assets_dir: Path, **kwargs) -> Tuple[BeautifulSoup, Dict[str, Any]]:
+        """
+        Downloads images wrapped in links and updates their src.
+
+        Args:
+            soup (BeautifulSoup): The BeautifulSoup object containing HTML to process.
+            assets_dir (Path): The directory of the page's assets.
+            **kwargs: Must contain 'downloader': an instance of `AssetDownloader`.
+
+        Returns:
+            Tuple[BeautifulSoup, Dict[str, Any]]: A tuple containing:
+                - Updated BeautifulSoup object with local image sources.
+                - Empty metadata dictionary.
+        """
+        return process_by_visiting(self, soup, assets_dir, **kwargs)
+
+    def begin(self, context: VisitContext) -> None:
+        """
+        Checks that a downloader was given.
+
+        Raises:
+            ValueError: If no downloader was passed via kwargs['downloader'].
+        """
+        if not context.kwargs.get('downloader'):
+            raise ValueError("AssetDownloader must be provided via kwargs['downloader']")
+
+    def matches(self, tag: Tag) -> bool:
+        """Matches links wrapping an image with a src."""
+        img_tag = tag.find('img')
+        return img_tag is not None and bool(img_tag.get('src'))
+
+    def visit(self, tag: Tag, context: VisitContext) -> None:
+        """Downloads the wrapped image and points its src to the local copy."""
+        img_tag = tag.find('img')
+        clean_img_src = img_tag['src'].lstrip('../../')
+        page_assets_dir = context.assets_dir / "assets"
+        local_path = context.kwargs['downloader'].download(clean_img_src, page_assets_dir / "assets", asset_type='image')
+        if local_path:
+            img_tag['src'] = str(local_path.relative_to(page_assets_dir))
+            logger.debug(f"Updated img src inside <a> to local file: {img_tag['src']}")
+        else:
+            logger.warning(f"Failed to download linked image {clean_img_src}.")
+
+
+class InvalidImageRemover(AssetProcessor):
+    """
+    A class to remove broken and layout-only images from HTML content.
+
+    This processor removes images with alt="undefined" and images carrying
+    the legacy align or border attributes.
+    Implements the `AssetProcessor` interface.
+    """
+
+    tag_names = frozenset({'img'})
+
+    def process(self, soup: BeautifulSoup, assets_dir: Path, **kwargs) -> Tuple[BeautifulSoup, Dict[str, Any]]:
+        """
+        Removes broken and layout-only images from the HTML.
+
+        Args:
+            soup (BeautifulSoup): The BeautifulSoup object containing HTML to process.
+            assets_dir (Path): Not used by this processor.
+            **kwargs: Not used by this processor.
+
+        Returns:
+            Tuple[BeautifulSoup, Dict[str, Any]]: A tuple containing:
+                - Updated BeautifulSoup object without these images.
+                - Empty metadata dictionary.
+        """
+        return process_by_visiting(self, soup, assets_dir, **kwargs)
+
+    def matches(self, tag: Tag) -> bool:
+        """Matches images with alt="undefined", align or border."""
+        return tag.get('alt') == 'undefined' or tag.has_attr('align') or tag.has_attr('border')
+
+    def visit(self, tag: Tag, context: VisitContext) -> None:
+        """Removes the image."""
+        tag.decompose()
+
+
+class ScriptRemover(AssetProcessor):
+    """
+    A class to remove script elements from HTML content.
+
+    This processor removes every <script> tag; it runs after the processors
+    that read scripts (e.g. `ImageScriptProcessor`).
+    Implements the `AssetProcessor` interface.
+    """
+
+    tag_names = frozenset({'script'})
+
+    def process(self, soup: BeautifulSoup, assets_dir: Path, **kwargs) -> Tuple[BeautifulSoup, Dict[str, Any]]:
+        """
+        Removes script elements from the HTML.
+
+        Args:
+            soup (BeautifulSoup): The BeautifulSoup object containing HTML to process.
+            assets_dir (Path): Not used by this processor.
+            **kwargs: Not used by this processor.
+
+        Returns:
+            Tuple[BeautifulSoup, Dict[str, Any]]: A tuple containing:
+                - Updated BeautifulSoup object without scripts.
+                - Empty metadata dictionary.
+        """
+        return process_by_visiting(self, soup, assets_dir, **kwargs)
+
+    def visit(self, tag: Tag, context: VisitContext) -> None:
+        """Removes the script."""
+        tag.decompose()
 
 
 class TaskInfoProcessor(AssetProcessor):
@@ -144,6 +347,8 @@ class TaskInfoProcessor(AssetProcessor):
     Implements the `AssetProcessor` interface.
     """
 
+    tag_names = frozenset({'div'})
+
     def process(self, soup: BeautifulSoup, assets_dir: Path, **kwargs) -> Tuple[BeautifulSoup, Dict[str, Any]]:
         """
         Updates info button onclick handlers for standalone HTML compatibility.
@@ -158,10 +363,15 @@ class TaskInfoProcessor(AssetProcessor):
                 - Updated BeautifulSoup object with modified info buttons.
                 - Empty metadata dictionary.
         """
-        for info_button in soup.find_all('div', class_='info-button'):
-            info_button['onclick'] = "toggleInfo(this); return false;"
+        return process_by_visiting(self, soup, assets_dir, **kwargs)
+
+    def matches(self, tag: Tag) -> bool:
+        """Matches info button divs."""
+        return 'info-button' in tag.get('class', [])
 
-        return soup, {}
+    def visit(self, tag: Tag, context: VisitContext) -> None:
+        """Replaces the info button's onclick handler."""
+        tag['onclick'] = "toggleInfo(this); return false;"
 
 
 class InputFieldRemover(AssetProcessor):
@@ -173,6 +383,8 @@ class InputFieldRemover(AssetProcessor):
     Implements the `AssetProcessor` interface.
     """
 
+    tag_names = frozenset({'input'})
+
     def process(self, soup: BeautifulSoup, assets_dir: Path, **kwargs) -> Tuple[BeautifulSoup, Dict[str, Any]]:
         """
         Removes answer input fields from the HTML.
@@ -187,10 +399,15 @@ class InputFieldRemover(AssetProcessor):
                 - Updated BeautifulSoup object without answer input fields.
                 - Empty metadata dictionary.
         """
-        for input_tag in soup.find_all('input', attrs={'name': 'answer'}):
-            input_tag.decompose()
+        return process_by_visiting(self, soup, assets_dir, **kwargs)
+
+    def matches(self, tag: Tag) -> bool:
+        """Matches answer input fields."""
+        return tag.get('name') == 'answer'
 
-        return soup, {}
+    def visit(self, tag: Tag, context: VisitContext) -> None:
+        """Removes the input field."""
+        tag.decompose()
 
 
 class MathMLRemover(AssetProcessor):
@@ -202,6 +419,8 @@ class MathMLRemover(AssetProcessor):
     Implements the `AssetProcessor` interface.
     """
 
+    tag_names = frozenset({'math', 'mml:math'})
+
     def process(self, soup: BeautifulSoup, assets_dir: Path, **kwargs) -> Tuple[BeautifulSoup, Dict[str, Any]]:
         """
         Removes MathML elements from the HTML.
@@ -216,10 +435,11 @@ class MathMLRemover(AssetProcessor):
                 - Updated BeautifulSoup object without MathML elements.
                 - Empty metadata dictionary.
         """
-        for math_tag in soup.find_all(['math', 'mml:math']):
-            math_tag.decompose()
+        return process_by_visiting(self, soup, assets_dir, **kwargs)
 
-        return soup, {}
+    def visit(self, tag: Tag, context: VisitContext) -> None:
+        """Removes the MathML element."""
+        tag.decompose()
 
 
 class UnwantedElementRemover(AssetProcessor):
@@ -231,6 +451,11 @@ class UnwantedElementRemover(AssetProcessor):
     Implements the `AssetProcessor` interface.
     """
 
+    tag_names = frozenset({'div', 'span', 'tr'})
+
+    # Rules that only remove the first matching element of a tree
+    _FIRST_ONLY_RULES = frozenset({'hint', 'status_title', 'white_row'})
+
     def process(self, soup: BeautifulSoup, assets_dir: Path, **kwargs) -> Tuple[BeautifulSoup, Dict[str, Any]]:
         """
         Removes unwanted elements from the HTML.
@@ -245,29 +470,54 @@ class UnwantedElementRemover(AssetProcessor):
                 - Updated BeautifulSoup object without unwanted elements.
                 - Empty metadata dictionary.
         """
-        # Remove hint div with specific content
-        hint_div = soup.find('div', attrs={'class': 'hint', 'id': 'hint', 'name': 'hint'}, string='Впишите правильный ответ.')
-        if hint_div:
-            hint_div.decompose()
-
-        # Remove status title span with specific content
-        status_title_span = soup.find('span', attrs={'class': 'status-title-text hidden-xs'}, string='Статус задания:')
-        if status_title_span:
-            status_title_span.decompose()
+        return process_by_visiting(self, soup, assets_dir, **kwargs)
+
+    def matches(self, tag: Tag) -> bool:
+        """Matches elements covered by one of the removal rules."""
+        return self._rule(tag) is not None
+
+    def visit(self, tag: Tag, context: VisitContext) -> None:
+        """Removes the element, at most once per traversal for the first-only rules."""
+        applied: Set[str] = context.state(self).setdefault('applied_rules', set())
+        rule = self._rule(tag)
+        if rule in applied:
+            return
+        if rule in self._FIRST_ONLY_RULES:
+            applied.add(rule)
+        tag.decompose()
+
+    @staticmethod
+    def _rule(tag: Tag) -> Optional[str]:
+        """
+        Returns the name of the removal rule an element falls under.
 
-        # Remove task status span with dynamic class containing 'task-status' and 'task-status-'
-        for span in soup.find_all('span', string='НЕ РЕШЕНО'):
-            class_attr = span.get('class', [])
-            if class_attr and any('task-status' in cls and 'task-status-' in cls for cls in class_attr):
-                span.decompose()
+        Args:
+            tag (Tag): A div, span or tr element.
 
-        # Remove table row with bgcolor="#FFFFFF"
-        tr_with_bgcolor = soup.find('tr', attrs={'bgcolor': '#FFFFFF'})
-        if tr_with_bgcolor:
-            tr_with_bgcolor.decompose()
+        Returns:
+            Optional[str]: 'hint', 'status_title', 'task_status', 'white_row' or None.
+        """
+        classes = tag.get('class', [])
+
+        # Hint div with specific content
+        if tag.name == 'div':
+            if ('hint' in classes and tag.get('id') == 'hint' and tag.get('name') == 'hint'
+                    and tag.string == 'Впишите правильный ответ.'):
+                return 'hint'
+
+        elif tag.name == 'span':
+            # Status title span with specific content
+            if ' '.join(classes) == 'status-title-text hidden-xs' and tag.string == 'Статус задания:':
+                return 'status_title'
+            # Task status span with dynamic class containing 'task-status' and 'task-status-'
+            if tag.string == 'НЕ РЕШЕНО' and any('task-status' in cls and 'task-status-' in cls for cls in classes):
+                return 'task_status'
+
+        # Table row with bgcolor="#FFFFFF"
+        elif tag.name == 'tr':
+            if tag.get('bgcolor') == '#FFFFFF':
+                return 'white_row'
 
         # DO NOT remove <span class="canselect"> — needed for task ID extraction
         # DO NOT remove <span class="answer-button"> — needed for form ID extraction
-
-        return soup, {}
-
+        return None
@@ -10,7 +10,7 @@ It now delegates UI component rendering to `ui_components.py`.
 import json
 import logging
 import re
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterable, Optional, List
 # NEW: Import Problem model
 from models.problem_schema import Problem
 
@@ -81,14 +81,10 @@ class HTMLRenderer:
             task_metadata = []
             if problems is not None:
                 logger.debug("Using provided List[Problem] for rendering initial state.")
-                # For initial state, we can fetch from DB using problem IDs
-                initial_state = {}
-                for problem in problems:
-                    task_id = problem.problem_id # Assuming problem_id matches task_id
-                    # Fetch from DB for consistency
-                    user_answer, status = self._db_manager.get_answer_and_status(task_id=task_id)
-                    if user_answer is not None or status != "not_checked":
-                        initial_state[task_id] = {"answer": user_answer, "status": status}
+                # For initial state, we can fetch from DB using problem IDs (one bulk query)
+                initial_state = self._get_filtered_initial_state_from_db(
+                    [problem.problem_id for problem in problems] # Assuming problem_id matches task_id
+                )
                 
                 # For blocks_html and task_metadata, we still rely on 'data' if available
                 # as the renderer needs the processed HTML content.
@@ -172,12 +168,7 @@ class HTMLRenderer:
             logger.info(f"Rendering HTML page for page_name: {page_name} using List[Problem] (count: {len(problems)}).")
 
             # Generate initial_state from problems
-            initial_state = {}
-            for problem in problems:
-                task_id = problem.problem_id
-                user_answer, status = self._db_manager.get_answer_and_status(task_id=task_id)
-                if user_answer is not None or status != "not_checked":
-                    initial_state[task_id] = {"answer": user_answer, "status": status}
+            initial_state = self._get_filtered_initial_state_from_db([problem.problem_id for problem in problems])
 
             # Generate task_blocks_data from problems
             task_blocks_data = []
@@ -248,13 +239,11 @@ class HTMLRenderer:
             # NEW: Use the provided task_id for this specific block
             initial_state = {}
             if task_id:
-                # NEW: Fetch answer and status for the specific task_id
-                # Assuming DatabaseManager has a method get_answer_and_status
                 logger.debug(f"Fetching initial state for block {block_index} using task_id: {task_id}")
-                user_answer, status = self._db_manager.get_answer_and_status(task_id=task_id)
+                task_state = self._get_filtered_initial_state_from_db([task_id])
                 # NEW: Construct the initial state object for this single task
-                if user_answer is not None or status != "not_checked": # Only include if there's data
-                    initial_state = {task_id: {"answer": user_answer, "status": status}}
+                if task_id in task_state: # Only include if there's data
+                    initial_state = {task_id: task_state[task_id]}
                     logger.debug(f"Retrieved initial state for block {block_index} (task_id {task_id}): {initial_state}")
 
 
@@ -344,26 +333,23 @@ class HTMLRenderer:
         return self._css_clean_pattern.sub('', css_text)
 
     # NEW: Helper method to fetch initial state for a list of task IDs
-    def _get_filtered_initial_state_from_db(self, task_ids: list[str]) -> dict:
+    def _get_filtered_initial_state_from_db(self, task_ids: Iterable[str]) -> dict:
         """
         Fetches answers and statuses for a list of task IDs from the DatabaseManager.
 
+        All task IDs are looked up with a single bulk query
+        (`DatabaseManager.get_answers_and_statuses`).
+
         Args:
-            task_ids (list[str]): List of task IDs to fetch data for.
+            task_ids (Iterable[str]): Task IDs to fetch data for. Empty IDs are ignored.
 
         Returns:
-            dict: A dictionary mapping task_id to {"answer": ..., "status": ...}.
+            dict: A dictionary mapping task_id to {"answer": ..., "status": ...},
+                  only for tasks that have an answer.
         """
+        task_ids = [task_id for task_id in task_ids if task_id]
         logger.debug(f"Fetching initial state from DB for {len(task_ids)} task IDs: {task_ids[:5]}...")
-        initial_state = {}
-        for task_id in task_ids:
-            if task_id: # Ensure task_id is not empty
-                logger.debug(f"Fetching state for individual task_id: {task_id}")
-                user_answer, status = self._db_manager.get_answer_and_status(task_id=task_id)
-                logger.debug(f"Fetched state for {task_id}: answer present = {user_answer is not None}, status = {status}")
-                # NEW: Only add to state if there's meaningful data
-                if user_answer is not None or status != "not_checked":
-                    initial_state[task_id] = {"answer": user_answer, "status": status}
+        initial_state = self._db_manager.get_answers_and_statuses(task_ids)
         logger.debug(f"Aggregated initial state for {len(initial_state)} tasks out of {len(task_ids)} requested.")
         return initial_state
 
@@ -10,9 +10,9 @@ import re
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple
-from bs4 import BeautifulSoup
 from bs4.element import Tag
 from utils.downloader import AssetDownloader
+from utils.html_parsing import DEFAULT_HTML_PARSER, parse_html
 from utils.element_pairer import ElementPairer
 from utils.metadata_extractor import MetadataExtractor
 from models.problem_builder import ProblemBuilder
@@ -49,6 +49,7 @@ class PageProcessingOrchestrator:
         problem_builder: Optional[ProblemBuilder] = None,
         block_processor: Optional[BlockProcessor] = None,
         element_pairer: Optional[ElementPairer] = None,
+        html_parser: str = DEFAULT_HTML_PARSER,
     ):
         """
         Initializes the orchestrator with required dependencies.
@@ -64,6 +65,8 @@ class PageProcessingOrchestrator:
                                                        one will be created using other dependencies.
             element_pairer (ElementPairer, optional): Instance of ElementPairer. If not provided,
                                                      one will be created.
+            html_parser (str, optional): BeautifulSoup tree builder used to parse pages.
+                                         Defaults to "lxml".
         """
         self.asset_downloader_factory = asset_downloader_factory
         # Use provided processors or instantiate default ones
@@ -91,6 +94,7 @@ class PageProcessingOrchestrator:
 
         # Inject ElementPairer dependency
         self.pairer = element_pairer or ElementPairer()
+        self.html_parser = html_parser
 
     def process(
         self,
@@ -124,7 +128,8 @@ class PageProcessingOrchestrator:
                 - A dictionary with the old scraped data structure (page_name, blocks_html, etc.).
         """
         logger.info(f"Starting processing of page {page_num} for project {proj_id}")
-        page_soup = BeautifulSoup(page_content, "html.parser")
+        # The page is parsed exactly once; blocks are processed as subtrees of this document
+        page_soup = parse_html(page_content, self.html_parser)
 
         # Use the injected ElementPairer
         paired_elements = self.pairer.pair(page_soup)
@@ -134,6 +139,10 @@ class PageProcessingOrchestrator:
         page_assets_dir = run_folder / page_num / "assets"
         page_assets_dir.mkdir(parents=True, exist_ok=True)
 
+        # Download every asset of the page in one de-duplicated, concurrent batch;
+        # the processors below then reuse the downloader's results
+        self._prefetch_assets(paired_elements, page_assets_dir, base_url, files_location_prefix, page)
+
         problems: List[Problem] = []
         processed_blocks_html: List[str] = []
         assignments_text: List[str] = []
@@ -185,6 +194,39 @@ class PageProcessingOrchestrator:
         logger.info(f"Successfully processed {len(processed_blocks_html)} blocks for page {page_num}.")
         return problems, scraped_data
 
+    def _prefetch_assets(
+        self,
+        paired_elements: List[Tuple[Tag, Tag]],
+        page_assets_dir: Path,
+        base_url: str,
+        files_location_prefix: str,
+        page: Any,
+    ) -> None:
+        """
+        Collects the assets of all blocks on the page and downloads them as one batch.
+
+        Only effective when `asset_downloader_factory` returns the same downloader for
+        the whole page (as `FIPIScraper` does), since results are memoized per downloader.
+        Failures are logged and left to the per-block downloads to retry.
+
+        Args:
+            paired_elements (List[Tuple[Tag, Tag]]): The (header_container, qblock) pairs of the page.
+            page_assets_dir (Path): The directory to save downloaded assets for this page.
+            base_url (str): Base URL used to resolve relative asset paths.
+            files_location_prefix (str): Prefix used by FIPI for asset paths (e.g., '../../').
+            page (Any): Playwright page object used for asset downloading.
+        """
+        try:
+            assets = []
+            for _, qblock in paired_elements:
+                assets.extend(self.block_processor.collect_assets(qblock, page_assets_dir))
+            if not assets:
+                return
+            downloader = self.asset_downloader_factory(page, base_url, files_location_prefix)
+            downloader.download_many(assets)
+        except Exception as e:
+            logger.warning(f"Batch asset download failed, falling back to per-block downloads: {e}", exc_info=True)
+
     def _extract_kes_codes(self, header_container: Tag) -> List[str]:
         """Extracts KES codes from header container."""
         kes_codes = []
@@ -0,0 +1,171 @@
+"""
+Module for applying several HTML processors in a single traversal of a tree.
+
+This module provides the `ProcessingEngine` class which walks an HTML subtree
+once and dispatches every element to the processors that registered interest
+in it (via `AssetProcessor.tag_names` and `AssetProcessor.matches`), instead of
+letting every processor run its own `find_all` over the whole block.
+
+The walk is pre-order, in document order. For each element the interested
+processors are called in registration order, so the result is the same as
+running the processors one after another, element by element. Once a
+processor removes or replaces an element, later processors do not see it and
+its descendants are not visited. Elements inserted by a processor are not
+visited either.
+"""
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+from processors.asset_processor_interface import AssetProcessor
+
+logger = logging.getLogger(__name__)
+
+ANY_TAG = "*"
+"""Tag name wildcard for processors that want to see every element."""
+
+
+class VisitContext:
+    """
+    Shared state of one traversal, passed to every `AssetProcessor.visit` call.
+
+    Attributes:
+        assets_dir (Path): The `assets_dir` argument of `AssetProcessor.process`.
+        kwargs (Dict[str, Any]): The extra keyword arguments of `AssetProcessor.process` (e.g. `downloader`).
+    """
+
+    def __init__(self, assets_dir: Path, **kwargs):
+        """
+        Initializes the VisitContext.
+
+        Args:
+            assets_dir (Path): The directory processors save assets relative to.
+            **kwargs: Extra arguments for the processors (e.g. `downloader`).
+        """
+        self.assets_dir = assets_dir
+        self.kwargs = kwargs
+        self._metadata: Dict[int, Dict[str, Any]] = {}
+        self._state: Dict[int, Dict[str, Any]] = {}
+
+    def metadata(self, processor: AssetProcessor) -> Dict[str, Any]:
+        """Returns the metadata dictionary a processor reports for this traversal."""
+        return self._metadata.setdefault(id(processor), {})
+
+    def state(self, processor: AssetProcessor) -> Dict[str, Any]:
+        """Returns private scratch state of a processor for this traversal."""
+        return self._state.setdefault(id(processor), {})
+
+
+class ProcessingEngine:
+    """
+    A class to run visiting processors over a tree in one pass.
+
+    Only processors that support visiting (see `supports_visiting`) can be
+    registered; others must be applied with their own `process` method.
+    """
+
+    def __init__(self, processors: Sequence[AssetProcessor]):
+        """
+        Initializes the ProcessingEngine.
+
+        Args:
+            processors (Sequence[AssetProcessor]): Visiting processors, in the order they must see each element.
+
+        Raises:
+            TypeError: If a processor does not support visiting.
+        """
+        for processor in processors:
+            if not self.supports_visiting(processor):
+                raise TypeError(f"{type(processor).__name__} does not support visiting (no tag_names)")
+        self.processors = list(processors)
+        self._dispatch: Dict[str, List[AssetProcessor]] = {}
+
+    @staticmethod
+    def supports_visiting(processor: Any) -> bool:
+        """
+        Tells whether a processor can take part in a fused traversal.
+
+        The check is made on the processor's class, so test doubles that merely
+        imitate a processor's interface fall back to their `process` method.
+
+        Args:
+            processor (Any): The processor to check.
+
+        Returns:
+            bool: True for `AssetProcessor` subclasses that declare `tag_names`.
+        """
+        processor_cls = type(processor)
+        return issubclass(processor_cls, AssetProcessor) and processor_cls.tag_names is not None
+
+    def run(self, root: Union[BeautifulSoup, Tag], assets_dir: Path, **kwargs) -> VisitContext:
+        """
+        Walks the descendants of `root` once and dispatches them to the processors.
+
+        Args:
+            root (Union[BeautifulSoup, Tag]): The document or subtree to process in place.
+            assets_dir (Path): The directory processors save assets relative to.
+            **kwargs: Extra arguments for the processors (e.g. `downloader`).
+
+        Returns:
+            VisitContext: The traversal context, holding each processor's metadata.
+        """
+        context = VisitContext(assets_dir, **kwargs)
+        for processor in self.processors:
+            processor.begin(context)
+
+        stack = self._child_tags(root)
+        stack.reverse()
+        while stack:
+            tag = stack.pop()
+            for processor in self._processors_for(tag.name):
+                if processor.matches(tag):
+                    processor.visit(tag, context)
+                    if tag.parent is None:
+                        # Removed or replaced: nobody else sees it, nor its descendants
+                        break
+            if tag.parent is not None:
+                children = self._child_tags(tag)
+                children.reverse()
+                stack.extend(children)
+        return context
+
+    def _processors_for(self, tag_name: str) -> List[AssetProcessor]:
+        """Returns the processors interested in a tag name, in registration order."""
+        processors = self._dispatch.get(tag_name)
+        if processors is None:
+            processors = [
+                processor for processor in self.processors
+                if tag_name in processor.tag_names or ANY_TAG in processor.tag_names
+            ]
+            self._dispatch[tag_name] = processors
+        return processors
+
+    @staticmethod
+    def _child_tags(tag: Union[BeautifulSoup, Tag]) -> List[Tag]:
+        """Returns the element children of a tag, skipping strings and comments."""
+        return [child for child in tag.children if isinstance(child, Tag)]
+
+
+def process_by_visiting(
+    processor: AssetProcessor,
+    soup: Union[BeautifulSoup, Tag],
+    assets_dir: Path,
+    **kwargs
+) -> Tuple[Union[BeautifulSoup, Tag], Dict[str, Any]]:
+    """
+    Implements `AssetProcessor.process` for a visiting processor on its own.
+
+    Args:
+        processor (AssetProcessor): A processor that supports visiting.
+        soup (Union[BeautifulSoup, Tag]): The document or subtree to process in place.
+        assets_dir (Path): The directory processors save assets relative to.
+        **kwargs: Extra arguments for the processor (e.g. `downloader`).
+
+    Returns:
+        Tuple[Union[BeautifulSoup, Tag], Dict[str, Any]]: `soup` and the processor's metadata.
+    """
+    context = ProcessingEngine([processor]).run(soup, assets_dir, **kwargs)
+    return soup, context.metadata(processor)
@@ -0,0 +1,150 @@
+"""
+Module for scraping several FIPI pages at the same time.
+
+This module provides the `ConcurrentPageScraper` class which runs a bounded pool
+of worker threads. Each worker owns its own `FIPIScraper` browser session
+(Playwright's sync API is bound to the thread that started it), takes page
+names from a shared queue and scrapes them. Results are handed back to the
+caller strictly in the order of the requested page list, so downstream saving
+stays deterministic.
+"""
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from scraper.fipi_scraper import FIPIScraper
+
+logger = logging.getLogger(__name__)
+
+
+class PageScrapeResult(NamedTuple):
+    """Outcome of scraping a single page."""
+    page_name: str
+    problems: List[Any]
+    scraped_data: Optional[Dict[str, Any]]
+    error: Optional[BaseException] = None
+
+
+class ConcurrentPageScraper:
+    """
+    A class to scrape a list of pages with a bounded number of concurrent browser pages.
+
+    Every worker thread creates a scraper through `scraper_factory`, opens its
+    browser session and keeps it for all pages it processes. The number of
+    finished-but-not-yet-consumed results is bounded, so memory stays flat when
+    the consumer (database, renderer, JSON saver) is slower than the scrapers.
+    """
+
+    def __init__(self, scraper_factory: Callable[[], FIPIScraper], concurrency: int = 4):
+        """
+        Initializes the ConcurrentPageScraper.
+
+        Args:
+            scraper_factory (Callable[[], FIPIScraper]): Creates a new, not yet started scraper.
+                                                         Called once per worker thread.
+            concurrency (int, optional): Number of pages scraped at the same time. Defaults to 4.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.scraper_factory = scraper_factory
+        self.concurrency = concurrency
+
+    def scrape(self, proj_id: str, page_list: List[str], run_folder: Path) -> Iterator[PageScrapeResult]:
+        """
+        Scrapes all pages and yields their results in the order of `page_list`.
+
+        Errors raised while scraping a page are captured in `PageScrapeResult.error`
+        instead of being raised, so one failing page does not stop the run.
+
+        Args:
+            proj_id (str): The project ID of the subject.
+            page_list (List[str]): Page names to scrape (e.g., ['init', '1', '2']).
+            run_folder (Path): The base run folder where assets should be saved.
+
+        Yields:
+            PageScrapeResult: One result per page, in `page_list` order.
+        """
+        if not page_list:
+            return
+
+        tasks: "queue.Queue[Optional[int]]" = queue.Queue()
+        for index in range(len(page_list)):
+            tasks.put(index)
+
+        results: Dict[int, PageScrapeResult] = {}
+        results_ready = threading.Condition()
+        # Bounds how far workers may run ahead of the consumer
+        slots = threading.Semaphore(self.concurrency * 2)
+        stop = threading.Event()
+        num_workers = min(self.concurrency, len(page_list))
+
+        def publish(index: int, result: PageScrapeResult) -> None:
+            with results_ready:
+                results[index] = result
+                results_ready.notify_all()
+
+        def worker(worker_id: int) -> None:
+            scraper = None
+            try:
+                scraper = self.scraper_factory()
+                scraper.start()
+            except Exception as e:
+                logger.error(f"Worker {worker_id} could not start a browser session: {e}", exc_info=True)
+                startup_error = e
+            else:
+                startup_error = None
+
+            try:
+                while not stop.is_set():
+                    slots.acquire()
+                    # The consumer may have left while this worker waited for a slot
+                    if stop.is_set():
+                        slots.release()
+                        return
+                    try:
+                        index = tasks.get_nowait()
+                    except queue.Empty:
+                        slots.release()
+                        return
+                    page_name = page_list[index]
+                    if startup_error is not None:
+                        publish(index, PageScrapeResult(page_name, [], None, startup_error))
+                        continue
+                    logger.info(f"Worker {worker_id} scraping page {page_name}")
+                    try:
+                        problems, scraped_data = scraper.scrape_page(proj_id, page_name, run_folder)
+                        publish(index, PageScrapeResult(page_name, problems, scraped_data))
+                    except Exception as e:
+                        logger.error(f"Worker {worker_id} failed on page {page_name}: {e}", exc_info=True)
+                        publish(index, PageScrapeResult(page_name, [], None, e))
+            finally:
+                if scraper is not None:
+                    scraper.close()
+
+        workers = [
+            threading.Thread(target=worker, args=(i,), name=f"scrape-worker-{i}", daemon=True)
+            for i in range(num_workers)
+        ]
+        logger.info(f"Scraping {len(page_list)} pages with {num_workers} concurrent workers.")
+        for thread in workers:
+            thread.start()
+
+        try:
+            for index in range(len(page_list)):
+                with results_ready:
+                    while index not in results:
+                        if not any(thread.is_alive() for thread in workers):
+                            raise RuntimeError(f"All scrape workers exited before page {page_list[index]} was scraped")
+                        results_ready.wait(timeout=1.0)
+                    result = results.pop(index)
+                slots.release()
+                yield result
+        finally:
+            stop.set()
+            # Unblock workers waiting for a free slot so they can observe `stop`
+            for _ in workers:
+                slots.release()
+            for thread in workers:
+                thread.join()
@@ -4,11 +4,22 @@ This module provides the `FIPIScraper` class which handles interactions with the
 FIPI website using Playwright to fetch subject listings and assignment pages.
 It delegates the actual HTML processing logic to `PageProcessingOrchestrator`.
 """
+import json
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, Iterator, List, Tuple, Optional
 from playwright.sync_api import sync_playwright
+from utils.asset_cache import AssetCache
 from utils.downloader import AssetDownloader
+from utils.html_parsing import DEFAULT_HTML_PARSER
+from utils.page_fingerprints import PageFingerprintStore
+from utils.rate_limiter import HostRateLimiter
+from scraper.page_readiness import PageReadinessWaiter, ReadinessResult
+from scraper.raw_page_archive import RawPage, RawPageArchive
+from scraper.request_router import RequestRouter
 from processors.page_processor import PageProcessingOrchestrator
 
 # Импорты для зависимостей
@@ -27,6 +38,9 @@ from processors.asset_processor_interface import AssetProcessor
 
 logger = logging.getLogger(__name__)
 
+# Serializes appends to the shared page_timings.jsonl when several scrapers run in threads
+_timings_file_lock = threading.Lock()
+
 
 class FIPIScraper:
     """
@@ -35,6 +49,10 @@ class FIPIScraper:
     This class uses Playwright to interact with the website, fetch pages,
     and extract relevant information like subject listings and assignment content.
     It delegates the actual HTML processing logic to `PageProcessingOrchestrator`.
+
+    The scraper can hold a long-lived browser session. Use it as a context manager
+    (or call `start()`/`close()`) to launch Chromium once and reuse it for every
+    page; without an open session each call launches a temporary browser.
     """
 
     def __init__(
@@ -43,6 +61,16 @@ class FIPIScraper:
         subjects_url: str = None,
         user_agent: str = None,
         headless: bool = True,
+        recycle_context_every: int = 0,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        readiness: Optional[PageReadinessWaiter] = None,
+        wait_until: str = "domcontentloaded",
+        request_router: Optional[RequestRouter] = None,
+        asset_download_workers: int = 1,
+        asset_cache: Optional[AssetCache] = None,
+        fingerprint_store: Optional[PageFingerprintStore] = None,
+        html_parser: str = DEFAULT_HTML_PARSER,
+        archive_raw_pages: bool = False,
         # --- НОВЫЕ ЗАВИСИМОСТИ ---
         processors: Optional[List[AssetProcessor]] = None,
         pairer: Optional[ElementPairer] = None,
@@ -61,6 +89,27 @@ class FIPIScraper:
                                         Defaults to None, which uses the system default or a predefined one.
             headless (bool, optional): Whether to run the browser in headless mode.
                                        Defaults to True.
+            recycle_context_every (int, optional): Number of pages served by one browser context
+                                                   before it is closed and replaced with a fresh one.
+                                                   Only applies to an open session. 0 disables recycling.
+            rate_limiter (HostRateLimiter, optional): Limiter consulted before every page navigation.
+                                                      Share one instance between scrapers to throttle them together.
+            readiness (PageReadinessWaiter, optional): Decides when an assignment page is ready to be captured.
+                                                       If not provided, waits for the qblock and header elements.
+            wait_until (str, optional): Playwright load state passed to `page.goto` for assignment pages.
+                                        Defaults to "domcontentloaded"; readiness is then decided by `readiness`.
+            request_router (RequestRouter, optional): Installed on every browser context to block
+                                                      unneeded requests. If not provided, nothing is blocked.
+            asset_download_workers (int, optional): Maximum number of assets of a page downloaded concurrently.
+                                                    Defaults to 1 (sequential downloads through the page).
+            asset_cache (AssetCache, optional): Cross-run cache used to revalidate and reuse downloaded assets.
+                                                If not provided, every asset is downloaded.
+            fingerprint_store (PageFingerprintStore, optional): Enables incremental scraping: pages whose
+                                                                fingerprint matches the stored one are not processed.
+            html_parser (str, optional): BeautifulSoup tree builder used to parse pages. Defaults to "lxml".
+            archive_raw_pages (bool, optional): Keep a compressed snapshot of every captured page in the
+                                                run folder (see `RawPageArchive`), so the run can be
+                                                reprocessed offline. Defaults to False.
             processors (List[AssetProcessor], optional): List of HTML processors to use.
                                                          If not provided, default processors will be instantiated.
             pairer (ElementPairer, optional): Element pairer instance to use.
@@ -74,6 +123,24 @@ class FIPIScraper:
         self.subjects_url = subjects_url if subjects_url else base_url
         self.user_agent = user_agent
         self.headless = headless
+        self.recycle_context_every = max(0, recycle_context_every)
+        self._rate_limiter = rate_limiter
+        self._readiness = readiness or PageReadinessWaiter()
+        self.wait_until = wait_until
+        self._request_router = request_router
+        self.asset_download_workers = max(1, asset_download_workers)
+        self._asset_cache = asset_cache
+        self.fingerprint_store = fingerprint_store
+        self.html_parser = html_parser
+        self.archive_raw_pages = archive_raw_pages
+        # page_num -> {"navigation_s", "ready_s", "ready_strategy"} for pages scraped by this instance
+        self.page_timings: Dict[str, Dict[str, Any]] = {}
+
+        # Long-lived browser session (see start()/close())
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._pages_in_context = 0
 
         # Сохраняем внедрённые зависимости как атрибуты
         self._processors = processors or [
@@ -88,6 +155,134 @@ class FIPIScraper:
         self._extractor = extractor or MetadataExtractor()
         self._builder = builder or ProblemBuilder()
 
+    def __enter__(self) -> "FIPIScraper":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def is_started(self) -> bool:
+        """Whether a long-lived browser session is currently open."""
+        return self._browser is not None
+
+    def start(self) -> "FIPIScraper":
+        """
+        Launches the browser and creates the shared context.
+
+        Calling `start()` on an already started scraper is a no-op.
+
+        Returns:
+            FIPIScraper: The scraper itself, to allow `with FIPIScraper(...) as scraper:`.
+        """
+        if self.is_started:
+            return self
+        logger.info(f"Starting browser session (headless={self.headless}, recycle every {self.recycle_context_every or 'never'} pages)")
+        self._playwright = sync_playwright().start()
+        try:
+            self._browser = self._playwright.chromium.launch(headless=self.headless)
+            self._context = self._new_context(self._browser)
+        except Exception:
+            self.close()
+            raise
+        self._pages_in_context = 0
+        return self
+
+    def close(self) -> None:
+        """Closes the shared context, the browser and the Playwright driver, if open."""
+        if self._browser is not None and self._request_router is not None:
+            logger.info(f"Request routing stats: {self._request_router.stats()}")
+        for name, closer in (
+            ("context", lambda: self._context.close() if self._context else None),
+            ("browser", lambda: self._browser.close() if self._browser else None),
+            ("playwright", lambda: self._playwright.stop() if self._playwright else None),
+        ):
+            try:
+                closer()
+            except Exception as e:
+                logger.warning(f"Error while closing browser {name}: {e}")
+        if self._browser is not None:
+            logger.info("Browser session closed.")
+        self._context = None
+        self._browser = None
+        self._playwright = None
+        self._pages_in_context = 0
+
+    def _new_context(self, browser):
+        """Creates a browser context configured for FIPI pages, with request routing if configured."""
+        context = browser.new_context(user_agent=self.user_agent, ignore_https_errors=True)
+        if self._request_router is not None:
+            self._request_router.install(context)
+        return context
+
+    def _recycle_context_if_needed(self) -> None:
+        """Replaces the shared context once it has served `recycle_context_every` pages."""
+        if self.recycle_context_every and self._pages_in_context >= self.recycle_context_every:
+            logger.info(f"Recycling browser context after {self._pages_in_context} pages.")
+            try:
+                self._context.close()
+            except Exception as e:
+                logger.warning(f"Error while closing browser context: {e}")
+            self._context = self._new_context(self._browser)
+            self._pages_in_context = 0
+
+    def _throttle(self, url: str) -> None:
+        """Waits for the rate limiter, if one is configured, before navigating to `url`."""
+        if self._rate_limiter is not None:
+            self._rate_limiter.wait(url)
+
+    def _record_timing(self, run_folder: Path, page_num: str, navigation_s: float, readiness: ReadinessResult) -> None:
+        """
+        Records how long a page took to load and to become ready.
+
+        Timings are kept in `page_timings` and appended to `page_timings.jsonl`
+        in the run folder, so readiness timeouts can be tuned from real runs.
+        """
+        record = {
+            "navigation_s": round(navigation_s, 3),
+            "ready_s": round(readiness.seconds, 3),
+            "ready_strategy": readiness.strategy,
+        }
+        self.page_timings[page_num] = record
+        logger.info(
+            f"Page {page_num} loaded in {record['navigation_s']}s, "
+            f"ready after {record['ready_s']}s ({readiness.strategy})"
+        )
+        try:
+            run_folder.mkdir(parents=True, exist_ok=True)
+            with _timings_file_lock, open(run_folder / "page_timings.jsonl", "a", encoding="utf-8") as f:
+                f.write(json.dumps({"page": page_num, **record}) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write page timing for page {page_num}: {e}")
+
+    @contextmanager
+    def _open_page(self) -> Iterator[Any]:
+        """
+        Yields a Playwright page, closing it afterwards.
+
+        Uses the shared context when a session is open; otherwise launches a
+        temporary browser for the duration of the block.
+        """
+        if self.is_started:
+            self._recycle_context_if_needed()
+            page = self._context.new_page()
+            self._pages_in_context += 1
+            try:
+                yield page
+            finally:
+                try:
+                    page.close()
+                except Exception as e:
+                    logger.warning(f"Error while closing page: {e}")
+        else:
+            with sync_playwright() as p:
+                browser = p.chromium.launch(headless=self.headless)
+                try:
+                    context = self._new_context(browser)
+                    yield context.new_page()
+                finally:
+                    browser.close()
+
     def get_projects(self) -> Dict[str, str]:
         """
         Fetches the list of available subjects and their project IDs from the FIPI website.
@@ -102,12 +297,10 @@ class FIPIScraper:
                             Returns an empty dict if the list is not found or parsing fails.
         """
         print(f"[Fetching subjects] Navigating to {self.subjects_url} ...")
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=self.headless)
-            context = browser.new_context(user_agent=self.user_agent, ignore_https_errors=True)
-            page = context.new_page()
+        projects = {}
+        with self._open_page() as page:
+            self._throttle(self.subjects_url)
             page.goto(self.subjects_url, wait_until="networkidle")
-            projects = {}
             try:
                 list_selector = "ul[id^='pgp_']"
                 list_element = page.query_selector(list_selector)
@@ -127,8 +320,6 @@ class FIPIScraper:
                             print(f"Warning: Skipping item with empty ID or name: {item_id}, Name: '{subject_name}'")
             except Exception as e:
                 print(f"Error parsing projects list: {e}")
-            finally:
-                browser.close()
         print(f"[Fetched subjects] Found {len(projects)} subjects.")
         return projects
 
@@ -146,29 +337,25 @@ class FIPIScraper:
             Tuple[List[Problem], Dict[str, Any]]: A tuple containing:
                 - A list of Problem objects created from the scraped data.
                 - A dictionary with the old scraped data structure (page_name, blocks_html, etc.).
+                  With a fingerprint store it also holds the page "fingerprint"; unchanged pages
+                  return no problems and only {"page_name", "unchanged": True, "fingerprint"}.
         """
-        page_url = f"{self.base_url}?proj={proj_id}&page={page_num}"
-        logger.info(f"Scraping page {page_num} for project {proj_id}, URL: {page_url}")
-
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=self.headless)
-            context = browser.new_context(user_agent=self.user_agent, ignore_https_errors=True)
-            page = context.new_page()
-            page.goto(page_url, wait_until="networkidle")
-            page.wait_for_timeout(3000)
-
-            try:
-                files_location_prefix = page.evaluate("window.files_location || '../../'")
-            except Exception as e:
-                print(f"Warning: Could not get files_location from page {page_url}, using default. Error: {e}")
-                files_location_prefix = '../../'
-
-            page_content = page.content()
+        with self._open_page() as page:
+            raw_page = self._capture(page, proj_id, page_num, run_folder)
+            if raw_page.unchanged:
+                return [], {"page_name": page_num, "unchanged": True, "fingerprint": raw_page.fingerprint}
 
             # --- Delegate to Orchestrator ---
             logger.debug("Initializing AssetDownloader and PageProcessingOrchestrator...")
             # Create a simple factory that returns the already-instantiated downloader
-            downloader = AssetDownloader(page=page, base_url=self.base_url, files_location_prefix=files_location_prefix)
+            downloader = AssetDownloader(
+                page=page,
+                base_url=self.base_url,
+                files_location_prefix=raw_page.files_location_prefix,
+                max_workers=self.asset_download_workers,
+                user_agent=self.user_agent,
+                cache=self._asset_cache
+            )
 
             def asset_downloader_factory(page_obj, base_url, prefix):
                 return downloader
@@ -179,23 +366,115 @@ class FIPIScraper:
                 processors=self._processors, # <- Используем внедрённые
                 metadata_extractor=self._extractor, # <- Используем внедрённые
                 problem_builder=self._builder, # <- Используем внедрённые
-                element_pairer=self._pairer # <- Используем внедрённые
+                element_pairer=self._pairer, # <- Используем внедрённые
+                html_parser=self.html_parser
             )
 
             logger.info("Delegating page processing to PageProcessingOrchestrator...")
             problems, scraped_data = orchestrator.process(
-                page_content=page_content,
+                page_content=raw_page.content,
                 proj_id=proj_id,
                 page_num=page_num,
                 run_folder=run_folder,
                 base_url=self.base_url,
-                files_location_prefix=files_location_prefix,
+                files_location_prefix=raw_page.files_location_prefix,
                 page=page, # Pass the page object for AssetDownloader if needed internally
             )
             logger.info("Page processing completed by Orchestrator.")
+            if raw_page.fingerprint is not None:
+                scraped_data["fingerprint"] = raw_page.fingerprint
             # -------------------------------
 
-            browser.close()
         return problems, scraped_data
 
+    def capture_page(self, proj_id: str, page_num: str, run_folder: Path) -> RawPage:
+        """
+        Loads an assignment page and captures its HTML, without processing it.
+
+        This is the browser half of `scrape_page`: the returned `RawPage` can be
+        processed later, in another process (see `scraper.processing_pipeline`),
+        with its assets downloaded over HTTP using the captured cookies.
+
+        Args:
+            proj_id (str): The project ID corresponding to the subject.
+            page_num (str): The page number to capture (e.g., 'init', '1', '2').
+            run_folder (Path): The base run folder (page timings are recorded there).
+
+        Returns:
+            RawPage: The captured page. With a fingerprint store, pages unchanged since the
+                     last run are flagged `unchanged`.
+        """
+        with self._open_page() as page:
+            raw_page = self._capture(page, proj_id, page_num, run_folder)
+            if raw_page.unchanged:
+                return raw_page
+            try:
+                cookies = page.context.cookies()
+            except Exception as e:
+                logger.debug(f"Could not read browser cookies of page {page_num}: {e}")
+                cookies = []
+            return raw_page._replace(cookies=list(cookies) if isinstance(cookies, list) else [])
+
+    @property
+    def processing_dependencies(self) -> Dict[str, Any]:
+        """The components used to process pages, as keyword arguments of `PageProcessingOrchestrator`."""
+        return {
+            "processors": self._processors,
+            "metadata_extractor": self._extractor,
+            "problem_builder": self._builder,
+            "element_pairer": self._pairer,
+            "html_parser": self.html_parser,
+        }
 
+    @property
+    def asset_cache(self) -> Optional[AssetCache]:
+        """The cross-run asset cache, if any."""
+        return self._asset_cache
+
+    def _capture(self, page: Any, proj_id: str, page_num: str, run_folder: Path) -> RawPage:
+        """
+        Navigates an open page to an assignment page and reads its HTML.
+
+        Args:
+            page (Any): An open Playwright page.
+            proj_id (str): The project ID corresponding to the subject.
+            page_num (str): The page number to capture.
+            run_folder (Path): The base run folder (page timings are recorded there).
+
+        Returns:
+            RawPage: The captured page, without cookies.
+        """
+        page_url = f"{self.base_url}?proj={proj_id}&page={page_num}"
+        logger.info(f"Scraping page {page_num} for project {proj_id}, URL: {page_url}")
+
+        self._throttle(page_url)
+        navigation_started = time.monotonic()
+        page.goto(page_url, wait_until=self.wait_until)
+        navigation_s = time.monotonic() - navigation_started
+        readiness = self._readiness.wait(page)
+        self._record_timing(run_folder, page_num, navigation_s, readiness)
+
+        try:
+            files_location_prefix = page.evaluate("window.files_location || '../../'")
+        except Exception as e:
+            print(f"Warning: Could not get files_location from page {page_url}, using default. Error: {e}")
+            files_location_prefix = '../../'
+
+        page_content = page.content()
+
+        fingerprint = None
+        unchanged = False
+        if self.fingerprint_store is not None:
+            fingerprint = self.fingerprint_store.fingerprint(page_content)
+            if self.fingerprint_store.is_unchanged(proj_id, page_num, fingerprint):
+                logger.info(f"Page {page_num} of project {proj_id} is unchanged since the last run, skipping processing.")
+                unchanged = True
+
+        raw_page = RawPage(proj_id, page_num, page_url, page_content, files_location_prefix, fingerprint, unchanged)
+        if self.archive_raw_pages:
+            # Unchanged pages are archived too, so every run holds a complete set of snapshots
+            try:
+                RawPageArchive(run_folder).save(raw_page)
+            except OSError as e:
+                logger.warning(f"Could not archive raw HTML of page {page_num}: {e}")
+        return raw_page
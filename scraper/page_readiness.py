@@ -0,0 +1,78 @@
+"""
+Module for deciding when a FIPI assignment page is ready to be captured.
+
+This module provides the `PageReadinessWaiter` class which waits for the
+elements that `ElementPairer.pair` relies on (question blocks and their header
+containers) instead of sleeping for a fixed amount of time.
+"""
+import logging
+import time
+from typing import Any, NamedTuple, Sequence
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_READY_SELECTORS = ("div.qblock", "div[id^='i']")
+
+
+class ReadinessResult(NamedTuple):
+    """Outcome of waiting for a page to become ready."""
+    seconds: float
+    strategy: str  # "selectors" or "fallback"
+
+
+class PageReadinessWaiter:
+    """
+    A class to wait until a Playwright page contains the elements needed for parsing.
+
+    All selectors must be attached to the DOM within `timeout_ms` (a single budget
+    shared by all selectors). If they are not, the page may legitimately be empty
+    or slow, so the waiter falls back to a short fixed wait and lets the caller
+    capture whatever is there.
+    """
+
+    def __init__(
+        self,
+        selectors: Sequence[str] = DEFAULT_READY_SELECTORS,
+        timeout_ms: int = 15000,
+        fallback_ms: int = 1000,
+    ):
+        """
+        Initializes the PageReadinessWaiter.
+
+        Args:
+            selectors (Sequence[str], optional): CSS selectors that must be present for the page to be ready.
+                                                 Defaults to the qblock and header selectors.
+            timeout_ms (int, optional): Total time budget for all selectors, in milliseconds. Defaults to 15000.
+            fallback_ms (int, optional): Fixed wait used when the selectors time out, in milliseconds. Defaults to 1000.
+        """
+        self.selectors = tuple(selectors)
+        self.timeout_ms = timeout_ms
+        self.fallback_ms = fallback_ms
+
+    def wait(self, page: Any) -> ReadinessResult:
+        """
+        Blocks until the page is ready or the fallback wait has elapsed.
+
+        Args:
+            page (playwright.sync_api.Page): The page to wait on.
+
+        Returns:
+            ReadinessResult: Seconds spent waiting and the strategy that ended the wait.
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout_ms / 1000
+        try:
+            for selector in self.selectors:
+                remaining_ms = max(1, int((deadline - time.monotonic()) * 1000))
+                page.wait_for_selector(selector, state="attached", timeout=remaining_ms)
+            strategy = "selectors"
+        except PlaywrightTimeoutError:
+            logger.warning(
+                f"Page readiness selectors {self.selectors} not found within {self.timeout_ms} ms, "
+                f"falling back to a fixed {self.fallback_ms} ms wait."
+            )
+            page.wait_for_timeout(self.fallback_ms)
+            strategy = "fallback"
+        return ReadinessResult(time.monotonic() - started, strategy)
@@ -0,0 +1,286 @@
+"""
+Module for processing captured FIPI pages on all CPU cores while the browser keeps loading pages.
+
+This module provides the `PageProcessingPipeline` class, a two-stage pipeline:
+
+1. Capture: the scraper's browser session (Playwright's sync API is bound to
+   its thread) only loads pages and captures their raw HTML and
+   `files_location` (`FIPIScraper.capture_page`).
+2. Process: every captured page is handed to a `ProcessPoolExecutor` running
+   `process_raw_page`, i.e. `PageProcessingOrchestrator` with a
+   `DeferredAssetDownloader`, so the CPU-bound BeautifulSoup work runs in
+   parallel with the next page loads.
+
+Asset downloads are resolved afterwards, in the parent process, with one
+concurrent HTTP batch per page carrying the browser's cookies. Links to assets
+that could not be downloaded are pointed back to the site.
+"""
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from processors.page_processor import PageProcessingOrchestrator
+from scraper.concurrent_scraper import PageScrapeResult
+from scraper.fipi_scraper import FIPIScraper
+from scraper.raw_page_archive import RawPage
+from utils.asset_cache import AssetCache
+from utils.downloader import AssetDownloader, AssetRequest, DeferredAssetDownloader
+from utils.html_parsing import FALLBACK_HTML_PARSER, parse_html
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessedPage(NamedTuple):
+    """Result of processing a captured page in a worker process."""
+    problems: List[Any]
+    scraped_data: Dict[str, Any]
+    assets: List[AssetRequest]
+
+
+def process_raw_page(raw_page: RawPage, run_folder: Path, base_url: str, dependencies: Dict[str, Any]) -> ProcessedPage:
+    """
+    Processes a captured page without a browser, planning its asset downloads.
+
+    Runs in a worker process, so it only uses picklable arguments.
+
+    Args:
+        raw_page (RawPage): The captured page.
+        run_folder (Path): The base run folder where assets will be saved.
+        base_url (str): Base URL used to resolve relative asset paths.
+        dependencies (Dict[str, Any]): Keyword arguments for `PageProcessingOrchestrator`
+                                       (see `FIPIScraper.processing_dependencies`).
+
+    Returns:
+        ProcessedPage: The problems, the scraped data and the assets still to download.
+    """
+    downloader = DeferredAssetDownloader(base_url, raw_page.files_location_prefix)
+    orchestrator = PageProcessingOrchestrator(
+        asset_downloader_factory=lambda page_obj, url, prefix: downloader,
+        **dependencies
+    )
+    problems, scraped_data = orchestrator.process(
+        page_content=raw_page.content,
+        proj_id=raw_page.proj_id,
+        page_num=raw_page.page_name,
+        run_folder=run_folder,
+        base_url=base_url,
+        files_location_prefix=raw_page.files_location_prefix,
+        page=None,
+    )
+    if raw_page.fingerprint is not None:
+        scraped_data["fingerprint"] = raw_page.fingerprint
+    return ProcessedPage(problems, scraped_data, downloader.requests)
+
+
+class PageProcessingPipeline:
+    """
+    A class to scrape pages with browser I/O and HTML processing running in parallel.
+
+    Pages are captured one by one by the given scraper and processed by a pool of
+    worker processes; results are yielded in page order, like
+    `ConcurrentPageScraper.scrape`, so they can be saved as they arrive.
+    """
+
+    def __init__(
+        self,
+        scraper: FIPIScraper,
+        workers: Optional[int] = None,
+        asset_download_workers: Optional[int] = None,
+        asset_cache: Optional[AssetCache] = None,
+    ):
+        """
+        Initializes the PageProcessingPipeline.
+
+        Args:
+            scraper (FIPIScraper): Scraper used to capture pages (and holding the processing components).
+            workers (int, optional): Number of worker processes. Defaults to one per CPU core.
+            asset_download_workers (int, optional): Concurrent asset downloads per page.
+                                                    Defaults to the scraper's setting.
+            asset_cache (AssetCache, optional): Cross-run asset cache. Defaults to the scraper's cache.
+        """
+        self.scraper = scraper
+        self.workers = workers if workers and workers > 0 else (multiprocessing.cpu_count() or 1)
+        self.asset_download_workers = max(1, asset_download_workers or scraper.asset_download_workers)
+        self.asset_cache = asset_cache if asset_cache is not None else scraper.asset_cache
+
+    def scrape(self, proj_id: str, page_list: List[str], run_folder: Path) -> Iterator[PageScrapeResult]:
+        """
+        Captures, processes and downloads the assets of all pages, yielding results in page order.
+
+        At most twice as many pages as there are workers are captured ahead of the
+        consumer. Errors are captured in `PageScrapeResult.error` instead of being raised.
+
+        Args:
+            proj_id (str): The project ID of the subject.
+            page_list (List[str]): Page names to scrape (e.g., ['init', '1', '2']).
+            run_folder (Path): The base run folder where assets should be saved.
+
+        Yields:
+            PageScrapeResult: One result per page, in `page_list` order.
+        """
+        if not page_list:
+            return
+        max_in_flight = self.workers * 2
+        dependencies = self.scraper.processing_dependencies
+        # "spawn" keeps the browser driver and the API server thread out of the workers
+        context = multiprocessing.get_context("spawn")
+        logger.info(f"Processing {len(page_list)} pages with {self.workers} worker processes.")
+        in_flight: Deque[Tuple[str, Optional[RawPage], Any]] = deque()
+
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as executor:
+            for page_name in page_list:
+                in_flight.append(self._submit(executor, proj_id, page_name, run_folder, dependencies))
+                # Finished pages are handed over as soon as possible to keep memory flat
+                while in_flight and (len(in_flight) >= max_in_flight or self._is_done(in_flight[0][2])):
+                    yield self._complete(*in_flight.popleft(), run_folder)
+            while in_flight:
+                yield self._complete(*in_flight.popleft(), run_folder)
+
+    def _submit(
+        self,
+        executor: ProcessPoolExecutor,
+        proj_id: str,
+        page_name: str,
+        run_folder: Path,
+        dependencies: Dict[str, Any],
+    ) -> Tuple[str, Optional[RawPage], Any]:
+        """
+        Captures a page and submits it for processing.
+
+        Returns:
+            Tuple[str, Optional[RawPage], Any]: (page_name, raw page, outcome), the outcome being
+                                                a Future, a ready PageScrapeResult or an exception.
+        """
+        try:
+            raw_page = self._capture(proj_id, page_name, run_folder)
+        except Exception as e:
+            logger.error(f"Failed to capture page {page_name}: {e}", exc_info=True)
+            return page_name, None, e
+        if raw_page.unchanged:
+            return page_name, raw_page, PageScrapeResult(
+                page_name, [], {"page_name": page_name, "unchanged": True, "fingerprint": raw_page.fingerprint}
+            )
+        logger.debug(f"Submitting page {page_name} for processing.")
+        future = executor.submit(process_raw_page, raw_page, run_folder, self.scraper.base_url, dependencies)
+        return page_name, raw_page, future
+
+    @staticmethod
+    def _is_done(outcome: Any) -> bool:
+        """Tells whether an in-flight outcome can be completed without waiting."""
+        return not isinstance(outcome, Future) or outcome.done()
+
+    def _complete(self, page_name: str, raw_page: Optional[RawPage], outcome: Any, run_folder: Path) -> PageScrapeResult:
+        """Waits for a page's processing, downloads its assets and returns its result."""
+        if isinstance(outcome, PageScrapeResult):
+            return outcome
+        if isinstance(outcome, BaseException):
+            return PageScrapeResult(page_name, [], None, outcome)
+        try:
+            processed: ProcessedPage = outcome.result()
+            self._resolve_assets(raw_page, processed, run_folder)
+            logger.info(f"Page {page_name} processed ({len(processed.problems)} problems, {len(processed.assets)} assets).")
+            return PageScrapeResult(page_name, processed.problems, processed.scraped_data)
+        except Exception as e:
+            logger.error(f"Failed to process page {page_name}: {e}", exc_info=True)
+            return PageScrapeResult(page_name, [], None, e)
+
+    def _capture(self, proj_id: str, page_name: str, run_folder: Path) -> RawPage:
+        """Captures a page with the scraper's browser session."""
+        return self.scraper.capture_page(proj_id, page_name, run_folder)
+
+    def _resolve_assets(self, raw_page: RawPage, processed: ProcessedPage, run_folder: Path) -> None:
+        """
+        Downloads the assets planned while processing a page.
+
+        Assets that could not be downloaded are unlinked from the page
+        (see `_drop_missing_assets`).
+        """
+        if not processed.assets:
+            return
+        downloader = AssetDownloader(
+            page=None,
+            base_url=self.scraper.base_url,
+            files_location_prefix=raw_page.files_location_prefix,
+            max_workers=self.asset_download_workers,
+            cookies=raw_page.cookies,
+            user_agent=self.scraper.user_agent,
+            cache=self.asset_cache
+        )
+        results = downloader.download_many(processed.assets)
+        missing = [request for request in processed.assets if results.get(request[:2]) is None]
+        self._drop_missing_assets(raw_page, processed, missing, run_folder, downloader.resolve_url)
+
+    @staticmethod
+    def _drop_missing_assets(
+        raw_page: RawPage,
+        processed: ProcessedPage,
+        missing: List[AssetRequest],
+        run_folder: Path,
+        resolve_url: Callable[[str], str],
+    ) -> None:
+        """
+        Unlinks assets that could not be obtained from a processed page.
+
+        They are removed from the page's "images" and "files" metadata, and the img src
+        and link href the processors pointed to the planned local copy are pointed back
+        to the asset's URL on the site, so the saved HTML has no dangling local links.
+
+        Args:
+            raw_page (RawPage): The captured page.
+            processed (ProcessedPage): The page's processing result, updated in place.
+            missing (List[AssetRequest]): The planned assets that were not obtained.
+            run_folder (Path): The base run folder the page was processed for.
+            resolve_url (Callable[[str], str]): Builds the absolute URL of an asset.
+        """
+        if not missing:
+            return
+        missing_srcs = {asset_src for asset_src, _, _ in missing}
+        logger.warning(f"Missing {len(missing_srcs)} assets of page {raw_page.page_name}: {sorted(missing_srcs)}")
+        for key in ("images", "files"):
+            downloaded = processed.scraped_data.get(key) or {}
+            for asset_src in list(downloaded):
+                if asset_src in missing_srcs:
+                    del downloaded[asset_src]
+
+        # Local references as the processors wrote them: relative to the page folder,
+        # or to its assets folder for images wrapped in links (see LinkedImageProcessor)
+        page_dir = run_folder / raw_page.page_name
+        page_assets_dir = page_dir / "assets"
+        remote_urls: Dict[Tuple[str, str], str] = {}
+        for asset_src, save_dir, asset_type in missing:
+            local_path = save_dir / Path(asset_src).name
+            base = page_assets_dir if save_dir.parent == page_assets_dir else page_dir
+            try:
+                reference = str(local_path.relative_to(base))
+            except ValueError:
+                continue
+            attribute = "href" if asset_type == "file" else "src"
+            remote_urls[(attribute, reference)] = resolve_url(asset_src)
+        blocks_html = processed.scraped_data.get("blocks_html")
+        if remote_urls and blocks_html:
+            processed.scraped_data["blocks_html"] = [_relink_assets(html, remote_urls) for html in blocks_html]
+
+
+def _relink_assets(html: str, remote_urls: Dict[Tuple[str, str], str]) -> str:
+    """
+    Points img src and link href attributes from local asset copies to remote URLs.
+
+    Args:
+        html (str): The processed HTML of a block.
+        remote_urls (Dict[Tuple[str, str], str]): ("src" or "href", local reference) mapped to the remote URL.
+
+    Returns:
+        str: The HTML with the references replaced; unchanged if it has none of them.
+    """
+    if not any(reference in html for _, reference in remote_urls):
+        return html
+    soup = parse_html(html, FALLBACK_HTML_PARSER)
+    for tag_name, attribute in (("img", "src"), ("a", "href")):
+        for tag in soup.find_all(tag_name):
+            remote_url = remote_urls.get((attribute, tag.get(attribute)))
+            if remote_url is not None:
+                tag[attribute] = remote_url
+    return str(soup)
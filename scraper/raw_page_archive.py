@@ -0,0 +1,143 @@
+"""
+Module for archiving the raw HTML of captured FIPI pages.
+
+This module provides the `RawPage` tuple, a page as captured by the browser,
+and the `RawPageArchive` class which keeps a gzip-compressed snapshot of every
+captured page in the run folder (`<run_folder>/raw/`), next to a small JSON
+file with what is needed to process it again (project ID, URL,
+`files_location`, fingerprint). Archived pages can be replayed through the
+processing pipeline without a browser or network access (see
+`scraper.snapshot_reprocessor`).
+"""
+import gzip
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIRNAME = "raw"
+
+
+class RawPage(NamedTuple):
+    """A captured assignment page, ready to be processed without the browser."""
+    proj_id: str
+    page_name: str
+    page_url: str
+    content: str
+    files_location_prefix: str
+    fingerprint: Optional[str] = None
+    unchanged: bool = False
+    cookies: List[Dict[str, Any]] = []
+
+
+class RawPageArchive:
+    """
+    A class to store and load raw page snapshots of one run.
+
+    Every page is stored as `<page>.html.gz` plus `<page>.json`; the metadata file
+    is written last, so a page is only listed once its snapshot is complete.
+    """
+
+    def __init__(self, run_folder: Path, compresslevel: int = 6):
+        """
+        Initializes the RawPageArchive.
+
+        Args:
+            run_folder (Path): The run output folder; snapshots go to its `raw/` subfolder.
+            compresslevel (int, optional): gzip compression level (1-9). Defaults to 6.
+        """
+        self.run_folder = Path(run_folder)
+        self.root = self.run_folder / ARCHIVE_DIRNAME
+        self.compresslevel = compresslevel
+
+    def save(self, raw_page: RawPage) -> Path:
+        """
+        Archives a captured page, replacing any previous snapshot of it.
+
+        Args:
+            raw_page (RawPage): The captured page. Its cookies are not archived.
+
+        Returns:
+            Path: The path of the compressed HTML snapshot.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        html_path = self._html_path(raw_page.page_name)
+        self._atomic_write(html_path, gzip.compress(raw_page.content.encode("utf-8"), compresslevel=self.compresslevel))
+        meta = {
+            "proj_id": raw_page.proj_id,
+            "page_name": raw_page.page_name,
+            "page_url": raw_page.page_url,
+            "files_location_prefix": raw_page.files_location_prefix,
+            "fingerprint": raw_page.fingerprint,
+            "captured_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self._atomic_write(self._meta_path(raw_page.page_name), json.dumps(meta, ensure_ascii=False, indent=2).encode("utf-8"))
+        logger.debug(f"Archived raw HTML of page {raw_page.page_name} to {html_path}")
+        return html_path
+
+    def load(self, page_name: str) -> RawPage:
+        """
+        Loads an archived page.
+
+        Args:
+            page_name (str): The page name (e.g., 'init', '1').
+
+        Returns:
+            RawPage: The archived page, without cookies.
+
+        Raises:
+            FileNotFoundError: If the page is not in the archive.
+        """
+        meta = json.loads(self._meta_path(page_name).read_text(encoding="utf-8"))
+        content = gzip.decompress(self._html_path(page_name).read_bytes()).decode("utf-8")
+        return RawPage(
+            proj_id=meta["proj_id"],
+            page_name=meta["page_name"],
+            page_url=meta.get("page_url", ""),
+            content=content,
+            files_location_prefix=meta.get("files_location_prefix") or "../../",
+            fingerprint=meta.get("fingerprint"),
+        )
+
+    def pages(self) -> List[str]:
+        """
+        Lists the archived pages.
+
+        Returns:
+            List[str]: Page names, 'init' first, then numeric pages in order, then any others.
+        """
+        if not self.root.is_dir():
+            return []
+        names = [path.name[:-len(".json")] for path in self.root.glob("*.json")]
+        names = [name for name in names if self._html_path(name).is_file()]
+        return sorted(names, key=lambda name: (name != "init", not name.isdigit(), int(name) if name.isdigit() else 0, name))
+
+    def __contains__(self, page_name: str) -> bool:
+        return self._meta_path(page_name).is_file() and self._html_path(page_name).is_file()
+
+    def _html_path(self, page_name: str) -> Path:
+        """Returns the snapshot file of a page."""
+        return self.root / f"{page_name}.html.gz"
+
+    def _meta_path(self, page_name: str) -> Path:
+        """Returns the metadata file of a page."""
+        return self.root / f"{page_name}.json"
+
+    def _atomic_write(self, path: Path, data: bytes) -> None:
+        """Writes a file through a temporary file and a rename, so readers never see partial data."""
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
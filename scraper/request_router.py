@@ -0,0 +1,124 @@
+"""
+Module for filtering the network requests made by the scraping browser.
+
+This module provides the `RequestRouter` class which installs a Playwright
+route handler on a browser context and aborts requests that are not needed to
+capture a page's HTML (fonts, media, third-party trackers, ...). Assets that
+the scraper keeps are downloaded separately by `AssetDownloader` through the
+API request context, which is not affected by these routes.
+
+The default block and allow lists are the ones configured in `config`
+(BLOCKED_RESOURCE_TYPES, BLOCKED_URL_PATTERNS, ALLOWED_URL_PATTERNS).
+"""
+import fnmatch
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class RequestRouter:
+    """
+    A class deciding which browser requests are allowed during HTML capture.
+
+    A request is allowed if its URL matches one of `allow_url_patterns`.
+    Otherwise it is aborted when its resource type is in `blocked_resource_types`
+    or its URL matches one of `deny_url_patterns`. URL patterns are shell-style
+    globs matched against the full URL (e.g. "*mc.yandex.ru*").
+    """
+
+    def __init__(
+        self,
+        blocked_resource_types: Optional[Iterable[str]] = None,
+        deny_url_patterns: Optional[Iterable[str]] = None,
+        allow_url_patterns: Optional[Iterable[str]] = None,
+    ):
+        """
+        Initializes the RequestRouter.
+
+        Args:
+            blocked_resource_types (Iterable[str], optional): Playwright resource types to abort
+                                                              (e.g. "font", "media", "image", "stylesheet").
+                                                              Defaults to `config.BLOCKED_RESOURCE_TYPES`.
+            deny_url_patterns (Iterable[str], optional): URL globs to abort regardless of resource type.
+                                                         Defaults to `config.BLOCKED_URL_PATTERNS`.
+            allow_url_patterns (Iterable[str], optional): URL globs that are always allowed; they take
+                                                          precedence over both block lists.
+                                                          Defaults to `config.ALLOWED_URL_PATTERNS`.
+        """
+        if blocked_resource_types is None:
+            blocked_resource_types = config.BLOCKED_RESOURCE_TYPES
+        if deny_url_patterns is None:
+            deny_url_patterns = config.BLOCKED_URL_PATTERNS
+        if allow_url_patterns is None:
+            allow_url_patterns = config.ALLOWED_URL_PATTERNS
+        self.blocked_resource_types = frozenset(t.strip().lower() for t in blocked_resource_types if t.strip())
+        self.deny_url_patterns = tuple(p for p in deny_url_patterns if p)
+        self.allow_url_patterns = tuple(p for p in allow_url_patterns if p)
+        self._blocked = Counter()
+        self._allowed = 0
+        self._lock = threading.Lock()
+
+    def should_block(self, url: str, resource_type: str) -> Optional[str]:
+        """
+        Decides whether a request should be aborted.
+
+        Args:
+            url (str): The request URL.
+            resource_type (str): The Playwright resource type of the request.
+
+        Returns:
+            Optional[str]: The reason for blocking ("type:<resource_type>" or "url"), or None to allow it.
+        """
+        if any(fnmatch.fnmatchcase(url, pattern) for pattern in self.allow_url_patterns):
+            return None
+        if resource_type in self.blocked_resource_types:
+            return f"type:{resource_type}"
+        if any(fnmatch.fnmatchcase(url, pattern) for pattern in self.deny_url_patterns):
+            return "url"
+        return None
+
+    def handle(self, route: Any) -> None:
+        """
+        Playwright route handler: aborts or continues the intercepted request.
+
+        Args:
+            route (playwright.sync_api.Route): The intercepted route.
+        """
+        request = route.request
+        reason = self.should_block(request.url, request.resource_type)
+        with self._lock:
+            if reason:
+                self._blocked[reason] += 1
+            else:
+                self._allowed += 1
+        if reason:
+            logger.debug(f"Blocked {request.resource_type} request ({reason}): {request.url}")
+            route.abort()
+        else:
+            route.continue_()
+
+    def install(self, context: Any) -> None:
+        """
+        Registers the router on a browser context for all URLs.
+
+        Args:
+            context (playwright.sync_api.BrowserContext): The context to route.
+        """
+        context.route("**/*", self.handle)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns counts of routed requests.
+
+        Returns:
+            Dict[str, int]: "allowed", "blocked" and one "blocked:<reason>" entry per block reason.
+        """
+        with self._lock:
+            stats = {"allowed": self._allowed, "blocked": sum(self._blocked.values())}
+            stats.update({f"blocked:{reason}": count for reason, count in self._blocked.items()})
+        return stats
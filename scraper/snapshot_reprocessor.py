@@ -0,0 +1,111 @@
+"""
+Module for reprocessing archived FIPI pages without a browser or network access.
+
+This module provides the `SnapshotReprocessor` class, a `PageProcessingPipeline`
+whose pages come from a `RawPageArchive` instead of the browser, and whose
+assets are copied from the source run folder (or the asset cache) instead of
+being downloaded. After a change to a processor or to `ProblemBuilder`, a
+whole subject can be rebuilt from its snapshots on all CPU cores in minutes,
+instead of crawling FIPI again.
+"""
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from scraper.fipi_scraper import FIPIScraper
+from scraper.processing_pipeline import PageProcessingPipeline, ProcessedPage
+from scraper.raw_page_archive import RawPage, RawPageArchive
+from utils.asset_cache import AssetCache
+from utils.downloader import AssetDownloader
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotReprocessor(PageProcessingPipeline):
+    """
+    A class to replay archived pages through the processing pipeline, offline.
+
+    The scraper is only used for its configuration (base URL and processing
+    components); its browser is never started.
+    """
+
+    def __init__(
+        self,
+        scraper: FIPIScraper,
+        archive: RawPageArchive,
+        asset_sources: Sequence[Path] = (),
+        workers: Optional[int] = None,
+        asset_cache: Optional[AssetCache] = None,
+    ):
+        """
+        Initializes the SnapshotReprocessor.
+
+        Args:
+            scraper (FIPIScraper): Provides the base URL and the processing components. Not started.
+            archive (RawPageArchive): The archived pages to reprocess.
+            asset_sources (Sequence[Path], optional): Run folders to copy already downloaded assets from,
+                                                      in order of preference. Defaults to the archive's run folder.
+            workers (int, optional): Number of worker processes. Defaults to one per CPU core.
+            asset_cache (AssetCache, optional): Cross-run asset cache used for assets missing from
+                                                `asset_sources`. Defaults to the scraper's cache.
+        """
+        super().__init__(scraper, workers=workers, asset_cache=asset_cache)
+        self.archive = archive
+        self.asset_sources: List[Path] = [Path(p) for p in asset_sources] or [archive.run_folder]
+
+    def _capture(self, proj_id: str, page_name: str, run_folder: Path) -> RawPage:
+        """Loads a page from the archive."""
+        return self.archive.load(page_name)
+
+    def _resolve_assets(self, raw_page: RawPage, processed: ProcessedPage, run_folder: Path) -> None:
+        """
+        Places the assets of a reprocessed page from local copies.
+
+        Each asset is looked up at the same relative path in the source run folders,
+        then in the asset cache. Assets found in neither are unlinked from the page,
+        as failed downloads are.
+        """
+        resolver = AssetDownloader(page=None, base_url=self.scraper.base_url,
+                                   files_location_prefix=raw_page.files_location_prefix)
+        missing = []
+        for asset_src, save_dir, asset_type in processed.assets:
+            target = save_dir / Path(asset_src).name
+            if not self._copy_from_sources(target, run_folder) and not self._copy_from_cache(resolver.resolve_url(asset_src), target):
+                logger.debug(f"No local copy of {asset_type} {asset_src} for page {raw_page.page_name}")
+                missing.append((asset_src, save_dir, asset_type))
+        self._drop_missing_assets(raw_page, processed, missing, run_folder, resolver.resolve_url)
+
+    def _copy_from_sources(self, target: Path, run_folder: Path) -> bool:
+        """Links or copies an asset from the first source run folder that has it."""
+        try:
+            relative_path = target.relative_to(run_folder)
+        except ValueError:
+            return False
+        for source in self.asset_sources:
+            source_path = source / relative_path
+            if not source_path.is_file():
+                continue
+            if target.exists() and os.path.samefile(source_path, target):
+                return True
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                if target.exists():
+                    target.unlink()
+                os.link(source_path, target)
+            except OSError:
+                # Different filesystem or no hard-link support
+                shutil.copyfile(source_path, target)
+            return True
+        return False
+
+    def _copy_from_cache(self, asset_url: str, target: Path) -> bool:
+        """Materializes an asset from the asset cache, if it is there."""
+        if self.asset_cache is None:
+            return False
+        entry = self.asset_cache.lookup(asset_url)
+        if entry is None:
+            return False
+        self.asset_cache.materialize(entry, target)
+        return True
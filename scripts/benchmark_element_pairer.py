@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Script to benchmark ElementPairer on synthetic FIPI pages.
+
+This script builds pages with a growing number of header/qblock pairs (in both
+header -> qblock and qblock -> header order, with unrelated divs in between),
+times `ElementPairer.pair` on each of them and reports the time per block, which
+stays flat as long as pairing scales linearly with the page size.
+
+Usage:
+    python scripts/benchmark_element_pairer.py --sizes 1000 2000 4000 8000 --repeat 3
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Make the project root importable when run as a plain script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    from bs4 import BeautifulSoup
+    from utils.element_pairer import ElementPairer
+    from utils.html_parsing import parse_html
+except ImportError as e:
+    print(f"Error importing project modules: {e}")
+    sys.exit(1)
+
+
+def build_page(block_count: int, seed: int = 0) -> str:
+    """
+    Builds the HTML of a synthetic page.
+
+    Args:
+        block_count (int): Number of header/qblock pairs on the page.
+        seed (int): Seed for the choice of pair order and filler divs.
+
+    Returns:
+        str: The page HTML.
+    """
+    rnd = random.Random(seed)
+    parts: List[str] = ["<html><body>"]
+    for block in range(block_count):
+        task_id = f"{block:06X}"
+        header = (
+            f'<div id="i{task_id}"><div class="task-header-panel">'
+            f'<span class="canselect">{task_id}</span></div></div>'
+        )
+        qblock = f'<div class="qblock" id="q{task_id}"><p>Task {block} text</p></div>'
+        parts.extend((header, qblock) if rnd.random() < 0.5 else (qblock, header))
+        if rnd.random() < 0.2:
+            parts.append('<div class="banner">Advertisement</div>')
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def benchmark(block_count: int, repeat: int) -> float:
+    """
+    Times the pairing of one synthetic page, excluding parsing.
+
+    Args:
+        block_count (int): Number of header/qblock pairs on the page.
+        repeat (int): Number of timed runs; the best one is reported.
+
+    Returns:
+        float: The best pairing time in seconds.
+    """
+    soup: BeautifulSoup = parse_html(build_page(block_count))
+    pairer = ElementPairer()
+    best = float("inf")
+    for _ in range(repeat):
+        # Like timeit, keep the garbage collector (which scans the whole soup) out of the measurement
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            pairs = pairer.pair(soup)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    if len(pairs) != block_count:
+        raise RuntimeError(f"Expected {block_count} pairs, got {len(pairs)}")
+    return best
+
+
+def main():
+    """Main function to run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description="Benchmark ElementPairer on synthetic pages.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 4000, 8000],
+                        help="Numbers of blocks per page to benchmark.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per page size (best is reported).")
+    args = parser.parse_args()
+
+    print(f"{'blocks':>8} {'total, ms':>12} {'per block, us':>15}")
+    for block_count in args.sizes:
+        elapsed = benchmark(block_count, args.repeat)
+        print(f"{block_count:>8} {elapsed * 1000:>12.2f} {elapsed / block_count * 1e6:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
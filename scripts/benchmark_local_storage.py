@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Script to benchmark LocalStorage on a large answer history.
+
+This script fills a storage file with a given number of answers (default
+100k), then times random reads, answer saves and status updates on it. For
+comparison it times the same operations with the previous implementation,
+which re-read the whole JSON file on every call and rewrote it on every write.
+The per-operation cost of LocalStorage stays flat as the history grows, while
+the legacy cost grows linearly with it.
+
+Usage:
+    python scripts/benchmark_local_storage.py --entries 100000 --ops 2000 --legacy-ops 20
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+# Make the project root importable when run as a plain script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    from utils.local_storage import LocalStorage
+except ImportError as e:
+    print(f"Error importing project modules: {e}")
+    sys.exit(1)
+
+
+class LegacyJSONStorage:
+    """The previous LocalStorage: the whole JSON file is re-read on every call and rewritten on every write."""
+
+    def __init__(self, storage_path: Path):
+        self._storage_path = storage_path
+
+    def _load_data(self) -> Dict[str, Dict[str, str]]:
+        with self._storage_path.open('r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_data(self, data: Dict[str, Dict[str, str]]) -> None:
+        with self._storage_path.open('w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+
+    def get_answer_and_status(self, task_id: str) -> Tuple[Optional[str], str]:
+        entry = self._load_data().get(task_id) or {}
+        return entry.get("answer"), entry.get("status", "not_checked")
+
+    def save_answer_and_status(self, task_id: str, answer: str, status: str = "not_checked") -> None:
+        data = self._load_data()
+        data[task_id] = {"answer": answer, "status": status}
+        self._save_data(data)
+
+    def update_status(self, task_id: str, status: str) -> None:
+        data = self._load_data()
+        data.setdefault(task_id, {})["status"] = status
+        self._save_data(data)
+
+
+def build_history(entries: int) -> Dict[str, Dict[str, str]]:
+    """
+    Builds a synthetic answer history.
+
+    Args:
+        entries (int): Number of (user, task) answers.
+
+    Returns:
+        Dict[str, Dict[str, str]]: Storage keys mapped to answers and statuses.
+    """
+    return {
+        f"student{i % 500}/{i:06X}": {"answer": str(i), "status": "correct" if i % 3 else "incorrect"}
+        for i in range(entries)
+    }
+
+
+def time_ops(storage, keys, ops: int, seed: int = 0) -> Dict[str, float]:
+    """
+    Times random reads, saves and status updates.
+
+    Args:
+        storage: LocalStorage or LegacyJSONStorage filled with the history.
+        keys: Storage keys of the history.
+        ops (int): Operations of each kind.
+        seed (int): Seed for the choice of keys.
+
+    Returns:
+        Dict[str, float]: Mean seconds per operation, by operation name.
+    """
+    rnd = random.Random(seed)
+    operations: Dict[str, Callable[[str], object]] = {
+        "get": lambda key: storage.get_answer_and_status(key),
+        "save": lambda key: storage.save_answer_and_status(key, "42", "not_checked"),
+        "update": lambda key: storage.update_status(key, "correct"),
+    }
+    results = {}
+    for name, operation in operations.items():
+        start = time.perf_counter()
+        for _ in range(ops):
+            operation(rnd.choice(keys))
+        results[name] = (time.perf_counter() - start) / ops
+    return results
+
+
+def main():
+    """Main function to run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description="Benchmark LocalStorage on a large answer history.")
+    parser.add_argument("--entries", type=int, default=100000, help="Number of answers in the storage.")
+    parser.add_argument("--ops", type=int, default=2000, help="Operations of each kind for LocalStorage.")
+    parser.add_argument("--legacy-ops", type=int, default=20,
+                        help="Operations of each kind for the legacy storage (0 skips it).")
+    args = parser.parse_args()
+
+    history = build_history(args.entries)
+    keys = list(history)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "answers.json"
+        LocalStorage(path)._save_data(history)
+        start = time.perf_counter()
+        storage = LocalStorage(path)
+        storage.get_answer_and_status(keys[0])
+        load_time = time.perf_counter() - start
+        results = {"LocalStorage": time_ops(storage, keys, args.ops)}
+        log_size = path.stat().st_size
+
+        if args.legacy_ops:
+            legacy_path = Path(tmp) / "legacy_answers.json"
+            legacy = LegacyJSONStorage(legacy_path)
+            legacy._save_data(history)
+            results["legacy JSON"] = time_ops(legacy, keys, args.legacy_ops)
+
+    print(f"{args.entries} entries; LocalStorage loads in {load_time * 1000:.1f} ms, "
+          f"log size after the run {log_size / 1024 / 1024:.1f} MiB")
+    print(f"{'storage':>14} {'get, us':>12} {'save, us':>12} {'update, us':>12}")
+    for name, timings in results.items():
+        print(f"{name:>14} {timings['get'] * 1e6:>12.1f} {timings['save'] * 1e6:>12.1f} {timings['update'] * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
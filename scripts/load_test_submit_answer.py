@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Script to load test the /submit_answer endpoint of the answer API.
+
+This script starts the answer API (`api.answer_api.create_app`) with uvicorn on
+a local port, in its own process, backed by a real SQLite `DatabaseManager` in
+a temporary folder and a stub answer checker that answers after a fixed
+network-like delay. It then runs many concurrent clients, each submitting
+answers to new tasks (one read and one write per request), and reports
+latency percentiles. Clients speak plain keep-alive HTTP/1.1 over asyncio
+streams, so the load generator itself is not the bottleneck.
+
+By default database calls run inline on the event loop, as the API does.
+With `--executor`, they run in a `BlockingCallExecutor` thread pool instead.
+
+With `--writer-hold-ms`, another process (standing in for the scraper) keeps
+taking the database write lock and holding it for that long, so answer saves
+have to wait for it, as they do while a page is being saved.
+
+On a single core, 200 clients x 10 requests, the executor lost in both cases:
+without a writer 361 req/s (p99 745 ms) against 560 req/s (p99 440 ms) inline;
+with a writer holding the lock 50 ms of every 100 ms, 144-207 req/s
+(p99 1095-1435 ms, 1-8 threads) against 255 req/s (p99 1101 ms) inline.
+
+Usage:
+    python scripts/load_test_submit_answer.py --clients 200 --requests 10
+    python scripts/load_test_submit_answer.py --clients 200 --requests 10 --executor --workers 8
+    python scripts/load_test_submit_answer.py --clients 200 --requests 10 --writer-hold-ms 50 [--executor]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Make the project root importable when run as a plain script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    import uvicorn
+    from api.answer_api import create_app
+    from api.blocking_executor import BlockingCallExecutor, InlineExecutor
+    from utils.database_manager import DatabaseManager
+except ImportError as e:
+    print(f"Error importing project modules: {e}")
+    sys.exit(1)
+
+
+class StubChecker:
+    """Answer checker that returns 'correct' after a fixed delay, without network access."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def check_answer(self, task_id: str, form_id: str, user_answer: str) -> Dict[str, Any]:
+        await asyncio.sleep(self.delay)
+        return {"status": "correct", "message": "Верно", "raw_response": ""}
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(db_path: str, port: int, use_executor: bool, workers: int, queue: int, checker_delay: float) -> None:
+    """
+    Runs the answer API with uvicorn until the process is terminated.
+
+    Args:
+        db_path (str): Path of the SQLite database.
+        port (int): Local port to listen on.
+        use_executor (bool): Run database calls in a thread pool instead of the event loop.
+        workers (int): Threads of the blocking call executor.
+        queue (int): Queue size of the blocking call executor.
+        checker_delay (float): Seconds the stub checker takes per answer.
+    """
+    db_manager = DatabaseManager(db_path)
+    db_manager.initialize_db()
+    executor = BlockingCallExecutor(max_workers=workers, max_queue=queue) if use_executor else InlineExecutor()
+    app = create_app(db_manager, StubChecker(checker_delay), executor=executor)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+
+
+def hold_write_lock(db_path: str, hold_ms: float, interval_ms: float) -> None:
+    """
+    Repeatedly takes the database write lock and holds it, until the process is terminated.
+
+    Args:
+        db_path (str): Path of the SQLite database.
+        hold_ms (float): Milliseconds the write lock is held each time.
+        interval_ms (float): Milliseconds between releasing the lock and taking it again.
+    """
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        time.sleep(hold_ms / 1000)
+        conn.execute("COMMIT")
+        time.sleep(interval_ms / 1000)
+
+
+def wait_for_port(port: int, timeout: float = 30.0) -> None:
+    """Waits until the server accepts connections on the port."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1.0):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server did not start on port {port} within {timeout} s")
+
+
+async def post_json(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, path: str,
+                    payload: Dict[str, Any], headers: Dict[str, str]) -> int:
+    """
+    Sends a JSON POST request on a keep-alive connection and reads the response.
+
+    Returns:
+        int: The HTTP status code.
+    """
+    body = json.dumps(payload).encode("utf-8")
+    head = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n{head}\r\n".encode("ascii") + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    content_length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            content_length = int(value.strip())
+    await reader.readexactly(content_length)
+    return int(status_line.split()[1])
+
+
+async def run_clients(port: int, clients: int, requests_per_client: int) -> List[float]:
+    """
+    Runs concurrent clients submitting answers and returns the latency of every request.
+
+    Args:
+        port (int): Local port of the API.
+        clients (int): Number of concurrent clients, each with its own connection and user ID.
+        requests_per_client (int): Answers submitted by every client, one after another.
+
+    Returns:
+        List[float]: Request latencies in seconds.
+    """
+    latencies: List[float] = []
+
+    async def client_loop(client_idx: int) -> None:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        headers = {"X-User-Id": f"student{client_idx}"}
+        try:
+            for request_idx in range(requests_per_client):
+                payload = {"task_id": f"T{request_idx:04d}", "answer": str(client_idx), "form_id": "form"}
+                start = time.perf_counter()
+                status = await post_json(reader, writer, "/submit_answer", payload, headers)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    print(f"Client {client_idx}: HTTP {status}")
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(client_loop(idx) for idx in range(clients)))
+    return latencies
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Returns the `pct` percentile of `values` (nearest rank)."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def main():
+    """Main function to run the load test and print the latency report."""
+    parser = argparse.ArgumentParser(description="Load test /submit_answer of the answer API.")
+    parser.add_argument("--clients", type=int, default=200, help="Number of concurrent clients.")
+    parser.add_argument("--requests", type=int, default=10, help="Requests per client.")
+    parser.add_argument("--checker-delay", type=float, default=0.05, help="Seconds the stub checker takes per answer.")
+    parser.add_argument("--workers", type=int, default=8, help="Threads of the blocking call executor.")
+    parser.add_argument("--queue", type=int, default=1024, help="Queue size of the blocking call executor.")
+    parser.add_argument("--executor", action="store_true",
+                        help="Run database calls in a BlockingCallExecutor thread pool instead of the event loop.")
+    parser.add_argument("--writer-hold-ms", type=float, default=0.0,
+                        help="Have another process hold the database write lock this long, repeatedly (0: no writer).")
+    parser.add_argument("--writer-interval-ms", type=float, default=50.0,
+                        help="Milliseconds between the writer's lock holds.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        port = _free_port()
+        server = multiprocessing.Process(
+            target=serve,
+            args=(str(Path(tmp) / "load_test.db"), port, args.executor, args.workers, args.queue, args.checker_delay),
+            daemon=True,
+        )
+        server.start()
+        writer = None
+        try:
+            wait_for_port(port)
+            if args.writer_hold_ms:
+                writer = multiprocessing.Process(
+                    target=hold_write_lock,
+                    args=(str(Path(tmp) / "load_test.db"), args.writer_hold_ms, args.writer_interval_ms),
+                    daemon=True,
+                )
+                writer.start()
+            started = time.perf_counter()
+            latencies = asyncio.run(run_clients(port, args.clients, args.requests))
+            elapsed = time.perf_counter() - started
+        finally:
+            for process in (writer, server):
+                if process is not None:
+                    process.terminate()
+                    process.join()
+
+    mode = f"executor ({args.workers} threads)" if args.executor else "inline (event loop)"
+    writer_info = (f", writer holds the lock {args.writer_hold_ms:.0f} ms every "
+                   f"{args.writer_hold_ms + args.writer_interval_ms:.0f} ms" if args.writer_hold_ms else "")
+    print(f"Mode: {mode}, {args.clients} clients x {args.requests} requests, "
+          f"checker delay {args.checker_delay * 1000:.0f} ms{writer_info}")
+    print(f"Throughput: {len(latencies) / elapsed:.1f} req/s over {elapsed:.2f} s")
+    print(f"{'p50, ms':>10} {'p95, ms':>10} {'p99, ms':>10} {'max, ms':>10} {'mean, ms':>10}")
+    print(
+        f"{percentile(latencies, 50) * 1000:>10.1f} {percentile(latencies, 95) * 1000:>10.1f} "
+        f"{percentile(latencies, 99) * 1000:>10.1f} {max(latencies) * 1000:>10.1f} "
+        f"{statistics.mean(latencies) * 1000:>10.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
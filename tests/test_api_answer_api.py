@@ -0,0 +1,72 @@
+"""
+Tests for the endpoints of api/answer_api.py.
+"""
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+import httpx
+
+from api.answer_api import create_app
+
+
+class TestInitialStateForPage(unittest.TestCase):
+    def setUp(self):
+        self.db_manager = MagicMock()
+        self.db_manager.get_answers_for_user_on_page.return_value = {"40B442": {"answer": "4", "status": "correct"}}
+
+    def _get(self, app, path):
+        async def request():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get(path, headers={"X-User-Id": "student"})
+
+        return asyncio.run(request())
+
+    def test_page_is_looked_up_in_the_app_project(self):
+        app = create_app(self.db_manager, MagicMock(), proj_id="PROJ")
+
+        response = self._get(app, "/get_initial_state_for_page/init")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"40B442": {"answer": "4", "status": "correct"}})
+        self.db_manager.get_answers_for_user_on_page.assert_called_once_with(
+            user_id="student", page_name="init", proj_id="PROJ")
+
+    def test_query_parameter_selects_the_project(self):
+        app = create_app(self.db_manager, MagicMock(), proj_id="PROJ")
+
+        self._get(app, "/get_initial_state_for_page/init?proj_id=OTHER")
+
+        self.db_manager.get_answers_for_user_on_page.assert_called_once_with(
+            user_id="student", page_name="init", proj_id="OTHER")
+
+
+class TestInvalidUserHeader(unittest.TestCase):
+    def setUp(self):
+        self.db_manager = MagicMock()
+        self.checker = MagicMock()
+        self.app = create_app(self.db_manager, self.checker)
+
+    def _post(self, path, user_id):
+        async def request():
+            transport = httpx.ASGITransport(app=self.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post(path, json={"task_id": "40B442", "answer": "4"},
+                                         headers={"X-User-Id": user_id})
+
+        return asyncio.run(request())
+
+    def test_post_endpoints_reject_invalid_user_id_with_422(self):
+        for path in ("/submit_answer", "/save_answer_only"):
+            for user_id in ("a/b", "x" * 200):
+                with self.subTest(path=path, user_id=user_id[:10]):
+                    response = self._post(path, user_id)
+                    self.assertEqual(response.status_code, 422)
+                    self.assertIn("X-User-Id", response.json()["detail"])
+        self.db_manager.save_answer.assert_not_called()
+        self.db_manager.get_answer_and_status.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Unit tests for running blocking API calls off the event loop.
+"""
+import asyncio
+import threading
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+
+from api.answer_api import create_app
+from api.blocking_executor import BlockingCallExecutor, ExecutorOverloadedError, InlineExecutor
+
+
+class TestBlockingCallExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = BlockingCallExecutor(max_workers=2, max_queue=1)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_run_returns_result_from_worker_thread(self):
+        async def scenario():
+            return threading.get_ident(), await self.executor.run(lambda a, b=0: (threading.get_ident(), a + b), 1, b=2)
+
+        loop_thread, (worker_thread, result) = asyncio.run(scenario())
+        self.assertEqual(result, 3)
+        self.assertNotEqual(worker_thread, loop_thread)
+
+    def test_run_propagates_exceptions(self):
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            asyncio.run(self.executor.run(fail))
+
+    def test_rejects_calls_when_queue_is_full(self):
+        release = threading.Event()
+
+        async def scenario():
+            pending = [asyncio.ensure_future(self.executor.run(release.wait)) for _ in range(3)]
+            await asyncio.sleep(0)
+            with self.assertRaises(ExecutorOverloadedError):
+                await self.executor.run(lambda: None)
+            release.set()
+            await asyncio.gather(*pending)
+            # Slots are released once the calls finish
+            return await self.executor.run(lambda: "ok")
+
+        self.assertEqual(asyncio.run(scenario()), "ok")
+
+
+class TestAnswerAPIExecutor(unittest.TestCase):
+    def setUp(self):
+        self.db_manager = MagicMock()
+        self.checker = MagicMock()
+        self.checker.check_answer = AsyncMock(return_value={"status": "correct", "message": "ok"})
+        self.executor = BlockingCallExecutor(max_workers=1, max_queue=0)
+        self.app = create_app(self.db_manager, self.checker, executor=self.executor)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def _post(self, path, payload):
+        async def request():
+            transport = httpx.ASGITransport(app=self.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post(path, json=payload)
+
+        return asyncio.run(request())
+
+    def test_database_calls_run_off_the_event_loop(self):
+        db_threads = []
+
+        def get_answer_and_status(task_id, user_id):
+            db_threads.append(threading.current_thread().name)
+            return None, "not_checked"
+
+        self.db_manager.get_answer_and_status.side_effect = get_answer_and_status
+        self.db_manager.save_answer.side_effect = lambda *args, **kwargs: db_threads.append(threading.current_thread().name)
+
+        response = self._post("/submit_answer", {"task_id": "40B442", "answer": "4", "form_id": "f"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(db_threads), 2)
+        self.assertTrue(all(name.startswith("api-io") for name in db_threads))
+        self.db_manager.save_answer.assert_called_once_with("40B442", "4", "correct", user_id="default_user")
+
+    def test_overloaded_executor_returns_503(self):
+        # Take the only slot, as a long-running call would
+        self.assertTrue(self.executor._slots.acquire(blocking=False))
+        try:
+            response = self._post("/save_answer_only", {"task_id": "40B442", "answer": "4"})
+        finally:
+            self.executor._slots.release()
+
+        self.assertEqual(response.status_code, 503)
+        self.db_manager.save_answer.assert_not_called()
+
+    def test_database_calls_run_inline_by_default(self):
+        app = create_app(self.db_manager, self.checker)
+        self.assertIsInstance(app.state.executor, InlineExecutor)
+        self.app = app
+        self.db_manager.save_answer.side_effect = lambda *args, **kwargs: db_threads.append(threading.current_thread().name)
+        db_threads = []
+
+        response = self._post("/save_answer_only", {"task_id": "40B442", "answer": "4"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(db_threads, [threading.current_thread().name])
+
+
+if __name__ == '__main__':
+    unittest.main()
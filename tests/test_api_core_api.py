@@ -1,6 +1,9 @@
 """
 Тесты для api/core_api.py с использованием TestClient.
 """
+import asyncio
+import random
+import shutil
 import unittest
 import tempfile
 import os
@@ -8,6 +11,7 @@ from pathlib import Path
 from unittest.mock import MagicMock
 from unittest.mock import AsyncMock # Импортируем AsyncMock
 
+import httpx
 from fastapi.testclient import TestClient
 from api.core_api import create_core_app
 from utils.database_manager import DatabaseManager
@@ -15,6 +19,7 @@ from models.problem_schema import Problem
 from datetime import datetime
 from utils.local_storage import LocalStorage
 from utils.answer_checker import FIPIAnswerChecker
+from utils.quiz_selector import QuizSelector
 
 
 class TestCoreAPI(unittest.TestCase):
@@ -216,6 +221,72 @@ class TestCoreAPI(unittest.TestCase):
             self.assertIn("daily_tasks", first_week)
 
 
+class TestDailyQuizEndpoint(unittest.TestCase):
+    """Тесты выбора задач эндпоинтом /quiz/daily/start (через ASGI, без сети)."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(os.path.join(self.tmp_dir, "quiz.db"))
+        self.db_manager.initialize_db()
+        self.db_manager.save_problems(
+            [self._problem(f"init_M{i}", "mathematics", "algebra") for i in range(4)]
+            + [self._problem(f"init_G{i}", "mathematics", "geometry") for i in range(3)]
+            + [self._problem(f"init_R{i}", "russian", "orthography") for i in range(2)]
+        )
+        self.selector = QuizSelector(self.db_manager, rng=random.Random(0))
+        self.app = create_core_app(self.db_manager, MagicMock(), MagicMock(), quiz_selector=self.selector)
+
+    def tearDown(self):
+        self.db_manager.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _problem(problem_id: str, subject: str, topic: str) -> Problem:
+        return Problem(
+            problem_id=problem_id, subject=subject, type="A", text=f"Текст {problem_id}", answer="1",
+            topics=[topic], difficulty="easy", created_at=datetime(2024, 1, 1),
+            task_number=1, exam_part="Part 1", max_score=1, difficulty_level="basic",
+            page_name="init", task_id=problem_id.split("_", 1)[-1],
+        )
+
+    def _start(self, payload):
+        async def request():
+            transport = httpx.ASGITransport(app=self.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/quiz/daily/start", json=payload, headers={"X-User-Id": "student"})
+
+        return asyncio.run(request())
+
+    def test_invalid_count_returns_422(self):
+        for count in (0, -1, 51, "many", None):
+            with self.subTest(count=count):
+                self.assertEqual(self._start({"count": count}).status_code, 422)
+
+    def test_filters_by_subject_and_topic(self):
+        response = self._start({"subject": "mathematics", "topic": "geometry", "count": 10})
+        self.assertEqual(response.status_code, 200)
+        items = response.json()["items"]
+        self.assertEqual(sorted(item["problem_id"] for item in items), ["init_G0", "init_G1", "init_G2"])
+        self.assertTrue(all(item["topic"] == "geometry" for item in items))
+
+        items = self._start({"subject": "russian", "count": 1}).json()["items"]
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0]["subject"], "russian")
+        self.assertEqual(self._start({"subject": "mathematics", "topic": "unknown"}).json()["items"], [])
+
+    def test_items_follow_selection_order(self):
+        selected = ["init_R1", "init_M2", "missing", "init_G0"]
+        self.app.state.quiz_selector = MagicMock()
+        self.app.state.quiz_selector.select.return_value = selected
+
+        response = self._start({"subject": "mathematics", "topic": "algebra", "difficulty": "easy", "count": 4})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["problem_id"] for item in response.json()["items"]], ["init_R1", "init_M2", "init_G0"])
+        self.app.state.quiz_selector.select.assert_called_once_with(
+            "student", 4, subject="mathematics", topic="algebra", difficulty="easy")
+
+
 if __name__ == '__main__':
     unittest.main()
 
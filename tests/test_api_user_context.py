@@ -0,0 +1,37 @@
+"""
+Unit tests for the per-request user ID helper of the APIs.
+"""
+import unittest
+
+from fastapi import HTTPException, Request
+
+from api.user_context import DEFAULT_USER_ID, MAX_USER_ID_LENGTH, USER_ID_HEADER, get_user_id
+
+
+def _request(headers=None):
+    raw_headers = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw_headers})
+
+
+class TestGetUserId(unittest.TestCase):
+    def test_user_id_from_header(self):
+        self.assertEqual(get_user_id(_request({USER_ID_HEADER: " student42 "})), "student42")
+
+    def test_default_user_without_header(self):
+        self.assertEqual(get_user_id(_request()), DEFAULT_USER_ID)
+        self.assertEqual(get_user_id(_request({USER_ID_HEADER: "  "})), DEFAULT_USER_ID)
+
+    def test_too_long_user_id_is_rejected(self):
+        with self.assertRaises(HTTPException) as ctx:
+            get_user_id(_request({USER_ID_HEADER: "x" * (MAX_USER_ID_LENGTH + 1)}))
+        self.assertEqual(ctx.exception.status_code, 422)
+
+    def test_user_id_with_slash_is_rejected(self):
+        # "a/b" would share LocalStorage keys with the default user's task "a/b"
+        with self.assertRaises(HTTPException) as ctx:
+            get_user_id(_request({USER_ID_HEADER: "student/40B442"}))
+        self.assertEqual(ctx.exception.status_code, 422)
+
+
+if __name__ == '__main__':
+    unittest.main()
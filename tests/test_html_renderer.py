@@ -21,6 +21,9 @@ class TestHTMLRenderer(unittest.TestCase):
         # This prevents the "not enough values to unpack" error.
         # Using side_effect allows different returns for different calls if needed in the future.
         mock_db_manager.get_answer_and_status.return_value = (None, "not_checked")
+        # Initial state is loaded with one bulk query per page
+        mock_db_manager.get_answers_and_statuses.return_value = {}
+        self.mock_db_manager = mock_db_manager
 
         # CHANGED: Initialize HTMLRenderer with the DatabaseManager mock
         self.renderer = html_renderer.HTMLRenderer(db_manager=mock_db_manager)
@@ -224,6 +227,32 @@ class TestHTMLRenderer(unittest.TestCase):
         result = self.renderer._clean_css(raw_css)
         self.assertEqual(result, expected_cleaned)
 
+    def test_page_state_loaded_with_one_query(self):
+        """Test that a page render queries all its tasks at once."""
+        self.mock_db_manager.get_answers_and_statuses.return_value = {"T1": {"answer": "42", "status": "correct"}}
+        test_data = {
+            "page_name": "init",
+            "blocks_html": ["<p>Block 1</p>", "<p>Block 2</p>"],
+            "task_metadata": [{"task_id": "T1", "form_id": "F1"}, {"task_id": "T2", "form_id": "F2"}]
+        }
+
+        page_html = self.renderer.render(test_data, page_name="init")
+
+        self.mock_db_manager.get_answers_and_statuses.assert_called_once_with(["T1", "T2"])
+        self.mock_db_manager.get_answer_and_status.assert_not_called()
+        self.assertIn('"T1": {', page_html)
+
+    def test_render_block_reads_current_state(self):
+        """Test that a block render sees answers saved after its page was rendered."""
+        self.mock_db_manager.get_answers_and_statuses.return_value = {}
+        self.renderer.render({"blocks_html": [], "task_metadata": [{"task_id": "T1"}]}, page_name="init")
+
+        self.mock_db_manager.get_answers_and_statuses.return_value = {"T1": {"answer": "42", "status": "correct"}}
+        block_html = self.renderer.render_block("<p>Block</p>", 0, task_id="T1", page_name="init")
+
+        self.assertEqual(self.mock_db_manager.get_answers_and_statuses.call_args_list[-1].args, (["T1"],))
+        self.assertIn('"T1": {', block_html)
+
     # --- REMOVED tests for _get_answer_form_html and _get_js_functions ---
     # These methods no longer exist in HTMLRenderer.
     # Their logic is now in ui_components.
@@ -96,7 +96,7 @@ class TestMainMainFunction(unittest.TestCase):
         # 3. NEW: Verify API components were initialized and thread was created with correct arguments
         # OLD: mock_storage_cls.assert_called_once() # No longer used
         mock_checker_cls.assert_called_once()
-        mock_create_app.assert_called_once_with(mock_db_manager_instance, mock_checker_instance) # Passes db_manager and checker
+        mock_create_app.assert_called_once_with(mock_db_manager_instance, mock_checker_instance, proj_id='TEST_PROJ_ID') # Passes db_manager, checker and the run's project
         # NEW: Verify threading.Thread was called once with the correct target (the internal run_server function) and kwargs
         # The target should now be the internal function defined in main.py, not uvicorn.run directly
         mock_thread_cls.assert_called_once()
@@ -183,5 +183,79 @@ class TestMainMainFunction(unittest.TestCase):
             path_str = str(args[1]) # Second argument is the path
             self.assertTrue(path_str.endswith('.html'), f"Save called with non-HTML path: {path_str}")
 
+
+class TestUnchangedPageEntry(unittest.TestCase):
+    """
+    Test suite for the report entries of pages skipped in an incremental run.
+    """
+
+    def test_entry_names_the_run_with_the_outputs(self):
+        import tempfile
+        from pathlib import Path
+        from utils.page_fingerprints import PageFingerprintStore
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = PageFingerprintStore(Path(tmp_dir))
+            store.update("PROJ", "init", "fp", "run_20240101_000000")
+
+            self.assertEqual(main._unchanged_page_entry(store, "PROJ", "init"),
+                             {"page": "init", "run": "run_20240101_000000"})
+            self.assertEqual(main._unchanged_page_entry(store, "PROJ", "1"), {"page": "1", "run": None})
+        self.assertEqual(main._unchanged_page_entry(None, "PROJ", "init"), {"page": "init", "run": None})
+
+
+class TestMainResume(unittest.TestCase):
+    """
+    Test suite for the --resume command line option.
+    """
+
+    def test_parse_args(self):
+        self.assertIsNone(main.parse_args([]).resume)
+        self.assertEqual(main.parse_args(["--resume"]).resume, "latest")
+        self.assertEqual(main.parse_args(["--resume", "/data/run_1"]).resume, "/data/run_1")
+
+    def test_select_run_resumes_folder_from_journal(self):
+        import tempfile
+        from pathlib import Path
+        from utils.checkpoint_journal import CheckpointJournal
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            run_folder = Path(tmp_dir).resolve() / "run_1"
+            CheckpointJournal(run_folder).start("PROJ", "Math", ["init"])
+            mock_scraper = MagicMock()
+
+            selection = main._select_run(mock_scraper, MagicMock(), resume=str(run_folder))
+
+            self.assertEqual(selection, ("PROJ", "Math", run_folder))
+            mock_scraper.get_projects.assert_not_called()
+
+    @patch('builtins.print')
+    def test_select_run_without_journal(self, mock_print):
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertIsNone(main._select_run(MagicMock(), MagicMock(), resume=tmp_dir))
+
+
+class TestMainReprocess(unittest.TestCase):
+    """
+    Test suite for the --reprocess command line option.
+    """
+
+    def test_parse_args(self):
+        args = main.parse_args(["--reprocess", "/data/run_1", "--output", "/data/run_2"])
+        self.assertEqual(args.reprocess, "/data/run_1")
+        self.assertEqual(args.output, "/data/run_2")
+        self.assertIsNone(main.parse_args([]).reprocess)
+
+    @patch('builtins.print')
+    def test_reprocess_without_snapshots(self, mock_print):
+        import tempfile
+        from pathlib import Path
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mock_scraper = MagicMock()
+
+            self.assertIsNone(main._reprocess_run(mock_scraper, Path(tmp_dir), None, MagicMock()))
+            mock_scraper.start.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -129,8 +129,11 @@ class TestBlockProcessor(unittest.TestCase):
         for proc in self.mock_processors:
             proc.process.assert_called()
 
-        # Check if problem builder was called
+        # Check if problem builder was called, with the page membership of the problem
         self.mock_problem_builder.build.assert_called_once()
+        build_kwargs = self.mock_problem_builder.build.call_args.kwargs
+        self.assertEqual((build_kwargs["proj_id"], build_kwargs["page_name"], build_kwargs["task_id"]),
+                         (proj_id, page_num, "1"))
 
         # Check return tuple structure and types
         self.assertEqual(len(result), 6)
@@ -212,6 +215,32 @@ class TestBlockProcessor(unittest.TestCase):
         self.assertEqual(block_metadata["task_id"], "2")
         self.assertEqual(block_metadata["form_id"], "form2")
 
+    def test_collect_assets(self):
+        """
+        Test that linked preview images and processor assets are listed with their save directories.
+        """
+        block_processor = BlockProcessor(
+            asset_downloader_factory=self.mock_downloader_factory,
+            processors=[ImageScriptProcessor(), FileLinkProcessor()],
+            metadata_extractor=self.mock_metadata_extractor,
+            problem_builder=self.mock_problem_builder,
+        )
+        qblock = BeautifulSoup(
+            '<div class="qblock"><a href="../../docs/a.zip"><img src="../../img/prev.gif"></a>'
+            '<script>ShowPicture(\'img/pic.gif\')</script></div>',
+            'html.parser'
+        ).find('div')
+        page_assets_dir = self.temp_dir / "assets"
+
+        assets = block_processor.collect_assets(qblock, page_assets_dir)
+
+        self.assertEqual(assets, [
+            ('img/prev.gif', page_assets_dir / "assets", 'image'),
+            ('img/pic.gif', self.temp_dir / "assets", 'image'),
+            ('docs/a.zip', self.temp_dir / "assets", 'file'),
+        ])
+        self.mock_downloader_factory.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
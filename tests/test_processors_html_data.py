@@ -228,6 +228,18 @@ class TestImageScriptProcessor(unittest.TestCase):
         # Verify downloaded_images is empty
         self.assertEqual(downloaded_images, {'downloaded_images': {}})
 
+    def test_collect_assets(self):
+        """Test that referenced images are listed without downloading them."""
+        html_content = """
+        <script>ShowPicture('a.gif')</script>
+        <script>var x = 1;</script>
+        <script>ShowPictureQ("b.gif")</script>
+        """
+        soup = BeautifulSoup(html_content, 'html.parser')
+
+        self.assertEqual(self.processor.collect_assets(soup), [('a.gif', 'image'), ('b.gif', 'image')])
+        self.assertEqual(len(soup.find_all('script')), 3)
+
     def test_process_missing_downloader(self):
         """Test processing when AssetDownloader is not provided."""
         html_content = """
@@ -384,6 +396,20 @@ class TestFileLinkProcessor(unittest.TestCase):
         # Verify downloaded_files is empty
         self.assertEqual(downloaded_files, {'downloaded_files': {}})
 
+    def test_collect_assets(self):
+        """Test that javascript and direct file links are listed without downloading them."""
+        html_content = """
+        <a href="javascript:var wnd=window.open('../../docs/test.zip','_blank')">ZIP</a>
+        <a href="../../files/document.pdf">PDF</a>
+        <a href="https://example.com/page.html">Page</a>
+        """
+        soup = BeautifulSoup(html_content, 'html.parser')
+
+        self.assertEqual(
+            self.processor.collect_assets(soup),
+            [('docs/test.zip', 'file'), ('files/document.pdf', 'file')]
+        )
+
     def test_process_missing_downloader(self):
         """Test processing when AssetDownloader is not provided."""
         html_content = """
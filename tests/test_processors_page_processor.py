@@ -179,6 +179,47 @@ class TestPageProcessingOrchestrator(unittest.TestCase):
         expected_metadata = [{"meta1": "data1"}, {"meta2": "data2"}]
         self.assertEqual(scraped_data["task_metadata"], expected_metadata)
 
+    def test_page_is_parsed_once_with_real_processors(self):
+        """
+        Test that a page is parsed exactly once and blocks are processed as subtrees of it.
+        """
+        import tempfile
+        page_content = """
+        <html><body>
+            <div class="qblock" id="q40B442">Question <b>one</b><script>var x = 1;</script></div>
+            <div id="i40B442">
+                <span class="canselect">40B442</span>
+                <div class="task-header-panel"><div class="info-button">i</div></div>
+            </div>
+        </body></html>
+        """
+        orchestrator = PageProcessingOrchestrator(
+            asset_downloader_factory=self.mock_asset_downloader_factory,
+            problem_builder=MagicMock(spec=ProblemBuilder)
+        )
+        original_init = BeautifulSoup.__init__
+
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                patch.object(BeautifulSoup, '__init__', autospec=True, side_effect=original_init) as soup_init, \
+                patch('builtins.print'):
+            problems, scraped_data = orchestrator.process(
+                page_content=page_content,
+                proj_id="proj",
+                page_num="1",
+                run_folder=Path(tmp_dir),
+                base_url="https://example.com/questions.php",
+            )
+
+        self.assertEqual(soup_init.call_count, 1)
+        self.assertEqual(soup_init.call_args.args[2], "lxml")
+        self.assertEqual(len(scraped_data["blocks_html"]), 1)
+        block_html = scraped_data["blocks_html"][0]
+        self.assertTrue(block_html.startswith('<div class="qblock" id="q40B442">'))
+        self.assertIn('class="task-header-panel"', block_html)
+        self.assertIn('onclick="toggleInfo(this); return false;"', block_html)
+        self.assertNotIn("<script>", block_html)
+        self.assertEqual(scraped_data["assignments"][0], "Question\none\ni")
+
 
 if __name__ == '__main__':
     unittest.main()
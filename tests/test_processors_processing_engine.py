@@ -0,0 +1,120 @@
+# File: tests/test_processors_processing_engine.py
+
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, create_autospec
+from bs4 import BeautifulSoup
+from utils.downloader import AssetDownloader
+from processors.processing_engine import ProcessingEngine
+from processors.html_data_processors import (
+    ImageScriptProcessor,
+    FileLinkProcessor,
+    LinkedImageProcessor,
+    InvalidImageRemover,
+    ScriptRemover,
+    TaskInfoProcessor,
+    InputFieldRemover,
+    MathMLRemover,
+    UnwantedElementRemover
+)
+
+
+BLOCK_HTML = '''
+<div class="qblock">
+    <div class="hint" id="hint" name="hint">Впишите правильный ответ.</div>
+    <p>Text <math><mi>x</mi></math> more text</p>
+    <script>ShowPicture('img/pic.gif')</script>
+    <a href="../../docs/a.zip"><img src="../../img/prev.gif"></a>
+    <div class="info-button">i</div>
+    <input name="answer" type="text">
+    <span class="task-status task-status-0">НЕ РЕШЕНО</span>
+    <span class="task-status task-status-1">НЕ РЕШЕНО</span>
+    <table><tr bgcolor="#FFFFFF"><td>first</td></tr><tr bgcolor="#FFFFFF"><td>second</td></tr></table>
+    <img src="spacer.gif" border="0">
+    <script>var x = 1;</script>
+</div>
+'''
+
+
+def _processors():
+    return [
+        LinkedImageProcessor(),
+        ImageScriptProcessor(),
+        FileLinkProcessor(),
+        TaskInfoProcessor(),
+        InputFieldRemover(),
+        MathMLRemover(),
+        UnwantedElementRemover(),
+        InvalidImageRemover(),
+        ScriptRemover(),
+    ]
+
+
+class TestProcessingEngine(unittest.TestCase):
+    def setUp(self):
+        self.assets_dir = Path('/fake/page/dir')
+
+        def download(asset_src, save_dir, asset_type='image'):
+            return save_dir / Path(asset_src).name
+
+        self.downloader = MagicMock(spec=AssetDownloader)
+        self.downloader.download.side_effect = download
+
+    def _run_sequentially(self, soup):
+        for processor in _processors():
+            soup, _ = processor.process(soup, self.assets_dir, downloader=self.downloader)
+        return soup
+
+    def test_single_pass_matches_sequential_passes(self):
+        sequential = self._run_sequentially(BeautifulSoup(BLOCK_HTML, 'html.parser'))
+
+        fused = BeautifulSoup(BLOCK_HTML, 'html.parser')
+        ProcessingEngine(_processors()).run(fused, self.assets_dir, downloader=self.downloader)
+
+        self.assertEqual(str(fused), str(sequential))
+        self.assertEqual(len(fused.find_all('script')), 0)
+        self.assertEqual(len(fused.find_all('math')), 0)
+        self.assertIsNotNone(fused.find('img', src='assets/pic.gif'))
+        self.assertIsNotNone(fused.find('img', src='assets/prev.gif'))
+        self.assertIsNotNone(fused.find('a', href='assets/a.zip'))
+        self.assertIn('second', fused.get_text())
+        self.assertNotIn('first', fused.get_text())
+
+    def test_metadata_is_reported_per_processor(self):
+        image_processor = ImageScriptProcessor()
+        file_processor = FileLinkProcessor()
+        soup = BeautifulSoup(BLOCK_HTML, 'html.parser')
+
+        context = ProcessingEngine([image_processor, file_processor]).run(
+            soup, self.assets_dir, downloader=self.downloader
+        )
+
+        self.assertEqual(context.metadata(image_processor), {"downloaded_images": {"img/pic.gif": "assets/pic.gif"}})
+        self.assertEqual(context.metadata(file_processor), {"downloaded_files": {"docs/a.zip": "assets/a.zip"}})
+
+    def test_removed_elements_are_not_visited(self):
+        soup = BeautifulSoup('<table><tr bgcolor="#FFFFFF"><td><script>ShowPicture(\'x.gif\')</script></td></tr></table>', 'html.parser')
+
+        ProcessingEngine([UnwantedElementRemover(), ImageScriptProcessor()]).run(
+            soup, self.assets_dir, downloader=self.downloader
+        )
+
+        self.downloader.download.assert_not_called()
+        self.assertIsNone(soup.find('tr'))
+
+    def test_rejects_processors_without_tag_names(self):
+        with self.assertRaises(TypeError):
+            ProcessingEngine([create_autospec(ImageScriptProcessor)])
+        self.assertFalse(ProcessingEngine.supports_visiting(MagicMock()))
+        self.assertTrue(ProcessingEngine.supports_visiting(ScriptRemover()))
+
+    def test_missing_downloader_fails_before_walking(self):
+        soup = BeautifulSoup(BLOCK_HTML, 'html.parser')
+
+        with self.assertRaises(ValueError):
+            ProcessingEngine([MathMLRemover(), ImageScriptProcessor()]).run(soup, self.assets_dir)
+        self.assertIsNotNone(soup.find('math'))
+
+
+if __name__ == '__main__':
+    unittest.main()
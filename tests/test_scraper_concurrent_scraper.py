@@ -0,0 +1,92 @@
+"""
+Unit tests for the ConcurrentPageScraper class.
+"""
+import random
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from scraper.concurrent_scraper import ConcurrentPageScraper
+
+
+class TestConcurrentPageScraper(unittest.TestCase):
+    """Test cases for ConcurrentPageScraper."""
+
+    def setUp(self):
+        self.created = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def _factory(self, fail_on=None):
+        def make_scraper():
+            scraper = MagicMock()
+
+            def scrape_page(proj_id, page_name, run_folder):
+                with self.lock:
+                    self.active += 1
+                    self.max_active = max(self.max_active, self.active)
+                time.sleep(random.uniform(0, 0.01))
+                with self.lock:
+                    self.active -= 1
+                if page_name == fail_on:
+                    raise RuntimeError(f"boom on {page_name}")
+                return [f"problem_{page_name}"], {"page_name": page_name}
+
+            scraper.scrape_page.side_effect = scrape_page
+            self.created.append(scraper)
+            return scraper
+        return make_scraper
+
+    def test_results_are_yielded_in_page_order(self):
+        pages = ["init"] + [str(i) for i in range(1, 21)]
+        pool = ConcurrentPageScraper(self._factory(), concurrency=4)
+
+        results = list(pool.scrape("PROJ", pages, Path("/tmp/run")))
+
+        self.assertEqual([r.page_name for r in results], pages)
+        self.assertTrue(all(r.error is None for r in results))
+        self.assertEqual(results[3].problems, ["problem_3"])
+        self.assertLessEqual(self.max_active, 4)
+
+    def test_each_worker_opens_and_closes_one_session(self):
+        pool = ConcurrentPageScraper(self._factory(), concurrency=3)
+        list(pool.scrape("PROJ", [str(i) for i in range(10)], Path("/tmp/run")))
+
+        self.assertEqual(len(self.created), 3)
+        for scraper in self.created:
+            scraper.start.assert_called_once()
+            scraper.close.assert_called_once()
+
+    def test_page_errors_are_reported_not_raised(self):
+        pool = ConcurrentPageScraper(self._factory(fail_on="2"), concurrency=2)
+        results = list(pool.scrape("PROJ", ["1", "2", "3"], Path("/tmp/run")))
+
+        self.assertIsNone(results[0].error)
+        self.assertIsInstance(results[1].error, RuntimeError)
+        self.assertIsNone(results[1].scraped_data)
+        self.assertIsNone(results[2].error)
+
+    def test_early_stop_shuts_workers_down(self):
+        pool = ConcurrentPageScraper(self._factory(), concurrency=2)
+        results = pool.scrape("PROJ", [str(i) for i in range(50)], Path("/tmp/run"))
+        first = next(results)
+        # Let the workers run ahead until every slot is taken
+        time.sleep(0.2)
+        results.close()
+
+        self.assertEqual(first.page_name, "0")
+        for scraper in self.created:
+            scraper.close.assert_called_once()
+        # No page is scraped after the consumer leaves: the first one plus 2 * concurrency ahead
+        self.assertEqual(sum(scraper.scrape_page.call_count for scraper in self.created), 5)
+
+    def test_invalid_concurrency(self):
+        with self.assertRaises(ValueError):
+            ConcurrentPageScraper(self._factory(), concurrency=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
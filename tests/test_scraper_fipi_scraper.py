@@ -1,10 +1,14 @@
 """
 Integration tests for the FIPIScraper class focusing on delegation to PageProcessingOrchestrator.
 """
+import json
+import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 from scraper.fipi_scraper import FIPIScraper
+from scraper.request_router import RequestRouter
+from utils.page_fingerprints import PageFingerprintStore
 from models.problem_schema import Problem
 
 
@@ -35,5 +39,107 @@ class TestFIPIScraperScrapePageIntegration(unittest.TestCase):
         pass
 
 
+class TestFIPIScraperBrowserSession(unittest.TestCase):
+    """
+    Test cases for the long-lived browser session of FIPIScraper.
+    """
+
+    def setUp(self):
+        self.sync_playwright_patcher = patch('scraper.fipi_scraper.sync_playwright')
+        self.mock_sync_playwright = self.sync_playwright_patcher.start()
+        self.mock_playwright = self.mock_sync_playwright.return_value.start.return_value
+        self.mock_browser = self.mock_playwright.chromium.launch.return_value
+
+        self.orchestrator_patcher = patch('scraper.fipi_scraper.PageProcessingOrchestrator')
+        self.mock_orchestrator_cls = self.orchestrator_patcher.start()
+        self.mock_orchestrator_cls.return_value.process.return_value = ([], {"page_name": "init"})
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.run_folder = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+        self.orchestrator_patcher.stop()
+        self.sync_playwright_patcher.stop()
+
+    def test_session_launches_browser_once(self):
+        """All pages scraped inside the session share one browser and one context."""
+        scraper = FIPIScraper(base_url="https://example.com/questions.php")
+        with scraper:
+            for page_num in ["init", "1", "2"]:
+                scraper.scrape_page("PROJ", page_num, self.run_folder)
+
+        self.mock_playwright.chromium.launch.assert_called_once()
+        self.mock_browser.new_context.assert_called_once()
+        self.assertEqual(self.mock_browser.new_context.return_value.new_page.call_count, 3)
+        self.mock_browser.close.assert_called_once()
+        self.mock_playwright.stop.assert_called_once()
+        self.assertFalse(scraper.is_started)
+
+    def test_context_is_recycled_every_n_pages(self):
+        """The shared context is replaced after serving `recycle_context_every` pages."""
+        scraper = FIPIScraper(base_url="https://example.com/questions.php", recycle_context_every=2)
+        with scraper:
+            for page_num in ["init", "1", "2", "3", "4"]:
+                scraper.scrape_page("PROJ", page_num, self.run_folder)
+
+        self.mock_playwright.chromium.launch.assert_called_once()
+        # Initial context + recycles before pages 3 and 5
+        self.assertEqual(self.mock_browser.new_context.call_count, 3)
+
+    def test_without_session_uses_temporary_browser(self):
+        """Without an open session each call launches and closes its own browser."""
+        temp_playwright = self.mock_sync_playwright.return_value.__enter__.return_value
+        scraper = FIPIScraper(base_url="https://example.com/questions.php")
+        scraper.scrape_page("PROJ", "init", self.run_folder)
+        scraper.scrape_page("PROJ", "1", self.run_folder)
+
+        self.assertEqual(temp_playwright.chromium.launch.call_count, 2)
+        self.assertEqual(temp_playwright.chromium.launch.return_value.close.call_count, 2)
+
+    def test_request_router_installed_on_every_context(self):
+        """The request router is installed on the initial and on recycled contexts."""
+        router = RequestRouter()
+        scraper = FIPIScraper(base_url="https://example.com/questions.php", recycle_context_every=1, request_router=router)
+        with scraper:
+            scraper.scrape_page("PROJ", "init", self.run_folder)
+            scraper.scrape_page("PROJ", "1", self.run_folder)
+
+        context = self.mock_browser.new_context.return_value
+        self.assertEqual(context.route.call_count, 2)
+        context.route.assert_called_with("**/*", router.handle)
+
+    def test_page_readiness_timings_are_recorded(self):
+        """Each scraped page records its navigation and readiness time."""
+        scraper = FIPIScraper(base_url="https://example.com/questions.php")
+        with scraper:
+            scraper.scrape_page("PROJ", "init", self.run_folder)
+            page = self.mock_browser.new_context.return_value.new_page.return_value
+
+        page.goto.assert_called_once_with("https://example.com/questions.php?proj=PROJ&page=init", wait_until="domcontentloaded")
+        page.wait_for_timeout.assert_not_called()
+        self.assertEqual(scraper.page_timings["init"]["ready_strategy"], "selectors")
+        lines = (self.run_folder / "page_timings.jsonl").read_text(encoding="utf-8").splitlines()
+        self.assertEqual(json.loads(lines[0])["page"], "init")
+
+    def test_unchanged_page_skips_processing(self):
+        """With a fingerprint store, pages matching the stored fingerprint are not processed."""
+        store = PageFingerprintStore(self.run_folder / "fingerprints")
+        scraper = FIPIScraper(base_url="https://example.com/questions.php", fingerprint_store=store)
+        with scraper:
+            page = self.mock_browser.new_context.return_value.new_page.return_value
+            page.content.return_value = '<html><body><div class="qblock" id="qAB12">Task</div></body></html>'
+
+            problems, scraped_data = scraper.scrape_page("PROJ", "init", self.run_folder)
+            self.assertIn("fingerprint", scraped_data)
+            store.update("PROJ", "init", scraped_data["fingerprint"], "run_1")
+
+            problems, scraped_data = scraper.scrape_page("PROJ", "init", self.run_folder)
+
+        self.assertEqual(problems, [])
+        self.assertTrue(scraped_data["unchanged"])
+        self.mock_orchestrator_cls.return_value.process.assert_called_once()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,48 @@
+"""
+Unit tests for the PageReadinessWaiter class.
+"""
+import unittest
+from unittest.mock import MagicMock
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from scraper.page_readiness import PageReadinessWaiter
+
+
+class TestPageReadinessWaiter(unittest.TestCase):
+    """Test cases for PageReadinessWaiter."""
+
+    def test_waits_for_all_selectors(self):
+        page = MagicMock()
+        waiter = PageReadinessWaiter(selectors=("div.qblock", "div[id^='i']"), timeout_ms=5000)
+
+        result = waiter.wait(page)
+
+        self.assertEqual(result.strategy, "selectors")
+        waited = [call.args[0] for call in page.wait_for_selector.call_args_list]
+        self.assertEqual(waited, ["div.qblock", "div[id^='i']"])
+        for call in page.wait_for_selector.call_args_list:
+            self.assertEqual(call.kwargs["state"], "attached")
+            self.assertLessEqual(call.kwargs["timeout"], 5000)
+        page.wait_for_timeout.assert_not_called()
+
+    def test_falls_back_to_fixed_wait_on_timeout(self):
+        page = MagicMock()
+        page.wait_for_selector.side_effect = PlaywrightTimeoutError("Timeout 10ms exceeded.")
+        waiter = PageReadinessWaiter(timeout_ms=10, fallback_ms=250)
+
+        result = waiter.wait(page)
+
+        self.assertEqual(result.strategy, "fallback")
+        page.wait_for_timeout.assert_called_once_with(250)
+        self.assertGreaterEqual(result.seconds, 0.0)
+
+    def test_other_errors_propagate(self):
+        page = MagicMock()
+        page.wait_for_selector.side_effect = RuntimeError("page crashed")
+        with self.assertRaises(RuntimeError):
+            PageReadinessWaiter().wait(page)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Unit tests for the PageProcessingPipeline class.
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from processors.html_data_processors import ImageScriptProcessor, FileLinkProcessor
+from scraper.fipi_scraper import FIPIScraper, RawPage
+from scraper.processing_pipeline import PageProcessingPipeline, process_raw_page
+from utils.element_pairer import ElementPairer
+from utils.metadata_extractor import MetadataExtractor
+
+
+PAGE_HTML = """
+<html><body>
+<div id="i{task}"><div class="task-header-panel"><span class="canselect">{task}</span></div></div>
+<div class="qblock" id="q{task}">
+    <p>Task {task}</p>
+    <script>ShowPicture('docs/{task}.gif')</script>
+    <a href="../../docs/{task}.pdf">file</a>
+</div>
+</body></html>
+"""
+
+
+class _StubProblemBuilder:
+    """Picklable stand-in for ProblemBuilder that returns the problem ID."""
+
+    def build(self, **kwargs):
+        return kwargs["problem_id"]
+
+
+def _dependencies():
+    return {
+        "processors": [ImageScriptProcessor(), FileLinkProcessor()],
+        "metadata_extractor": MetadataExtractor(),
+        "problem_builder": _StubProblemBuilder(),
+        "element_pairer": ElementPairer(),
+        "html_parser": "html.parser",
+    }
+
+
+def _raw_page(page_name, unchanged=False):
+    task = f"A{page_name.upper()}"
+    return RawPage("PROJ", page_name, f"https://example.com/questions.php?proj=PROJ&page={page_name}",
+                   PAGE_HTML.format(task=task), "../../", fingerprint=f"fp-{page_name}", unchanged=unchanged)
+
+
+class TestProcessRawPage(unittest.TestCase):
+    def test_plans_asset_downloads_without_fetching(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            run_folder = Path(tmp)
+            processed = process_raw_page(_raw_page("init"), run_folder, "https://example.com/questions.php", _dependencies())
+
+        self.assertEqual(processed.problems, ["init_AINIT"])
+        self.assertEqual(processed.scraped_data["images"], {"docs/AINIT.gif": "assets/AINIT.gif"})
+        self.assertEqual(processed.scraped_data["files"], {"docs/AINIT.pdf": "assets/AINIT.pdf"})
+        self.assertEqual(processed.scraped_data["fingerprint"], "fp-init")
+        self.assertIn('src="assets/AINIT.gif"', processed.scraped_data["blocks_html"][0])
+        self.assertEqual(processed.assets, [
+            ("docs/AINIT.gif", run_folder / "init" / "assets", "image"),
+            ("docs/AINIT.pdf", run_folder / "init" / "assets", "file"),
+        ])
+
+
+class TestPageProcessingPipeline(unittest.TestCase):
+    def setUp(self):
+        self.scraper = MagicMock(spec=FIPIScraper)
+        self.scraper.base_url = "https://example.com/questions.php"
+        self.scraper.user_agent = "test-agent"
+        self.scraper.asset_download_workers = 4
+        self.scraper.asset_cache = None
+        self.scraper.processing_dependencies = _dependencies()
+        self.scraper.capture_page.side_effect = lambda proj_id, page_name, run_folder: _raw_page(
+            page_name, unchanged=(page_name == "2")
+        )
+
+    @patch('scraper.processing_pipeline.AssetDownloader')
+    def test_results_in_page_order_with_assets_downloaded_afterwards(self, mock_downloader_cls):
+        def download_many(assets):
+            # The pdf of page 1 cannot be downloaded
+            return {(src, save_dir): None if src == "docs/A1.pdf" else save_dir / Path(src).name
+                    for src, save_dir, _ in assets}
+        mock_downloader_cls.return_value.download_many.side_effect = download_many
+        mock_downloader_cls.return_value.resolve_url.side_effect = lambda src: f"https://example.com/{src}"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            pipeline = PageProcessingPipeline(self.scraper, workers=2)
+            results = list(pipeline.scrape("PROJ", ["init", "1", "2", "3"], Path(tmp)))
+
+        self.assertEqual([r.page_name for r in results], ["init", "1", "2", "3"])
+        self.assertTrue(all(r.error is None for r in results))
+        self.assertEqual(results[0].problems, ["init_AINIT"])
+        self.assertTrue(results[2].scraped_data["unchanged"])
+        self.assertEqual(results[1].scraped_data["files"], {})
+        self.assertEqual(results[1].scraped_data["images"], {"docs/A1.gif": "assets/A1.gif"})
+        # The link to the missing pdf points back to the site, not to a local file that does not exist
+        block_html = results[1].scraped_data["blocks_html"][0]
+        self.assertIn('href="https://example.com/docs/A1.pdf"', block_html)
+        self.assertNotIn('href="assets/A1.pdf"', block_html)
+        self.assertIn('src="assets/A1.gif"', block_html)
+        self.assertIn('href="assets/AINIT.pdf"', results[0].scraped_data["blocks_html"][0])
+        # One download batch per processed page, without a browser page
+        self.assertEqual(mock_downloader_cls.return_value.download_many.call_count, 3)
+        self.assertIsNone(mock_downloader_cls.call_args.kwargs["page"])
+
+    @patch('scraper.processing_pipeline.AssetDownloader')
+    def test_capture_errors_are_reported_not_raised(self, mock_downloader_cls):
+        mock_downloader_cls.return_value.download_many.return_value = {}
+        self.scraper.capture_page.side_effect = RuntimeError("navigation failed")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            results = list(PageProcessingPipeline(self.scraper, workers=1).scrape("PROJ", ["init"], Path(tmp)))
+
+        self.assertEqual(len(results), 1)
+        self.assertIsInstance(results[0].error, RuntimeError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Unit tests for the RawPageArchive class.
+"""
+import gzip
+import tempfile
+import unittest
+from pathlib import Path
+
+from scraper.raw_page_archive import RawPage, RawPageArchive
+
+
+class TestRawPageArchive(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.run_folder = Path(self.temp_dir.name)
+        self.archive = RawPageArchive(self.run_folder)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_save_and_load_round_trip(self):
+        raw_page = RawPage("PROJ", "init", "https://example.com/q?page=init", "<html>Задание</html>", "../../",
+                           fingerprint="fp", cookies=[{"name": "session", "value": "secret"}])
+
+        html_path = self.archive.save(raw_page)
+        loaded = self.archive.load("init")
+
+        self.assertEqual(html_path, self.run_folder / "raw" / "init.html.gz")
+        self.assertEqual(gzip.decompress(html_path.read_bytes()).decode("utf-8"), "<html>Задание</html>")
+        self.assertEqual(loaded, raw_page._replace(cookies=[]))
+        self.assertIn("init", self.archive)
+
+    def test_pages_are_listed_in_page_order(self):
+        for page_name in ["10", "2", "init", "1"]:
+            self.archive.save(RawPage("PROJ", page_name, "", "<html></html>", "../../"))
+        # A snapshot without its metadata file is incomplete and not listed
+        (self.archive.root / "3.html.gz").write_bytes(gzip.compress(b"<html></html>"))
+
+        self.assertEqual(self.archive.pages(), ["init", "1", "2", "10"])
+
+    def test_missing_page(self):
+        self.assertEqual(self.archive.pages(), [])
+        with self.assertRaises(FileNotFoundError):
+            self.archive.load("init")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Unit tests for the RequestRouter class.
+"""
+import unittest
+from unittest.mock import MagicMock, patch
+
+import config
+from scraper.request_router import RequestRouter
+
+
+def make_route(url, resource_type):
+    route = MagicMock()
+    route.request.url = url
+    route.request.resource_type = resource_type
+    return route
+
+
+class TestRequestRouter(unittest.TestCase):
+    """Test cases for RequestRouter."""
+
+    def setUp(self):
+        self.router = RequestRouter()
+
+    def test_default_blocks_fonts_media_and_trackers(self):
+        self.assertEqual(self.router.should_block("https://ege.fipi.ru/fonts/a.woff2", "font"), "type:font")
+        self.assertEqual(self.router.should_block("https://ege.fipi.ru/v.mp4", "media"), "type:media")
+        self.assertEqual(self.router.should_block("https://mc.yandex.ru/metrika/tag.js", "script"), "url")
+
+    def test_default_allows_page_content(self):
+        self.assertIsNone(self.router.should_block("https://ege.fipi.ru/bank/questions.php?page=1", "document"))
+        self.assertIsNone(self.router.should_block("https://ege.fipi.ru/bank/js/qfntstb.js", "script"))
+        self.assertIsNone(self.router.should_block("https://ege.fipi.ru/docs/img.gif", "image"))
+
+    def test_defaults_come_from_config(self):
+        with patch.object(config, "BLOCKED_URL_PATTERNS", ["*tracker.example*"]):
+            router = RequestRouter()
+        self.assertEqual(router.deny_url_patterns, ("*tracker.example*",))
+        self.assertEqual(router.blocked_resource_types, frozenset(config.BLOCKED_RESOURCE_TYPES))
+
+    def test_allow_patterns_take_precedence(self):
+        router = RequestRouter(blocked_resource_types=["image"], allow_url_patterns=["*ege.fipi.ru/docs/*"])
+        self.assertIsNone(router.should_block("https://ege.fipi.ru/docs/img.gif", "image"))
+        self.assertEqual(router.should_block("https://cdn.example.com/logo.png", "image"), "type:image")
+
+    def test_handle_aborts_or_continues_and_counts(self):
+        blocked = make_route("https://ege.fipi.ru/fonts/a.woff2", "font")
+        allowed = make_route("https://ege.fipi.ru/bank/questions.php", "document")
+
+        self.router.handle(blocked)
+        self.router.handle(allowed)
+
+        blocked.abort.assert_called_once()
+        blocked.continue_.assert_not_called()
+        allowed.continue_.assert_called_once()
+        allowed.abort.assert_not_called()
+        self.assertEqual(self.router.stats(), {"allowed": 1, "blocked": 1, "blocked:type:font": 1})
+
+    def test_install_routes_all_urls(self):
+        context = MagicMock()
+        self.router.install(context)
+        context.route.assert_called_once_with("**/*", self.router.handle)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Unit tests for the SnapshotReprocessor class.
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from scraper.fipi_scraper import FIPIScraper
+from scraper.raw_page_archive import RawPage, RawPageArchive
+from scraper.snapshot_reprocessor import SnapshotReprocessor
+from tests.test_scraper_processing_pipeline import PAGE_HTML, _dependencies
+
+
+class TestSnapshotReprocessor(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = Path(self.temp_dir.name)
+        self.source_run = root / "run_source"
+        self.output_run = root / "run_output"
+
+        self.archive = RawPageArchive(self.source_run)
+        for page_name in ["init", "1"]:
+            task = f"A{page_name.upper()}"
+            self.archive.save(RawPage("PROJ", page_name, "", PAGE_HTML.format(task=task), "../../"))
+        # Only the image of page init was downloaded by the source run
+        image_path = self.source_run / "init" / "assets" / "AINIT.gif"
+        image_path.parent.mkdir(parents=True)
+        image_path.write_bytes(b"GIF89a")
+
+        self.scraper = MagicMock(spec=FIPIScraper)
+        self.scraper.base_url = "https://example.com/questions.php"
+        self.scraper.user_agent = None
+        self.scraper.asset_download_workers = 1
+        self.scraper.asset_cache = None
+        self.scraper.processing_dependencies = _dependencies()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_reprocesses_archived_pages_offline(self):
+        reprocessor = SnapshotReprocessor(self.scraper, self.archive, workers=2)
+
+        results = list(reprocessor.scrape("PROJ", self.archive.pages(), self.output_run))
+
+        self.assertEqual([r.page_name for r in results], ["init", "1"])
+        self.assertTrue(all(r.error is None for r in results))
+        self.assertEqual(results[0].problems, ["init_AINIT"])
+        self.assertEqual(results[0].scraped_data["images"], {"docs/AINIT.gif": "assets/AINIT.gif"})
+        self.assertEqual((self.output_run / "init" / "assets" / "AINIT.gif").read_bytes(), b"GIF89a")
+        # Assets without a local copy are dropped, nothing is downloaded
+        self.assertEqual(results[0].scraped_data["files"], {})
+        self.assertEqual(results[1].scraped_data["images"], {})
+        self.assertIn('src="assets/AINIT.gif"', results[0].scraped_data["blocks_html"][0])
+        self.assertIn('href="https://example.com/docs/AINIT.pdf"', results[0].scraped_data["blocks_html"][0])
+        self.assertIn('src="https://example.com/docs/A1.gif"', results[1].scraped_data["blocks_html"][0])
+        self.scraper.capture_page.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 """Тесты для модуля answer_checker."""
 
+import asyncio
 import json
 import unittest
 from unittest.mock import AsyncMock, patch
@@ -64,4 +65,100 @@ class TestFIPIAnswerChecker(unittest.IsolatedAsyncioTestCase):
             )
 
             self.assertEqual(result["status"], "error")
-            self.assertIn("HTTP ошибка: 500", result["message"])
\ No newline at end of file
+            self.assertIn("HTTP ошибка: 500", result["message"])
+    async def test_client_is_reused_between_checks(self) -> None:
+        """Тест: все проверки идут через один клиент с пулом соединений."""
+        mock_response = Response(
+            status_code=200,
+            text=json.dumps({"status": "incorrect"}),
+            request=httpx.Request("POST", "https://fipi.ru/check-answer"),
+        )
+
+        with patch("httpx.AsyncClient.post", new_callable=AsyncMock) as mock_post:
+            mock_post.return_value = mock_response
+
+            await self.checker.check_answer("40B442", "checkform40B442", "1")
+            first_client = self.checker._client
+            await self.checker.check_answer("40B443", "checkform40B443", "2")
+
+            self.assertIsNotNone(first_client)
+            self.assertIs(self.checker._client, first_client)
+            self.assertEqual(mock_post.call_count, 2)
+
+        await self.checker.aclose()
+        self.assertTrue(first_client.is_closed)
+        self.assertIsNone(self.checker._client)
+
+    async def test_client_uses_configured_limits(self) -> None:
+        """Тест: параметры пула и HTTP/2 передаются клиенту."""
+        checker = FIPIAnswerChecker("https://fipi.ru", http2=False, max_connections=3, max_keepalive_connections=2)
+
+        with patch("utils.answer_checker.httpx.AsyncClient") as mock_client_cls:
+            checker._get_client()
+
+        kwargs = mock_client_cls.call_args.kwargs
+        self.assertFalse(kwargs["http2"])
+        self.assertEqual(kwargs["limits"].max_connections, 3)
+        self.assertEqual(kwargs["limits"].max_keepalive_connections, 2)
+
+
+class TestFIPIAnswerCheckerCoalescing(unittest.IsolatedAsyncioTestCase):
+    """Тесты объединения одинаковых проверок и кэша вердиктов."""
+
+    def setUp(self) -> None:
+        self.checker = FIPIAnswerChecker("https://fipi.ru", verdict_cache_ttl=60.0, verdict_cache_size=2)
+        self.calls = 0
+
+    def _upstream(self, status: str, delay: float = 0.0):
+        async def check(task_id, form_id, user_answer):
+            self.calls += 1
+            await asyncio.sleep(delay)
+            return {"status": status, "message": status, "raw_response": ""}
+        return check
+
+    async def test_concurrent_identical_checks_share_one_request(self) -> None:
+        """Тест: одновременные проверки одного ответа отправляют один запрос."""
+        with patch.object(self.checker, "_check_upstream", side_effect=self._upstream("correct", 0.01)):
+            results = await asyncio.gather(
+                self.checker.check_answer("40B442", "checkform40B442", "42"),
+                self.checker.check_answer("40B442", "checkform40B442", " 42 "),
+                self.checker.check_answer("40B442", "checkform40B442", "42"),
+            )
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual([r["status"] for r in results], ["correct"] * 3)
+        # Каждый вызывающий получает свою копию результата
+        self.assertIsNot(results[0], results[1])
+
+    async def test_verdict_is_cached_for_other_users(self) -> None:
+        """Тест: повторная проверка того же ответа берётся из кэша."""
+        with patch.object(self.checker, "_check_upstream", side_effect=self._upstream("incorrect")):
+            await self.checker.check_answer("40B442", "checkform40B442", "1")
+            result = await self.checker.check_answer("40B442", "checkform40B442", "1")
+            await self.checker.check_answer("40B442", "checkform40B442", "2")
+
+        self.assertEqual(result["status"], "incorrect")
+        self.assertEqual(self.calls, 2)
+
+    async def test_errors_and_expired_verdicts_are_not_reused(self) -> None:
+        """Тест: ошибки не кэшируются, а устаревшие вердикты проверяются заново."""
+        with patch.object(self.checker, "_check_upstream", side_effect=self._upstream("error")):
+            await self.checker.check_answer("40B442", "checkform40B442", "1")
+            await self.checker.check_answer("40B442", "checkform40B442", "1")
+        self.assertEqual(self.calls, 2)
+
+        self.checker.verdict_cache_ttl = 0.01
+        with patch.object(self.checker, "_check_upstream", side_effect=self._upstream("correct")):
+            await self.checker.check_answer("40B442", "checkform40B442", "1")
+            await asyncio.sleep(0.02)
+            await self.checker.check_answer("40B442", "checkform40B442", "1")
+        self.assertEqual(self.calls, 4)
+
+    async def test_cache_evicts_least_recently_used(self) -> None:
+        """Тест: размер кэша ограничен."""
+        with patch.object(self.checker, "_check_upstream", side_effect=self._upstream("correct")):
+            for answer in ("1", "2", "3"):
+                await self.checker.check_answer("40B442", "checkform40B442", answer)
+
+        self.assertEqual(len(self.checker._verdicts), 2)
+        self.assertNotIn(("40B442", "checkform40B442", "1"), self.checker._verdicts)
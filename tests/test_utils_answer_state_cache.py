@@ -0,0 +1,42 @@
+"""
+Unit tests for the AnswerStateCache class.
+"""
+import unittest
+
+from utils.answer_state_cache import AnswerStateCache
+
+
+class TestAnswerStateCache(unittest.TestCase):
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = AnswerStateCache(max_entries=2)
+        cache.put("u1", "t1", ("a", "correct"))
+        cache.put("u1", "t2", ("b", "incorrect"))
+        self.assertEqual(cache.get("u1", "t1"), ("a", "correct"))  # t1 becomes the most recent
+
+        cache.put("u2", "t1", (None, "not_checked"))
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("u1", "t2"))
+        self.assertEqual(cache.get_many("u1", ["t1", "t2"]), ({"t1": ("a", "correct")}, ["t2"]))
+        self.assertEqual(cache.get("u2", "t1"), (None, "not_checked"))
+
+    def test_invalidation_drops_entry_and_rejects_stale_puts(self):
+        cache = AnswerStateCache()
+        cache.put("u1", "t1", ("a", "correct"))
+        version = cache.version()  # A reader starts querying the database
+
+        cache.invalidate("u1", "t1")  # A writer saves a new answer meanwhile
+        cache.put("u1", "t1", ("a", "correct"), version=version)
+
+        self.assertIsNone(cache.get("u1", "t1"))
+        cache.put("u1", "t1", ("b", "correct"), version=cache.version())
+        self.assertEqual(cache.get("u1", "t1"), ("b", "correct"))
+
+    def test_zero_size_disables_caching(self):
+        cache = AnswerStateCache(max_entries=0)
+        cache.put("u1", "t1", ("a", "correct"))
+        self.assertIsNone(cache.get("u1", "t1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
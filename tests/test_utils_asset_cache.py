@@ -0,0 +1,86 @@
+"""
+Unit tests for the AssetCache class.
+"""
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from utils.asset_cache import AssetCache
+
+
+class TestAssetCache(unittest.TestCase):
+    """Test cases for the AssetCache class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.cache = AssetCache(self.root / "cache")
+        self.url = "https://example.com/images/a.gif"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lookup_missing(self):
+        self.assertIsNone(self.cache.lookup(self.url))
+
+    def test_store_and_lookup(self):
+        entry = self.cache.store(self.url, b"gif-bytes", {"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+
+        looked_up = self.cache.lookup(self.url)
+        self.assertEqual(looked_up["sha256"], entry["sha256"])
+        self.assertEqual(looked_up["etag"], '"abc"')
+        self.assertEqual(self.cache.blob_path(entry["sha256"]).read_bytes(), b"gif-bytes")
+        self.assertEqual(
+            self.cache.conditional_headers(looked_up),
+            {"If-None-Match": '"abc"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+        )
+
+    def test_identical_content_stored_once(self):
+        first = self.cache.store(self.url, b"same")
+        second = self.cache.store("https://example.com/other.gif", b"same")
+
+        self.assertEqual(first["sha256"], second["sha256"])
+        blobs = [p for p in (self.root / "cache" / "blobs").rglob("*") if p.is_file()]
+        self.assertEqual(len(blobs), 1)
+
+    def test_materialize_links_blob(self):
+        entry = self.cache.store(self.url, b"data")
+        dest = self.root / "run_1" / "page" / "a.gif"
+
+        self.cache.materialize(entry, dest)
+        self.cache.materialize(entry, dest)  # Idempotent
+
+        self.assertEqual(dest.read_bytes(), b"data")
+        self.assertTrue(os.path.samefile(dest, self.cache.blob_path(entry["sha256"])))
+
+    def test_materialize_replaces_stale_file(self):
+        entry = self.cache.store(self.url, b"new")
+        dest = self.root / "a.gif"
+        dest.write_bytes(b"old")
+
+        self.cache.materialize(entry, dest)
+
+        self.assertEqual(dest.read_bytes(), b"new")
+
+    def test_mark_checked_keeps_validators(self):
+        entry = self.cache.store(self.url, b"data", {"etag": '"v1"'})
+        entry["checked_at"] = 0
+
+        updated = self.cache.mark_checked(self.url, entry, {})
+
+        self.assertEqual(updated["etag"], '"v1"')
+        self.assertGreater(self.cache.lookup(self.url)["checked_at"], 0)
+
+    def test_is_fresh(self):
+        entry = self.cache.store(self.url, b"data")
+        self.assertFalse(self.cache.is_fresh(entry))
+
+        cache = AssetCache(self.root / "cache", max_age=60)
+        self.assertTrue(cache.is_fresh(entry))
+        self.assertFalse(cache.is_fresh(dict(entry, checked_at=time.time() - 120)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit tests for the CheckpointJournal class.
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils.checkpoint_journal import CheckpointJournal, JOURNAL_FILENAME
+
+
+class TestCheckpointJournal(unittest.TestCase):
+    """Test cases for the CheckpointJournal class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.run_folder = Path(self.tmp.name) / "Math_PROJ" / "run_20240101_000000"
+        self.pages = ["init", "1", "2", "3"]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_new_journal_has_all_pages_pending(self):
+        journal = CheckpointJournal(self.run_folder)
+        journal.start("PROJ", "Math", self.pages)
+
+        self.assertEqual(journal.pending_pages(self.pages), self.pages)
+        self.assertEqual(journal.run_info["proj_id"], "PROJ")
+
+    def test_state_is_replayed_after_restart(self):
+        journal = CheckpointJournal(self.run_folder)
+        journal.start("PROJ", "Math", self.pages)
+        journal.record_done("init", {"html": "init/init.html"})
+        journal.record_failed("1", RuntimeError("timeout"))
+        journal.record_done("2")
+
+        reopened = CheckpointJournal(self.run_folder)
+        self.assertEqual(reopened.run_info["subject"], "Math")
+        self.assertEqual(reopened.pending_pages(self.pages), ["1", "3"])
+        self.assertEqual(reopened.failed_pages(), ["1"])
+        self.assertEqual(reopened.completed_pages()["init"]["outputs"], {"html": "init/init.html"})
+
+    def test_failed_page_completed_on_retry(self):
+        journal = CheckpointJournal(self.run_folder)
+        journal.start("PROJ", "Math", self.pages)
+        journal.record_failed("1", "boom")
+        journal.record_done("1")
+
+        self.assertEqual(CheckpointJournal(self.run_folder).failed_pages(), [])
+
+    def test_resumed_start_keeps_header(self):
+        CheckpointJournal(self.run_folder).start("PROJ", "Math", self.pages)
+        journal = CheckpointJournal(self.run_folder)
+        journal.start("OTHER", "Other", self.pages)
+
+        self.assertEqual(CheckpointJournal(self.run_folder).run_info["proj_id"], "PROJ")
+
+    def test_torn_last_line_is_ignored(self):
+        journal = CheckpointJournal(self.run_folder)
+        journal.start("PROJ", "Math", self.pages)
+        journal.record_done("init")
+        with open(self.run_folder / JOURNAL_FILENAME, "a", encoding="utf-8") as f:
+            f.write('{"event": "page_do')
+
+        self.assertIn("init", CheckpointJournal(self.run_folder).completed_pages())
+
+    def test_append_after_torn_line_starts_a_new_line(self):
+        journal = CheckpointJournal(self.run_folder)
+        journal.start("PROJ", "Math", self.pages)
+        with open(self.run_folder / JOURNAL_FILENAME, "a", encoding="utf-8") as f:
+            f.write('{"event": "page_do')
+
+        resumed = CheckpointJournal(self.run_folder)
+        resumed.record_done("init")
+        resumed.record_done("1")
+
+        self.assertEqual(set(CheckpointJournal(self.run_folder).completed_pages()), {"init", "1"})
+
+    def test_find_latest(self):
+        subject_folder = self.run_folder.parent
+        self.assertIsNone(CheckpointJournal.find_latest(subject_folder))
+
+        CheckpointJournal(self.run_folder).start("PROJ", "Math", self.pages)
+        newer = subject_folder / "run_20240102_000000"
+        CheckpointJournal(newer).start("PROJ", "Math", self.pages)
+        (subject_folder / "run_20240103_000000").mkdir()  # No journal
+
+        self.assertEqual(CheckpointJournal.find_latest(subject_folder), newer)
+
+
+if __name__ == "__main__":
+    unittest.main()
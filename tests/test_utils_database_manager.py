@@ -8,8 +8,11 @@ import tempfile
 from pathlib import Path
 from datetime import datetime, timezone
 
+from sqlalchemy import create_engine, inspect
+
+from models.database_models import DBProblem
 from models.problem_schema import Problem
-from utils.database_manager import DatabaseManager
+from utils.database_manager import DatabaseManager, SQLiteProfile
 
 
 class TestDatabaseManager(unittest.TestCase):
@@ -22,9 +25,12 @@ class TestDatabaseManager(unittest.TestCase):
         self.db_manager.initialize_db()
 
     def tearDown(self):
-        """Удаляет временный файл базы данных."""
-        if self.temp_db_path.exists():
-            self.temp_db_path.unlink()
+        """Удаляет временный файл базы данных вместе с файлами WAL."""
+        self.db_manager.engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            path = Path(f"{self.temp_db_path}{suffix}")
+            if path.exists():
+                path.unlink()
 
     def test_save_and_get_problem(self):
         """Проверяет сохранение и извлечение одной задачи."""
@@ -89,3 +95,185 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(len(all_problems), 2)
         ids = {p.problem_id for p in all_problems}
         self.assertEqual(ids, {"p1", "p2"})
+
+    def _make_problem(self, problem_id: str, text: str, proj_id: str = None, page_name: str = None,
+                      task_id: str = None) -> Problem:
+        """Создаёт задачу со всеми обязательными полями."""
+        return Problem(
+            problem_id=problem_id, subject="math", type="A", text=text, answer="1",
+            topics=["algebra"], difficulty="easy", created_at=datetime(2024, 1, 1),
+            task_number=1, exam_part="Part 1", max_score=1, difficulty_level="basic",
+            metadata={"page": "init"}, proj_id=proj_id, page_name=page_name, task_id=task_id,
+        )
+
+    def test_save_problems_upserts_in_batches(self):
+        """Проверяет подсчёт вставленных и обновлённых задач и замену полей при конфликте."""
+        first = [self._make_problem(f"p{i}", f"Q{i}") for i in range(5)]
+        self.assertEqual(self.db_manager.save_problems(first, batch_size=2), (5, 0))
+
+        second = [self._make_problem("p1", "Q1 updated"), self._make_problem("p9", "Q9"),
+                  self._make_problem("p9", "Q9 again")]
+        self.assertEqual(self.db_manager.save_problems(second, batch_size=2), (1, 2))
+
+        with self.db_manager.SessionLocal() as session:
+            rows = {p.problem_id: p for p in session.query(DBProblem).all()}
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows["p1"].text, "Q1 updated")
+        self.assertEqual(rows["p9"].text, "Q9 again")
+        self.assertEqual(rows["p9"].metadata_, {"page": "init"})
+
+    def test_connection_profile_pragmas(self):
+        """Проверяет, что PRAGMA-команды профиля применяются к каждому соединению."""
+        with self.db_manager.engine.connect() as conn:
+            pragma = lambda name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            self.assertEqual(pragma("journal_mode"), "wal")
+            self.assertEqual(pragma("synchronous"), 1)  # NORMAL
+            self.assertEqual(pragma("busy_timeout"), 5000)
+            self.assertEqual(pragma("cache_size"), -64 * 1024)
+
+    def test_custom_profile(self):
+        """Проверяет применение пользовательского профиля подключения."""
+        with tempfile.TemporaryDirectory() as tmp:
+            db_manager = DatabaseManager(str(Path(tmp) / "custom.db"),
+                                         profile=SQLiteProfile(journal_mode="DELETE", busy_timeout_ms=250))
+            with db_manager.engine.connect() as conn:
+                self.assertEqual(conn.exec_driver_sql("PRAGMA journal_mode").scalar(), "delete")
+                self.assertEqual(conn.exec_driver_sql("PRAGMA busy_timeout").scalar(), 250)
+            db_manager.engine.dispose()
+
+    def test_reads_from_another_thread_during_write(self):
+        """Проверяет, что чтение из другого потока не блокируется открытой транзакцией записи."""
+        import threading
+
+        self.db_manager.save_answer("task1", "42", "correct")
+        results = []
+        with self.db_manager.engine.begin() as writer:
+            writer.exec_driver_sql("UPDATE answers SET user_answer = '43'")
+            # В режиме WAL читатель видит последнюю зафиксированную версию, не дожидаясь писателя
+            reader = threading.Thread(target=lambda: results.append(self.db_manager.get_answer_and_status("task1")))
+            reader.start()
+            reader.join(timeout=5)
+        self.assertEqual(results, [("42", "correct")])
+
+    def test_page_scoped_answer_lookups(self):
+        """Проверяет выборку задач и ответов одной страницы."""
+        self.db_manager.save_problems([
+            self._make_problem("init_AAA", "Q1", "PROJ", "init", "AAA"),
+            self._make_problem("init_BBB", "Q2", "PROJ", "init", "BBB"),
+            self._make_problem("1_CCC", "Q3", "PROJ", "1", "CCC"),
+            self._make_problem("init_DDD", "Q4", "OTHER", "init", "DDD"),
+        ])
+        self.db_manager.save_answer("AAA", "a", "correct")
+        self.db_manager.save_answer("CCC", "c", "incorrect")
+        self.db_manager.save_answer("AAA", "x", "incorrect", user_id="other_user")
+
+        self.assertEqual(self.db_manager.get_problem_ids_for_page("init", "PROJ"), ["init_AAA", "init_BBB"])
+        self.assertEqual(self.db_manager.get_problem_ids_for_page("2", "PROJ"), [])
+        self.assertEqual(self.db_manager.get_answers_for_user_on_page("init"),
+                         {"AAA": {"answer": "a", "status": "correct"}})
+        self.assertEqual(self.db_manager.get_answers_for_user_on_page("1", proj_id="OTHER"), {})
+        self.assertEqual(self.db_manager.get_answers_for_user_on_page("init", user_id="other_user"),
+                         {"AAA": {"answer": "x", "status": "incorrect"}})
+
+    def test_initialize_db_migrates_existing_problems_table(self):
+        """Проверяет добавление колонок страницы в старую БД и заполнение их для сохранённых задач."""
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "old.db"
+            old_engine = create_engine(f"sqlite:///{db_path}")
+            with old_engine.begin() as conn:
+                conn.exec_driver_sql(
+                    "CREATE TABLE problems (problem_id VARCHAR PRIMARY KEY, subject VARCHAR, type VARCHAR, "
+                    "text TEXT, options JSON, answer TEXT, solutions JSON, topics JSON, skills JSON, "
+                    "difficulty VARCHAR, source_url VARCHAR, raw_html_path VARCHAR, created_at DATETIME, "
+                    "updated_at DATETIME, metadata JSON)"
+                )
+                conn.exec_driver_sql(
+                    "INSERT INTO problems VALUES ('init_40B442', 'math', 'A', 'Q', NULL, '1', NULL, '[]', NULL, "
+                    "'easy', NULL, NULL, '2024-01-01 00:00:00', NULL, '{\"proj_id\": \"PROJ\"}')"
+                )
+            old_engine.dispose()
+
+            db_manager = DatabaseManager(str(db_path))
+            db_manager.initialize_db()
+            db_manager.initialize_db()  # Повторный запуск ничего не меняет
+            db_manager.save_answer("40B442", "1", "correct")
+
+            self.assertEqual(db_manager.get_problem_ids_for_page("init", "PROJ"), ["init_40B442"])
+            self.assertEqual(db_manager.get_answers_for_user_on_page("init", proj_id="PROJ"),
+                             {"40B442": {"answer": "1", "status": "correct"}})
+            index_names = {index["name"] for index in inspect(db_manager.engine).get_indexes("problems")}
+            self.assertIn("ix_problems_page_name_proj_id", index_names)
+            db_manager.engine.dispose()
+
+    def test_get_answers_and_statuses_in_batches(self):
+        """Проверяет получение ответов для нескольких задач пачками запросов IN."""
+        for idx in range(5):
+            self.db_manager.save_answer(f"task{idx}", f"answer{idx}", "correct")
+        self.db_manager.save_answer("task0", "other", "incorrect", user_id="other_user")
+
+        answers = self.db_manager.get_answers_and_statuses(
+            ["task0", "task3", "missing", "", "task3", "task4"], batch_size=2
+        )
+
+        self.assertEqual(answers, {
+            "task0": {"answer": "answer0", "status": "correct"},
+            "task3": {"answer": "answer3", "status": "correct"},
+            "task4": {"answer": "answer4", "status": "correct"},
+        })
+        self.assertEqual(self.db_manager.get_answers_and_statuses([]), {})
+        self.assertEqual(self.db_manager.get_answers_and_statuses(["task0"], user_id="other_user"),
+                         {"task0": {"answer": "other", "status": "incorrect"}})
+
+    def test_answers_are_per_user_and_cache_is_invalidated_on_save(self):
+        """Проверяет раздельное хранение ответов пользователей и сброс кэша при сохранении."""
+        self.db_manager.save_answer("task1", "a", "correct", user_id="alice")
+        self.assertEqual(self.db_manager.get_answer_and_status("task1", user_id="alice"), ("a", "correct"))
+        self.assertEqual(self.db_manager.get_answer_and_status("task1", user_id="bob"), (None, "not_checked"))
+        self.assertEqual(len(self.db_manager.answer_cache), 2)
+
+        self.db_manager.save_answer("task1", "b", "incorrect", user_id="bob")
+
+        self.assertEqual(self.db_manager.get_answer_and_status("task1", user_id="bob"), ("b", "incorrect"))
+        self.assertEqual(self.db_manager.get_answers_and_statuses(["task1"], user_id="bob"),
+                         {"task1": {"answer": "b", "status": "incorrect"}})
+        self.assertEqual(self.db_manager.get_answer_and_status("task1", user_id="alice"), ("a", "correct"))
+
+    def test_answers_index_leads_on_user_id(self):
+        """Проверяет наличие индекса (user_id, problem_id) в таблице ответов."""
+        indexes = {index["name"]: index["column_names"] for index in inspect(self.db_manager.engine).get_indexes("answers")}
+        self.assertEqual(indexes.get("ix_answers_user_id_problem_id"), ["user_id", "problem_id"])
+
+    def test_iter_problem_fields_filters_and_projects(self):
+        """Проверяет выборку отдельных полей с фильтрами по предмету, теме и сложности."""
+        problems = []
+        for i in range(6):
+            problem = self._make_problem(f"p{i}", f"Q{i}")
+            problems.append(problem.model_copy(update={
+                "subject": "math" if i % 2 else "physics",
+                "topics": ["algebra", "geometry"] if i % 3 == 0 else ["geometry"],
+                "difficulty": "hard" if i >= 3 else "easy",
+            }))
+        self.db_manager.save_problems(problems)
+
+        rows = list(self.db_manager.iter_problem_fields(["problem_id", "text"], batch_size=2))
+        self.assertEqual(rows, [{"problem_id": f"p{i}", "text": f"Q{i}"} for i in range(6)])
+
+        self.assertEqual([r["problem_id"] for r in self.db_manager.iter_problem_fields(["problem_id"], topic="algebra")],
+                         ["p0", "p3"])
+        self.assertEqual([r["problem_id"] for r in self.db_manager.iter_problem_fields(
+            ["problem_id"], subject="math", difficulty="hard")], ["p3", "p5"])
+        self.assertEqual(list(self.db_manager.iter_problem_fields(["problem_id", "metadata"], limit=1)),
+                         [{"problem_id": "p0", "metadata": {"page": "init"}}])
+
+        with self.assertRaises(ValueError):
+            list(self.db_manager.iter_problem_fields(["problem_id", "no_such_field"]))
+
+    def test_iter_problem_fields_can_stop_early(self):
+        """Проверяет, что незавершённый итератор закрывает сессию и не мешает записи."""
+        self.db_manager.save_problems([self._make_problem(f"p{i}", f"Q{i}") for i in range(5)])
+
+        iterator = self.db_manager.iter_problem_fields(["problem_id"], batch_size=1)
+        self.assertEqual(next(iterator), {"problem_id": "p0"})
+        iterator.close()
+
+        self.assertEqual(self.db_manager.save_problems([self._make_problem("p0", "changed")]), (0, 1))
@@ -2,9 +2,12 @@ import os
 import tempfile
 import unittest
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
-from utils.downloader import AssetDownloader
+import httpx
+
+from utils.asset_cache import AssetCache
+from utils.downloader import AssetDownloader, DeferredAssetDownloader
 
 
 class TestAssetDownloader(unittest.TestCase):
@@ -76,6 +79,109 @@ class TestAssetDownloader(unittest.TestCase):
             expected_url = "https://example.com/assets/image.jpg"
             self.page.request.get.assert_called_once_with(expected_url)
 
+    def test_download_reuses_previous_result(self):
+        mock_response = MagicMock()
+        mock_response.ok = True
+        mock_response.body.return_value = b"data"
+        self.page.request.get.return_value = mock_response
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            first = self.downloader.download("images/test.jpg", Path(tmp_dir))
+            second = self.downloader.download("images/test.jpg", Path(tmp_dir))
+
+        self.assertEqual(first, second)
+        self.page.request.get.assert_called_once()
+
+    def test_download_many_sequential_deduplicates(self):
+        mock_response = MagicMock()
+        mock_response.ok = True
+        mock_response.body.return_value = b"data"
+        self.page.request.get.return_value = mock_response
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            save_dir = Path(tmp_dir)
+            results = self.downloader.download_many([
+                ("images/a.jpg", save_dir, "image"),
+                ("images/a.jpg", save_dir, "image"),
+                ("images/b.jpg", save_dir, "image"),
+            ])
+
+            self.assertEqual(self.page.request.get.call_count, 2)
+            self.assertEqual(results[("images/a.jpg", save_dir)], save_dir / "a.jpg")
+            self.assertEqual(results[("images/b.jpg", save_dir)], save_dir / "b.jpg")
+
+    def test_download_many_concurrent(self):
+        requested_urls = []
+
+        def handler(request):
+            requested_urls.append(str(request.url))
+            if request.url.path.endswith("missing.jpg"):
+                return httpx.Response(404)
+            return httpx.Response(200, content=request.url.path.encode())
+
+        downloader = AssetDownloader(self.page, self.base_url, self.files_location_prefix, max_workers=4)
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                patch.object(downloader, "_create_http_client",
+                             return_value=httpx.Client(transport=httpx.MockTransport(handler))):
+            save_dir = Path(tmp_dir)
+            assets = [(f"images/{i % 5}.jpg", save_dir, "image") for i in range(20)]
+            assets.append(("images/missing.jpg", save_dir, "image"))
+            results = downloader.download_many(assets)
+
+            self.assertEqual(len(requested_urls), 6)
+            self.assertEqual(results[("images/3.jpg", save_dir)], save_dir / "3.jpg")
+            self.assertEqual((save_dir / "3.jpg").read_bytes(), b"/images/3.jpg")
+            self.assertIsNone(results[("images/missing.jpg", save_dir)])
+
+            # Later single downloads are served from the batch results
+            self.assertEqual(downloader.download("images/3.jpg", save_dir), save_dir / "3.jpg")
+        self.page.request.get.assert_not_called()
+
+    def test_download_with_cache_revalidates(self):
+        first_response = MagicMock()
+        first_response.ok = True
+        first_response.status = 200
+        first_response.headers = {"etag": '"v1"'}
+        first_response.body.return_value = b"image"
+        not_modified = MagicMock()
+        not_modified.ok = False
+        not_modified.status = 304
+        not_modified.headers = {}
+        self.page.request.get.side_effect = [first_response, not_modified]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = AssetCache(Path(tmp_dir) / "cache")
+            first_run = AssetDownloader(self.page, self.base_url, self.files_location_prefix, cache=cache)
+            second_run = AssetDownloader(self.page, self.base_url, self.files_location_prefix, cache=cache)
+
+            first_path = first_run.download("images/test.jpg", Path(tmp_dir) / "run_1")
+            second_path = second_run.download("images/test.jpg", Path(tmp_dir) / "run_2")
+
+            self.assertEqual(second_path.read_bytes(), b"image")
+            self.assertTrue(os.path.samefile(first_path, second_path))
+            self.page.request.get.assert_called_with(
+                "https://example.com/images/test.jpg", headers={"If-None-Match": '"v1"'}
+            )
+
+
+class TestDeferredAssetDownloader(unittest.TestCase):
+    def test_records_requests_and_returns_planned_paths(self):
+        downloader = DeferredAssetDownloader("https://example.com/bank/questions.php", "../../")
+        save_dir = Path("/run/init/assets")
+
+        path = downloader.download("docs/pic.gif", save_dir, asset_type="image")
+        results = downloader.download_many([
+            ("docs/pic.gif", save_dir, "image"),
+            ("docs/a.pdf", save_dir, "file"),
+        ])
+
+        self.assertEqual(path, save_dir / "pic.gif")
+        self.assertEqual(results[("docs/a.pdf", save_dir)], save_dir / "a.pdf")
+        self.assertEqual(downloader.requests, [
+            ("docs/pic.gif", save_dir, "image"),
+            ("docs/a.pdf", save_dir, "file"),
+        ])
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
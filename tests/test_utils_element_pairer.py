@@ -1,6 +1,8 @@
 # tests/test_utils_element_pairer.py
 
+import io
 import unittest
+from unittest.mock import patch
 from bs4 import BeautifulSoup
 from bs4.element import Tag
 from utils.element_pairer import ElementPairer
@@ -165,5 +167,39 @@ class TestElementPairer(unittest.TestCase):
         self.assertIn("Question 2", second_pair[1].get_text())
 
 
+    def test_pair_mixed_order_with_ids(self):
+        html = """
+        <html>
+        <body>
+            <div class="qblock" id="qA">Question A</div>
+            <div id="iA">Header A</div>
+            <div id="iB">Header B</div>
+            <div class="other">Other content</div>
+            <div class="qblock" id="qB">Question B</div>
+            <div class="qblock" id="qC">Question C</div>
+            <div id="iD">Header D</div>
+        </body>
+        </html>
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        result = self.pairer.pair(soup)
+
+        texts = [(h.get_text(strip=True), q.get_text(strip=True)) for h, q in result]
+        self.assertEqual(texts, [("Header A", "Question A"), ("Header B", "Question B")])
+
+    def test_pair_does_not_print(self):
+        blocks = "".join(
+            f'<div id="i{n}">Header {n}</div><div class="qblock" id="q{n}">Question {n}</div>'
+            for n in range(200)
+        )
+        soup = BeautifulSoup(f"<html><body>{blocks}</body></html>", 'html.parser')
+
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            result = self.pairer.pair(soup)
+
+        self.assertEqual(len(result), 200)
+        self.assertEqual(stdout.getvalue(), "")
+
+
 if __name__ == '__main__':
     unittest.main()
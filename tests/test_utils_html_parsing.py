@@ -0,0 +1,42 @@
+"""
+Unit tests for the HTML parsing helpers.
+"""
+import unittest
+from unittest.mock import patch
+
+from bs4 import BeautifulSoup
+
+from utils.html_parsing import new_tag, parse_html, soup_root
+
+
+class TestHtmlParsing(unittest.TestCase):
+    """Test cases for parse_html, soup_root and new_tag."""
+
+    def test_parse_html_defaults_to_lxml(self):
+        soup = parse_html("<div class='qblock'>Q</div>")
+        self.assertEqual(soup.builder.NAME, "lxml")
+        self.assertEqual(soup.find("div")["class"], ["qblock"])
+
+    def test_parse_html_falls_back_when_parser_missing(self):
+        soup = parse_html("<p>x</p>", "no-such-parser")
+        self.assertEqual(soup.builder.NAME, "html.parser")
+
+    def test_soup_root(self):
+        soup = parse_html("<div><p><b>x</b></p></div>")
+        self.assertIs(soup_root(soup.find("b")), soup)
+        self.assertIs(soup_root(soup), soup)
+        self.assertIsNone(soup_root(soup.find("p").extract().find("b").extract()))
+
+    def test_new_tag_uses_owning_document(self):
+        soup = parse_html("<div><script>x</script></div>")
+        script = soup.find("script")
+        with patch.object(BeautifulSoup, "new_tag", wraps=soup.new_tag) as soup_new_tag:
+            img = new_tag(script, "img", src="a.gif")
+        script.replace_with(img)
+
+        soup_new_tag.assert_called_once()
+        self.assertEqual(str(soup.find("div")), '<div><img src="a.gif"/></div>')
+
+
+if __name__ == "__main__":
+    unittest.main()
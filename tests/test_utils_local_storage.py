@@ -52,7 +52,7 @@ from pathlib import Path
 # import sys
 # from pathlib import Path
 # sys.path.insert(0, str(Path(__file__).parent.parent)) # Добавить корень проекта в путь
-# from utils.local_storage import LocalStorage
+# from utils.local_storage import LOG_HEADER, LocalStorage
 # --- КОНЕЦ КОММЕНТАРИЯ ---
 
 # Ниже приведен вариант с добавлением пути, чтобы тест работал из корня проекта,
@@ -67,7 +67,7 @@ project_root = Path(__file__).resolve().parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-from utils.local_storage import LocalStorage
+from utils.local_storage import LOG_HEADER, LocalStorage
 
 
 class TestLocalStorage(unittest.TestCase):
@@ -146,3 +146,100 @@ class TestLocalStorage(unittest.TestCase):
 
         # Cleanup
         os.unlink(tmp_path)
+
+    def test_answers_are_per_user(self) -> None:
+        """Test that answers of different users to the same task are kept apart."""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False) as tmp:
+            tmp_path = Path(tmp.name)
+
+        storage = LocalStorage(tmp_path)
+        storage.save_answer_and_status("task_users", "default_answer", "correct")
+        storage.save_answer_and_status("task_users", "alice_answer", "incorrect", user_id="alice")
+        storage.update_status("task_users", "correct", user_id="alice")
+
+        self.assertEqual(storage.get_answer_and_status("task_users"), ("default_answer", "correct"))
+        self.assertEqual(storage.get_answer_and_status("task_users", user_id="alice"), ("alice_answer", "correct"))
+        self.assertEqual(storage.get_answer_and_status("task_users", user_id="bob"), (None, "not_checked"))
+        # User IDs with "/" would share keys with tasks of other users
+        with self.assertRaises(ValueError):
+            storage.save_answer_and_status("task_users", "x", user_id="alice/")
+
+        # Cleanup
+        os.unlink(tmp_path)
+
+
+class TestLocalStorageLog(unittest.TestCase):
+    """Test case for the append-only log behind LocalStorage."""
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / "answers.json"
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def _lines(self):
+        return self.path.read_text(encoding='utf-8').splitlines()
+
+    def test_writes_append_to_the_log(self) -> None:
+        """Test that each write appends one line instead of rewriting the file."""
+        storage = LocalStorage(self.path)
+        storage.save_answer_and_status("task1", "ans1")
+        storage.update_status("task1", "correct")
+        storage.save_answer_and_status("task2", "ans2", "incorrect", user_id="alice")
+
+        lines = self._lines()
+        self.assertEqual(json.loads(lines[0]), LOG_HEADER)
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(json.loads(lines[2]), {"k": "task1", "v": {"answer": "ans1", "status": "correct"}})
+
+    def test_log_is_compacted(self) -> None:
+        """Test that overwritten entries are dropped once the log grows."""
+        storage = LocalStorage(self.path, compact_min_records=10, compact_ratio=2.0)
+        for i in range(25):
+            storage.save_answer_and_status("task1", f"ans{i}", "incorrect")
+
+        self.assertLess(len(self._lines()), 12)
+        self.assertEqual(LocalStorage(self.path).get_answer_and_status("task1"), ("ans24", "incorrect"))
+
+    def test_legacy_json_file_is_read_and_converted(self) -> None:
+        """Test that a file in the old whole-JSON format is still readable."""
+        self.path.write_text(json.dumps({"task1": {"answer": "old", "status": "correct"}}, indent=4), encoding='utf-8')
+
+        storage = LocalStorage(self.path)
+        self.assertEqual(storage.get_answer_and_status("task1"), ("old", "correct"))
+        storage.save_answer_and_status("task2", "new")
+
+        self.assertEqual(json.loads(self._lines()[0]), LOG_HEADER)
+        reopened = LocalStorage(self.path)
+        self.assertEqual(reopened.get_answer_and_status("task1"), ("old", "correct"))
+        self.assertEqual(reopened.get_answer_and_status("task2"), ("new", "not_checked"))
+
+    def test_instances_see_each_others_writes(self) -> None:
+        """Test that instances sharing a file (e.g. API workers) do not lose updates."""
+        first = LocalStorage(self.path, compact_min_records=5)
+        second = LocalStorage(self.path, compact_min_records=5)
+
+        first.save_answer_and_status("task1", "ans1")
+        second.update_status("task1", "correct")
+        for i in range(10):
+            # Compaction by one instance replaces the file under the other
+            (first if i % 2 else second).save_answer_and_status(f"task{i + 2}", "x")
+
+        self.assertEqual(first.get_answer_and_status("task1"), ("ans1", "correct"))
+        self.assertEqual(second.get_answer_and_status("task11"), ("x", "not_checked"))
+        self.assertEqual(len(first._load_data()), 11)
+
+    def test_partial_last_line_is_ignored(self) -> None:
+        """Test that a line cut short by a crash does not break reading."""
+        storage = LocalStorage(self.path)
+        storage.save_answer_and_status("task1", "ans1", "correct")
+        with self.path.open('a', encoding='utf-8') as f:
+            f.write('{"k": "task2", "v": {"ans')
+
+        self.assertEqual(LocalStorage(self.path).get_answer_and_status("task1"), ("ans1", "correct"))
+        self.assertEqual(LocalStorage(self.path).get_answer_and_status("task2"), (None, "not_checked"))
+
+        # The next write replaces the damaged tail
+        storage.save_answer_and_status("task3", "ans3")
+        self.assertEqual(LocalStorage(self.path).get_answer_and_status("task3"), ("ans3", "not_checked"))
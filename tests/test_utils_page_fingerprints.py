@@ -0,0 +1,71 @@
+"""
+Unit tests for the PageFingerprintStore class and compute_fingerprint.
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils.page_fingerprints import PageFingerprintStore, compute_fingerprint
+
+PAGE = """
+<html><body>
+  <div class="qblock" id="q111">Task 1</div>
+  <div id="i111">Header</div>
+  <div class="qblock" id="q222">Task 2</div>
+  <span>Generated at 12:00</span>
+</body></html>
+"""
+
+
+class TestComputeFingerprint(unittest.TestCase):
+    """Test cases for compute_fingerprint."""
+
+    def test_qblock_ids_ignore_unrelated_markup(self):
+        other = PAGE.replace("12:00", "13:00").replace("Task 1", "Task one")
+        self.assertEqual(compute_fingerprint(PAGE), compute_fingerprint(other))
+
+    def test_qblock_ids_detect_new_task(self):
+        other = PAGE.replace("</body>", '<div class="qblock" id="q333">Task 3</div></body>')
+        self.assertNotEqual(compute_fingerprint(PAGE), compute_fingerprint(other))
+
+    def test_html_mode_ignores_whitespace_only(self):
+        self.assertEqual(compute_fingerprint(PAGE, "html"), compute_fingerprint(PAGE.replace("\n", "\n   "), "html"))
+        self.assertNotEqual(compute_fingerprint(PAGE, "html"), compute_fingerprint(PAGE.replace("12:00", "13:00"), "html"))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            compute_fingerprint(PAGE, "dom")
+
+
+class TestPageFingerprintStore(unittest.TestCase):
+    """Test cases for the PageFingerprintStore class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_unknown_page_is_changed(self):
+        store = PageFingerprintStore(self.root)
+        self.assertFalse(store.is_unchanged("PROJ", "init", store.fingerprint(PAGE)))
+
+    def test_update_persists_between_instances(self):
+        store = PageFingerprintStore(self.root)
+        fingerprint = store.fingerprint(PAGE)
+        store.update("PROJ", "init", fingerprint, "run_1")
+
+        reopened = PageFingerprintStore(self.root)
+        self.assertTrue(reopened.is_unchanged("PROJ", "init", fingerprint))
+        self.assertFalse(reopened.is_unchanged("OTHER", "init", fingerprint))
+        self.assertEqual(reopened.get("PROJ", "init")["run"], "run_1")
+
+    def test_corrupt_file_starts_fresh(self):
+        (self.root / "PROJ.json").write_text("{not json", encoding="utf-8")
+        store = PageFingerprintStore(self.root)
+        self.assertIsNone(store.get("PROJ", "init"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ import tempfile
 import unittest
 from datetime import datetime
 from pathlib import Path
+from unittest.mock import patch
 
 from models.problem_schema import Problem
 from utils.problem_storage import ProblemStorage
@@ -123,3 +124,71 @@ class TestProblemStorage(unittest.TestCase):
 
         loaded_problems = self.storage.load_all_problems()
         self.assertEqual(loaded_problems, [])
+
+
+class TestProblemStorageIndex(unittest.TestCase):
+    """Тесты индекса смещений и потокового чтения ProblemStorage."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.storage_path = Path(self.tmp_dir.name) / "problems.jsonl"
+        self.storage = ProblemStorage(self.storage_path)
+
+    def tearDown(self):
+        self.storage.close()
+        self.tmp_dir.cleanup()
+
+    def _make_problem(self, problem_id: str, text: str = "Q") -> Problem:
+        """Создаёт задачу со всеми обязательными полями."""
+        return Problem(
+            problem_id=problem_id, subject="math", type="A", text=text, answer="1",
+            topics=["algebra"], difficulty="easy", created_at=datetime(2024, 1, 1),
+            task_number=1, exam_part="Part 1", max_score=1, difficulty_level="basic",
+        )
+
+    def test_lookup_uses_saved_index(self):
+        """Тест: задача читается по индексу, а индекс сохраняется рядом с файлом."""
+        problems = [self._make_problem(f"p{i}", f"Текст {i}") for i in range(50)]
+        self.storage.save_problems(problems)
+
+        self.assertEqual(self.storage.get_problem_by_id("p37"), problems[37])
+        self.assertIsNone(self.storage.get_problem_by_id("missing"))
+        self.assertTrue(self.storage.index_path.exists())
+
+        reopened = ProblemStorage(self.storage_path)
+        with patch.object(reopened, "_update_index", wraps=reopened._update_index) as update:
+            self.assertEqual(reopened.get_problem_by_id("p0"), problems[0])
+        update.assert_not_called()
+        reopened.close()
+
+    def test_appended_problems_are_indexed_incrementally(self):
+        """Тест: после дописывания индексируются только новые строки."""
+        self.storage.save_problems([self._make_problem("p1"), self._make_problem("p2")])
+        self.assertIn("p1", self.storage)
+        indexed_size = self.storage_path.stat().st_size
+
+        self.storage.save_problem(self._make_problem("p3", "new"))
+        self.assertEqual(self.storage.get_problem_by_id("p3").text, "new")
+        self.assertEqual(self.storage._offsets["p1"][0], 0)
+        self.assertEqual(self.storage._offsets["p3"][0], indexed_size)
+
+    def test_rewritten_file_rebuilds_index(self):
+        """Тест: перезаписанный файл индексируется заново."""
+        self.storage.save_problems([self._make_problem("old")])
+        self.assertIn("old", self.storage)
+
+        self.storage_path.unlink()
+        ProblemStorage(self.storage_path).save_problems([self._make_problem("new1"), self._make_problem("new2")])
+
+        self.assertNotIn("old", self.storage)
+        self.assertEqual(self.storage.get_problem_by_id("new2").problem_id, "new2")
+
+    def test_iter_problems_streams(self):
+        """Тест: iter_problems возвращает задачи по одной."""
+        problems = [self._make_problem(f"p{i}") for i in range(3)]
+        self.storage.save_problems(problems)
+
+        iterator = self.storage.iter_problems()
+        self.assertEqual(next(iterator), problems[0])
+        self.assertEqual(list(iterator), problems[1:])
+        self.assertEqual(list(ProblemStorage(Path(self.tmp_dir.name) / "none.jsonl").iter_problems()), [])
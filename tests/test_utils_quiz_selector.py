@@ -0,0 +1,94 @@
+"""
+Unit tests for the QuizSelector class.
+"""
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from models.problem_schema import Problem
+from utils.database_manager import DatabaseManager
+from utils.quiz_selector import QuizSelector
+
+
+def make_problem(problem_id: str, subject: str = "math", topics=("algebra",), difficulty: str = "easy") -> Problem:
+    """Builds a problem with all required fields; its FIPI task ID is the part after the page prefix."""
+    return Problem(
+        problem_id=problem_id, subject=subject, type="A", text=f"Text {problem_id}", answer="1",
+        topics=list(topics), difficulty=difficulty, created_at=datetime(2024, 1, 1),
+        task_number=1, exam_part="Part 1", max_score=1, difficulty_level="basic",
+        page_name="init", task_id=problem_id.split("_", 1)[-1],
+    )
+
+
+class TestQuizSelector(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(os.path.join(self.tmp_dir, "quiz.db"))
+        self.db_manager.initialize_db()
+        self.db_manager.save_problems(
+            [make_problem(f"init_M{i}", difficulty="hard" if i % 2 else "easy") for i in range(10)]
+            + [make_problem(f"init_P{i}", subject="physics", topics=("optics",)) for i in range(5)]
+        )
+        self.selector = QuizSelector(self.db_manager, rng=random.Random(0))
+
+    def tearDown(self):
+        self.db_manager.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_select_filters_by_subject_topic_and_difficulty(self):
+        selected = self.selector.select("student", count=10, subject="math", difficulty="hard")
+        self.assertEqual(sorted(selected), [f"init_M{i}" for i in (1, 3, 5, 7, 9)])
+
+        self.assertEqual(len(self.selector.select("student", count=3, topic="optics")), 3)
+        self.assertEqual(len(set(self.selector.select("student", count=15))), 15)
+        self.assertEqual(self.selector.select("student", subject="history"), [])
+
+    def test_unanswered_problems_come_first(self):
+        for i in range(8):
+            self.db_manager.save_answer(f"M{i}", "1", "correct", user_id="student")
+
+        selected = self.selector.select("student", count=3, subject="math")
+
+        self.assertEqual(len(selected), 3)
+        self.assertIn("init_M8", selected)
+        self.assertIn("init_M9", selected)
+        # Other users are not affected by this user's answers
+        self.assertEqual(len(self.selector.select("other", count=10, subject="math")), 10)
+
+    def test_saved_problems_update_loaded_pools(self):
+        self.selector.warm_up()
+
+        with patch.object(self.db_manager, "iter_problem_fields") as iter_fields:
+            self.db_manager.save_problems([
+                make_problem("init_C1", subject="chemistry"),
+                make_problem("init_M0", subject="physics", topics=("optics",)),
+            ])
+            self.assertEqual(self.selector.select("student", subject="chemistry"), ["init_C1"])
+            self.assertNotIn("init_M0", self.selector.select("student", count=20, subject="math"))
+            self.assertIn("init_M0", self.selector.select("student", count=20, topic="optics"))
+        iter_fields.assert_not_called()
+
+    def test_subsets_are_cached_only_for_known_values(self):
+        self.selector.warm_up()
+        pool = self.selector._pools["math"]
+
+        for i in range(100):
+            self.assertEqual(self.selector.select("student", subject="math", topic=f"topic{i}"), [])
+            self.assertEqual(self.selector.select("student", subject="math", difficulty=f"level{i}"), [])
+        self.assertEqual(pool._subsets, {})
+
+        self.selector.select("student", subject="math", topic="algebra", difficulty="hard")
+        self.assertEqual(list(pool._subsets), [("algebra", "hard")])
+
+        # A difficulty no problem has any more is not cached either
+        self.db_manager.save_problems([make_problem(f"init_M{i}", difficulty="easy") for i in (1, 3, 5, 7, 9)])
+        self.assertEqual(self.selector.select("student", subject="math", difficulty="hard"), [])
+        self.assertEqual(pool._subsets, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
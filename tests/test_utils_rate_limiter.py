@@ -0,0 +1,58 @@
+"""
+Unit tests for the HostRateLimiter class.
+"""
+import unittest
+
+from utils.rate_limiter import HostRateLimiter
+
+
+class FakeClock:
+    """A controllable clock whose sleep advances the time."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestHostRateLimiter(unittest.TestCase):
+    """Test cases for HostRateLimiter."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = HostRateLimiter(min_interval=2.0, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_first_request_is_not_delayed(self):
+        self.assertEqual(self.limiter.wait("https://ege.fipi.ru/bank/questions.php?page=1"), 0.0)
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_requests_to_same_host_are_spaced(self):
+        self.limiter.wait("https://ege.fipi.ru/bank/questions.php?page=1")
+        delay = self.limiter.wait("https://ege.fipi.ru/bank/questions.php?page=2")
+        self.assertEqual(delay, 2.0)
+        self.assertEqual(self.clock.sleeps, [2.0])
+
+    def test_different_hosts_are_independent(self):
+        self.limiter.wait("https://ege.fipi.ru/bank/")
+        self.assertEqual(self.limiter.wait("https://oge.fipi.ru/bank/"), 0.0)
+
+    def test_elapsed_time_counts_towards_interval(self):
+        self.limiter.wait("https://ege.fipi.ru/a")
+        self.clock.now += 1.5
+        self.assertAlmostEqual(self.limiter.wait("https://ege.fipi.ru/b"), 0.5)
+
+    def test_zero_interval_disables_throttling(self):
+        limiter = HostRateLimiter(min_interval=0, clock=self.clock, sleep=self.clock.sleep)
+        for _ in range(3):
+            self.assertEqual(limiter.wait("https://ege.fipi.ru/"), 0.0)
+        self.assertEqual(self.clock.sleeps, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,9 +6,8 @@ from unittest.mock import MagicMock, patch
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qdrant_models
 
-from models.problem_schema import Problem
 from utils.database_manager import DatabaseManager
-from utils.vector_indexer import QdrantProblemIndexer
+from utils.vector_indexer import PAYLOAD_FIELDS, QdrantProblemIndexer
 
 
 class TestQdrantProblemIndexer(unittest.TestCase):
@@ -43,40 +42,38 @@ class TestQdrantProblemIndexer(unittest.TestCase):
         Test the index_problems method successfully fetches problems,
         generates embeddings, and calls Qdrant upsert with correct data.
         """
-        # Arrange: Define test problems
-        test_problem_1 = Problem(
-            problem_id="test_001",
-            subject="mathematics",
-            type="A",
-            text="Solve for x: x + 2 = 5.",
-            answer="3",
-            topics=["algebra.equations"],
-            difficulty="easy",
-            created_at=self.mock_db_manager.get_all_problems.return_value[0].created_at if self.mock_db_manager.get_all_problems.return_value else None # Placeholder for datetime
-        )
-        test_problem_2 = Problem(
-            problem_id="test_002",
-            subject="physics",
-            type="B",
-            text="What is the speed of light?",
-            answer="300000000 m/s",
-            topics=["physics.constants"],
-            difficulty="medium",
-            created_at=self.mock_db_manager.get_all_problems.return_value[0].created_at if self.mock_db_manager.get_all_problems.return_value else None # Placeholder for datetime
-        )
+        # Arrange: Define test problems (the fields the indexer streams from the database)
+        test_problem_1 = {
+            "problem_id": "test_001",
+            "subject": "mathematics",
+            "topics": ["algebra.equations"],
+            "type": "A",
+            "difficulty": "easy",
+            "source_url": None,
+            "text": "Solve for x: x + 2 = 5.",
+        }
+        test_problem_2 = {
+            "problem_id": "test_002",
+            "subject": "physics",
+            "topics": ["physics.constants"],
+            "type": "B",
+            "difficulty": "medium",
+            "source_url": None,
+            "text": "What is the speed of light?",
+        }
         test_problems = [test_problem_1, test_problem_2]
 
-        # Configure the mock to return the test problems
-        self.mock_db_manager.get_all_problems.return_value = test_problems
+        # Configure the mock to stream the test problems
+        self.mock_db_manager.iter_problem_fields.return_value = iter(test_problems)
 
         # Act: Call the index_problems method
         self.indexer.index_problems(self.mock_embedding_model)
 
-        # Assert: Check that the DB manager was called to get problems
-        self.mock_db_manager.get_all_problems.assert_called_once()
+        # Assert: Check that the DB manager was asked only for the indexed fields
+        self.mock_db_manager.iter_problem_fields.assert_called_once_with(PAYLOAD_FIELDS, batch_size=256)
 
         # Assert: Check that the embedding model was called for each problem's text
-        expected_encode_calls = [unittest.mock.call(test_problem_1.text), unittest.mock.call(test_problem_2.text)]
+        expected_encode_calls = [unittest.mock.call(test_problem_1["text"]), unittest.mock.call(test_problem_2["text"])]
         self.mock_embedding_model.encode.assert_has_calls(expected_encode_calls, any_order=True)
 
         # Assert: Check that Qdrant client upsert was called
@@ -90,7 +87,7 @@ class TestQdrantProblemIndexer(unittest.TestCase):
 
         # Assert details for each point
         upserted_point_ids = {point.id for point in upserted_points}
-        expected_ids = {test_problem_1.problem_id, test_problem_2.problem_id}
+        expected_ids = {test_problem_1["problem_id"], test_problem_2["problem_id"]}
         self.assertEqual(upserted_point_ids, expected_ids)
 
         # Find the point for test_001 to check its details
@@ -103,7 +100,7 @@ class TestQdrantProblemIndexer(unittest.TestCase):
             "topics": ["algebra.equations"],
             "type": "A",
             "difficulty": "easy",
-            "source_url": None, # Default value from the Problem instance
+            "source_url": None,
             "text": "Solve for x: x + 2 = 5.",
         }
         # Use assertDictEqual to check payload contents, ignoring potentially non-serializable fields like datetime if they exist in the payload
@@ -120,12 +117,27 @@ class TestQdrantProblemIndexer(unittest.TestCase):
             "topics": ["physics.constants"],
             "type": "B",
             "difficulty": "medium",
-            "source_url": None, # Default value from the Problem instance
+            "source_url": None,
             "text": "What is the speed of light?",
         }
         for key, value in expected_payload_002.items():
              self.assertEqual(point_002.payload.get(key), value)
 
+    def test_index_problems_upserts_in_batches(self):
+        """
+        Test that problems are upserted to Qdrant in batches of batch_size.
+        """
+        problems = [
+            {field: None for field in PAYLOAD_FIELDS} | {"problem_id": f"p{i}", "text": f"Text {i}"}
+            for i in range(5)
+        ]
+        self.mock_db_manager.iter_problem_fields.return_value = iter(problems)
+
+        self.indexer.index_problems(self.mock_embedding_model, batch_size=2)
+
+        batch_sizes = [len(call.kwargs["points"]) for call in self.mock_qdrant_client.upsert.call_args_list]
+        self.assertEqual(batch_sizes, [2, 2, 1])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,30 +1,180 @@
 """Модуль для проверки ответов пользователя на задания FIPI через API."""
 
+import asyncio
 import logging # NEW: Import logging
 import json
-from typing import Dict, Any
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
 
 import httpx
 
 
 logger = logging.getLogger(__name__) # NEW: Create module logger
 
+CheckKey = Tuple[str, str, str]
+"""Ключ проверки: (task_id, form_id, нормализованный ответ)."""
+
+CACHEABLE_STATUSES = ("correct", "incorrect")
+"""Статусы, которые можно переиспользовать для других пользователей; ошибки не кэшируются."""
+
+
+def normalize_answer(user_answer: str) -> str:
+    """Приводит ответ к виду, по которому совпадающие ответы проверяются один раз.
+
+    Убираются пробелы по краям, а последовательности пробельных символов внутри
+    заменяются одним пробелом. Регистр и знаки не меняются: неизвестно, как их
+    сравнивает FIPI.
+
+    Args:
+        user_answer (str): Ответ, введённый пользователем.
+
+    Returns:
+        str: Нормализованный ответ.
+    """
+    return " ".join(user_answer.split())
+
 class FIPIAnswerChecker:
     """Класс для отправки пользовательских ответов на задания FIPI и получения результата проверки.
 
+    Все проверки идут через один долгоживущий `httpx.AsyncClient` с пулом
+    соединений (и HTTP/2, если сервер его поддерживает), поэтому TCP- и
+    TLS-рукопожатие выполняется один раз, а не на каждый ответ. Клиент
+    закрывается методом `aclose()` при остановке приложения.
+
+    Одинаковые проверки `(task_id, form_id, нормализованный ответ)`, выполняемые
+    одновременно, разделяют один запрос к FIPI, а вердикты 'correct'/'incorrect'
+    хранятся в общем для всех пользователей кэше с ограниченным сроком жизни.
+
     Attributes:
         base_url (str): Базовый URL сайта FIPI (например, 'https://fipi.ru  ').
     """
 
-    def __init__(self, base_url: str) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 10.0,
+        http2: bool = True,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        verdict_cache_ttl: float = 600.0,
+        verdict_cache_size: int = 10000,
+    ) -> None:
         """Инициализирует экземпляр FIPIAnswerChecker.
 
         Args:
             base_url (str): Базовый URL сайта FIPI.
+            timeout (float): Таймаут запроса проверки, в секундах.
+            http2 (bool): Использовать HTTP/2, если сервер его поддерживает.
+            max_connections (int): Максимальное число одновременных соединений с сервером.
+            max_keepalive_connections (int): Сколько простаивающих соединений держать открытыми.
+            keepalive_expiry (float): Через сколько секунд простоя закрывать соединение.
+            verdict_cache_ttl (float): Сколько секунд хранить вердикт FIPI (0 отключает кэш).
+            verdict_cache_size (int): Максимальное число вердиктов в кэше; при переполнении
+                                      вытесняются давно не использованные.
         """
         self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.verdict_cache_ttl = max(0.0, verdict_cache_ttl)
+        self.verdict_cache_size = max(0, verdict_cache_size)
+        self._verdicts: "OrderedDict[CheckKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._in_flight: Dict[CheckKey, asyncio.Task] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Возвращает общий HTTP-клиент, создавая его при первом обращении.
+
+        Соединения пула привязаны к циклу событий, в котором были открыты,
+        поэтому в новом цикле (перезапуск сервера, тесты) создаётся новый клиент.
+
+        Returns:
+            httpx.AsyncClient: Клиент для запросов проверки.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            logger.debug(f"Creating pooled HTTP client for {self.base_url} (http2={self.http2}).")
+            self._client = httpx.AsyncClient(timeout=self.timeout, http2=self.http2, limits=self.limits)
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """Закрывает общий HTTP-клиент и его соединения."""
+        client, self._client, self._client_loop = self._client, None, None
+        if client is not None and not client.is_closed:
+            logger.debug("Closing pooled HTTP client of the answer checker.")
+            await client.aclose()
+
+    def _get_cached_verdict(self, key: CheckKey) -> Optional[Dict[str, Any]]:
+        """Возвращает копию действующего вердикта из кэша или None."""
+        entry = self._verdicts.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._verdicts[key]
+            return None
+        self._verdicts.move_to_end(key)
+        return dict(result)
+
+    def _cache_verdict(self, key: CheckKey, result: Dict[str, Any]) -> None:
+        """Сохраняет вердикт в кэш, если он окончательный и кэш включён."""
+        if not self.verdict_cache_ttl or not self.verdict_cache_size:
+            return
+        if result.get("status") not in CACHEABLE_STATUSES:
+            return
+        self._verdicts[key] = (time.monotonic() + self.verdict_cache_ttl, dict(result))
+        self._verdicts.move_to_end(key)
+        while len(self._verdicts) > self.verdict_cache_size:
+            self._verdicts.popitem(last=False)
 
     async def check_answer(self, task_id: str, form_id: str, user_answer: str) -> Dict[str, Any]:
+        """Проверяет ответ, переиспользуя вердикты и одновременные запросы с тем же ответом.
+
+        Если тот же ответ на то же задание недавно проверялся, вердикт берётся из кэша.
+        Если он проверяется прямо сейчас, вызов дожидается уже отправленного запроса
+        вместо отправки ещё одного.
+
+        Args:
+            task_id (str): Идентификатор задания (например, '40B442').
+            form_id (str): Идентификатор формы (например, 'checkform40B442').
+            user_answer (str): Ответ, введённый пользователем.
+
+        Returns:
+            Dict[str, Any]: Результат проверки, как у `_check_upstream`.
+        """
+        key: CheckKey = (task_id, form_id, normalize_answer(user_answer))
+        cached = self._get_cached_verdict(key)
+        if cached is not None:
+            logger.info(f"Answer for task {task_id} served from verdict cache: {cached['status']}.")
+            return cached
+
+        task = self._in_flight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            # Отдельная задача: отмена запроса первого пользователя не прерывает проверку для остальных
+            task = asyncio.ensure_future(self._check_upstream(task_id, form_id, user_answer))
+            self._in_flight[key] = task
+
+            def _on_done(done: asyncio.Task, key: CheckKey = key) -> None:
+                if self._in_flight.get(key) is done:
+                    del self._in_flight[key]
+                if not done.cancelled() and done.exception() is None:
+                    self._cache_verdict(key, done.result())
+
+            task.add_done_callback(_on_done)
+        else:
+            logger.info(f"Answer for task {task_id} joins an in-flight check.")
+        result = await asyncio.shield(task)
+        return dict(result)
+
+    async def _check_upstream(self, task_id: str, form_id: str, user_answer: str) -> Dict[str, Any]:
         """Отправляет пользовательский ответ на задание FIPI и возвращает результат проверки.
 
         This method logs the attempt, request details, response, and outcome.
@@ -55,52 +205,52 @@ class FIPIAnswerChecker:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                logger.debug(f"Sending POST request to {url} with data keys: {list(data.keys())} and headers: {list(headers.keys())}") # MODIFIED: Log request details safely
-                response = await client.post(url, data=data, headers=headers)
-                response.raise_for_status()
-                raw_text = response.text
-                logger.debug(f"Received raw response: {raw_text[:200]}...") # NEW: Log raw response snippet
-
-                # Пробуем распарсить JSON, как выяснили, сайт возвращает JSON
-                try:
-                    json_data = response.json()
-                    logger.debug(f"Parsed JSON response: {json_data}") # NEW: Log parsed JSON
-                    server_status = json_data.get("status")
-                    server_message = json_data.get("message", raw_text)
-                except (json.JSONDecodeError, AttributeError):
-                    # Fallback: анализ текста, если JSON не удался
-                    if "correct" in raw_text.lower() or "верно" in raw_text.lower():
-                        server_status = "correct"
-                        server_message = "Верно"
-                    elif "incorrect" in raw_text.lower() or "неверно" in raw_text.lower():
-                        server_status = "incorrect"
-                        server_message = "Неверно"
-                    else:
-                        server_status = None
-                        server_message = raw_text
-
-                if server_status == "correct":
-                    logger.info(f"Answer for task {task_id} is CORRECT.") # NEW: Log correct result
-                    return {
-                        "status": "correct",
-                        "message": server_message,
-                        "raw_response": raw_text,
-                    }
-                elif server_status == "incorrect":
-                    logger.info(f"Answer for task {task_id} is INCORRECT.") # NEW: Log incorrect result
-                    return {
-                        "status": "incorrect",
-                        "message": server_message,
-                        "raw_response": raw_text,
-                    }
+            client = self._get_client()
+            logger.debug(f"Sending POST request to {url} with data keys: {list(data.keys())} and headers: {list(headers.keys())}") # MODIFIED: Log request details safely
+            response = await client.post(url, data=data, headers=headers)
+            response.raise_for_status()
+            raw_text = response.text
+            logger.debug(f"Received raw response: {raw_text[:200]}...") # NEW: Log raw response snippet
+
+            # Пробуем распарсить JSON, как выяснили, сайт возвращает JSON
+            try:
+                json_data = response.json()
+                logger.debug(f"Parsed JSON response: {json_data}") # NEW: Log parsed JSON
+                server_status = json_data.get("status")
+                server_message = json_data.get("message", raw_text)
+            except (json.JSONDecodeError, AttributeError):
+                # Fallback: анализ текста, если JSON не удался
+                if "correct" in raw_text.lower() or "верно" in raw_text.lower():
+                    server_status = "correct"
+                    server_message = "Верно"
+                elif "incorrect" in raw_text.lower() or "неверно" in raw_text.lower():
+                    server_status = "incorrect"
+                    server_message = "Неверно"
                 else:
-                    logger.warning(f"Could not determine status for task {task_id}. Raw response: {raw_text[:100]}...") # NEW: Log undetermined status
-                    return {
-                        "status": "error",
-                        "message": "Не удалось определить статус ответа.",
-                        "raw_response": raw_text,
-                    }
+                    server_status = None
+                    server_message = raw_text
+
+            if server_status == "correct":
+                logger.info(f"Answer for task {task_id} is CORRECT.") # NEW: Log correct result
+                return {
+                    "status": "correct",
+                    "message": server_message,
+                    "raw_response": raw_text,
+                }
+            elif server_status == "incorrect":
+                logger.info(f"Answer for task {task_id} is INCORRECT.") # NEW: Log incorrect result
+                return {
+                    "status": "incorrect",
+                    "message": server_message,
+                    "raw_response": raw_text,
+                }
+            else:
+                logger.warning(f"Could not determine status for task {task_id}. Raw response: {raw_text[:100]}...") # NEW: Log undetermined status
+                return {
+                    "status": "error",
+                    "message": "Не удалось определить статус ответа.",
+                    "raw_response": raw_text,
+                }
 
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error {e.response.status_code} while checking answer for task {task_id}: {e}", exc_info=True) # MODIFIED: Use logger
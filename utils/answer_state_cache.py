@@ -0,0 +1,138 @@
+"""
+Module for caching recently used answer states in memory.
+
+This module provides the `AnswerStateCache` class, a bounded, thread-safe LRU
+cache of `(user_id, task_id) -> (user_answer, status)` entries used by
+`DatabaseManager` so that repeated lookups of the same students' answers
+(page reloads, resubmissions) are served without a database query.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+AnswerState = Tuple[Optional[str], str]
+"""An answer and its status; (None, "not_checked") when the user has not answered."""
+
+
+class AnswerStateCache:
+    """
+    A bounded LRU cache of per-user answer states.
+
+    Absent answers are cached too, so a task the user has not answered yet does
+    not cost a query on every lookup. Entries must be invalidated whenever the
+    answer is written (see `DatabaseManager.save_answer`). Readers take a
+    `version()` before querying the database and pass it to `put`, so a value
+    read before a concurrent invalidation is not cached.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Initializes the AnswerStateCache.
+
+        Args:
+            max_entries (int, optional): Maximum number of cached (user, task) entries;
+                                         the least recently used are evicted first. 0 disables caching.
+        """
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[Tuple[str, str], AnswerState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+
+    def get(self, user_id: str, task_id: str) -> Optional[AnswerState]:
+        """
+        Returns the cached state of a task for a user.
+
+        Args:
+            user_id (str): The user ID.
+            task_id (str): The task ID.
+
+        Returns:
+            Optional[AnswerState]: The cached state, or None on a cache miss.
+        """
+        key = (user_id, task_id)
+        with self._lock:
+            state = self._entries.get(key)
+            if state is not None:
+                self._entries.move_to_end(key)
+            return state
+
+    def get_many(self, user_id: str, task_ids: Iterable[str]) -> Tuple[Dict[str, AnswerState], List[str]]:
+        """
+        Returns the cached states of several tasks for a user.
+
+        Args:
+            user_id (str): The user ID.
+            task_ids (Iterable[str]): The task IDs.
+
+        Returns:
+            Tuple[Dict[str, AnswerState], List[str]]: The cached states and the task IDs that were not cached.
+        """
+        found: Dict[str, AnswerState] = {}
+        missing: List[str] = []
+        with self._lock:
+            for task_id in task_ids:
+                key = (user_id, task_id)
+                state = self._entries.get(key)
+                if state is None:
+                    missing.append(task_id)
+                else:
+                    self._entries.move_to_end(key)
+                    found[task_id] = state
+        return found, missing
+
+    def version(self) -> int:
+        """
+        Returns the current invalidation counter, to be passed to `put`.
+
+        Returns:
+            int: A value that changes on every invalidation.
+        """
+        with self._lock:
+            return self._version
+
+    def put(self, user_id: str, task_id: str, state: AnswerState, version: Optional[int] = None) -> None:
+        """
+        Caches the state of a task for a user, evicting the least recently used entries if needed.
+
+        Args:
+            user_id (str): The user ID.
+            task_id (str): The task ID.
+            state (AnswerState): The answer and its status.
+            version (Optional[int]): `version()` taken before the state was read; the state is
+                                     not cached if an invalidation happened since.
+        """
+        if not self.max_entries:
+            return
+        key = (user_id, task_id)
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+            self._entries[key] = state
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str, task_id: str) -> None:
+        """
+        Drops the cached state of a task for a user.
+
+        Args:
+            user_id (str): The user ID.
+            task_id (str): The task ID.
+        """
+        with self._lock:
+            self._version += 1
+            self._entries.pop((user_id, task_id), None)
+
+    def clear(self) -> None:
+        """Drops all cached states."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
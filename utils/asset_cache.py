@@ -0,0 +1,208 @@
+"""
+Module for a content-addressed asset cache shared by all scraping runs.
+
+This module provides the `AssetCache` class which stores downloaded images and
+files once, under the SHA-256 of their content, and remembers for every asset
+URL which blob it last resolved to together with its HTTP validators (ETag,
+Last-Modified). `AssetDownloader` uses it to send conditional requests and to
+hard-link unchanged assets into a run folder instead of downloading them again.
+
+Layout under the cache root::
+
+    blobs/<sha256[:2]>/<sha256>       asset contents
+    index/<sha1(url)[:2]>/<sha1(url)>.json  {"url", "sha256", "size", "etag", "last_modified", "checked_at"}
+
+All writes go through a temporary file and an atomic rename, so several
+threads or processes can share one cache directory.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AssetCache:
+    """
+    A class to store downloaded assets by content hash and look them up by URL.
+
+    Attributes:
+        root (Path): The cache directory.
+        max_age (float): Seconds after a successful check during which a cached asset
+                         is reused without contacting the server at all. 0 always revalidates.
+    """
+
+    def __init__(self, root: Path, max_age: float = 0.0):
+        """
+        Initializes the AssetCache.
+
+        Args:
+            root (Path): The cache directory. Created if it does not exist.
+            max_age (float, optional): Seconds during which a checked asset is trusted without
+                                       a conditional request. Defaults to 0 (always revalidate).
+        """
+        self.root = Path(root)
+        self.max_age = max(0.0, max_age)
+        self._blobs_dir = self.root / "blobs"
+        self._index_dir = self.root / "index"
+        self._blobs_dir.mkdir(parents=True, exist_ok=True)
+        self._index_dir.mkdir(parents=True, exist_ok=True)
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the index entry of a URL if its blob is still present.
+
+        Args:
+            url (str): The absolute asset URL.
+
+        Returns:
+            Optional[Dict[str, Any]]: The index entry, or None if the URL is not cached.
+        """
+        index_path = self._index_path(url)
+        try:
+            entry = json.loads(index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url or not self.blob_path(entry.get("sha256", "")).is_file():
+            return None
+        return entry
+
+    def is_fresh(self, entry: Mapping[str, Any]) -> bool:
+        """
+        Tells whether an entry was checked recently enough to skip revalidation.
+
+        Args:
+            entry (Mapping[str, Any]): An index entry returned by `lookup`.
+
+        Returns:
+            bool: True if the entry was checked less than `max_age` seconds ago.
+        """
+        return self.max_age > 0 and time.time() - entry.get("checked_at", 0) < self.max_age
+
+    def conditional_headers(self, entry: Optional[Mapping[str, Any]]) -> Dict[str, str]:
+        """
+        Builds the conditional request headers for a cached entry.
+
+        Args:
+            entry (Optional[Mapping[str, Any]]): An index entry returned by `lookup`, or None.
+
+        Returns:
+            Dict[str, str]: "If-None-Match" and/or "If-Modified-Since" headers; empty if there is nothing to validate.
+        """
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, body: bytes, headers: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+        """
+        Stores downloaded content and records it as the current version of the URL.
+
+        Identical content downloaded from several URLs is stored once.
+
+        Args:
+            url (str): The absolute asset URL.
+            body (bytes): The asset contents.
+            headers (Optional[Mapping[str, str]]): Response headers; ETag and Last-Modified are kept.
+
+        Returns:
+            Dict[str, Any]: The new index entry.
+        """
+        sha256 = hashlib.sha256(body).hexdigest()
+        blob_path = self.blob_path(sha256)
+        if not blob_path.is_file():
+            self._atomic_write(blob_path, body)
+            logger.debug(f"Stored new blob {sha256} for {url}")
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        entry = {
+            "url": url,
+            "sha256": sha256,
+            "size": len(body),
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "checked_at": time.time(),
+        }
+        self._write_entry(url, entry)
+        return entry
+
+    def mark_checked(self, url: str, entry: Dict[str, Any], headers: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+        """
+        Records that the server confirmed a cached entry is unchanged (HTTP 304).
+
+        Args:
+            url (str): The absolute asset URL.
+            entry (Dict[str, Any]): The entry that was revalidated.
+            headers (Optional[Mapping[str, str]]): Response headers; updated validators are kept.
+
+        Returns:
+            Dict[str, Any]: The updated index entry.
+        """
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        entry = dict(entry)
+        entry["etag"] = headers.get("etag") or entry.get("etag")
+        entry["last_modified"] = headers.get("last-modified") or entry.get("last_modified")
+        entry["checked_at"] = time.time()
+        self._write_entry(url, entry)
+        return entry
+
+    def materialize(self, entry: Mapping[str, Any], dest: Path) -> Path:
+        """
+        Places a cached blob at `dest`, hard-linking it when possible and copying otherwise.
+
+        Args:
+            entry (Mapping[str, Any]): An index entry returned by `lookup` or `store`.
+            dest (Path): The target file path (e.g., inside a run folder).
+
+        Returns:
+            Path: `dest`.
+        """
+        blob_path = self.blob_path(entry["sha256"])
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest.exists() or dest.is_symlink():
+            if dest.is_file() and os.path.samefile(dest, blob_path):
+                return dest
+            dest.unlink()
+        try:
+            os.link(blob_path, dest)
+        except OSError:
+            # Different filesystem or no hard-link support
+            shutil.copyfile(blob_path, dest)
+        return dest
+
+    def blob_path(self, sha256: str) -> Path:
+        """Returns the path of the blob with the given content hash."""
+        return self._blobs_dir / sha256[:2] / sha256
+
+    def _index_path(self, url: str) -> Path:
+        """Returns the path of the index entry of a URL."""
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self._index_dir / key[:2] / f"{key}.json"
+
+    def _write_entry(self, url: str, entry: Dict[str, Any]) -> None:
+        """Atomically writes the index entry of a URL."""
+        self._atomic_write(self._index_path(url), json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes) -> None:
+        """Writes `data` to a temporary file next to `path` and renames it into place."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
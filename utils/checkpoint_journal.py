@@ -0,0 +1,171 @@
+"""
+Module for recording the progress of a scraping run so it can be resumed.
+
+This module provides the `CheckpointJournal` class which appends one JSON line
+per event to `checkpoint.jsonl` in a run folder: a header describing the run
+(subject and project ID), then one line for every page that completed (with
+its output paths) or failed. Every line is flushed and fsynced before the
+call returns, so the journal survives crashes and kills; a torn last line is
+ignored on reading and ended before the next line is appended.
+"""
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILENAME = "checkpoint.jsonl"
+
+
+class CheckpointJournal:
+    """
+    A class to record which pages of a run completed or failed.
+
+    The journal state is the replay of all its lines: a page is completed once a
+    "page_done" line exists for it, and failed if its latest line is "page_failed".
+    """
+
+    def __init__(self, run_folder: Path):
+        """
+        Initializes the CheckpointJournal and loads any existing entries.
+
+        Args:
+            run_folder (Path): The run output folder holding `checkpoint.jsonl`.
+        """
+        self.run_folder = Path(run_folder)
+        self.path = self.run_folder / JOURNAL_FILENAME
+        self.run_info: Dict[str, Any] = {}
+        self._completed: Dict[str, Dict[str, Any]] = {}
+        self._failed: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # Set when the file ends in a line torn by a crash: the next append starts a new line
+        self._torn_tail = False
+        self._load()
+
+    @classmethod
+    def find_latest(cls, subject_folder: Path) -> Optional[Path]:
+        """
+        Finds the most recent run folder of a subject that has a checkpoint journal.
+
+        Args:
+            subject_folder (Path): The folder holding the subject's `run_<timestamp>` folders.
+
+        Returns:
+            Optional[Path]: The newest run folder with a journal, or None.
+        """
+        if not subject_folder.is_dir():
+            return None
+        runs = sorted(
+            (p for p in subject_folder.glob("run_*") if (p / JOURNAL_FILENAME).is_file()),
+            key=lambda p: p.name
+        )
+        return runs[-1] if runs else None
+
+    def start(self, proj_id: str, subject_name: str, page_list: List[str]) -> None:
+        """
+        Writes the run header, unless the journal already has one (resumed run).
+
+        Args:
+            proj_id (str): The project ID of the subject.
+            subject_name (str): The subject name.
+            page_list (List[str]): All pages of the run.
+        """
+        if self.run_info:
+            self._append({"event": "resume"})
+            return
+        self.run_info = {"proj_id": proj_id, "subject": subject_name, "pages": list(page_list)}
+        self._append({"event": "run", **self.run_info})
+
+    def record_done(self, page_name: str, outputs: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Records that a page was processed and all its outputs were saved.
+
+        Args:
+            page_name (str): The page name.
+            outputs (Optional[Dict[str, Any]]): Output paths (relative to the run folder) and other details.
+        """
+        entry = {"event": "page_done", "page": page_name, "outputs": outputs or {}}
+        with self._lock:
+            self._completed[page_name] = entry
+            self._failed.pop(page_name, None)
+        self._append(entry)
+
+    def record_failed(self, page_name: str, error: Any, attempt: int = 1) -> None:
+        """
+        Records that processing a page failed.
+
+        Args:
+            page_name (str): The page name.
+            error (Any): The error or its description.
+            attempt (int, optional): The attempt number in this run. Defaults to 1.
+        """
+        entry = {"event": "page_failed", "page": page_name, "error": str(error), "attempt": attempt}
+        with self._lock:
+            if page_name not in self._completed:
+                self._failed[page_name] = entry
+        self._append(entry)
+
+    def completed_pages(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the "page_done" entries by page name."""
+        with self._lock:
+            return dict(self._completed)
+
+    def failed_pages(self) -> List[str]:
+        """Returns pages whose latest attempt failed, in the order they first failed."""
+        with self._lock:
+            return list(self._failed)
+
+    def pending_pages(self, page_list: List[str]) -> List[str]:
+        """
+        Returns the pages of `page_list` that have not completed yet, keeping their order.
+
+        Args:
+            page_list (List[str]): All pages of the run.
+
+        Returns:
+            List[str]: Pages never attempted or whose latest attempt failed.
+        """
+        with self._lock:
+            return [page for page in page_list if page not in self._completed]
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        """Appends one timestamped line and forces it to disk."""
+        line = json.dumps({**entry, "at": datetime.now().isoformat(timespec="seconds")}, ensure_ascii=False)
+        with self._lock:
+            self.run_folder.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as journal_file:
+                if self._torn_tail:
+                    line = "\n" + line
+                    self._torn_tail = False
+                journal_file.write(line + "\n")
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+
+    def _load(self) -> None:
+        """Replays an existing journal file."""
+        if not self.path.is_file():
+            return
+        with open(self.path, "r", encoding="utf-8") as journal_file:
+            for line_number, line in enumerate(journal_file, 1):
+                # Only the last line can lack its newline
+                self._torn_tail = not line.endswith("\n")
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Ignoring unreadable line {line_number} in {self.path}")
+                    continue
+                event = entry.get("event")
+                if event == "run":
+                    self.run_info = {k: entry.get(k) for k in ("proj_id", "subject", "pages")}
+                elif event == "page_done":
+                    self._completed[entry["page"]] = entry
+                    self._failed.pop(entry["page"], None)
+                elif event == "page_failed" and entry["page"] not in self._completed:
+                    self._failed[entry["page"]] = entry
+        logger.info(
+            f"Loaded checkpoint journal {self.path}: {len(self._completed)} completed, {len(self._failed)} failed pages."
+        )
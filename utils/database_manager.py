@@ -6,16 +6,61 @@
 import datetime
 import logging
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict, Any
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple, Dict, Any
 
 import sqlalchemy as sa
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker
 
 from models.database_models import Base, DBProblem, DBAnswer
 from models.problem_schema import Problem
+from utils.answer_state_cache import AnswerStateCache
 
 logger = logging.getLogger(__name__)
 
+PROBLEM_FIELD_COLUMNS: Dict[str, Any] = {
+    column.key if column.key != "metadata_" else "metadata": column
+    for column in DBProblem.__mapper__.column_attrs
+}
+"""Поля модели Problem и соответствующие им колонки таблицы problems (для выборки отдельных полей)."""
+
+
+class SQLiteProfile(NamedTuple):
+    """
+    Параметры подключения к SQLite, применяемые к каждому новому соединению.
+
+    По умолчанию включён WAL: читатели (поток API) не блокируются пишущим
+    потоком скрапера, а `synchronous=NORMAL` в режиме WAL сохраняет целостность
+    БД при меньшем числе fsync.
+
+    Attributes:
+        journal_mode (str): Режим журнала (`PRAGMA journal_mode`), например "WAL" или "DELETE".
+        synchronous (str): Уровень синхронизации (`PRAGMA synchronous`): "OFF", "NORMAL", "FULL".
+        busy_timeout_ms (int): Сколько ждать освобождения блокировки, в миллисекундах.
+        mmap_size (int): Размер отображаемой в память части файла БД, в байтах (0 отключает mmap).
+        cache_size_kib (int): Размер кэша страниц на соединение, в КиБ.
+        pool_size (int): Количество постоянно открытых соединений в пуле.
+        max_overflow (int): Сколько соединений сверх `pool_size` может быть открыто при пиковой нагрузке.
+    """
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    busy_timeout_ms: int = 5000
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size_kib: int = 64 * 1024
+    pool_size: int = 5
+    max_overflow: int = 10
+
+    def pragmas(self) -> List[str]:
+        """Возвращает PRAGMA-команды профиля в порядке применения."""
+        return [
+            f"PRAGMA journal_mode={self.journal_mode}",
+            f"PRAGMA synchronous={self.synchronous}",
+            f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}",
+            f"PRAGMA mmap_size={int(self.mmap_size)}",
+            # Отрицательное значение задаёт размер в КиБ, а не в страницах
+            f"PRAGMA cache_size={-int(self.cache_size_kib)}",
+        ]
+
 
 class DatabaseManager:
     """
@@ -25,66 +70,184 @@ class DatabaseManager:
     сохранение задач и ответов, получение задач и статусов ответов.
     """
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, profile: Optional[SQLiteProfile] = None, answer_cache_size: int = 4096):
         """Инициализирует менеджер с указанным путём к файлу SQLite.
 
+        Соединения берутся из пула (`QueuePool`) и могут использоваться из разных
+        потоков: скрапер пишет, а сервер API параллельно читает.
+
         Args:
             db_path (str): Путь к файлу базы данных SQLite.
+            profile (Optional[SQLiteProfile]): Параметры подключения. По умолчанию `SQLiteProfile()`.
+            answer_cache_size (int): Сколько последних состояний ответов (пользователь, задача)
+                                     держать в памяти. 0 отключает кэш.
         """
         self.db_path = db_path
-        self.engine = sa.create_engine(f"sqlite:///{db_path}", echo=False)
+        self.profile = profile or SQLiteProfile()
+        self.engine = sa.create_engine(
+            f"sqlite:///{db_path}",
+            echo=False,
+            poolclass=sa.pool.QueuePool,
+            pool_size=self.profile.pool_size,
+            max_overflow=self.profile.max_overflow,
+            connect_args={
+                "check_same_thread": False,
+                "timeout": self.profile.busy_timeout_ms / 1000,
+            },
+        )
+        sa.event.listen(self.engine, "connect", self._apply_profile)
         self.SessionLocal = sessionmaker(bind=self.engine)
-        logger.debug(f"DatabaseManager initialized with path: {db_path}")
+        self.answer_cache = AnswerStateCache(answer_cache_size)
+        self._problems_saved_listeners: List[Callable[[List[Problem]], None]] = []
+        logger.debug(f"DatabaseManager initialized with path: {db_path}, profile: {self.profile}")
+
+    def add_problems_saved_listener(self, listener: Callable[[List[Problem]], None]) -> None:
+        """Регистрирует функцию, вызываемую со списком задач после каждого успешного `save_problems`.
+
+        Так кэши, построенные по таблице задач (например, пулы `QuizSelector`),
+        обновляются сразу после записи. Исключения слушателя записываются в лог
+        и не влияют на сохранение.
+
+        Args:
+            listener (Callable[[List[Problem]], None]): Функция, принимающая сохранённые задачи.
+        """
+        self._problems_saved_listeners.append(listener)
+
+    def _apply_profile(self, dbapi_connection, connection_record) -> None:
+        """Применяет PRAGMA-команды профиля к новому соединению (обработчик события `connect`)."""
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in self.profile.pragmas():
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
 
     def initialize_db(self) -> None:
         """Создаёт таблицы в базе данных, если они ещё не существуют."""
         logger.info("Initializing database tables...")
         try:
             Base.metadata.create_all(self.engine)
+            self._migrate_problems_table()
+            self._create_missing_indexes()
             logger.info("Database tables initialized (or verified to exist).")
         except Exception as e:
             logger.error(f"Error initializing database: {e}", exc_info=True)
             raise
 
-    def save_problems(self, problems: List[Problem]) -> None:
-        """Сохраняет список задач в базу данных.
+    # Колонки, добавленные в таблицу problems после первой версии схемы
+    _PROBLEM_PAGE_COLUMNS = ("proj_id", "page_name", "task_id")
+
+    def _migrate_problems_table(self) -> None:
+        """Добавляет в существующую таблицу problems колонки страницы.
 
-        Если задача с таким `problem_id` уже существует, она будет заменена.
+        Значения для уже сохранённых задач восстанавливаются из `metadata.proj_id`
+        и из `problem_id` вида `<page_name>_<task_id>`.
+        """
+        table = DBProblem.__table__
+        existing_columns = {column["name"] for column in sa.inspect(self.engine).get_columns(table.name)}
+        missing_columns = [name for name in self._PROBLEM_PAGE_COLUMNS if name not in existing_columns]
+        with self.engine.begin() as conn:
+            for name in missing_columns:
+                logger.info(f"Migrating table '{table.name}': adding column '{name}'.")
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {name} VARCHAR")
+            if missing_columns:
+                conn.exec_driver_sql(
+                    f"UPDATE {table.name} SET proj_id = json_extract(metadata, '$.proj_id') "
+                    f"WHERE proj_id IS NULL AND json_valid(metadata)"
+                )
+                conn.exec_driver_sql(
+                    f"UPDATE {table.name} SET "
+                    f"page_name = substr(problem_id, 1, instr(problem_id, '_') - 1), "
+                    f"task_id = substr(problem_id, instr(problem_id, '_') + 1) "
+                    f"WHERE page_name IS NULL AND instr(problem_id, '_') > 0"
+                )
+
+    def _create_missing_indexes(self) -> None:
+        """Создаёт индексы, объявленные в моделях, которых нет в существующей БД."""
+        with self.engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(conn, checkfirst=True)
+
+    def save_problems(self, problems: List[Problem], batch_size: int = 500) -> Tuple[int, int]:
+        """Сохраняет список задач в базу данных пакетным UPSERT.
+
+        Если задача с таким `problem_id` уже существует, все её поля будут заменены.
+        Задачи записываются пачками по `batch_size` строк одним
+        `INSERT ... ON CONFLICT(problem_id) DO UPDATE` (executemany) вместо
+        `session.merge` с SELECT по первичному ключу для каждой строки.
 
         Args:
             problems (List[Problem]): Список Pydantic-моделей задач.
+            batch_size (int): Количество строк в одной пачке.
+
+        Returns:
+            Tuple[int, int]: Количество вставленных и обновлённых задач.
         """
         logger.info(f"Saving {len(problems)} problems to database...")
+        inserted = updated = 0
+        table = DBProblem.__table__
         try:
-            with self.SessionLocal() as session:
-                for prob in problems:
-                    # Преобразуем Pydantic -> ORM
-                    db_problem = DBProblem(
-                        problem_id=prob.problem_id,
-                        subject=prob.subject,
-                        type=prob.type,
-                        text=prob.text,
-                        options=prob.options,
-                        answer=prob.answer,
-                        solutions=prob.solutions,
-                        topics=prob.topics,
-                        skills=prob.skills,
-                        difficulty=prob.difficulty,
-                        source_url=prob.source_url,
-                        raw_html_path=prob.raw_html_path,
-                        created_at=prob.created_at,
-                        updated_at=prob.updated_at,
-                        metadata_=prob.metadata,
-                    )
-                    logger.debug(f"Converted problem {prob.problem_id} for saving.")
-                    # Замена при конфликте (MERGE-like поведение)
-                    session.merge(db_problem)
-                    logger.debug(f"Added problem {db_problem.problem_id} to session.")
-                session.commit()
-            logger.info(f"Successfully saved {len(problems)} problems to database.")
+            with self.engine.begin() as conn:
+                for start in range(0, len(problems), max(1, batch_size)):
+                    rows = [self._problem_to_row(prob) for prob in problems[start:start + batch_size]]
+                    batch_ids = {row["problem_id"] for row in rows}
+                    existing = set(conn.execute(
+                        sa.select(table.c.problem_id).where(table.c.problem_id.in_(batch_ids))
+                    ).scalars())
+                    for row in rows:
+                        # Повтор в той же пачке тоже обновляет строку
+                        if row["problem_id"] in existing:
+                            updated += 1
+                        else:
+                            inserted += 1
+                            existing.add(row["problem_id"])
+                    conn.execute(self._problem_upsert_statement(), rows)
+                    logger.debug(f"Upserted batch of {len(rows)} problems.")
+            logger.info(f"Successfully saved {len(problems)} problems to database ({inserted} inserted, {updated} updated).")
         except Exception as e:
             logger.error(f"Error saving problems to database: {e}", exc_info=True)
             raise
+        for listener in self._problems_saved_listeners:
+            try:
+                listener(problems)
+            except Exception as e:
+                logger.error(f"Problems-saved listener {listener} failed: {e}", exc_info=True)
+        return inserted, updated
+
+    @staticmethod
+    def _problem_to_row(prob: Problem) -> Dict[str, Any]:
+        """Преобразует Pydantic-модель задачи в строку таблицы `problems`."""
+        return {
+            "problem_id": prob.problem_id,
+            "subject": prob.subject,
+            "type": prob.type,
+            "text": prob.text,
+            "options": prob.options,
+            "answer": prob.answer,
+            "solutions": prob.solutions,
+            "topics": prob.topics,
+            "skills": prob.skills,
+            "difficulty": prob.difficulty,
+            "source_url": prob.source_url,
+            "raw_html_path": prob.raw_html_path,
+            "created_at": prob.created_at,
+            "updated_at": prob.updated_at,
+            "metadata": prob.metadata,
+            "proj_id": prob.proj_id,
+            "page_name": prob.page_name,
+            "task_id": prob.task_id,
+        }
+
+    @staticmethod
+    def _problem_upsert_statement():
+        """Строит `INSERT ... ON CONFLICT(problem_id) DO UPDATE`, заменяющий все поля задачи."""
+        table = DBProblem.__table__
+        stmt = sqlite_insert(table)
+        return stmt.on_conflict_do_update(
+            index_elements=[table.c.problem_id],
+            set_={column.name: stmt.excluded[column.name] for column in table.c if not column.primary_key},
+        )
 
     def save_answer(
         self,
@@ -114,6 +277,7 @@ class DatabaseManager:
                 session.merge(db_answer)  # Обновляет, если уже существует
                 logger.debug(f"Merged/added answer for task {task_id} to session.")
                 session.commit()
+            self.answer_cache.invalidate(user_id, task_id)
             logger.info(f"Successfully saved answer for task {task_id}.")
         except Exception as e:
             logger.error(f"Error saving answer for task {task_id} to database: {e}", exc_info=True)
@@ -133,7 +297,12 @@ class DatabaseManager:
                 Если запись не найдена, возвращает (None, "not_checked").
         """
         logger.debug(f"Fetching answer and status for task {task_id}, user {user_id}.")
+        cached = self.answer_cache.get(user_id, task_id)
+        if cached is not None:
+            logger.debug(f"Answer state for task {task_id}, user {user_id} served from cache.")
+            return cached
         try:
+            cache_version = self.answer_cache.version()
             with self.SessionLocal() as session:
                 logger.debug(f"Querying database for task {task_id}, user {user_id}.")
                 db_answer = (
@@ -143,22 +312,102 @@ class DatabaseManager:
                 )
                 if db_answer:
                     logger.debug(f"Found answer and status ({db_answer.status}) for task {task_id}.")
-                    return db_answer.user_answer, db_answer.status
-                logger.debug(f"Answer not found for task {task_id}, user {user_id}. Returning default status 'not_checked'.")
-                return None, "not_checked"
+                    state = (db_answer.user_answer, db_answer.status)
+                else:
+                    logger.debug(f"Answer not found for task {task_id}, user {user_id}. Returning default status 'not_checked'.")
+                    state = (None, "not_checked")
+            self.answer_cache.put(user_id, task_id, state, version=cache_version)
+            return state
         except Exception as e:
             logger.error(f"Error fetching answer for task {task_id}, user {user_id}: {e}", exc_info=True)
             raise
 
+    def get_answers_and_statuses(
+        self, task_ids: Iterable[str], user_id: str = "default_user", batch_size: int = 500
+    ) -> Dict[str, Dict[str, str]]:
+        """Получает ответы и статусы сразу для нескольких задач.
+
+        Задачи, состояние которых есть в кэше ответов, в БД не запрашиваются;
+        для остальных вместо отдельной сессии и запроса на каждую задачу выполняется
+        один запрос `WHERE problem_id IN (...)` на каждые `batch_size` идентификаторов
+        (ограничение SQLite на число параметров запроса).
+
+        Args:
+            task_ids (Iterable[str]): Идентификаторы задач. Пустые и повторяющиеся пропускаются.
+            user_id (str): Идентификатор пользователя.
+            batch_size (int): Количество идентификаторов в одном запросе.
+
+        Returns:
+            Dict[str, Dict[str, str]]: Словарь task_id -> {"answer": ..., "status": ...}
+                                       только для задач, на которые есть ответ.
+        """
+        unique_ids = list(dict.fromkeys(task_id for task_id in task_ids if task_id))
+        logger.debug(f"Fetching answers and statuses for {len(unique_ids)} tasks, user {user_id}.")
+        cached, missing_ids = self.answer_cache.get_many(user_id, unique_ids)
+        answers: Dict[str, Dict[str, str]] = {
+            task_id: {"answer": user_answer, "status": status}
+            for task_id, (user_answer, status) in cached.items()
+            if user_answer is not None
+        }
+        if not missing_ids:
+            return answers
+        try:
+            cache_version = self.answer_cache.version()
+            with self.SessionLocal() as session:
+                for start in range(0, len(missing_ids), max(1, batch_size)):
+                    rows = (
+                        session.query(DBAnswer.problem_id, DBAnswer.user_answer, DBAnswer.status)
+                        .filter(DBAnswer.user_id == user_id,
+                                DBAnswer.problem_id.in_(missing_ids[start:start + batch_size]))
+                    )
+                    for task_id, user_answer, status in rows:
+                        answers[task_id] = {"answer": user_answer, "status": status}
+            for task_id in missing_ids:
+                state = answers.get(task_id)
+                self.answer_cache.put(user_id, task_id,
+                                      (state["answer"], state["status"]) if state else (None, "not_checked"),
+                                      version=cache_version)
+            logger.debug(f"Found answers for {len(answers)} of {len(unique_ids)} tasks, user {user_id}.")
+            return answers
+        except Exception as e:
+            logger.error(f"Error fetching answers for {len(unique_ids)} tasks, user {user_id}: {e}", exc_info=True)
+            raise
+
+    def get_answered_task_ids(self, user_id: str = "default_user") -> Set[str]:
+        """Возвращает идентификаторы задач, на которые пользователь уже отвечал.
+
+        Запрос покрывается индексом `ix_answers_user_id_problem_id` и не зависит
+        от числа ответов других пользователей.
+
+        Args:
+            user_id (str): Идентификатор пользователя.
+
+        Returns:
+            Set[str]: Идентификаторы задач FIPI (task_id) из таблицы ответов.
+        """
+        try:
+            with self.SessionLocal() as session:
+                rows = session.query(DBAnswer.problem_id).filter(DBAnswer.user_id == user_id)
+                return {task_id for (task_id,) in rows}
+        except Exception as e:
+            logger.error(f"Error fetching answered tasks for user {user_id}: {e}", exc_info=True)
+            raise
+
     # NEW: Method to get all answers for a specific user and page prefix
     def get_answers_for_user_on_page(
-        self, page_name: str, user_id: str = "default_user"
+        self, page_name: str, user_id: str = "default_user", proj_id: Optional[str] = None
     ) -> Dict[str, Dict[str, str]]:
         """Получает все ответы и статусы для задач на конкретной странице для конкретного пользователя.
 
+        Выполняется одним JOIN-запросом: задачи страницы выбираются по индексу
+        (page_name, proj_id), ответы к ним — по первичному ключу (problem_id, user_id),
+        так что время ответа зависит от размера страницы, а не от истории пользователя.
+
         Args:
             page_name (str): Имя страницы (например, 'init', '1', '2').
             user_id (str): Идентификатор пользователя.
+            proj_id (Optional[str]): Идентификатор проекта (subject). Если не указан,
+                                     учитываются страницы всех проектов в БД.
 
         Returns:
             Dict[str, Dict[str, str]]: Словарь, где ключ - problem_id (task_id),
@@ -168,70 +417,25 @@ class DatabaseManager:
         logger.debug(f"Fetching answers for user '{user_id}' on page '{page_name}'.")
         try:
             with self.SessionLocal() as session:
-                # Query answers for the specific user
-                query = session.query(DBAnswer).filter_by(user_id=user_id)
-                all_user_answers = query.all()
-
-                # Filter answers based on the page name.
-                # Since problem_id is the task_id (e.g., '40B442'), we need to determine
-                # if this task_id belongs to the given page_name.
-                # This requires fetching the corresponding DBProblem records or having
-                # a way to map task_id to page_name.
-                # For now, let's assume we need to filter based on a convention
-                # where task_id might contain the page name as a prefix or is somehow
-                # determinable from the context provided by the page rendering process.
-                # However, since task_id itself (like '40B442') does not inherently
-                # contain the page name (like 'init'), this is a complex lookup.
-                # A better approach might be to pass the list of task_ids expected
-                # for the page from the renderer and filter against that.
-
-                # For this implementation, we'll assume that the page_name is used
-                # to determine the set of task_ids that belong to it elsewhere,
-                # and this function fetches answers for *any* task_id for the user.
-                # The filtering by page context must happen in the caller (e.g., in the API).
-                # However, if we *could* filter by page_name here, it would require
-                # a join with the problems table or a different schema design.
-                # As per the current schema, problem_id in answers table is just task_id.
-                # We will return all answers for the user, and the API caller
-                # is responsible for further filtering or association with page content.
-                # This is suboptimal but reflects the current schema limitations for
-                # direct page -> problem_id mapping.
-
-                # A potential future improvement would be to add a 'page_name' column
-                # to the DBProblem table, allowing a join here.
-                # For now, this method fetches all answers for the user.
-                # The caller (e.g., get_initial_state_for_page in answer_api.py)
-                # should manage the association with the page's specific task IDs.
-
-                # This implementation returns ALL user answers.
-                # The API endpoint must handle the page-specific filtering.
-                # If we had a way to link task_id to page_name (e.g., by fetching
-                # all problems for a page first), we could do the filtering here.
-                # Let's assume the caller provides the list of relevant task_ids.
-
-                # Alternative approach: Fetch all answers for the user
-                all_answers = {}
-                for db_answer in all_user_answers:
-                    # This does not filter by page_name directly.
-                    # The page-specific logic must be handled by the caller.
-                    # For now, we return all answers for the user.
-                    all_answers[db_answer.problem_id] = {
-                        "answer": db_answer.user_answer,
-                        "status": db_answer.status
-                    }
-                logger.debug(f"Fetched {len(all_answers)} answers for user '{user_id}'.")
+                query = (
+                    session.query(DBAnswer.problem_id, DBAnswer.user_answer, DBAnswer.status)
+                    # Ответы хранятся по task_id, который отображается на странице
+                    .join(DBProblem, DBProblem.task_id == DBAnswer.problem_id)
+                    .filter(DBProblem.page_name == page_name, DBAnswer.user_id == user_id)
+                )
+                if proj_id is not None:
+                    query = query.filter(DBProblem.proj_id == proj_id)
+                all_answers = {
+                    task_id: {"answer": user_answer, "status": status}
+                    for task_id, user_answer, status in query
+                }
+                logger.debug(f"Fetched {len(all_answers)} answers for user '{user_id}' on page '{page_name}'.")
                 return all_answers
 
         except Exception as e:
             logger.error(f"Error fetching answers for user '{user_id}' on page '{page_name}': {e}", exc_info=True)
             raise
 
-    # NEW: Method to get all problems for a specific page (example placeholder)
-    # This would be needed by the API to know which task_ids belong to a page.
-    # It requires the DBProblem table to have a field indicating the page or source URL.
-    # Since the current schema for DBProblem doesn't explicitly store the page name,
-    # we might need to infer it from the source_url or another field, or add a field.
-    # For now, this is a conceptual placeholder if source_url contains page info.
     def get_problem_ids_for_page(self, page_name: str, proj_id: str) -> List[str]:
         """Получает список problem_id (task_id), принадлежащих конкретной странице.
 
@@ -242,45 +446,22 @@ class DatabaseManager:
         Returns:
             List[str]: Список problem_id (task_id) для задач на странице.
         """
-        # This is a conceptual example assuming source_url contains page information.
-        # In practice, DBProblem might need a 'page_name' field for direct lookup.
-        # For now, let's assume source_url contains the page identifier.
         logger.debug(f"Fetching problem IDs for page '{page_name}' in project '{proj_id}'.")
         try:
             with self.SessionLocal() as session:
-                # Example query assuming source_url contains '?page=init' or similar
-                # This is highly dependent on the actual URL structure stored in DBProblem.source_url
-                # A more robust approach would be adding a 'page_name' column to DBProblem.
-                # For example, if source_url is like ".../questions.php?proj=ID&page=init"
-                # We could filter like this:
-                # search_url_pattern = f"%page={page_name}%" # Be careful with SQL LIKE wildcards
-                # problems = session.query(DBProblem).filter(
-                #     DBProblem.source_url.like(search_url_pattern),
-                #     DBProblem.source_url.like(f"%proj={proj_id}%") # Ensure correct project
-                # ).all()
-                # task_ids = [p.problem_id for p in problems]
-
-                # Since source_url might not be reliable for page identification,
-                # and DBProblem lacks a 'page_name' field, we cannot reliably implement this
-                # without schema changes or other metadata.
-
-                # A common approach would be to add a 'page_name' or 'source_page' field to DBProblem.
-                # Example schema change needed:
-                # class DBProblem(Base):
-                #     ...
-                #     source_page: str = sa.Column(sa.String, nullable=False) # e.g., 'init', '1', etc.
-
-                # For now, this method cannot be reliably implemented with the current schema
-                # unless there's a way to determine the page from existing fields like source_url.
-                # We will return an empty list, indicating this needs further work.
-                logger.warning("get_problem_ids_for_page requires a 'page_name' field in DBProblem or reliable source_url parsing.")
-                return [] # Placeholder - needs implementation based on schema or URL parsing
+                rows = (
+                    session.query(DBProblem.problem_id)
+                    .filter(DBProblem.page_name == page_name, DBProblem.proj_id == proj_id)
+                    .order_by(DBProblem.problem_id)
+                )
+                problem_ids = [problem_id for (problem_id,) in rows]
+                logger.debug(f"Found {len(problem_ids)} problems on page '{page_name}' in project '{proj_id}'.")
+                return problem_ids
 
         except Exception as e:
             logger.error(f"Error fetching problem IDs for page '{page_name}' in project '{proj_id}': {e}", exc_info=True)
             raise
 
-
     def get_problem_by_id(self, problem_id: str) -> Optional[Problem]:
         """Получает задачу по её идентификатору.
 
@@ -297,62 +478,161 @@ class DatabaseManager:
                 db_problem = session.query(DBProblem).filter_by(problem_id=problem_id).first()
                 if db_problem:
                     logger.debug(f"Found problem {problem_id} in database, converting to Problem schema.")
-                    return Problem(
-                        problem_id=db_problem.problem_id,
-                        subject=db_problem.subject,
-                        type=db_problem.type,
-                        text=db_problem.text,
-                        options=db_problem.options,
-                        answer=db_problem.answer,
-                        solutions=db_problem.solutions,
-                        topics=db_problem.topics,
-                        skills=db_problem.skills,
-                        difficulty=db_problem.difficulty,
-                        source_url=db_problem.source_url,
-                        raw_html_path=db_problem.raw_html_path,
-                        created_at=db_problem.created_at,
-                        updated_at=db_problem.updated_at,
-                        metadata=db_problem.metadata_,
-                    )
+                    return self._db_problem_to_schema(db_problem)
                 logger.debug(f"Problem {problem_id} not found in database.")
                 return None
         except Exception as e:
             logger.error(f"Error fetching problem {problem_id}: {e}", exc_info=True)
             raise
 
+    @staticmethod
+    def _db_problem_to_schema(p: DBProblem) -> Problem:
+        """Преобразует строку таблицы problems в Pydantic-модель задачи."""
+        return Problem(
+            problem_id=p.problem_id,
+            subject=p.subject,
+            type=p.type,
+            text=p.text,
+            options=p.options,
+            answer=p.answer,
+            solutions=p.solutions,
+            topics=p.topics,
+            skills=p.skills,
+            difficulty=p.difficulty,
+            source_url=p.source_url,
+            raw_html_path=p.raw_html_path,
+            created_at=p.created_at,
+            updated_at=p.updated_at,
+            metadata=p.metadata_,
+            proj_id=p.proj_id,
+            page_name=p.page_name,
+            task_id=p.task_id,
+        )
+
+    @staticmethod
+    def _problem_filters(
+        subject: Optional[str], topic: Optional[str], difficulty: Optional[str],
+        problem_ids: Optional[Sequence[str]] = None,
+    ) -> List[Any]:
+        """Возвращает условия WHERE для выборки задач по предмету, теме, сложности и идентификаторам."""
+        conditions: List[Any] = []
+        if problem_ids is not None:
+            conditions.append(DBProblem.problem_id.in_(list(problem_ids)))
+        if subject is not None:
+            conditions.append(DBProblem.subject == subject)
+        if difficulty is not None:
+            conditions.append(DBProblem.difficulty == difficulty)
+        if topic is not None:
+            # topics хранится как JSON-массив
+            conditions.append(
+                sa.exists(
+                    sa.select(sa.literal(1))
+                    .select_from(sa.func.json_each(DBProblem.topics).table_valued("value"))
+                    .where(sa.column("value") == topic)
+                )
+            )
+        return conditions
+
+    def iter_problems(
+        self,
+        subject: Optional[str] = None,
+        topic: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        batch_size: int = 500,
+    ) -> Iterator[Problem]:
+        """Последовательно возвращает задачи, не загружая их все в память.
+
+        Строки читаются из курсора пачками по `batch_size` (`yield_per`), и в памяти
+        одновременно находится только одна пачка. Сессия открыта, пока итератор
+        не исчерпан или не закрыт.
+
+        Args:
+            subject (Optional[str]): Только задачи этого предмета.
+            topic (Optional[str]): Только задачи, в списке тем которых есть эта тема.
+            difficulty (Optional[str]): Только задачи этой сложности.
+            batch_size (int): Количество строк, загружаемых из курсора за раз.
+
+        Yields:
+            Problem: Задачи в порядке problem_id.
+        """
+        logger.debug(f"Streaming problems (subject={subject}, topic={topic}, difficulty={difficulty}).")
+        try:
+            with self.SessionLocal() as session:
+                stmt = (
+                    sa.select(DBProblem)
+                    .where(*self._problem_filters(subject, topic, difficulty))
+                    .order_by(DBProblem.problem_id)
+                    .execution_options(yield_per=max(1, batch_size))
+                )
+                for db_problem in session.scalars(stmt):
+                    yield self._db_problem_to_schema(db_problem)
+                    # Прочитанные строки больше не нужны сессии
+                    session.expunge(db_problem)
+        except Exception as e:
+            logger.error(f"Error streaming problems: {e}", exc_info=True)
+            raise
+
+    def iter_problem_fields(
+        self,
+        fields: Sequence[str],
+        subject: Optional[str] = None,
+        topic: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        batch_size: int = 500,
+        limit: Optional[int] = None,
+        problem_ids: Optional[Sequence[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Последовательно возвращает только выбранные поля задач.
+
+        Из БД читаются лишь нужные колонки (например, problem_id и text для
+        индексации), без разбора остальных JSON-колонок и без создания моделей Problem.
+
+        Args:
+            fields (Sequence[str]): Имена полей модели Problem (например, ["problem_id", "text"]).
+            subject (Optional[str]): Только задачи этого предмета.
+            topic (Optional[str]): Только задачи, в списке тем которых есть эта тема.
+            difficulty (Optional[str]): Только задачи этой сложности.
+            batch_size (int): Количество строк, загружаемых из курсора за раз.
+            limit (Optional[int]): Максимальное количество задач.
+            problem_ids (Optional[Sequence[str]]): Только задачи с этими идентификаторами.
+
+        Yields:
+            Dict[str, Any]: Словарь поле -> значение для каждой задачи, в порядке problem_id.
+
+        Raises:
+            ValueError: Если среди полей есть неизвестное.
+        """
+        unknown = [field for field in fields if field not in PROBLEM_FIELD_COLUMNS]
+        if unknown or not fields:
+            raise ValueError(f"Unknown problem fields: {unknown or 'none requested'}")
+        columns = [PROBLEM_FIELD_COLUMNS[field].class_attribute for field in fields]
+        logger.debug(f"Streaming problem fields {list(fields)} (subject={subject}, topic={topic}, difficulty={difficulty}).")
+        try:
+            with self.SessionLocal() as session:
+                stmt = (
+                    sa.select(*columns)
+                    .where(*self._problem_filters(subject, topic, difficulty, problem_ids))
+                    .order_by(DBProblem.problem_id)
+                    .execution_options(yield_per=max(1, batch_size))
+                )
+                if limit is not None:
+                    stmt = stmt.limit(limit)
+                for row in session.execute(stmt):
+                    yield dict(zip(fields, row))
+        except Exception as e:
+            logger.error(f"Error streaming problem fields {list(fields)}: {e}", exc_info=True)
+            raise
+
     def get_all_problems(self) -> List[Problem]:
         """Получает все задачи из базы данных.
 
+        Для больших банков задач используйте `iter_problems` или `iter_problem_fields`.
+
         Returns:
             List[Problem]: Список всех задач в виде Pydantic-моделей.
         """
         logger.debug("Fetching all problems from database.")
-        try:
-            with self.SessionLocal() as session:
-                logger.debug("Querying database for all problems.")
-                db_problems = session.query(DBProblem).all()
-                logger.info(f"Fetched {len(db_problems)} problems from database, converting to Problem schema.")
-                return [
-                    Problem(
-                        problem_id=p.problem_id,
-                        subject=p.subject,
-                        type=p.type,
-                        text=p.text,
-                        options=p.options,
-                        answer=p.answer,
-                        solutions=p.solutions,
-                        topics=p.topics,
-                        skills=p.skills,
-                        difficulty=p.difficulty,
-                        source_url=p.source_url,
-                        raw_html_path=p.raw_html_path,
-                        created_at=p.created_at,
-                        updated_at=p.updated_at,
-                        metadata=p.metadata_,
-                    )
-                    for p in db_problems
-                ]
-        except Exception as e:
-            logger.error(f"Error fetching all problems: {e}", exc_info=True)
-            raise
+        problems = list(self.iter_problems())
+        logger.info(f"Fetched {len(problems)} problems from database.")
+        return problems
 
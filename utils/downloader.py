@@ -1,37 +1,99 @@
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 from urllib.parse import urljoin
 
+import httpx
+
+from utils.asset_cache import AssetCache
+
 
 logger = logging.getLogger(__name__)
 
+AssetRequest = Tuple[str, Path, str]
+"""An asset to download: (asset_src, save_dir, asset_type)."""
+
+# (url, conditional headers) -> (ok, status, response headers, body getter)
+_Fetcher = Callable[[str, Dict[str, str]], Tuple[bool, int, Mapping[str, str], Callable[[], bytes]]]
+
 
 class AssetDownloader:
     """A class to handle downloading assets from web pages.
 
+    Every asset is fetched at most once per downloader: results are memoized by
+    (asset URL, target path), so the same image referenced by several blocks of a
+    page is only downloaded once. `download_many` fetches a whole batch concurrently.
+    With an `AssetCache`, assets are revalidated with conditional requests and
+    unchanged ones are linked from the cache instead of being downloaded again.
+
     Attributes:
         page: A Playwright page object for making HTTP requests.
         base_url: The base URL used to resolve relative asset URLs.
         files_location_prefix: Prefix to append to asset paths when constructing URLs.
+        max_workers: Maximum number of concurrent downloads in `download_many`.
+        cache: Optional cross-run cache of downloaded assets.
     """
 
-    def __init__(self, page: 'playwright.sync_api.Page', base_url: str, files_location_prefix: str = '../../'):
+    def __init__(
+        self,
+        page: 'playwright.sync_api.Page',
+        base_url: str,
+        files_location_prefix: str = '../../',
+        max_workers: int = 1,
+        cookies: Optional[List[Dict[str, str]]] = None,
+        user_agent: Optional[str] = None,
+        cache: Optional[AssetCache] = None,
+    ):
         """Initializes the AssetDownloader with necessary configuration.
 
         Args:
             page: Playwright page instance for HTTP requests.
             base_url: Base URL for resolving relative asset paths.
             files_location_prefix: URL prefix to prepend to asset paths.
+            max_workers: Maximum number of concurrent downloads in `download_many`.
+                         With 1, batches are downloaded one by one through `page`
+                         (or, without a page, by one HTTP client worker).
+            cookies: Browser cookies (Playwright format) sent with concurrent downloads.
+                     If not provided, they are read from the page's browser context.
+            user_agent: User agent sent with concurrent downloads.
+                        If not provided, the page's browser user agent is used.
+            cache: Content-addressed asset cache shared between runs. If not provided,
+                   every asset is downloaded and written to `save_dir`.
         """
         self.page = page
         self.base_url = base_url
         self.files_location_prefix = files_location_prefix
+        self.max_workers = max(1, max_workers)
+        self._cookies = cookies
+        self._user_agent = user_agent
+        self.cache = cache
+        self._results: Dict[Tuple[str, Path], Optional[Path]] = {}
+        self._results_lock = threading.Lock()
         logger.debug(f"AssetDownloader initialized with base_url: {base_url}, prefix: {files_location_prefix}")
 
+    def resolve_url(self, asset_src: str) -> str:
+        """Builds the absolute URL of an asset.
+
+        Args:
+            asset_src: Relative path or URL of the asset.
+
+        Returns:
+            The absolute asset URL.
+        """
+        # Construct the full URL - urljoin will normalize the path
+        logger.debug(f"Constructing full asset path using prefix '{self.files_location_prefix}' and src '{asset_src}'")
+        full_asset_path = self.files_location_prefix + asset_src
+        logger.debug(f"Constructing full URL from base '{self.base_url}' and path '{full_asset_path}'")
+        return urljoin(self.base_url, full_asset_path)
+
     def download(self, asset_src: str, save_dir: Path, asset_type: str = 'image') -> Optional[Path]:
         """Downloads an asset from the web and saves it locally.
 
+        Assets already fetched by this downloader (for example by `download_many`)
+        are not downloaded again.
+
         Args:
             asset_src: Relative path or URL of the asset.
             save_dir: Directory where the asset will be saved.
@@ -40,31 +102,234 @@ class AssetDownloader:
         Returns:
             Path to the saved file if successful, None otherwise.
         """
+        asset_url = self.resolve_url(asset_src)
+        key = (asset_url, save_dir / Path(asset_src).name)
+        with self._results_lock:
+            if key in self._results:
+                logger.debug(f"Reusing previous download result for {asset_url}")
+                return self._results[key]
+
         logger.info(f"Attempting to download {asset_type}: {asset_src} to {save_dir}")
-        
-        # Construct the full URL - urljoin will normalize the path
-        logger.debug(f"Constructing full asset path using prefix '{self.files_location_prefix}' and src '{asset_src}'")
-        full_asset_path = self.files_location_prefix + asset_src
-        
-        logger.debug(f"Constructing full URL from base '{self.base_url}' and path '{full_asset_path}'")
-        asset_url = urljoin(self.base_url, full_asset_path)
+        result = self._download_with_page(asset_src, asset_url, save_dir, asset_type)
+        with self._results_lock:
+            self._results[key] = result
+        return result
 
-        try:
-            logger.debug(f"Initiating GET request to: {asset_url}")
-            response = self.page.request.get(asset_url)
-            
-            if response.ok:
-                logger.debug(f"Download request for {asset_src} successful, status: {response.status}")
-                save_filename = Path(asset_src).name
-                save_path = save_dir / save_filename
-                save_path.parent.mkdir(parents=True, exist_ok=True)
-                save_path.write_bytes(response.body())
-                logger.info(f"Successfully downloaded {asset_type} from {asset_src} and saved to {save_path}")
-                logger.debug(f"Returning save path: {save_path}")
-                return save_path
+    def download_many(self, assets: Iterable[AssetRequest]) -> Dict[Tuple[str, Path], Optional[Path]]:
+        """Downloads a batch of assets concurrently, fetching each distinct URL once.
+
+        Duplicate requests (same resolved URL and target path) are dropped before
+        fetching, and assets already downloaded by this instance are skipped.
+        Results are memoized, so later `download` calls for the same assets
+        return immediately.
+
+        Args:
+            assets: Iterable of (asset_src, save_dir, asset_type) tuples.
+
+        Returns:
+            Mapping of (asset_src, save_dir) to the saved path, or None if the download failed.
+        """
+        pending: Dict[Tuple[str, Path], AssetRequest] = {}
+        requested: Dict[Tuple[str, Path], Tuple[str, Path]] = {}
+        for asset_src, save_dir, asset_type in assets:
+            key = (self.resolve_url(asset_src), save_dir / Path(asset_src).name)
+            requested[(asset_src, save_dir)] = key
+            with self._results_lock:
+                already_done = key in self._results
+            if not already_done and key not in pending:
+                pending[key] = (asset_src, save_dir, asset_type)
+
+        if pending:
+            logger.info(f"Downloading {len(pending)} unique assets ({len(requested)} requested) with up to {self.max_workers} workers")
+            if self.max_workers == 1 and self.page is not None:
+                fetched = {
+                    key: self._download_with_page(src, key[0], save_dir, asset_type)
+                    for key, (src, save_dir, asset_type) in pending.items()
+                }
             else:
-                logger.warning(f"Failed to download {asset_type} {asset_url}. Status: {response.status}")
-                return None
+                fetched = self._download_concurrently(pending)
+            with self._results_lock:
+                self._results.update(fetched)
+
+        with self._results_lock:
+            return {request: self._results.get(key) for request, key in requested.items()}
+
+    def _download_with_page(self, asset_src: str, asset_url: str, save_dir: Path, asset_type: str) -> Optional[Path]:
+        """Fetches one asset through the Playwright page's request context and saves it."""
+        def fetch(url: str, headers: Dict[str, str]):
+            logger.debug(f"Initiating GET request to: {url}")
+            # Only pass headers when revalidating a cached asset
+            response = self.page.request.get(url, headers=headers) if headers else self.page.request.get(url)
+            return response.ok, response.status, response.headers, response.body
+
+        return self._fetch(asset_src, asset_url, save_dir, asset_type, fetch)
+
+    def _download_concurrently(self, pending: Dict[Tuple[str, Path], AssetRequest]) -> Dict[Tuple[str, Path], Optional[Path]]:
+        """Fetches assets in a bounded thread pool with a shared HTTP client.
+
+        The Playwright sync API may only be used from the thread that created it,
+        so worker threads use an httpx client carrying the browser's cookies instead.
+        """
+        def fetch(url: str, headers: Dict[str, str]):
+            response = client.get(url, headers=headers)
+            return response.is_success, response.status_code, response.headers, lambda: response.content
+
+        with self._create_http_client() as client:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending)), thread_name_prefix="asset-dl") as executor:
+                futures = {
+                    key: executor.submit(self._fetch, asset_src, key[0], save_dir, asset_type, fetch)
+                    for key, (asset_src, save_dir, asset_type) in pending.items()
+                }
+                return {key: future.result() for key, future in futures.items()}
+
+    def _fetch(
+        self,
+        asset_src: str,
+        asset_url: str,
+        save_dir: Path,
+        asset_type: str,
+        fetch: _Fetcher,
+    ) -> Optional[Path]:
+        """Downloads one asset with `fetch`, revalidating it against the cache if there is one.
+
+        Args:
+            asset_src: Relative path or URL of the asset.
+            asset_url: The resolved absolute URL.
+            save_dir: Directory where the asset will be saved.
+            asset_type: Type of asset for logging.
+            fetch: Performs the GET request and returns (ok, status, headers, body getter).
+
+        Returns:
+            Path to the saved file if successful, None otherwise.
+        """
+        save_path = save_dir / Path(asset_src).name
+        entry = self.cache.lookup(asset_url) if self.cache else None
+        if entry and self.cache.is_fresh(entry):
+            logger.debug(f"Using recently checked cached {asset_type} for {asset_url}")
+            return self.cache.materialize(entry, save_path)
+
+        try:
+            conditional_headers = self.cache.conditional_headers(entry) if self.cache else {}
+            ok, status, headers, body = fetch(asset_url, conditional_headers)
+
+            if entry and status == 304:
+                entry = self.cache.mark_checked(asset_url, entry, headers)
+                logger.info(f"{asset_type.capitalize()} {asset_src} not modified, linked from cache to {save_path}")
+                return self.cache.materialize(entry, save_path)
+            if ok:
+                logger.debug(f"Download request for {asset_src} successful, status: {status}")
+                return self._save(asset_src, save_dir, body(), asset_type, asset_url, headers)
+            logger.warning(f"Failed to download {asset_type} {asset_url}. Status: {status}")
+            return None
         except Exception as e:
             logger.error(f"Error downloading {asset_type} {asset_url}: {e}", exc_info=True)
             return None
+
+    def _create_http_client(self) -> httpx.Client:
+        """Creates an HTTP client that presents itself like the scraping browser."""
+        cookies = self._cookies
+        if cookies is None and self.page is not None:
+            try:
+                cookies = self.page.context.cookies()
+            except Exception as e:
+                logger.debug(f"Could not read browser cookies for asset downloads: {e}")
+                cookies = []
+        jar = httpx.Cookies()
+        for cookie in cookies or []:
+            try:
+                jar.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+            except (KeyError, TypeError):
+                continue
+        user_agent = self._user_agent
+        if user_agent is None and self.page is not None:
+            try:
+                user_agent = self.page.evaluate("navigator.userAgent")
+            except Exception as e:
+                logger.debug(f"Could not read browser user agent for asset downloads: {e}")
+        headers = {"User-Agent": user_agent} if isinstance(user_agent, str) and user_agent else {}
+        return httpx.Client(
+            cookies=jar,
+            headers=headers,
+            verify=False,  # Matches the browser context, which ignores HTTPS errors
+            follow_redirects=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=self.max_workers, max_keepalive_connections=self.max_workers),
+        )
+
+    def _save(
+        self,
+        asset_src: str,
+        save_dir: Path,
+        body: bytes,
+        asset_type: str,
+        asset_url: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Path:
+        """Writes a downloaded asset to `save_dir` under its original file name, through the cache if there is one."""
+        save_filename = Path(asset_src).name
+        save_path = save_dir / save_filename
+        if self.cache is not None and asset_url:
+            entry = self.cache.store(asset_url, body, headers)
+            self.cache.materialize(entry, save_path)
+        else:
+            save_path.parent.mkdir(parents=True, exist_ok=True)
+            save_path.write_bytes(body)
+        logger.info(f"Successfully downloaded {asset_type} from {asset_src} and saved to {save_path}")
+        logger.debug(f"Returning save path: {save_path}")
+        return save_path
+
+
+class DeferredAssetDownloader(AssetDownloader):
+    """An asset downloader that only plans downloads, for processing pages away from the browser.
+
+    `download` and `download_many` record the requested assets and return the
+    path each one will be saved to, without fetching anything, so pages can be
+    processed in worker processes that have no browser or network access. The
+    recorded `requests` are then fetched in one batch by a regular
+    `AssetDownloader`, once processing is done; links to assets that fail are
+    pointed back to the site then (see `PageProcessingPipeline`).
+    """
+
+    def __init__(self, base_url: str, files_location_prefix: str = '../../'):
+        """Initializes the DeferredAssetDownloader.
+
+        Args:
+            base_url: Base URL for resolving relative asset paths.
+            files_location_prefix: URL prefix to prepend to asset paths.
+        """
+        super().__init__(page=None, base_url=base_url, files_location_prefix=files_location_prefix)
+        self._requests: Dict[Tuple[str, Path], AssetRequest] = {}
+
+    @property
+    def requests(self) -> List[AssetRequest]:
+        """The distinct assets requested so far, in request order."""
+        return list(self._requests.values())
+
+    def download(self, asset_src: str, save_dir: Path, asset_type: str = 'image') -> Optional[Path]:
+        """Records an asset to download later.
+
+        Args:
+            asset_src: Relative path or URL of the asset.
+            save_dir: Directory where the asset will be saved.
+            asset_type: Type of asset (e.g., 'image', 'file').
+
+        Returns:
+            The path the asset will be saved to.
+        """
+        save_path = save_dir / Path(asset_src).name
+        self._requests.setdefault((self.resolve_url(asset_src), save_path), (asset_src, save_dir, asset_type))
+        return save_path
+
+    def download_many(self, assets: Iterable[AssetRequest]) -> Dict[Tuple[str, Path], Optional[Path]]:
+        """Records a batch of assets to download later.
+
+        Args:
+            assets: Iterable of (asset_src, save_dir, asset_type) tuples.
+
+        Returns:
+            Mapping of (asset_src, save_dir) to the path the asset will be saved to.
+        """
+        return {
+            (asset_src, save_dir): self.download(asset_src, save_dir, asset_type)
+            for asset_src, save_dir, asset_type in assets
+        }
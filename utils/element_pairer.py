@@ -1,12 +1,15 @@
 # utils/element_pairer.py
 import logging
-import re
-from typing import List, Tuple
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
 from bs4 import BeautifulSoup
 from bs4.element import Tag
 
 logger = logging.getLogger(__name__)
 
+# (element_type, tag, element_id), element_type being 'qblock', 'header' or 'other_div'
+_OrderedElement = Tuple[str, Tag, Optional[str]]
+
 
 class ElementPairer:
     """
@@ -18,6 +21,16 @@ class ElementPairer:
     It correctly handles sequences like 'qblock' -> 'header' and 'header' -> 'qblock'.
     A 'qblock' (e.g., id='q40B442') is paired with a 'header' (e.g., id='i40B442')
     if their IDs match (qXXXX -> iXXXX).
+
+    Adjacency rules, applied to the body divs in document order:
+        - A qblock takes the nearest unpaired header with its ID after it, up to the
+          next qblock; failing that, the nearest one before it, back to the previous qblock.
+        - A header takes the nearest unpaired qblock with its ID before it, back to the
+          previous header; failing that, the nearest one after it, up to the next header.
+
+    The candidates of each element therefore lie in the two "gaps" around it (between
+    it and its neighbours of the same type), so the pairer indexes every element by
+    (gap, ID) and pairs the whole page in a single linear pass.
     """
 
     def pair(self, page_soup: BeautifulSoup) -> List[Tuple[Tag, Tag]]:
@@ -32,7 +45,103 @@ class ElementPairer:
             List[Tuple[Tag, Tag]]: A list of tuples, where each tuple contains
                                 (header_container_tag, qblock_tag).
         """
+        debug = logger.isEnabledFor(logging.DEBUG)
         logger.debug("Starting element pairing process.")
+        ordered_elements = self._ordered_elements(page_soup)
+
+        if debug:
+            for idx, (elem_type, elem_tag, elem_id) in enumerate(ordered_elements):
+                logger.debug(
+                    f"  [{idx}]: {elem_type}, id='{elem_tag.get('id')}', class='{elem_tag.get('class')}', "
+                    f"extracted_id='{elem_id}', text='{elem_tag.get_text(strip=True)[:30]}...'"
+                )
+
+        # Gap of an element: how many elements of the opposite type come before it.
+        # A qblock with qblock ordinal k looks for headers in header gaps k (before) and k + 1 (after);
+        # a header with header ordinal m looks for qblocks in qblock gaps m (before) and m + 1 (after).
+        headers_by_gap: Dict[Tuple[int, str], Deque[int]] = defaultdict(deque)
+        qblocks_by_gap: Dict[Tuple[int, str], Deque[int]] = defaultdict(deque)
+        ordinals: List[int] = []
+        qblock_count = 0
+        header_count = 0
+        for idx, (elem_type, _, elem_id) in enumerate(ordered_elements):
+            if elem_type == 'qblock':
+                ordinals.append(qblock_count)
+                if elem_id:
+                    qblocks_by_gap[(header_count, elem_id)].append(idx)
+                qblock_count += 1
+            elif elem_type == 'header':
+                ordinals.append(header_count)
+                if elem_id:
+                    headers_by_gap[(qblock_count, elem_id)].append(idx)
+                header_count += 1
+            else:
+                ordinals.append(-1)
+
+        paired_elements = []
+        # Список для отслеживания уже использованных индексов (для header и qblock)
+        used_indices: Set[int] = set()
+
+        for i, (element_type, element_tag, element_id) in enumerate(ordered_elements):
+            # other_div или элемент без ID просто пропускаем
+            if not element_id or i in used_indices or element_type == 'other_div':
+                continue
+
+            gap_before, gap_after = ordinals[i], ordinals[i] + 1
+            if element_type == 'qblock':
+                # Nearest following header first, then nearest preceding one
+                candidates = headers_by_gap
+                lookups = (("next", gap_after), ("prev", gap_before))
+            else:
+                # Nearest preceding qblock first, then nearest following one
+                candidates = qblocks_by_gap
+                lookups = (("prev", gap_before), ("next", gap_after))
+
+            match_idx = None
+            for direction, gap in lookups:
+                match_idx = self._take(candidates, gap, element_id, direction, used_indices)
+                if match_idx is not None:
+                    break
+            if match_idx is None:
+                # Если нет подходящей пары ни до, ни после, элемент остаётся непарным.
+                continue
+
+            used_indices.add(i)
+            used_indices.add(match_idx)
+            match_tag = ordered_elements[match_idx][1]
+            if element_type == 'qblock':
+                header_tag, qblock_tag = match_tag, element_tag
+            else:
+                header_tag, qblock_tag = element_tag, match_tag
+            paired_elements.append((header_tag, qblock_tag)) # (header, qblock)
+            if debug:
+                if element_type == 'qblock':
+                    logger.debug(f"Paired: QBlock class '{qblock_tag.get('class')}' (id q{element_id}) with Header '{header_tag.get('id')}' (id i{element_id}) ({direction})")
+                else:
+                    logger.debug(f"Paired: Header '{header_tag.get('id')}' (id i{element_id}) with QBlock class '{qblock_tag.get('class')}' (id q{element_id}) ({direction})")
+
+        # Теперь пройдемся по оставшимся элементам, чтобы вывести непарные
+        for idx, (elem_type, elem_tag, elem_id) in enumerate(ordered_elements):
+            if idx not in used_indices:
+                if elem_type == 'header':
+                    logger.warning(f"Unpaired header found: id '{elem_tag.get('id')}'")
+                elif elem_type == 'qblock':
+                    logger.warning(f"Unpaired qblock found: class '{elem_tag.get('class')}', id '{elem_tag.get('id')}'")
+
+        logger.info(f"Successfully paired {len(paired_elements)} header-qblock sets.")
+        return paired_elements
+
+    @staticmethod
+    def _ordered_elements(page_soup: BeautifulSoup) -> List[_OrderedElement]:
+        """
+        Classifies the div children of the page body, in document order.
+
+        Args:
+            page_soup (BeautifulSoup): The parsed BeautifulSoup object of the page.
+
+        Returns:
+            List[_OrderedElement]: (element_type, tag, element_id) for every body div.
+        """
         # Находим все div-элементы в порядке их появления в body
         body_children = page_soup.body.children if page_soup.body else []
         ordered_elements = []
@@ -52,159 +161,40 @@ class ElementPairer:
                 else:
                     element_id = None
                 ordered_elements.append((element_type, child, element_id))
+        return ordered_elements
+
+    @staticmethod
+    def _take(
+        index: Dict[Tuple[int, str], Deque[int]],
+        gap: int,
+        element_id: str,
+        direction: str,
+        used_indices: Set[int]
+    ) -> Optional[int]:
+        """
+        Returns the nearest unpaired candidate of a gap, or None.
 
-        # --- Добавленный отладочный вывод ---
-        print("--- DEBUG: ordered_elements (with other divs) ---")
-        for idx, (elem_type, elem_tag, elem_id) in enumerate(ordered_elements):
-            print(f"  [{idx}]: {elem_type}, id='{elem_tag.get('id')}', class='{elem_tag.get('class')}', extracted_id='{elem_id}', text='{elem_tag.get_text(strip=True)[:30]}...'")
-        print("--------- END DEBUG ---------")
-        # --- Конец добавленного вывода ---
-
-        paired_elements = []
-        # Список для отслеживания уже использованных индексов (для header и qblock)
-        used_indices = set()
-
-        # Проходим по списку
-        i = 0
-        while i < len(ordered_elements):
-            element_type, element_tag, element_id = ordered_elements[i]
-
-            if element_type == 'qblock' and element_id:
-                # Нашли qblock с ID. Проверим, был ли он использован.
-                if i in used_indices:
-                    i += 1
-                    continue
-
-                # Ищем *ближайший следующий* непарный header с *совпадающим* ID.
-                next_header_idx = -1
-                j = i + 1
-                while j < len(ordered_elements):
-                    next_type, next_tag, next_id = ordered_elements[j]
-                    if next_type == 'header' and next_id == element_id and j not in used_indices:
-                        next_header_idx = j
-                        break
-                    # Если встречаем другой qblock раньше header, останавливаем поиск
-                    if next_type == 'qblock':
-                        break
-                    j += 1
-
-                # --- Добавленный отладочный вывод ---
-                print(f"--- DEBUG: Processing qblock at i={i} (id={element_id}), next_matching_header_idx={next_header_idx} ---")
-                # --- Конец добавленного вывода ---
-
-                if next_header_idx != -1:
-                    # Найден непарный следующий header с совпадающим ID. Создаём пару.
-                    qblock_tag = element_tag
-                    header_tag = ordered_elements[next_header_idx][1]
-                    paired_elements.append((header_tag, qblock_tag)) # (header, qblock)
-                    used_indices.add(i)
-                    used_indices.add(next_header_idx)
-                    logger.debug(f"Paired: QBlock class '{qblock_tag.get('class')}' (id q{element_id}) with Header '{header_tag.get('id')}' (id i{element_id}) (next)")
-                    print(f"  -> PAIRED (q->h, next): (i{element_id}, '...{qblock_tag.get_text(strip=True)[:30]}...')") # Отладка
-                else:
-                    # Не нашли подходящий header после. Попробуем найти *ближайший предыдущий* непарный header с совпадающим ID.
-                    prev_header_idx = -1
-                    j = i - 1
-                    while j >= 0:
-                        prev_type, prev_tag, prev_id = ordered_elements[j]
-                        if prev_type == 'header' and prev_id == element_id and j not in used_indices:
-                            prev_header_idx = j
-                            break
-                        # Если встречаем другой qblock раньше header, останавливаем поиск
-                        if prev_type == 'qblock':
-                            break
-                        j -= 1
-
-                    # --- Добавленный отладочный вывод ---
-                    print(f"--- DEBUG: Processing qblock at i={i} (id={element_id}), prev_matching_header_idx={prev_header_idx} ---")
-                    # --- Конец добавленного вывода ---
-
-                    if prev_header_idx != -1:
-                        # Найден непарный предыдущий header с совпадающим ID. Создаём пару.
-                        header_tag = ordered_elements[prev_header_idx][1]
-                        qblock_tag = element_tag
-                        paired_elements.append((header_tag, qblock_tag)) # (header, qblock)
-                        used_indices.add(prev_header_idx)
-                        used_indices.add(i)
-                        logger.debug(f"Paired: QBlock class '{qblock_tag.get('class')}' (id q{element_id}) with Header '{header_tag.get('id')}' (id i{element_id}) (prev)")
-                        print(f"  -> PAIRED (q->h, prev): (i{element_id}, '...{qblock_tag.get_text(strip=True)[:30]}...')") # Отладка
-                    # Если нет подходящего header ни до, ни после, qblock остаётся непарным.
-
-            elif element_type == 'header' and element_id:
-                # Нашли header с ID. Проверим, был ли он использован.
-                if i in used_indices:
-                    i += 1
-                    continue
-
-                # Ищем *ближайший предыдущий* непарный qblock с *совпадающим* ID.
-                prev_qblock_idx = -1
-                j = i - 1
-                while j >= 0:
-                    prev_type, prev_tag, prev_id = ordered_elements[j]
-                    if prev_type == 'qblock' and prev_id == element_id and j not in used_indices:
-                        prev_qblock_idx = j
-                        break
-                    # Если встречаем другой header раньше qblock, останавливаем поиск
-                    if prev_type == 'header':
-                        break
-                    j -= 1
-
-                # --- Добавленный отладочный вывод ---
-                print(f"--- DEBUG: Processing header at i={i} (id={element_id}), prev_matching_qblock_idx={prev_qblock_idx} ---")
-                # --- Конец добавленного вывода ---
-
-                if prev_qblock_idx != -1:
-                    # Найден непарный предыдущий qblock с совпадающим ID. Создаём пару.
-                    header_tag = element_tag
-                    qblock_tag = ordered_elements[prev_qblock_idx][1]
-                    paired_elements.append((header_tag, qblock_tag)) # (header, qblock)
-                    used_indices.add(i)
-                    used_indices.add(prev_qblock_idx)
-                    logger.debug(f"Paired: Header '{header_tag.get('id')}' (id i{element_id}) with QBlock class '{qblock_tag.get('class')}' (id q{element_id}) (prev)")
-                    print(f"  -> PAIRED (h->q, prev): (i{element_id}, '...{qblock_tag.get_text(strip=True)[:30]}...')") # Отладка
-                else:
-                    # Не нашли подходящий qblock до. Попробуем найти *ближайший следующий* непарный qblock с совпадающим ID.
-                    next_qblock_idx = -1
-                    j = i + 1
-                    while j < len(ordered_elements):
-                        next_type, next_tag, next_id = ordered_elements[j]
-                        if next_type == 'qblock' and next_id == element_id and j not in used_indices:
-                            next_qblock_idx = j
-                            break
-                        # Если встречаем другой header раньше qblock, останавливаем поиск
-                        if next_type == 'header':
-                            break
-                        j += 1
-
-                    # --- Добавленный отладочный вывод ---
-                    print(f"--- DEBUG: Processing header at i={i} (id={element_id}), next_matching_qblock_idx={next_qblock_idx} ---")
-                    # --- Конец добавленного вывода ---
-
-                    if next_qblock_idx != -1:
-                        # Найден непарный следующий qblock с совпадающим ID. Создаём пару.
-                        header_tag = element_tag
-                        qblock_tag = ordered_elements[next_qblock_idx][1]
-                        paired_elements.append((header_tag, qblock_tag)) # (header, qblock)
-                        used_indices.add(i)
-                        used_indices.add(next_qblock_idx)
-                        logger.debug(f"Paired: Header '{header_tag.get('id')}' (id i{element_id}) with QBlock class '{qblock_tag.get('class')}' (id q{element_id}) (next)")
-                        print(f"  -> PAIRED (h->q, next): (i{element_id}, '...{qblock_tag.get_text(strip=True)[:30]}...')") # Отладка
-                    # Если нет подходящего qblock ни до, ни после, header остаётся непарным.
-
-            # other_div или элемент без ID просто пропускаем
-            i += 1
+        Candidates are kept in document order; already paired ones are dropped from
+        the end being read, so every index is discarded at most once per page.
 
-        # Теперь пройдемся по оставшимся элементам, чтобы вывести непарные
-        for idx, (elem_type, elem_tag, elem_id) in enumerate(ordered_elements):
-            if idx not in used_indices:
-                if elem_type == 'header':
-                    logger.warning(f"Unpaired header found: id '{elem_tag.get('id')}'")
-                    print(f"  -> UNPAIRED header: {elem_tag.get('id')}") # Отладка
-                elif elem_type == 'qblock':
-                    logger.warning(f"Unpaired qblock found: class '{elem_tag.get('class')}', id '{elem_tag.get('id')}'")
-                    print(f"  -> UNPAIRED qblock: '{elem_tag.get_text(strip=True)[:30]}...' (id {elem_tag.get('id')})") # Отладка
-
-        logger.info(f"Successfully paired {len(paired_elements)} header-qblock sets.")
-        print(f"--- DEBUG: Final result length: {len(paired_elements)} ---") # Отладка
-        return paired_elements
+        Args:
+            index (Dict[Tuple[int, str], Deque[int]]): Candidate positions by (gap, ID).
+            gap (int): The gap to look in.
+            element_id (str): The ID to match.
+            direction (str): "next" for the first candidate of the gap (the one nearest to an
+                             element before the gap), "prev" for the last one.
+            used_indices (Set[int]): Positions already paired.
 
+        Returns:
+            Optional[int]: The position of the candidate.
+        """
+        candidates = index.get((gap, element_id))
+        if not candidates:
+            return None
+        if direction == "next":
+            while candidates and candidates[0] in used_indices:
+                candidates.popleft()
+            return candidates[0] if candidates else None
+        while candidates and candidates[-1] in used_indices:
+            candidates.pop()
+        return candidates[-1] if candidates else None
@@ -0,0 +1,78 @@
+"""
+Module with shared helpers for parsing and editing HTML with BeautifulSoup.
+
+Pages are parsed once, with a configurable tree builder (lxml by default), and
+every later step works on subtrees (`Tag`s) of that single document. These
+helpers keep that pattern cheap: `parse_html` picks the backend, and
+`new_tag` creates elements for a subtree without building another soup.
+"""
+import logging
+from typing import Optional, Union
+
+from bs4 import BeautifulSoup, FeatureNotFound
+from bs4.element import Tag
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HTML_PARSER = "lxml"
+"""BeautifulSoup tree builder used when none is configured."""
+
+FALLBACK_HTML_PARSER = "html.parser"
+
+_fragment_soup = BeautifulSoup("", FALLBACK_HTML_PARSER)
+
+
+def parse_html(content: str, parser: Optional[str] = None) -> BeautifulSoup:
+    """
+    Parses an HTML document with the given BeautifulSoup tree builder.
+
+    Args:
+        content (str): The HTML to parse.
+        parser (Optional[str]): Tree builder name ("lxml", "html.parser", "html5lib").
+                                Defaults to `DEFAULT_HTML_PARSER`.
+
+    Returns:
+        BeautifulSoup: The parsed document. Falls back to "html.parser" if the requested
+                       builder is not installed.
+    """
+    parser = parser or DEFAULT_HTML_PARSER
+    try:
+        return BeautifulSoup(content, parser)
+    except FeatureNotFound:
+        logger.warning(f"HTML parser '{parser}' is not available, falling back to '{FALLBACK_HTML_PARSER}'.")
+        return BeautifulSoup(content, FALLBACK_HTML_PARSER)
+
+
+def soup_root(element: Union[BeautifulSoup, Tag]) -> Optional[BeautifulSoup]:
+    """
+    Returns the document an element belongs to.
+
+    Args:
+        element (Union[BeautifulSoup, Tag]): A document or any element inside one.
+
+    Returns:
+        Optional[BeautifulSoup]: The owning document, or None for a detached element.
+    """
+    node = element
+    while node is not None and not isinstance(node, BeautifulSoup):
+        node = node.parent
+    return node
+
+
+def new_tag(element: Union[BeautifulSoup, Tag], name: str, **attrs) -> Tag:
+    """
+    Creates a new tag that can be inserted next to or inside `element`.
+
+    The tag is created by the document `element` belongs to, so it uses the same
+    tree builder (and the same void-element rules, e.g. for <img>).
+
+    Args:
+        element (Union[BeautifulSoup, Tag]): A document or an element inside the target document.
+        name (str): The tag name.
+        **attrs: Tag attributes.
+
+    Returns:
+        Tag: The new, detached tag.
+    """
+    root = soup_root(element) or _fragment_soup
+    return root.new_tag(name, **attrs)
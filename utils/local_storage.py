@@ -1,100 +1,313 @@
-"""Local storage module for managing task answers and statuses."""
+"""Local storage module for managing task answers and statuses.
+
+Answers are kept in an in-memory index backed by an append-only log file:
+every write appends one JSON line with the new state of a single entry, and
+the log is periodically compacted to one line per entry. All file access is
+serialized with a lock file (`portalocker`), so several processes can share
+the same storage without losing updates; each instance catches up with lines
+appended by others before it reads or writes.
+"""
 
 import json
+import logging
+import os
+import threading
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
+import portalocker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_ID = "default_user"
+
+LOG_HEADER = {"format": "local-storage-log", "version": 1}
+"""First line of the log file; files without it are read as the legacy single JSON object."""
+
 
 class LocalStorage:
-    """Manages local storage for task answers and their statuses."""
+    """Manages local storage for task answers and their statuses.
+
+    Answers of the default user are stored under their task ID, as before
+    multi-user support; answers of other users under "<user_id>/<task_id>",
+    so user IDs must not contain "/".
 
-    def __init__(self, storage_path: Path) -> None:
+    Lookups are served from memory. Writes append a line to the log instead of
+    rewriting the file; once the log holds `compact_min_records` lines and more
+    than `compact_ratio` times as many lines as live entries, it is rewritten
+    with one line per entry. A legacy JSON file is read as is and converted on
+    the first compaction.
+    """
+
+    def __init__(self, storage_path: Path, compact_min_records: int = 1000,
+                 compact_ratio: float = 2.0, fsync: bool = False) -> None:
         """Initializes the LocalStorage with a path to the storage file.
 
         Args:
-            storage_path: Path to the JSON file used for storage.
+            storage_path: Path to the file used for storage.
+            compact_min_records: Log lines below which the log is never compacted.
+            compact_ratio: Compact once the log has this many lines per live entry.
+            fsync: Flush every write to disk before returning (slower, survives power loss).
         """
         self._storage_path = storage_path
+        self._lock_path = storage_path.with_name(storage_path.name + ".lock")
+        self.compact_min_records = max(1, compact_min_records)
+        self.compact_ratio = max(1.0, compact_ratio)
+        self.fsync = fsync
         # Ensure the parent directory exists
         self._storage_path.parent.mkdir(parents=True, exist_ok=True)
 
+        self._index: Dict[str, Dict[str, str]] = {}
+        self._records = 0
+        self._offset = 0
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._is_log = False
+        self._thread_lock = threading.Lock()
+        self._lock_file = None
+
+    # --- File access -----------------------------------------------------------
+
+    def _locked(self, exclusive: bool) -> "_FileLock":
+        """Returns a context manager holding the thread lock and the lock file."""
+        return _FileLock(self, exclusive)
+
+    def _reset(self) -> None:
+        """Forgets the loaded state, so the next sync reads the file from the start."""
+        self._index = {}
+        self._records = 0
+        self._offset = 0
+        self._file_id = None
+        self._is_log = False
+
+    def _sync(self) -> None:
+        """Brings the index up to date with the file; the lock file must be held.
+
+        Reads only the lines appended since the last sync. If the file was
+        replaced (compacted by another instance) or truncated, reads it again.
+        """
+        try:
+            stat = os.stat(self._storage_path)
+        except FileNotFoundError:
+            self._reset()
+            return
+        file_id = (stat.st_dev, stat.st_ino)
+        # Legacy files are rewritten in place by older versions: any change means a full reload
+        legacy_changed = not self._is_log and self._offset and stat.st_size != self._offset
+        if file_id != self._file_id or stat.st_size < self._offset or legacy_changed:
+            self._reset()
+            self._file_id = file_id
+        if stat.st_size == self._offset:
+            return
+        try:
+            with self._storage_path.open('rb') as f:
+                f.seek(self._offset)
+                chunk = f.read()
+        except OSError as e:
+            logger.error(f"Failed to read answer storage {self._storage_path}: {e}")
+            return
+
+        if self._offset == 0 and not self._is_log:
+            first_line = chunk.split(b"\n", 1)[0]
+            if _parse_line(first_line) != LOG_HEADER:
+                self._load_legacy(chunk)
+                return
+            self._is_log = True
+
+        # A writer may be in the middle of a line: stop at the last complete one
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            record = _parse_line(line)
+            if not isinstance(record, dict) or "k" not in record:
+                continue  # The header, or a line damaged by a crash
+            self._index[record["k"]] = record.get("v") or {}
+            self._records += 1
+        self._offset += end
+
+    def _load_legacy(self, content: bytes) -> None:
+        """Loads a file written in the legacy format (one JSON object)."""
+        try:
+            data = json.loads(content.decode('utf-8')) if content.strip() else {}
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # In case of an error, start with empty storage
+            logger.warning(f"Answer storage {self._storage_path} is not valid JSON; starting empty.")
+            data = {}
+        self._index = {k: v for k, v in data.items() if isinstance(v, dict)} if isinstance(data, dict) else {}
+        # Legacy files are rewritten as a log on the first write (see `_append`)
+        self._records = len(self._index)
+        self._offset = len(content)
+
+    def _append(self, key: str, entry: Dict[str, str]) -> None:
+        """Appends the new state of an entry to the log; the exclusive lock must be held."""
+        self._index[key] = entry
+        if not self._is_log or self._needs_compaction():
+            self._compact()
+            return
+        line = json.dumps({"k": key, "v": entry}, ensure_ascii=False).encode('utf-8') + b"\n"
+        try:
+            # Under the exclusive lock, bytes past the last complete line are left by a crashed writer
+            if os.path.getsize(self._storage_path) > self._offset:
+                os.truncate(self._storage_path, self._offset)
+            with self._storage_path.open('ab') as f:
+                f.write(line)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+        except OSError as e:
+            logger.error(f"Failed to append to answer storage {self._storage_path}: {e}")
+            return
+        self._offset += len(line)
+        self._records += 1
+
+    def _needs_compaction(self) -> bool:
+        return (self._records >= self.compact_min_records
+                and self._records > self.compact_ratio * len(self._index))
+
+    def _compact(self) -> None:
+        """Rewrites the log with one line per entry; the exclusive lock must be held."""
+        tmp_path = self._storage_path.with_name(self._storage_path.name + ".tmp")
+        lines = [json.dumps(LOG_HEADER).encode('utf-8') + b"\n"]
+        lines.extend(
+            json.dumps({"k": key, "v": entry}, ensure_ascii=False).encode('utf-8') + b"\n"
+            for key, entry in self._index.items()
+        )
+        content = b"".join(lines)
+        try:
+            with tmp_path.open('wb') as f:
+                f.write(content)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self._storage_path)
+        except OSError as e:
+            logger.error(f"Failed to compact answer storage {self._storage_path}: {e}")
+            return
+        logger.debug(f"Compacted answer storage {self._storage_path}: {self._records} -> {len(self._index)} records.")
+        stat = os.stat(self._storage_path)
+        self._file_id = (stat.st_dev, stat.st_ino)
+        self._offset = len(content)
+        self._records = len(self._index)
+        self._is_log = True
+
     def _load_data(self) -> Dict[str, Dict[str, str]]:
         """Loads data from the storage file.
 
         Returns:
-            A dictionary containing the stored data. Returns an empty
-            dictionary if the file does not exist or is invalid JSON.
+            A dictionary containing the stored data (a copy of the index).
+            Returns an empty dictionary if the file does not exist or is invalid.
         """
-        if not self._storage_path.exists():
-            return {}
-        try:
-            with self._storage_path.open('r', encoding='utf-8') as f:
-                content = f.read()
-                if content.strip():
-                    data = json.loads(content)
-                    if isinstance(data, dict):
-                        return data
-                return {}
-        except (json.JSONDecodeError, OSError):
-            # In case of an error, return an empty dict
-            return {}
+        with self._locked(exclusive=False):
+            self._sync()
+            return {key: dict(entry) for key, entry in self._index.items()}
 
     def _save_data(self, data: Dict[str, Dict[str, str]]) -> None:
-        """Saves data to the storage file.
+        """Replaces all stored data.
 
         Args:
              The dictionary to save.
         """
-        try:
-            with self._storage_path.open('w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
-        except OSError:
-            # Consider logging the error
-            pass
+        with self._locked(exclusive=True):
+            self._sync()
+            self._index = {key: dict(entry) for key, entry in data.items()}
+            self._compact()
+
+    # --- Public interface --------------------------------------------------------
+
+    @staticmethod
+    def _key(task_id: str, user_id: str) -> str:
+        """Returns the storage key of a task for a user.
+
+        Raises:
+            ValueError: If the user ID contains "/", which would make keys ambiguous.
+        """
+        if "/" in user_id:
+            raise ValueError(f"User ID must not contain '/': {user_id!r}")
+        return task_id if user_id == DEFAULT_USER_ID else f"{user_id}/{task_id}"
 
-    def get_answer_and_status(self, task_id: str) -> Tuple[Optional[str], str]:
+    def get_answer_and_status(self, task_id: str, user_id: str = DEFAULT_USER_ID) -> Tuple[Optional[str], str]:
         """Retrieves the answer and status for a given task ID.
 
         Args:
             task_id: The unique identifier for the task.
+            user_id: The user the answer belongs to. Defaults to the default user.
 
         Returns:
             A tuple containing the answer (or None if not found)
             and the status (defaulting to "not_checked").
         """
-        data = self._load_data()
-        entry = data.get(task_id)
+        with self._locked(exclusive=False):
+            self._sync()
+            entry = self._index.get(self._key(task_id, user_id))
         if entry and isinstance(entry, dict):
             answer = entry.get("answer")
             status = entry.get("status", "not_checked")
             return answer, status
         return None, "not_checked"
 
-    def save_answer_and_status(self, task_id: str, answer: str, status: str = "not_checked") -> None:
+    def save_answer_and_status(self, task_id: str, answer: str, status: str = "not_checked",
+                               user_id: str = DEFAULT_USER_ID) -> None:
         """Saves the answer and status for a given task ID.
 
         Args:
             task_id: The unique identifier for the task.
             answer: The answer string to store.
             status: The status string. Defaults to "not_checked".
+            user_id: The user the answer belongs to. Defaults to the default user.
         """
-        data = self._load_data()
-        data[task_id] = {"answer": answer, "status": status}
-        self._save_data(data)
+        with self._locked(exclusive=True):
+            self._sync()
+            self._append(self._key(task_id, user_id), {"answer": answer, "status": status})
 
-    def update_status(self, task_id: str, status: str) -> None:
+    def update_status(self, task_id: str, status: str, user_id: str = DEFAULT_USER_ID) -> None:
         """Updates the status for a given task ID.
 
         Args:
             task_id: The unique identifier for the task.
             status: The new status string.
+            user_id: The user the answer belongs to. Defaults to the default user.
         """
-        data = self._load_data()
-        entry = data.get(task_id)
-        if entry and isinstance(entry, dict):
-            entry["status"] = status
-        else:
-            # If the task_id doesn't exist, create a new entry with status only.
-            # The answer field might be None or missing.
-            data[task_id] = {"status": status}
-        self._save_data(data)
+        key = self._key(task_id, user_id)
+        with self._locked(exclusive=True):
+            # Read-modify-write under the exclusive lock, so concurrent updates are not lost
+            self._sync()
+            entry = self._index.get(key)
+            if entry and isinstance(entry, dict):
+                entry = {**entry, "status": status}
+            else:
+                # If the task_id doesn't exist, create a new entry with status only.
+                # The answer field might be None or missing.
+                entry = {"status": status}
+            self._append(key, entry)
+
+
+class _FileLock:
+    """Holds a LocalStorage's thread lock and a shared or exclusive lock on its lock file."""
+
+    def __init__(self, storage: LocalStorage, exclusive: bool) -> None:
+        self._storage = storage
+        self._flags = portalocker.LOCK_EX if exclusive else portalocker.LOCK_SH
+
+    def __enter__(self) -> "_FileLock":
+        storage = self._storage
+        storage._thread_lock.acquire()
+        try:
+            if storage._lock_file is None:
+                storage._lock_file = storage._lock_path.open('a')
+            portalocker.lock(storage._lock_file, self._flags)
+        except BaseException:
+            storage._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            portalocker.unlock(self._storage._lock_file)
+        finally:
+            self._storage._thread_lock.release()
+
+
+def _parse_line(line: bytes):
+    """Parses one log line; returns None if it is not valid JSON."""
+    try:
+        return json.loads(line.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
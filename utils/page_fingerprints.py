@@ -0,0 +1,183 @@
+"""
+Module for remembering what each FIPI page looked like in previous runs.
+
+This module provides the `PageFingerprintStore` class used by the incremental
+scraping mode: the scraper fingerprints every captured page and skips the
+processing pipeline when the fingerprint matches the one recorded by an
+earlier run. Fingerprints are kept in one small JSON file per subject
+(`<root>/<proj_id>.json`), independent of the per-run output folders.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_MODES = ("qblock_ids", "html")
+
+_DIV_START_TAG = re.compile(r"<div\b([^>]*)>", re.IGNORECASE)
+_ATTRIBUTE = re.compile(r"""([^\s=/>]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+
+
+def _attr_value(attrs: str, name: str) -> Optional[str]:
+    """Returns the value of attribute `name` in the attribute text of a start tag, or None."""
+    for match in _ATTRIBUTE.finditer(attrs):
+        if match.group(1).lower() == name:
+            return next(value for value in match.groups()[1:] if value is not None)
+    return None
+
+
+def compute_fingerprint(page_content: str, mode: str = "qblock_ids") -> str:
+    """
+    Computes the fingerprint of a page's raw HTML.
+
+    Args:
+        page_content (str): The raw HTML of the page.
+        mode (str, optional): "qblock_ids" hashes the sorted ids of the page's qblocks, so
+                              only added or removed tasks count as a change; "html" hashes the
+                              whole document with whitespace collapsed. Defaults to "qblock_ids".
+
+    Returns:
+        str: A "<mode>:<sha256>" fingerprint.
+
+    Raises:
+        ValueError: If the mode is unknown.
+    """
+    if mode == "qblock_ids":
+        # A lexical scan of the <div> start tags; the page itself is parsed only once, later, if it changed
+        qblock_ids = []
+        for attrs in _DIV_START_TAG.findall(page_content):
+            classes = _attr_value(attrs, "class")
+            if classes is not None and "qblock" in classes.split():
+                qblock_ids.append(_attr_value(attrs, "id") or "")
+        payload = "\n".join(sorted(qblock_ids))
+    elif mode == "html":
+        payload = re.sub(r"\s+", " ", page_content).strip()
+    else:
+        raise ValueError(f"Unknown fingerprint mode '{mode}', expected one of {FINGERPRINT_MODES}")
+    return f"{mode}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class PageFingerprintStore:
+    """
+    A class to store the last processed fingerprint of every page, per subject.
+
+    The store is thread-safe, so concurrent scraper workers can share one instance.
+    """
+
+    def __init__(self, root: Path, mode: str = "qblock_ids"):
+        """
+        Initializes the PageFingerprintStore.
+
+        Args:
+            root (Path): Directory holding one JSON file per subject. Created if it does not exist.
+            mode (str, optional): Fingerprint mode passed to `compute_fingerprint`. Defaults to "qblock_ids".
+        """
+        if mode not in FINGERPRINT_MODES:
+            raise ValueError(f"Unknown fingerprint mode '{mode}', expected one of {FINGERPRINT_MODES}")
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self._subjects: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, page_content: str) -> str:
+        """
+        Computes the fingerprint of a page in this store's mode.
+
+        Args:
+            page_content (str): The raw HTML of the page.
+
+        Returns:
+            str: The page fingerprint.
+        """
+        return compute_fingerprint(page_content, self.mode)
+
+    def get(self, proj_id: str, page_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the record of a page from the last run that processed it.
+
+        Args:
+            proj_id (str): The project ID of the subject.
+            page_name (str): The page name (e.g., 'init', '1').
+
+        Returns:
+            Optional[Dict[str, Any]]: {"fingerprint", "run", "updated_at"} or None if the page is unknown.
+        """
+        with self._lock:
+            record = self._load(proj_id).get(page_name)
+            return dict(record) if record else None
+
+    def is_unchanged(self, proj_id: str, page_name: str, fingerprint: str) -> bool:
+        """
+        Tells whether a page has the same fingerprint as when it was last processed.
+
+        Args:
+            proj_id (str): The project ID of the subject.
+            page_name (str): The page name.
+            fingerprint (str): The fingerprint of the freshly captured page.
+
+        Returns:
+            bool: True if the recorded fingerprint matches.
+        """
+        record = self.get(proj_id, page_name)
+        return record is not None and record.get("fingerprint") == fingerprint
+
+    def update(self, proj_id: str, page_name: str, fingerprint: str, run: str = "") -> None:
+        """
+        Records the fingerprint of a page that was processed and saved successfully.
+
+        Args:
+            proj_id (str): The project ID of the subject.
+            page_name (str): The page name.
+            fingerprint (str): The fingerprint of the processed page.
+            run (str, optional): Name of the run folder holding the page's outputs.
+        """
+        with self._lock:
+            pages = self._load(proj_id)
+            pages[page_name] = {
+                "fingerprint": fingerprint,
+                "run": run,
+                "updated_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            self._save(proj_id, pages)
+
+    def _path(self, proj_id: str) -> Path:
+        """Returns the JSON file of a subject."""
+        safe_proj_id = "".join(c for c in proj_id if c.isalnum() or c in ("-", "_")) or "unknown"
+        return self.root / f"{safe_proj_id}.json"
+
+    def _load(self, proj_id: str) -> Dict[str, Dict[str, Any]]:
+        """Returns the cached page records of a subject, reading them from disk once. Caller holds the lock."""
+        if proj_id not in self._subjects:
+            path = self._path(proj_id)
+            try:
+                self._subjects[proj_id] = json.loads(path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                self._subjects[proj_id] = {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read page fingerprints from {path}, starting fresh: {e}")
+                self._subjects[proj_id] = {}
+        return self._subjects[proj_id]
+
+    def _save(self, proj_id: str, pages: Dict[str, Dict[str, Any]]) -> None:
+        """Atomically writes the page records of a subject. Caller holds the lock."""
+        path = self._path(proj_id)
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                json.dump(pages, tmp_file, ensure_ascii=False, indent=2)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
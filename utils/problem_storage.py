@@ -1,12 +1,25 @@
 """
 Модуль для сохранения и загрузки задач Problem в формате JSONL.
+
+Для поиска задачи по идентификатору рядом с файлом хранится индекс смещений
+(`<файл>.idx`: problem_id -> смещение и длина строки), а сама запись читается
+через `mmap`, без разбора остальных строк. Индекс перестраивается, только если
+файл изменился: при дописывании в конец индексируются лишь новые строки.
 """
 import json
+import logging
+import mmap
+import os
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from models.problem_schema import Problem
 
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+"""Версия формата файла индекса; индекс другой версии перестраивается."""
+
 
 class ProblemStorage:
     """
@@ -14,6 +27,7 @@ class ProblemStorage:
 
     Attributes:
         storage_path (Path): Путь к файлу для хранения задач в формате JSONL.
+        index_path (Path): Путь к файлу индекса смещений.
     """
 
     def __init__(self, storage_path: Path):
@@ -24,6 +38,13 @@ class ProblemStorage:
             storage_path (Path): Путь к файлу .jsonl для хранения задач.
         """
         self.storage_path = storage_path
+        self.index_path = storage_path.with_name(storage_path.name + ".idx")
+        # problem_id -> (смещение, длина) строки; при повторах действует первая запись, как при полном поиске
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        # (st_ino, st_size, st_mtime_ns) файла, для которого построен индекс
+        self._indexed_stat: Optional[Tuple[int, int, int]] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._mmap_size = 0
 
     def save_problem(self, problem: Problem) -> None:
         """
@@ -46,25 +67,30 @@ class ProblemStorage:
             for problem in problems:
                 f.write(problem.model_dump_json() + '\n')
 
-    def load_all_problems(self) -> List[Problem]:
+    def iter_problems(self) -> Iterator[Problem]:
         """
-        Загружает все задачи из файла JSONL.
+        Последовательно читает задачи из файла JSONL, не держа их все в памяти.
 
-        Returns:
-            List[Problem]: Список задач, загруженных из файла.
-                           Возвращает пустой список, если файл не существует или пуст.
+        Yields:
+            Problem: Очередная задача из файла.
         """
         if not self.storage_path.exists():
-            return []
-        problems = []
+            return
         with self.storage_path.open('r', encoding='utf-8') as f:
             for line in f:
                 line = line.strip()
                 if line:  # Пропускаем пустые строки
-                    problem_data = json.loads(line)
-                    problem = Problem.model_validate(problem_data)
-                    problems.append(problem)
-        return problems
+                    yield Problem.model_validate(json.loads(line))
+
+    def load_all_problems(self) -> List[Problem]:
+        """
+        Загружает все задачи из файла JSONL.
+
+        Returns:
+            List[Problem]: Список задач, загруженных из файла.
+                           Возвращает пустой список, если файл не существует или пуст.
+        """
+        return list(self.iter_problems())
 
     def get_problem_by_id(self, problem_id: str) -> Optional[Problem]:
         """
@@ -76,9 +102,146 @@ class ProblemStorage:
         Returns:
             Optional[Problem]: Объект задачи, если найден, иначе None.
         """
-        # Для простоты читаем все задачи. В будущем можно оптимизировать.
-        all_problems = self.load_all_problems()
-        for problem in all_problems:
-            if problem.problem_id == problem_id:
-                return problem
-        return None
+        if not self._refresh_index():
+            return None
+        location = self._offsets.get(problem_id)
+        if location is None:
+            return None
+        offset, length = location
+        return Problem.model_validate_json(self._mmap[offset:offset + length])
+
+    def __contains__(self, problem_id: str) -> bool:
+        return self._refresh_index() and problem_id in self._offsets
+
+    def close(self) -> None:
+        """Освобождает отображение файла в память."""
+        if self._mmap is not None:
+            self._mmap.close()
+        self._mmap = None
+        self._mmap_size = 0
+
+    # --- Индекс смещений --------------------------------------------------------
+
+    def _refresh_index(self) -> bool:
+        """
+        Приводит индекс и отображение файла в соответствие с текущим файлом.
+
+        Returns:
+            bool: True, если файл существует и не пуст.
+        """
+        try:
+            stat = os.stat(self.storage_path)
+        except FileNotFoundError:
+            self.close()
+            self._offsets, self._indexed_stat = {}, None
+            return False
+        current = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if self._indexed_stat is None:
+            self._load_index_file()
+        if current != self._indexed_stat:
+            self._update_index(current)
+        if stat.st_size == 0:
+            self.close()
+            return False
+        if self._mmap is None or self._mmap_size != stat.st_size:
+            self.close()
+            with self.storage_path.open('rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mmap_size = stat.st_size
+        return True
+
+    def _load_index_file(self) -> None:
+        """Загружает сохранённый индекс, если он есть и подходит по версии."""
+        try:
+            with self.index_path.open('r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                return
+            self._offsets = {pid: (offset, length) for pid, offset, length in data["entries"]}
+            self._indexed_stat = tuple(data["stat"])
+        except (OSError, ValueError, KeyError, TypeError):
+            self._offsets, self._indexed_stat = {}, None
+
+    def _update_index(self, current: Tuple[int, int, int]) -> None:
+        """
+        Обновляет индекс под текущее состояние файла и сохраняет его.
+
+        Если файл тот же и только вырос, индексируются только новые строки,
+        иначе индекс строится заново.
+        """
+        inode, size, _ = current
+        start = 0
+        if self._indexed_stat is not None:
+            old_inode, old_size, _ = self._indexed_stat
+            if old_inode == inode and old_size < size and self._ends_with_newline(old_size):
+                start = old_size
+        if start == 0:
+            self._offsets = {}
+        logger.debug(f"Indexing {self.storage_path} from byte {start} of {size}.")
+        self.close()
+
+        offset = start
+        with self.storage_path.open('rb') as f:
+            f.seek(start)
+            for line in f:
+                length = len(line)
+                stripped = line.strip()
+                if stripped:
+                    problem_id = _read_problem_id(stripped)
+                    if problem_id is not None and problem_id not in self._offsets:
+                        self._offsets[problem_id] = (offset, len(line.rstrip(b"\r\n")))
+                offset += length
+        self._indexed_stat = current
+        self._save_index_file()
+
+    def _ends_with_newline(self, size: int) -> bool:
+        """Проверяет, что проиндексированная часть файла заканчивается целой строкой."""
+        if size == 0:
+            return True
+        with self.storage_path.open('rb') as f:
+            f.seek(size - 1)
+            return f.read(1) == b"\n"
+
+    def _save_index_file(self) -> None:
+        """Атомарно сохраняет индекс рядом с файлом задач."""
+        data = {
+            "version": INDEX_VERSION,
+            "stat": list(self._indexed_stat),
+            "entries": [[pid, offset, length] for pid, (offset, length) in self._offsets.items()],
+        }
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        try:
+            with tmp_path.open('w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            # Индекс лишь ускоряет поиск: без него он будет построен заново при следующем запуске
+            logger.warning(f"Failed to save problem index {self.index_path}: {e}")
+
+
+_ID_PREFIX = b'{"problem_id":"'
+
+
+def _read_problem_id(line: bytes) -> Optional[str]:
+    """
+    Извлекает problem_id из строки JSONL.
+
+    `Problem.model_dump_json` пишет problem_id первым полем, поэтому обычно
+    он берётся из начала строки без разбора всего JSON.
+
+    Args:
+        line (bytes): Строка файла без перевода строки.
+
+    Returns:
+        Optional[str]: Идентификатор задачи или None для повреждённой строки.
+    """
+    # Строка, дописанная не до конца, не заканчивается скобкой и разбирается целиком
+    if line.startswith(_ID_PREFIX) and line.endswith(b"}"):
+        end = line.find(b'"', len(_ID_PREFIX))
+        if end != -1 and b"\\" not in line[len(_ID_PREFIX):end]:
+            return line[len(_ID_PREFIX):end].decode('utf-8')
+    try:
+        problem_id = json.loads(line).get("problem_id")
+    except (ValueError, AttributeError):
+        return None  # Строка, повреждённая или ещё дописываемая
+    return problem_id if isinstance(problem_id, str) else None
@@ -0,0 +1,198 @@
+"""
+Module for selecting quiz problems without loading the problem bank.
+
+This module provides the `QuizSelector` class. It keeps hot candidate pools
+per subject: only the problem ID, task ID, topics and difficulty of every
+problem, loaded once with a single projected query and updated in place
+whenever `DatabaseManager.save_problems` stores problems. A quiz is sampled
+from the pool matching the requested subject, topic and difficulty, preferring
+problems the user has not answered yet, so the cost of starting a quiz does
+not depend on the size of the bank or the number of users.
+"""
+import logging
+import random
+import threading
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from models.problem_schema import Problem
+from utils.database_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+POOL_FIELDS = ["problem_id", "task_id", "subject", "topics", "difficulty"]
+"""Problem fields kept in the candidate pools."""
+
+
+class Candidate(NamedTuple):
+    """A problem that can be put into a quiz."""
+
+    problem_id: str
+    task_id: str
+    """FIPI task ID under which answers are stored (the problem ID for problems without one)."""
+    topics: Tuple[str, ...]
+    difficulty: str
+
+
+class _Pool:
+    """Candidates of one subject (or of all subjects), with cached topic/difficulty subsets."""
+
+    def __init__(self) -> None:
+        self.candidates: Dict[str, Candidate] = {}
+        # Number of candidates per topic and per difficulty, so that only subsets of
+        # values present in the pool are cached (the filters come from the request)
+        self._topics: Counter = Counter()
+        self._difficulties: Counter = Counter()
+        self._subsets: Dict[Tuple[Optional[str], Optional[str]], List[Candidate]] = {}
+
+    def put(self, candidate: Candidate) -> None:
+        self.remove(candidate.problem_id)
+        self.candidates[candidate.problem_id] = candidate
+        self._topics.update(set(candidate.topics))
+        self._difficulties[candidate.difficulty] += 1
+        self._subsets.clear()
+
+    def remove(self, problem_id: str) -> None:
+        candidate = self.candidates.pop(problem_id, None)
+        if candidate is not None:
+            for topic in set(candidate.topics):
+                _discount(self._topics, topic)
+            _discount(self._difficulties, candidate.difficulty)
+            self._subsets.clear()
+
+    def subset(self, topic: Optional[str], difficulty: Optional[str]) -> List[Candidate]:
+        """Returns the candidates with the topic and difficulty (None matches any), computed once per change."""
+        if (topic is not None and topic not in self._topics) or \
+                (difficulty is not None and difficulty not in self._difficulties):
+            return []
+        key = (topic, difficulty)
+        subset = self._subsets.get(key)
+        if subset is None:
+            subset = [
+                c for c in self.candidates.values()
+                if (topic is None or topic in c.topics) and (difficulty is None or c.difficulty == difficulty)
+            ]
+            self._subsets[key] = subset
+        return subset
+
+
+def _discount(counter: Counter, value: str) -> None:
+    """Decrements a count, dropping values no candidate has any more."""
+    counter[value] -= 1
+    if counter[value] <= 0:
+        del counter[value]
+
+
+class QuizSelector:
+    """
+    Samples quiz problems from hot per-subject candidate pools.
+
+    The pools are loaded from the database on first use (or by `warm_up`) and
+    kept current through `DatabaseManager.add_problems_saved_listener`, so a
+    quiz start costs one indexed query for the user's answered tasks and
+    an in-memory sample, whatever the size of the bank.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, rng: Optional[random.Random] = None):
+        """
+        Initializes the QuizSelector and subscribes it to problem saves.
+
+        Args:
+            db_manager (DatabaseManager): The database to select problems from.
+            rng (Optional[random.Random]): Random generator for sampling (seed it for reproducible quizzes).
+        """
+        self.db_manager = db_manager
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._pools: Optional[Dict[Optional[str], _Pool]] = None
+        self._subject_of: Dict[str, str] = {}
+        db_manager.add_problems_saved_listener(self._on_problems_saved)
+
+    def warm_up(self) -> None:
+        """Loads the candidate pools from the database, if not loaded yet."""
+        with self._lock:
+            self._ensure_loaded()
+
+    def _ensure_loaded(self) -> Dict[Optional[str], _Pool]:
+        """Returns the pools, loading them with one projected query on first use; the lock must be held."""
+        if self._pools is None:
+            self._pools = {None: _Pool()}
+            self._subject_of = {}
+            for row in self.db_manager.iter_problem_fields(POOL_FIELDS, batch_size=2000):
+                self._put(row["problem_id"], row["task_id"], row["subject"], row["topics"], row["difficulty"])
+            logger.info(f"Loaded quiz candidate pools: {len(self._subject_of)} problems, "
+                        f"{len(self._pools) - 1} subjects.")
+        return self._pools
+
+    def _put(self, problem_id: str, task_id: Optional[str], subject: str,
+             topics: Optional[Sequence[str]], difficulty: str) -> None:
+        """Adds or replaces a problem in the pools; the lock must be held."""
+        old_subject = self._subject_of.get(problem_id)
+        if old_subject is not None and old_subject != subject:
+            self._pools[old_subject].remove(problem_id)
+        candidate = Candidate(problem_id, task_id or problem_id, tuple(topics or ()), difficulty)
+        self._pools.setdefault(subject, _Pool()).put(candidate)
+        self._pools[None].put(candidate)
+        self._subject_of[problem_id] = subject
+
+    def _on_problems_saved(self, problems: List[Problem]) -> None:
+        """Updates the loaded pools with saved problems (pools not loaded yet will read them from the database)."""
+        with self._lock:
+            if self._pools is None:
+                return
+            for problem in problems:
+                self._put(problem.problem_id, problem.task_id, problem.subject, problem.topics, problem.difficulty)
+        logger.debug(f"Updated quiz candidate pools with {len(problems)} saved problems.")
+
+    def select(self, user_id: str, count: int = 10, subject: Optional[str] = None,
+               topic: Optional[str] = None, difficulty: Optional[str] = None) -> List[str]:
+        """
+        Samples problems for a quiz.
+
+        Problems the user has not answered are preferred; answered ones only
+        fill the quiz when there are not enough new problems.
+
+        Args:
+            user_id (str): The user taking the quiz.
+            count (int): Number of problems in the quiz.
+            subject (Optional[str]): Only problems of this subject.
+            topic (Optional[str]): Only problems with this topic.
+            difficulty (Optional[str]): Only problems of this difficulty.
+
+        Returns:
+            List[str]: IDs of the selected problems (fewer than `count` if the pool is smaller).
+        """
+        answered = self.db_manager.get_answered_task_ids(user_id)
+        with self._lock:
+            pool = self._ensure_loaded().get(subject)
+            candidates = pool.subset(topic, difficulty) if pool is not None else []
+        if count <= 0 or not candidates:
+            return []
+        selected = self._sample(candidates, count, answered)
+        logger.info(f"Selected {len(selected)} of {len(candidates)} candidates for user {user_id} "
+                    f"(subject={subject}, topic={topic}, difficulty={difficulty}).")
+        return selected
+
+    def _sample(self, candidates: List[Candidate], count: int, answered: Set[str]) -> List[str]:
+        """Samples up to `count` candidates, unanswered first."""
+        count = min(count, len(candidates))
+        fresh: List[str] = []
+        seen: Set[str] = set()
+        # Random probes find new problems quickly unless the user has answered most of the pool
+        for _ in range(count * 4):
+            candidate = candidates[self._rng.randrange(len(candidates))]
+            if candidate.problem_id in seen:
+                continue
+            seen.add(candidate.problem_id)
+            if candidate.task_id not in answered:
+                fresh.append(candidate.problem_id)
+                if len(fresh) == count:
+                    return fresh
+        fresh_set = set(fresh)
+        rest = [c for c in candidates if c.problem_id not in fresh_set]
+        new = [c.problem_id for c in rest if c.task_id not in answered]
+        old = [c.problem_id for c in rest if c.task_id in answered]
+        needed = count - len(fresh)
+        picked = self._rng.sample(new, min(needed, len(new)))
+        picked += self._rng.sample(old, needed - len(picked))
+        return fresh + picked
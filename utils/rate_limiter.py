@@ -0,0 +1,69 @@
+"""
+Module for throttling requests to the same host.
+
+This module provides the `HostRateLimiter` class which enforces a minimum
+interval between consecutive requests to a host. It is thread-safe, so several
+scraping workers can share one instance and stay polite towards FIPI together.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class HostRateLimiter:
+    """
+    A class to space out requests to the same host by a minimum interval.
+
+    Each call to `wait` reserves the next free time slot for the URL's host and
+    sleeps until that slot begins. Slots are reserved under a lock, while the
+    sleeping happens outside of it, so waiting threads do not block each other
+    on different hosts.
+    """
+
+    def __init__(
+        self,
+        min_interval: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initializes the HostRateLimiter.
+
+        Args:
+            min_interval (float): Minimum number of seconds between two requests to the same host.
+                                  0 or a negative value disables throttling.
+            clock (Callable[[], float], optional): Monotonic clock function. Defaults to time.monotonic.
+            sleep (Callable[[float], None], optional): Sleep function. Defaults to time.sleep.
+        """
+        self.min_interval = max(0.0, min_interval)
+        self._clock = clock
+        self._sleep = sleep
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> float:
+        """
+        Blocks until a request to the URL's host is allowed.
+
+        Args:
+            url (str): The URL about to be requested.
+
+        Returns:
+            float: The number of seconds the caller was delayed.
+        """
+        if self.min_interval <= 0:
+            return 0.0
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            logger.debug(f"Rate limiting request to {host}: sleeping {delay:.2f}s")
+            self._sleep(delay)
+        return delay
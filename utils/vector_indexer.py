@@ -7,21 +7,23 @@ to a Qdrant collection for semantic search.
 """
 
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, List
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qdrant_models
 
-from models.problem_schema import Problem
 from utils.database_manager import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+PAYLOAD_FIELDS = ["problem_id", "subject", "topics", "type", "difficulty", "source_url", "text"]
+"""Problem fields fetched for indexing and stored in the Qdrant payload."""
+
 
 class QdrantProblemIndexer:
     """
     A class to index Problems from a DatabaseManager into a Qdrant collection.
 
-    This indexer fetches Problem instances, generates embeddings for their text,
+    This indexer streams problems from the database, generates embeddings for their text,
     and uploads them along with metadata to a specified Qdrant collection.
     """
 
@@ -47,66 +49,66 @@ class QdrantProblemIndexer:
             f"with database at '{db_manager.db_path}'"
         )
 
-    def index_problems(self, embedding_model: Any) -> None:
+    def index_problems(self, embedding_model: Any, batch_size: int = 256) -> None:
         """
         Indexes all problems from the database into the Qdrant collection.
 
-        Fetches problems, generates embeddings for their text, and uploads them
-        with relevant metadata to Qdrant.
+        Streams only the fields needed for the payload from the database,
+        generates embeddings for their text, and uploads them to Qdrant in
+        batches, so memory use does not grow with the size of the problem bank.
 
         Args:
             embedding_model (Any): An object with an `encode(text)` method to generate embeddings.
+            batch_size (int): Number of problems fetched and upserted to Qdrant at a time.
         """
         logger.info("Starting indexing process for all problems.")
         try:
-            # Fetch all problems from the database
-            problems: List[Problem] = self.db_manager.get_all_problems()
-            logger.info(f"Fetched {len(problems)} problems from the database.")
-
-            points_to_upsert = []
-            for problem in problems:
+            indexed = 0
+            points_to_upsert: List[qdrant_models.PointStruct] = []
+            # Fetch only the indexed fields, batch by batch
+            for problem in self.db_manager.iter_problem_fields(PAYLOAD_FIELDS, batch_size=batch_size):
                 # --- Prepare text for embedding ---
                 # Start with the main problem text
-                text_for_embedding = problem.text
+                text_for_embedding = problem["text"]
                 # Future: Append solutions if they are relevant for search
-                # if problem.solutions:
-                #     solution_texts = [sol.get('text', '') for sol in problem.solutions if isinstance(sol, dict)]
-                #     text_for_embedding += " " + " ".join(solution_texts)
 
                 # --- Generate embedding ---
                 embedding_vector = embedding_model.encode(text_for_embedding)
 
-                # --- Prepare payload ---
-                payload = {
-                    "problem_id": problem.problem_id,
-                    "subject": problem.subject,
-                    "topics": problem.topics,
-                    "type": problem.type,
-                    "difficulty": problem.difficulty,
-                    "source_url": problem.source_url, # Optional: useful for linking back
-                    "text": problem.text, # Optional: store the text itself, might be redundant if searchable via vectors
-                    # Add other fields as needed for filtering/searching
-                }
-                # Handle potentially non-serializable fields like datetime if necessary
-                # For Pydantic models with datetime, they are usually serialized correctly by Qdrant client
-                # but be mindful of complex nested structures in metadata if not handled by Pydantic serialization.
-
                 # --- Create PointStruct ---
+                # The payload holds the problem_id, subject, topics, type, difficulty,
+                # source_url (useful for linking back) and text fields
                 point = qdrant_models.PointStruct(
-                    id=problem.problem_id, # Use problem_id as the unique ID in Qdrant
+                    id=problem["problem_id"], # Use problem_id as the unique ID in Qdrant
                     vector=embedding_vector,
-                    payload=payload
+                    payload=dict(problem)
                 )
                 points_to_upsert.append(point)
+                if len(points_to_upsert) >= batch_size:
+                    indexed += self._upsert(points_to_upsert)
+                    points_to_upsert = []
 
-            # --- Upsert points to Qdrant ---
-            logger.debug(f"Upserting {len(points_to_upsert)} points to collection '{self.collection_name}'.")
-            self.qdrant_client.upsert(
-                collection_name=self.collection_name,
-                points=points_to_upsert
-            )
-            logger.info(f"Successfully indexed {len(problems)} problems into Qdrant collection '{self.collection_name}'.")
+            if points_to_upsert:
+                indexed += self._upsert(points_to_upsert)
+            logger.info(f"Successfully indexed {indexed} problems into Qdrant collection '{self.collection_name}'.")
 
         except Exception as e:
             logger.error(f"Error occurred during indexing: {e}", exc_info=True)
             raise # Re-raise the exception to signal failure to the caller
+
+    def _upsert(self, points: List[qdrant_models.PointStruct]) -> int:
+        """
+        Upserts a batch of points to the Qdrant collection.
+
+        Args:
+            points (List[qdrant_models.PointStruct]): The points to upsert.
+
+        Returns:
+            int: Number of upserted points.
+        """
+        logger.debug(f"Upserting {len(points)} points to collection '{self.collection_name}'.")
+        self.qdrant_client.upsert(
+            collection_name=self.collection_name,
+            points=points
+        )
+        return len(points)